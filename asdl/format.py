@@ -215,13 +215,174 @@ class AnsiOutput(ColorOutput):
 INDENT = 2
 
 
+def _ExternalStr(node):
+    # type: (hnode.External) -> str
+    if mylib.PYTHON:
+        return repr(node.obj)
+    else:
+        return 'UNTYPED any'
+
+
 class _PrettyPrinter(object):
+    """Print a tree in two passes, each of which visits a node once.
+
+    _Measure() computes the single-line width of every node bottom-up.  The
+    widths are stored in lists indexed by the node's pre-order position, and
+    PrintNode() looks them up to decide where to break lines, then streams the
+    output.  So there are no temporary buffers, and no subtree is rendered
+    more than once.
+    """
+
     def __init__(self, max_col):
         # type: (int) -> None
         self.max_col = max_col
 
-    def _PrintWrappedArray(self, array, prefix_len, f, indent):
-        # type: (List[hnode_t], int, ColorOutput, int) -> bool
+        # Indexed by pre-order position
+        self.widths = []  # type: List[int]
+        # Width up to the end of the last Leaf, External, or Array.  A Record's
+        # right delimiter isn't checked against max_col.  -1 if there's none.
+        self.fit_widths = []  # type: List[int]
+        self.sizes = []  # type: List[int]  # number of nodes in the subtree
+        # Encoded text of Leaf and External nodes, so it's computed once
+        self.texts = []  # type: List[str]
+
+    def _Measure(self, node):
+        # type: (hnode_t) -> int
+        """Record widths for node and its descendants.
+
+        Returns the pre-order position of node.
+        """
+        i = len(self.widths)
+        self.widths.append(0)
+        self.fit_widths.append(0)
+        self.sizes.append(0)
+        self.texts.append(None)
+
+        width = 0
+        fit_width = -1
+
+        UP_node = node  # for mycpp
+        tag = node.tag()
+        if tag == hnode_e.Leaf:
+            node = cast(hnode.Leaf, UP_node)
+            self.texts[i] = qsn.maybe_encode(node.s)
+            width = len(self.texts[i])
+            fit_width = width
+
+        elif tag == hnode_e.External:
+            node = cast(hnode.External, UP_node)
+            self.texts[i] = _ExternalStr(node)
+            width = len(self.texts[i])
+            fit_width = width
+
+        elif tag == hnode_e.Array:
+            node = cast(hnode.Array, UP_node)
+            width = 1  # [
+            for j, item in enumerate(node.children):
+                if j != 0:
+                    width += 1  # space
+                width += self.widths[self._Measure(item)]
+            width += 1  # ]
+            fit_width = width
+
+        elif tag == hnode_e.Record:
+            node = cast(hnode.Record, UP_node)
+            width = len(node.left)
+            if node.abbrev:
+                if len(node.node_type):
+                    width += len(node.node_type) + 1
+                for j, val in enumerate(node.unnamed_fields):
+                    if j != 0:
+                        width += 1  # space
+                    c = self._Measure(val)
+                    if self.fit_widths[c] != -1:
+                        fit_width = width + self.fit_widths[c]
+                    width += self.widths[c]
+            else:
+                width += len(node.node_type)
+                for field in node.fields:
+                    width += len(field.name) + 2  # ' name:'
+                    c = self._Measure(field.val)
+                    if self.fit_widths[c] != -1:
+                        fit_width = width + self.fit_widths[c]
+                    width += self.widths[c]
+            width += len(node.right)
+
+        else:
+            raise AssertionError(node)
+
+        self.widths[i] = width
+        self.fit_widths[i] = fit_width
+        self.sizes[i] = len(self.widths) - i
+        return i
+
+    def _Fits(self, i, max_chars):
+        # type: (int, int) -> bool
+        """Can the node at position i be printed in max_chars?"""
+        fit_width = self.fit_widths[i]
+        return fit_width == -1 or fit_width <= max_chars
+
+    def _PrintSingleLine(self, node, i, f):
+        # type: (hnode_t, int, ColorOutput) -> None
+        """Print a node on a single line, which the caller has measured."""
+        UP_node = node  # for mycpp
+        tag = node.tag()
+        if tag == hnode_e.Leaf:
+            node = cast(hnode.Leaf, UP_node)
+            f.PushColor(node.color)
+            f.write(self.texts[i])
+            f.PopColor()
+
+        elif tag == hnode_e.External:
+            f.PushColor(color_e.External)
+            f.write(self.texts[i])
+            f.PopColor()
+
+        elif tag == hnode_e.Array:
+            node = cast(hnode.Array, UP_node)
+
+            f.write('[')
+            c = i + 1
+            for j, item in enumerate(node.children):
+                if j != 0:
+                    f.write(' ')
+                self._PrintSingleLine(item, c, f)
+                c += self.sizes[c]
+            f.write(']')
+
+        elif tag == hnode_e.Record:
+            node = cast(hnode.Record, UP_node)
+            f.write(node.left)
+            c = i + 1
+            if node.abbrev:
+                if len(node.node_type):
+                    f.PushColor(color_e.TypeName)
+                    f.write(node.node_type)
+                    f.PopColor()
+                    f.write(' ')
+
+                for j, val in enumerate(node.unnamed_fields):
+                    if j != 0:
+                        f.write(' ')
+                    self._PrintSingleLine(val, c, f)
+                    c += self.sizes[c]
+            else:
+                f.PushColor(color_e.TypeName)
+                f.write(node.node_type)
+                f.PopColor()
+
+                for field in node.fields:
+                    f.write(' %s:' % field.name)
+                    self._PrintSingleLine(field.val, c, f)
+                    c += self.sizes[c]
+
+            f.write(node.right)
+
+        else:
+            raise AssertionError(node)
+
+    def _PrintWrappedArray(self, array, first, prefix_len, f, indent):
+        # type: (List[hnode_t], int, int, ColorOutput, int) -> bool
         """Print an array of objects with line wrapping.
 
         Returns whether they all fit on a single line, so you can print
@@ -230,25 +391,25 @@ class _PrettyPrinter(object):
         all_fit = True
         chars_so_far = prefix_len
 
+        c = first
         for i, val in enumerate(array):
             if i != 0:
                 f.write(' ')
 
-            single_f = f.NewTempBuffer()
-            if _TrySingleLine(val, single_f, self.max_col - chars_so_far):
-                s, num_chars = single_f.GetRaw()  # extra unpacking for mycpp
-                f.WriteRaw((s, num_chars))
-                chars_so_far += single_f.NumChars()
+            if self._Fits(c, self.max_col - chars_so_far):
+                self._PrintSingleLine(val, c, f)
+                chars_so_far += self.widths[c]
             else:  # WRAP THE LINE
                 f.write('\n')
-                self.PrintNode(val, f, indent + INDENT)
+                self.PrintNode(val, c, f, indent + INDENT)
 
                 chars_so_far = 0  # allow more
                 all_fit = False
+            c += self.sizes[c]
         return all_fit
 
-    def _PrintWholeArray(self, array, prefix_len, f, indent):
-        # type: (List[hnode_t], int, ColorOutput, int) -> bool
+    def _PrintWholeArray(self, array, first, prefix_len, f):
+        # type: (List[hnode_t], int, int, ColorOutput) -> bool
 
         # This is UNLIKE the abbreviated case above, where we do WRAPPING.
         # Here, ALL children must fit on a single line, or else we separate
@@ -259,29 +420,25 @@ class _PrettyPrinter(object):
         # ]
         # The first child is out of line.  The abbreviated objects have a
         # small header like C or DQ so it doesn't matter as much.
-        all_fit = True
-        pieces = []  # type: List[Tuple[str, int]]
         chars_so_far = prefix_len
-        for item in array:
-            single_f = f.NewTempBuffer()
-            if _TrySingleLine(item, single_f, self.max_col - chars_so_far):
-                s, num_chars = single_f.GetRaw()  # extra unpacking for mycpp
-                pieces.append((s, num_chars))
-                chars_so_far += single_f.NumChars()
-            else:
-                all_fit = False
-                break
+        c = first
+        for _ in array:
+            if not self._Fits(c, self.max_col - chars_so_far):
+                return False
+            chars_so_far += self.widths[c]
+            c += self.sizes[c]
 
-        if all_fit:
-            for i, p in enumerate(pieces):
-                if i != 0:
-                    f.write(' ')
-                f.WriteRaw(p)
-            f.write(']')
-        return all_fit
+        c = first
+        for i, item in enumerate(array):
+            if i != 0:
+                f.write(' ')
+            self._PrintSingleLine(item, c, f)
+            c += self.sizes[c]
+        f.write(']')
+        return True
 
-    def _PrintRecord(self, node, f, indent):
-        # type: (hnode.Record, ColorOutput, int) -> None
+    def _PrintRecord(self, node, i, f, indent):
+        # type: (hnode.Record, int, ColorOutput, int) -> None
         """Print a CompoundObj in abbreviated or normal form."""
         ind = ' ' * indent
 
@@ -295,8 +452,8 @@ class _PrettyPrinter(object):
                 f.write(' ')
 
             prefix_len = len(prefix) + len(node.node_type) + 1
-            all_fit = self._PrintWrappedArray(node.unnamed_fields, prefix_len,
-                                              f, indent)
+            all_fit = self._PrintWrappedArray(node.unnamed_fields, i + 1,
+                                              prefix_len, f, indent)
 
             if not all_fit:
                 f.write('\n')
@@ -311,6 +468,7 @@ class _PrettyPrinter(object):
             f.PopColor()
 
             f.write('\n')
+            c = i + 1
             for field in node.fields:
                 name = field.name
                 val = field.val
@@ -325,12 +483,15 @@ class _PrettyPrinter(object):
                     f.write(name_str)
                     prefix_len = len(name_str)
 
-                    if not self._PrintWholeArray(val.children, prefix_len, f,
-                                                 indent):
+                    if not self._PrintWholeArray(val.children, c + 1,
+                                                 prefix_len, f):
                         f.write('\n')
+                        c2 = c + 1
                         for child in val.children:
-                            self.PrintNode(child, f, indent + INDENT + INDENT)
+                            self.PrintNode(child, c2, f,
+                                           indent + INDENT + INDENT)
                             f.write('\n')
+                            c2 += self.sizes[c2]
                         f.write('%s]' % ind1)
 
                 else:  # primitive field
@@ -340,40 +501,35 @@ class _PrettyPrinter(object):
 
                     # Try to print it on the same line as the field name; otherwise print
                     # it on a separate line.
-                    single_f = f.NewTempBuffer()
-                    if _TrySingleLine(val, single_f, self.max_col - prefix_len):
-                        s, num_chars = single_f.GetRaw(
-                        )  # extra unpacking for mycpp
-                        f.WriteRaw((s, num_chars))
+                    if self._Fits(c, self.max_col - prefix_len):
+                        self._PrintSingleLine(val, c, f)
                     else:
                         f.write('\n')
-                        self.PrintNode(val, f, indent + INDENT + INDENT)
+                        self.PrintNode(val, c, f, indent + INDENT + INDENT)
 
                 f.write('\n')  # separate fields
+                c += self.sizes[c]
 
             f.write(ind + node.right)
 
-    def PrintNode(self, node, f, indent):
-        # type: (hnode_t, ColorOutput, int) -> None
+    def PrintNode(self, node, i, f, indent):
+        # type: (hnode_t, int, ColorOutput, int) -> None
         """Second step of printing: turn homogeneous tree into a colored
         string.
 
         Args:
           node: homogeneous tree node
+          i: its pre-order position, from _Measure()
           f: ColorOutput instance.
-          max_col: don't print past this column number on ANY line
-            NOTE: See asdl/run.sh line-length-hist for a test of this.  It's
-            approximate.
-            TODO: Use the terminal width.
+          indent: number of spaces before the node
         """
         ind = ' ' * indent
 
-        # Try printing on a single line
-        single_f = f.NewTempBuffer()
-        single_f.write(ind)
-        if _TrySingleLine(node, single_f, self.max_col - indent):
-            s, num_chars = single_f.GetRaw()  # extra unpacking for mycpp
-            f.WriteRaw((s, num_chars))
+        # Try printing on a single line.  The indent is counted against both
+        # the line and the limit.
+        if self._Fits(i, self.max_col - indent - indent):
+            f.write(ind)
+            self._PrintSingleLine(node, i, f)
             return
 
         UP_node = node  # for mycpp
@@ -381,117 +537,24 @@ class _PrettyPrinter(object):
         if tag == hnode_e.Leaf:
             node = cast(hnode.Leaf, UP_node)
             f.PushColor(node.color)
-            f.write(qsn.maybe_encode(node.s))
+            f.write(self.texts[i])
             f.PopColor()
 
         elif tag == hnode_e.External:
-            node = cast(hnode.External, UP_node)
             f.PushColor(color_e.External)
-            if mylib.PYTHON:
-                f.write(repr(node.obj))
-            else:
-                f.write('UNTYPED any')
+            f.write(self.texts[i])
             f.PopColor()
 
         elif tag == hnode_e.Record:
             node = cast(hnode.Record, UP_node)
-            self._PrintRecord(node, f, indent)
+            self._PrintRecord(node, i, f, indent)
 
         else:
             raise AssertionError(node)
 
 
-def _TrySingleLineObj(node, f, max_chars):
-    # type: (hnode.Record, ColorOutput, int) -> bool
-    """Print an object on a single line."""
-    f.write(node.left)
-    if node.abbrev:
-        if len(node.node_type):
-            f.PushColor(color_e.TypeName)
-            f.write(node.node_type)
-            f.PopColor()
-            f.write(' ')
-
-        for i, val in enumerate(node.unnamed_fields):
-            if i != 0:
-                f.write(' ')
-            if not _TrySingleLine(val, f, max_chars):
-                return False
-    else:
-        f.PushColor(color_e.TypeName)
-        f.write(node.node_type)
-        f.PopColor()
-
-        for field in node.fields:
-            f.write(' %s:' % field.name)
-            if not _TrySingleLine(field.val, f, max_chars):
-                return False
-
-    f.write(node.right)
-    return True
-
-
-def _TrySingleLine(node, f, max_chars):
-    # type: (hnode_t, ColorOutput, int) -> bool
-    """Try printing on a single line.
-
-    Args:
-      node: homogeneous tree node
-      f: ColorOutput instance
-      max_chars: maximum number of characters to print on THIS line
-      indent: current indent level
-
-    Returns:
-      ok: whether it fit on the line of the given size.
-        If False, you can't use the value of f.
-    """
-    UP_node = node  # for mycpp
-    tag = node.tag()
-    if tag == hnode_e.Leaf:
-        node = cast(hnode.Leaf, UP_node)
-        f.PushColor(node.color)
-        f.write(qsn.maybe_encode(node.s))
-        f.PopColor()
-
-    elif tag == hnode_e.External:
-        node = cast(hnode.External, UP_node)
-
-        f.PushColor(color_e.External)
-        if mylib.PYTHON:
-            f.write(repr(node.obj))
-        else:
-            f.write('UNTYPED any')
-        f.PopColor()
-
-    elif tag == hnode_e.Array:
-        node = cast(hnode.Array, UP_node)
-
-        # Can we fit the WHOLE array on the line?
-        f.write('[')
-        for i, item in enumerate(node.children):
-            if i != 0:
-                f.write(' ')
-            if not _TrySingleLine(item, f, max_chars):
-                return False
-        f.write(']')
-
-    elif tag == hnode_e.Record:
-        node = cast(hnode.Record, UP_node)
-
-        return _TrySingleLineObj(node, f, max_chars)
-
-    else:
-        raise AssertionError(node)
-
-    # Take into account the last char.
-    num_chars_so_far = f.NumChars()
-    if num_chars_so_far > max_chars:
-        return False
-
-    return True
-
-
 def PrintTree(node, f):
     # type: (hnode_t, ColorOutput) -> None
     pp = _PrettyPrinter(100)  # max_col
-    pp.PrintNode(node, f, 0)  # indent
+    i = pp._Measure(node)
+    pp.PrintNode(node, i, f, 0)  # indent
@@ -5,8 +5,10 @@ import cStringIO
 import unittest
 
 from asdl import format as fmt
+from asdl import runtime
 
 from _devbuild.gen import typed_demo_asdl as demo_asdl  # module under test
+from _devbuild.gen.hnode_asdl import hnode, color_e, Field
 
 
 class FormatTest(unittest.TestCase):
@@ -40,6 +42,55 @@ class FormatTest(unittest.TestCase):
 
             fmt.PrintTree(t2, ast_f)
 
+    def testWrapping(self):
+        words = [
+            runtime.NewLeaf('word%d' % i, color_e.StringConst)
+            for i in xrange(20)
+        ]
+        abbrev = runtime.NewRecord('C')
+        abbrev.abbrev = True
+        abbrev.unnamed_fields = words
+
+        x = runtime.NewLeaf('x', color_e.OtherConst)
+        node = runtime.NewRecord('Simple')
+        node.fields.append(Field('words', hnode.Array([abbrev, x])))
+        node.fields.append(
+            Field('name', runtime.NewLeaf('short', color_e.StringConst)))
+
+        f = cStringIO.StringIO()
+        fmt.PrintTree(node, fmt.TextOutput(f))
+
+        # The array doesn't fit, so each item gets its own line, and the long
+        # abbreviated record wraps
+        expected = """\
+(Simple
+  words: [
+    (C word0 word1 word2 word3 word4 word5 word6 word7 word8 word9 word10 word11 word12 word13 word14 word15 word16 
+      word17 word18 word19
+    )
+    x
+  ]
+  name: short
+)"""
+        self.assertEqual(expected, f.getvalue())
+
+    def testDeepTree(self):
+        node = runtime.NewLeaf('leaf', color_e.StringConst)
+        for i in xrange(100):
+            parent = runtime.NewRecord('R')
+            parent.fields.append(Field('child', node))
+            node = parent
+
+        f = cStringIO.StringIO()
+        fmt.PrintTree(node, fmt.TextOutput(f))
+        lines = f.getvalue().splitlines()
+
+        # Past max_col, each record takes 3 lines
+        self.assertEqual(301, len(lines))
+        self.assertEqual('(R', lines[0])
+        self.assertEqual('  child: ', lines[1])
+        self.assertEqual('leaf', lines[200].strip())
+        self.assertEqual(')', lines[-1])
 
 if __name__ == '__main__':
     unittest.main()
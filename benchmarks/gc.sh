@@ -182,6 +182,7 @@ print-cachegrind-tasks() {
     "_bin/cxx-opt/osh${TAB}mut+alloc"
     "_bin/cxx-opt/osh${TAB}mut+alloc+free"
     "_bin/cxx-opt/osh${TAB}mut+alloc+free+gc"
+    "_bin/cxx-opt+frameroots/osh${TAB}mut+alloc+free+gc"
   )
 
   local id=0
@@ -383,7 +384,7 @@ more-variants() {
 }
 
 build-binaries() {
-  local -a bin=( _bin/cxx-opt{,+bumpleak,+bumproot,+bumpsmall,+nopool}/osh )
+  local -a bin=( _bin/cxx-opt{,+bumpleak,+bumproot,+bumpsmall,+nopool,+frameroots}/osh )
 
   if test -n "${TCMALLOC:-}"; then
     bin+=( _bin/cxx-opt+tcmalloc/osh )
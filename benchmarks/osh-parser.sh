@@ -173,6 +173,50 @@ cachegrind-parse-configure-coreutils() {
   cat $out
 }
 
+readonly YSH_CORPUS=$BASE_DIR/tmp/ysh-corpus.ysh
+
+write-ysh-corpus() {
+  ### Concatenate YSH files into one big file, so parsing dominates startup
+
+  local sh=${1:-bin/ysh}
+  local copies=${2:-20}
+
+  mkdir -p $(dirname $YSH_CORPUS)
+
+  # Spec tests have some cases with deliberate syntax errors
+  local -a files=()
+  for path in ysh/testdata/*.ysh spec/testdata/config/*.oil spec/ysh-*.test.sh; do
+    if $sh -n --ast-format none $path >/dev/null 2>&1; then
+      files+=( $path )
+    fi
+  done
+
+  for i in $(seq $copies); do
+    cat "${files[@]}"
+  done > $YSH_CORPUS
+
+  wc -l $YSH_CORPUS
+}
+
+parse-ysh-corpus() {
+  ### Time parsing YSH, which is mostly expressions handled by pgen2/
+  #
+  # Pass several shells to compare, e.g. builds before and after a change.
+
+  if test $# -eq 0; then
+    set -- _bin/cxx-opt/ysh
+    ninja $1
+  fi
+
+  test -f $YSH_CORPUS || write-ysh-corpus
+
+  for sh in "$@"; do
+    echo "--- $sh"
+    time $sh -n --ast-format none $YSH_CORPUS
+    echo
+  done
+}
+
 cachegrind-demo() {
   #local sh=bash
   local sh=zsh
@@ -170,6 +170,11 @@ setglobal_compile_flags() {
     *+nopool)
       flags="$flags -D NO_POOL_ALLOC"
       ;;
+
+    *+frameroots)
+      # StackRoots records form a linked list, rather than pushing each root
+      flags="$flags -D GC_FRAME_ROOTS"
+      ;;
   esac
 
   # needed to strip unused symbols
@@ -226,7 +231,8 @@ setglobal_link_flags() {
       ;;
   esac
 
-  link_flags="$link_flags -Wl,--gc-sections"
+  # OILS_GC_THREADS uses std::thread
+  link_flags="$link_flags -pthread -Wl,--gc-sections"
 }
 
 compile_one() {
@@ -64,6 +64,9 @@ GC_PERF_VARIANTS = [
 
     ('cxx', 'opt+nopool'),
 
+    # Compare root tracking strategies
+    ('cxx', 'opt+frameroots'),
+
     # TODO: should be binary with different files
     ('cxx', 'opt+cheney'),
 
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+fork_eval_bench.py
+
+Compare two ways of running many short scripts that source the same library:
+
+- spawn: start a new shell for each script, which sources the library
+- fork_eval: start one 'osh --headless' server that sources the library in its
+  rc file, and send it FORK_EVAL for each script
+
+Usage:
+  client/fork_eval_bench.py --sh-binary _bin/cxx-opt/osh -n 200
+"""
+import optparse
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import py_fanos
+from py_fanos import log
+
+
+def MakeLibrary(path, num_funcs):
+  """Write a shell library that's somewhat expensive to parse."""
+  with open(path, 'w') as f:
+    for i in range(num_funcs):
+      f.write('''\
+f%d() {
+  local x=$1
+  if test -n "$x"; then
+    echo "f%d $x"
+  else
+    for i in 1 2 3; do
+      : $(( i * 2 ))
+    done
+  fi
+}
+''' % (i, i))
+
+
+def main(argv):
+  p = optparse.OptionParser(__doc__)
+  p.add_option(
+      '--sh-binary', dest='sh_binary', default='bin/osh',
+      help='Which shell binary to launch')
+  p.add_option(
+      '-n', dest='num_runs', type='int', default=100,
+      help='Number of scripts to run each way')
+  p.add_option(
+      '--num-funcs', dest='num_funcs', type='int', default=200,
+      help='Number of functions in the library')
+
+  opts, _ = p.parse_args(argv[1:])
+
+  lib_path = '_tmp/fork_eval_bench_lib.sh'
+  os.makedirs('_tmp', exist_ok=True)
+  MakeLibrary(lib_path, opts.num_funcs)
+
+  code = b'f0 hi >/dev/null'
+  devnull = os.open('/dev/null', os.O_RDWR)
+  fds = [devnull, devnull, 2]
+
+  # spawn
+  start = time.time()
+  for i in range(opts.num_runs):
+    status = subprocess.call(
+        [opts.sh_binary, '-c', 'source %s; %s' % (lib_path, code.decode())],
+        stdin=devnull)
+    if status != 0:
+      raise RuntimeError('spawn failed with status %d' % status)
+  spawn_secs = time.time() - start
+
+  # fork_eval
+  left, right = socket.socketpair()
+  server = subprocess.Popen(
+      [opts.sh_binary, '--headless', '--rcfile', lib_path],
+      stdin=right, stdout=right, stderr=devnull)
+  right.close()
+
+  start = time.time()
+  for i in range(opts.num_runs):
+    pid, status = py_fanos.fork_eval(left, code, fds)
+    if status != 0:
+      raise RuntimeError('FORK_EVAL failed with status %d' % status)
+  fork_secs = time.time() - start
+
+  left.close()
+  server.wait()
+
+  for label, secs in [('spawn', spawn_secs), ('fork_eval', fork_secs)]:
+    log('%-10s %d runs in %.3f s (%.2f ms each)', label, opts.num_runs, secs,
+        secs * 1000 / opts.num_runs)
+  log('speedup: %.1fx', spawn_secs / fork_secs)
+  return 0
+
+
+if __name__ == '__main__':
+  try:
+    sys.exit(main(sys.argv))
+  except RuntimeError as e:
+    print('FATAL: %s' % e, file=sys.stderr)
+    sys.exit(1)
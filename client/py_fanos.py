@@ -100,3 +100,32 @@ def recv(sock, fd_out=None):
     raise ValueError('Expected ,')
 
   return msg
+
+
+def fork_eval(sock, code, fds, env=None):
+  """Evaluate code in a forked child of an 'osh --headless' server.
+
+  Args:
+    code: bytes of shell code
+    fds: the child's stdin, stdout, and stderr
+    env: optional dict of bytes to bytes, exported in the child
+
+  Returns:
+    (pid, status) of the child.  The server has already waited for it.
+  """
+  env = env or {}
+
+  parts = [b'FORK_EVAL ']
+  for name, val in env.items():
+    parts.append(b'%s=%s\0' % (name, val))
+  parts.append(code)
+  send(sock, b''.join(parts), fds)
+
+  reply = recv(sock)
+  if reply is None:
+    raise ValueError('Unexpected EOF')
+  if not reply.startswith(b'OK '):
+    raise ValueError('Unexpected reply %r' % reply)
+
+  pid, status = reply[len(b'OK '):].split()
+  return int(pid), int(status)
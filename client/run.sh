@@ -36,6 +36,13 @@ errors() {
   echo status=$?
 }
 
+# Compare spawning a shell per script with FORK_EVAL on a warm server
+fork-eval-bench() {
+  local bin=_bin/cxx-opt/osh
+  ninja $bin
+  client/fork_eval_bench.py --sh-binary $bin "$@"
+}
+
 # Hm what is this suppose to do?  It waits for input
 demo-pty() {
   echo mystdin | client/headless_demo.py --to-new-pty
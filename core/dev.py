@@ -6,11 +6,12 @@ from __future__ import print_function
 from _devbuild.gen.option_asdl import option_i, builtin_i, builtin_t
 from _devbuild.gen.runtime_asdl import (value, value_e, lvalue, lvalue_e,
                                         cmd_value, scope_e, trace, trace_e,
-                                        trace_t)
-from _devbuild.gen.syntax_asdl import assign_op_e, Token
+                                        trace_t, ProcessStats)
+from _devbuild.gen.syntax_asdl import assign_op_e, command, command_e, Token
 
 from core import error
 from core import optview
+from core import pyos
 from core import state
 from core import ui
 from mycpp.mylib import log
@@ -27,7 +28,7 @@ import posix_ as posix
 
 from typing import List, Dict, Optional, Any, cast, TYPE_CHECKING
 if TYPE_CHECKING:
-    from _devbuild.gen.syntax_asdl import assign_op_t, CompoundWord
+    from _devbuild.gen.syntax_asdl import assign_op_t, command_t, CompoundWord
     from _devbuild.gen.runtime_asdl import lvalue_t, value_t, scope_t
     from core import alloc
     from core.error import _ErrorWithLocation
@@ -261,6 +262,11 @@ class Tracer(object):
 
         self.word_ev = None  # type: NormalWordEvaluator
 
+        # Replaced by shell.Main() if OILS_PROFILE is set
+        self.profiler = Profiler(None)
+        # Replaced by shell.Main() if OILS_PROCESS_LOG is set
+        self.process_log = ProcessLog(None)
+
         self.ind = 0  # changed by process, proc, source, eval
         self.indents = ['']  # "pooled" to avoid allocations
 
@@ -386,8 +392,6 @@ class Tracer(object):
             # Async cases
             elif case(trace_e.ProcessSub):
                 buf.write('proc sub %d\n' % pid)
-            elif case(trace_e.HereDoc):
-                buf.write('here doc %d\n' % pid)
             elif case(trace_e.Fork):
                 buf.write('fork %d\n' % pid)
             elif case(trace_e.PipelinePart):
@@ -595,3 +599,211 @@ class Tracer(object):
 
         buf.write('\n')
         self.f.write(buf.getvalue())
+
+
+class _ProfileCount(object):
+    """Time charged to one stack.
+
+    Split into two ints so it doesn't overflow in C++.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self.secs = 0
+        self.usecs = 0
+
+
+class Profiler(object):
+    """Measures where an OSH script spends its time.
+
+    Enabled by OILS_PROFILE=path.  Time is charged to a stack of frames: procs,
+    source lines like foo.sh:12, and external commands, whose time is split into
+    fork, exec, and wait.  At exit, we write one line per stack in the
+    "collapsed" format that flamegraph.pl reads, with microseconds as the
+    count:
+
+        osh;deploy;deploy.sh:12;rsync;wait 1520330
+
+    This is an instrumenting profiler, so the numbers include its own overhead.
+    """
+
+    def __init__(self, f):
+        # type: (Optional[mylib.Writer]) -> None
+        """
+        Args:
+          f: where to write the stacks, or None if profiling is disabled
+        """
+        self.f = f
+        self.enabled = f is not None
+
+        self.pid = -1
+        self.stack = ['osh']  # type: List[str]
+        self.counts = {}  # type: Dict[str, _ProfileCount]
+        self.last_secs = 0
+        self.last_usecs = 0
+
+        if self.enabled:
+            # Only the main shell writes the file, not subshells
+            self.pid = posix.getpid()
+            secs, usecs = pyos.MonotonicTime()
+            self.last_secs = secs
+            self.last_usecs = usecs
+
+    def _Charge(self):
+        # type: () -> None
+        """Charge the time since the last event to the current stack."""
+        secs, usecs = pyos.MonotonicTime()
+        d_secs = secs - self.last_secs
+        d_usecs = usecs - self.last_usecs
+        self.last_secs = secs
+        self.last_usecs = usecs
+
+        key = ';'.join(self.stack)
+        c = self.counts.get(key)
+        if c is None:
+            c = _ProfileCount()
+            self.counts[key] = c
+
+        c.secs += d_secs
+        c.usecs += d_usecs
+        if c.usecs >= 1000000:
+            c.usecs -= 1000000
+            c.secs += 1
+        elif c.usecs < 0:
+            c.usecs += 1000000
+            c.secs -= 1
+
+    def PushFrame(self, name):
+        # type: (str) -> None
+        self._Charge()
+        # ; separates frames, and the count follows the last space
+        self.stack.append(name.replace(';', ':').replace('\n', ' '))
+
+    def PopFrame(self):
+        # type: () -> None
+        self._Charge()
+        self.stack.pop()
+
+    def WriteStacks(self):
+        # type: () -> None
+        """Called when the shell exits."""
+        if not self.enabled or posix.getpid() != self.pid:
+            return
+
+        self._Charge()
+        keys = self.counts.keys()
+        keys.sort()
+        for key in keys:
+            c = self.counts[key]
+            if c.secs:
+                self.f.write('%s %d%06d\n' % (key, c.secs, c.usecs))
+            elif c.usecs:
+                self.f.write('%s %d\n' % (key, c.usecs))
+        self.f.flush()
+
+
+class ProcessLog(object):
+    """Records what each child process used, for tools in benchmarks/.
+
+    Enabled by OILS_PROCESS_LOG=path.  We write a TSV file with a header, and
+    a row for each process that the shell or its subshells waited for.  The
+    columns are like those of benchmarks/time_.py, plus the command:
+
+        pid  status  elapsed_secs  user_secs  sys_secs  max_rss_KiB  command
+
+    Each row is flushed right away, so a forked subshell never writes the
+    rows of its parent.
+    """
+
+    def __init__(self, f):
+        # type: (Optional[mylib.Writer]) -> None
+        """
+        Args:
+          f: where to write the rows, or None if the log is disabled
+        """
+        self.f = f
+        self.enabled = f is not None
+
+        if self.enabled:
+            self.f.write(
+                'pid\tstatus\telapsed_secs\tuser_secs\tsys_secs\tmax_rss_KiB\t'
+                'command\n')
+            self.f.flush()
+
+    def OnProcessEnd(self, st, command_str):
+        # type: (ProcessStats, str) -> None
+        self.f.write('%d\t%d\t%d.%06d\t%d.%06d\t%d.%06d\t%d\t%s\n' %
+                     (st.pid, st.status, st.elapsed_secs, st.elapsed_usecs,
+                      st.user_secs, st.user_usecs, st.sys_secs, st.sys_usecs,
+                      st.max_rss_KiB, command_str))
+        self.f.flush()
+
+
+class ctx_Profile(object):
+    """Charge the time in a block to a frame, e.g. a proc or external
+    command."""
+
+    def __init__(self, profiler, name):
+        # type: (Profiler, str) -> None
+        if profiler.enabled:
+            profiler.PushFrame(name)
+        self.profiler = profiler
+
+    def __enter__(self):
+        # type: () -> None
+        pass
+
+    def __exit__(self, type, value, traceback):
+        # type: (Any, Any, Any) -> None
+        if self.profiler.enabled:
+            self.profiler.PopFrame()
+
+
+def _ProfileToken(node):
+    # type: (command_t) -> Optional[Token]
+    """The token that locates a "leaf" command, or None."""
+    UP_node = node
+    with tagswitch(node) as case:
+        if case(command_e.Simple):
+            node = cast(command.Simple, UP_node)
+            return node.blame_tok
+        elif case(command_e.ShAssignment):
+            node = cast(command.ShAssignment, UP_node)
+            return node.left
+        elif case(command_e.DBracket):
+            node = cast(command.DBracket, UP_node)
+            return node.left
+        elif case(command_e.DParen):
+            node = cast(command.DParen, UP_node)
+            return node.left
+        else:
+            return None
+
+
+class ctx_ProfileLine(object):
+    """Charge the time in a leaf command to its source line, e.g. foo.sh:12.
+
+    Compound commands like loops aren't frames, so each line in the body is
+    charged separately.
+    """
+
+    def __init__(self, profiler, node):
+        # type: (Profiler, command_t) -> None
+        self.pushed = False
+        if profiler.enabled:
+            tok = _ProfileToken(node)
+            if tok is not None:
+                profiler.PushFrame(
+                    '%s:%d' %
+                    (ui.GetLineSourceString(tok.line), tok.line.line_num))
+                self.pushed = True
+        self.profiler = profiler
+
+    def __enter__(self):
+        # type: () -> None
+        pass
+
+    def __exit__(self, type, value, traceback):
+        # type: (Any, Any, Any) -> None
+        if self.pushed:
+            self.profiler.PopFrame()
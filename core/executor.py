@@ -5,7 +5,7 @@ from errno import EINTR
 
 from _devbuild.gen.id_kind_asdl import Id
 from _devbuild.gen.option_asdl import builtin_i
-from _devbuild.gen.runtime_asdl import RedirValue, trace
+from _devbuild.gen.runtime_asdl import RedirValue, trace, ProcessStats
 from _devbuild.gen.syntax_asdl import (
     command,
     command_e,
@@ -23,11 +23,13 @@ from core import ui
 from core import vm
 from frontend import consts
 from frontend import lexer
+from osh import word_
 from mycpp.mylib import log
 
 import posix_ as posix
+from posix_ import SEEK_CUR, SEEK_SET
 
-from typing import cast, Dict, List, Optional, TYPE_CHECKING
+from typing import cast, Dict, List, Optional, Tuple, TYPE_CHECKING
 if TYPE_CHECKING:
     from _devbuild.gen.runtime_asdl import (cmd_value, CommandStatus,
                                             StatusArray, Proc)
@@ -39,6 +41,11 @@ if TYPE_CHECKING:
 
 _ = log
 
+# The first part of a pipeline can run in the shell process if it's one of
+# these builtins, because they don't change shell state.  (printf -v isn't
+# allowed.)
+_IN_PROCESS_BUILTINS = ['echo', 'printf', 'true', 'false', ':']
+
 
 class _ProcessSubFrame(object):
     """To keep track of diff <(cat 1) <(cat 2) > >(tac)"""
@@ -267,8 +274,10 @@ class ShellExecutor(vm._Executor):
                             arg0_loc)
 
                 with dev.ctx_Tracer(self.tracer, 'proc', argv):
-                    # NOTE: Functions could call 'exit 42' directly, etc.
-                    status = self.cmd_ev.RunProc(proc_node, argv[1:], arg0_loc)
+                    with dev.ctx_Profile(self.tracer.profiler, arg0):
+                        # NOTE: Functions could call 'exit 42' directly, etc.
+                        status = self.cmd_ev.RunProc(proc_node, argv[1:],
+                                                     arg0_loc)
                 return status
 
         # Notes:
@@ -326,7 +335,11 @@ class ShellExecutor(vm._Executor):
                     change = process.SetPgid(process.OWN_LEADER)
                 p.AddStateChange(change)
 
-            status = p.RunProcess(self.waiter, trace.External(cmd_val.argv))
+            with dev.ctx_Profile(self.tracer.profiler, arg0):
+                status = p.RunProcess(self.waiter,
+                                      trace.External(cmd_val.argv))
+            if p.stats is not None:  # None if it was stopped
+                self.mem.SetProcessStats([p.stats])
 
             # this is close to a "leaf" for errors
             # problem: permission denied EACCESS prints duplicate messages
@@ -384,6 +397,84 @@ class ShellExecutor(vm._Executor):
             self.job_list.AddJob(p)  # show in 'jobs' list
         return 0
 
+    def _CanRunInProcess(self, node):
+        # type: (command_t) -> bool
+        """Can the first part of a pipeline run without forking?
+
+        Only for simple builtins that write output, like 'echo "$x"', where
+        running in the shell process looks the same as running in a child.
+        """
+        if self.exec_opts.xtrace():  # child processes are traced differently
+            return False
+        # These traps would run in the shell, and could change its state
+        if (self.trap_state.GetHook('ERR') is not None or
+                self.trap_state.GetHook('DEBUG') is not None):
+            return False
+
+        if node.tag() != command_e.Simple:
+            return False
+        simple = cast(command.Simple, node)
+        if (len(simple.more_env) or len(simple.redirects) or
+                simple.typed_args or simple.block):
+            return False
+
+        n = len(simple.words)
+        if n == 0:
+            return False
+        ok, arg0, _ = word_.StaticEval(simple.words[0])
+        if not ok or arg0 not in _IN_PROCESS_BUILTINS:
+            return False
+        if self.procs.get(arg0) is not None:  # shadowed by a function
+            return False
+        if arg0 == 'printf':  # disallow printf -v
+            if n == 1:
+                return False
+            ok, fmt, _ = word_.StaticEval(simple.words[1])
+            if not ok or fmt.startswith('-'):
+                return False
+
+        for w in simple.words:
+            if not word_.IsPure(w):
+                return False
+        return True
+
+    def _RunInProcess(self, node):
+        # type: (command_t) -> Tuple[int, int]
+        """Run the first part of a pipeline in the shell process.
+
+        Its output goes to an anonymous file.  Small output is copied into a
+        pipe, and big output is read from the file, so the builtin never
+        blocks on a full pipe that nobody reads yet.
+
+        Returns:
+          (-1, -1) if the part should be forked instead
+          (status, fd) where fd is what the next part reads
+        """
+        f, _ = pyos.AnonymousFile()
+        if f < 0:
+            return -1, -1
+
+        # $? doesn't change until the whole pipeline is done
+        last_status = self.mem.LastStatus()
+        with process.ctx_StdoutToFile(self.fd_state, f):
+            self.cmd_ev.ExecuteAndCatch(node)
+        status = self.cmd_ev.LastStatus()
+        self.mem.SetLastStatus(last_status)
+
+        size = posix.lseek(f, 0, SEEK_CUR)
+        posix.lseek(f, 0, SEEK_SET)
+        if size > process.PIPE_BUF:  # too big to copy into a pipe
+            return status, f
+
+        r, w = posix.pipe()
+        if size:
+            chunks = []  # type: List[str]
+            pyos.Read(f, size, chunks)
+            posix.write(w, ''.join(chunks))
+        posix.close(w)
+        posix.close(f)
+        return status, r
+
     def RunPipeline(self, node, status_out):
         # type: (command.Pipeline, CommandStatus) -> None
 
@@ -394,9 +485,18 @@ class ShellExecutor(vm._Executor):
         # initialized with CommandStatus.CreateNull()
         pipe_locs = []  # type: List[loc_t]
 
-        # First n-1 processes (which is empty when n == 1)
         n = len(node.children)
-        for i in xrange(n - 1):
+        first = 0
+        first_status = -1
+        if n > 1 and self._CanRunInProcess(node.children[0]):
+            first_status, input_fd = self._RunInProcess(node.children[0])
+            if input_fd != -1:
+                pipe_locs.append(loc.Command(node.children[0]))
+                pi.SetInput(input_fd)
+                first = 1
+
+        # The rest of the first n-1 processes (which is empty when n == 1)
+        for i in xrange(first, n - 1):
             child = node.children[i]
 
             # TODO: determine these locations at parse time?
@@ -413,19 +513,35 @@ class ShellExecutor(vm._Executor):
 
         with dev.ctx_Tracer(self.tracer, 'pipeline', None):
             pi.StartPipeline(self.waiter)
-            self.fg_pipeline = pi
-            status_out.pipe_status = pi.RunLastPart(self.waiter, self.fd_state)
+            if len(pi.pids):
+                self.fg_pipeline = pi
+            self.mem.SetProcessStats([])  # the last part may add to it
+            pipe_status = pi.RunLastPart(self.waiter, self.fd_state)
             self.fg_pipeline = None  # clear in case we didn't end up forking
 
+        if first == 1:
+            status_out.pipe_status = [first_status]
+            status_out.pipe_status.extend(pipe_status)
+        else:
+            status_out.pipe_status = pipe_status
         status_out.pipe_locs = pipe_locs
 
+        # Forked parts, then processes started by the last part
+        stats = [p.stats for p in pi.procs
+                 if p.stats is not None]  # type: List[ProcessStats]
+        stats.extend(self.mem.LastProcessStats())
+        self.mem.SetProcessStats(stats)
+
     def RunSubshell(self, node):
         # type: (command_t) -> int
         p = self._MakeProcess(node)
         if self.job_control.Enabled():
             p.AddStateChange(process.SetPgid(process.OWN_LEADER))
 
-        return p.RunProcess(self.waiter, trace.ForkWait)
+        status = p.RunProcess(self.waiter, trace.ForkWait)
+        if p.stats is not None:  # None if it was stopped
+            self.mem.SetProcessStats([p.stats])
+        return status
 
     def RunCommandSub(self, cs_part):
         # type: (CommandSub) -> str
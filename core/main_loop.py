@@ -10,11 +10,16 @@ Variants:
 """
 from __future__ import print_function
 
+from errno import EINTR
+from signal import SIG_DFL, SIGPIPE, SIGQUIT
+
 from _devbuild.gen import arg_types
 from _devbuild.gen.syntax_asdl import (command, command_t, parse_result,
-                                       parse_result_e)
+                                       parse_result_e, IntParamBox)
 from core import error
 from core import process
+from core import pyos
+from core import state
 from core import ui
 from core import util
 from frontend import reader
@@ -24,8 +29,9 @@ from mycpp.mylib import log, print_stderr, tagswitch
 
 import fanos
 import posix_ as posix
+from posix_ import WIFSIGNALED, WTERMSIG, WEXITSTATUS
 
-from typing import cast, Any, List, TYPE_CHECKING
+from typing import cast, Any, List, Tuple, TYPE_CHECKING
 if TYPE_CHECKING:
     from core.comp_ui import _IDisplay
     from core.ui import ErrorFormatter
@@ -130,6 +136,76 @@ class Headless(object):
 
         return ''  # result is always 'OK ' since there was no protocol error
 
+    def FORK_EVAL(self, arg, fds):
+        # type: (str, List[int]) -> str
+        """Fork this warm server, and evaluate a script in the child.
+
+        The arg is zero or more NAME=value entries, each followed by a NUL
+        byte, and then the script.  The child is like a new shell process that
+        has already loaded its rc files: the descriptors become its stdin,
+        stdout, and stderr, and the entries are exported.
+
+        Returns the PID and exit status of the child, after waiting for it.
+        """
+        parts = arg.split('\0')
+        code = parts.pop()
+        env = []  # type: List[Tuple[str, str]]
+        for entry in parts:
+            name, val = mylib.split_once(entry, '=')
+            if val is None:
+                raise ValueError('Expected NAME=value, got %r' % entry)
+            env.append((name, val))
+
+        pyos.FlushStdout()  # don't write buffered output twice
+        pid = posix.fork()
+        if pid == 0:  # child
+            # Like process.Process.StartProcess()
+            pyos.Sigaction(SIGPIPE, SIG_DFL)
+            pyos.Sigaction(SIGQUIT, SIG_DFL)
+
+            # This also disconnects the child from the FANOS socket
+            posix.dup2(fds[0], 0)
+            posix.dup2(fds[1], 1)
+            posix.dup2(fds[2], 2)
+            for fd in fds:
+                posix.close(fd)
+
+            # Unlike a subshell, $$ is the PID of the child
+            mem = self.cmd_ev.mem
+            mem.root_pid = posix.getpid()
+            for name, val in env:
+                state.ExportGlobalString(mem, name, val)
+
+            line_reader = reader.StringLineReader(code, self.parse_ctx.arena)
+            c_parser = self.parse_ctx.MakeOshParser(line_reader)
+            try:
+                status = Batch(self.cmd_ev, c_parser, self.errfmt, 0)
+            except util.UserExit as e:
+                status = e.status
+
+            mut_status = IntParamBox(status)
+            self.cmd_ev.MaybeRunExitTrap(mut_status)
+
+            pyos.FlushStdout()
+            posix._exit(mut_status.i)  # never returns
+
+        for fd in fds:
+            posix.close(fd)
+
+        while True:
+            try:
+                _, wait_status = posix.waitpid(pid, 0)
+                break
+            except OSError as e:
+                if e.errno != EINTR:
+                    raise
+
+        if WIFSIGNALED(wait_status):
+            status = 128 + WTERMSIG(wait_status)
+        else:
+            status = WEXITSTATUS(wait_status)
+        return '%d %d' % (pid, status)
+
     def _Loop(self):
         # type: () -> int
         fanos_log(
@@ -174,6 +250,12 @@ class Headless(object):
 
                 #ShowDescriptorState('RESTORED')
 
+            elif command == 'FORK_EVAL':
+                if len(fd_out) != 3:
+                    raise ValueError('Expected 3 file descriptors')
+
+                reply = self.FORK_EVAL(arg, fd_out)
+
             # Note: lang == 'osh' or lang == 'ysh' puts this in different modes.
             # Do we also need 'complete --osh' and 'complete --ysh' ?
             elif command == 'PARSE':
@@ -198,7 +280,9 @@ def Interactive(flag, cmd_ev, c_parser, display, prompt_plugin, errfmt):
     status = 0
     done = False
     while not done:
-        mylib.MaybeCollect()  # manual GC point
+        # Manual GC point.  With incremental GC, we do extra work here, before
+        # waiting for the user.
+        mylib.CollectIdle()
 
         # - This loop has a an odd structure because we want to do cleanup after
         # every 'break'.  (The ones without 'done = True' were 'continue')
@@ -280,6 +364,9 @@ def Interactive(flag, cmd_ev, c_parser, display, prompt_plugin, errfmt):
         # or whitespace won't be reachable, so the GC will free them.
         c_parser.arena.DiscardLines()
 
+        # Directory listings are only cached for one command line
+        cmd_ev.word_ev.globber.ClearCache()
+
         cmd_ev.RunPendingTraps()  # Run trap handlers even if we get just ENTER
 
         # Cleanup after every command (or failed command).
@@ -347,6 +434,10 @@ def Batch(cmd_ev, c_parser, errfmt, cmd_flags=0):
         # can't optimize this because we haven't seen the end yet
         is_return, is_fatal = cmd_ev.ExecuteAndCatch(node, cmd_flags=cmd_flags)
         status = cmd_ev.LastStatus()
+
+        # Directory listings are only cached for one command line
+        cmd_ev.word_ev.globber.ClearCache()
+
         # e.g. 'return' in middle of script, or divide by zero
         if is_return or is_fatal:
             break
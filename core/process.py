@@ -19,7 +19,8 @@ from _devbuild.gen.id_kind_asdl import Id
 from _devbuild.gen.runtime_asdl import (job_state_e, job_state_t, job_state_str,
                                         wait_status, wait_status_t, RedirValue,
                                         redirect_arg, redirect_arg_e, value,
-                                        value_e, trace, trace_t)
+                                        value_e, trace, trace_e, trace_t,
+                                        ProcessStats)
 from _devbuild.gen.syntax_asdl import (
     loc_t,
     redir_loc,
@@ -58,6 +59,7 @@ from posix_ import (
     O_RDWR,
     O_WRONLY,
     O_TRUNC,
+    SEEK_SET,
 )
 
 from typing import List, Tuple, Dict, Optional, Any, cast, TYPE_CHECKING
@@ -82,6 +84,11 @@ NO_FD = -1
 # bookkeeping), and dash/zsh (10) and mksh (24)
 _SHELL_MIN_FD = 100
 
+# A write of up to PIPE_BUF bytes to an empty pipe never blocks, so the shell
+# can write that much to a pipe before anything reads it.  POSIX guarantees 512
+# bytes, and Linux and the BSDs have 4096.
+PIPE_BUF = 4096
+
 # Style for 'jobs' builtin
 STYLE_DEFAULT = 0
 STYLE_LONG = 1
@@ -144,7 +151,6 @@ class _FdFrame(object):
     def __init__(self):
         # type: () -> None
         self.saved = []  # type: List[_RedirFrame]
-        self.need_wait = []  # type: List[Process]
 
     def Forget(self):
         # type: () -> None
@@ -154,7 +160,6 @@ class _FdFrame(object):
                 posix.close(rf.saved_fd)
 
         del self.saved[:]  # like list.clear() in Python 3.3
-        del self.need_wait[:]
 
     def __repr__(self):
         # type: () -> str
@@ -173,7 +178,7 @@ class FdState(object):
         """
     Args:
       errfmt: for errors
-      job_list: For keeping track of _HereDocWriterThunk
+      job_list: For keeping track of child processes
     """
         self.errfmt = errfmt
         self.job_control = job_control
@@ -198,6 +203,13 @@ class FdState(object):
         fd_mode = O_RDONLY
         return self._Open(path, 'r', fd_mode)
 
+    def OpenForOverwrite(self, path):
+        # type: (str) -> mylib.Writer
+        """Like OpenForWrite(), but truncates the file."""
+        fd_mode = O_CREAT | O_WRONLY | O_TRUNC
+        f = self._Open(path, 'w', fd_mode)
+        return cast('mylib.Writer', f)
+
     # used for util.DebugFile
     def OpenForWrite(self, path):
         # type: (str) -> mylib.Writer
@@ -348,10 +360,6 @@ class FdState(object):
         # type: (int) -> None
         self.cur_frame.saved.append(_RedirFrame(NO_FD, fd, False))
 
-    def _PushWait(self, proc):
-        # type: (Process) -> None
-        self.cur_frame.need_wait.append(proc)
-
     def _ApplyRedirect(self, r):
         # type: (RedirValue) -> None
         arg = r.arg
@@ -437,38 +445,27 @@ class FdState(object):
             elif case(redirect_arg_e.HereDoc):
                 arg = cast(redirect_arg.HereDoc, UP_arg)
 
-                # NOTE: Do these descriptors have to be moved out of the range 0-9?
-                read_fd, write_fd = posix.pipe()
-
-                self._PushDup(read_fd, r.loc)  # stdin is now the pipe
-
-                # We can't close like we do in the filename case above?  The writer can
-                # get a "broken pipe".
-                self._PushClose(read_fd)
-
-                thunk = _HereDocWriterThunk(write_fd, arg.body)
-
-                # TODO: Use PIPE_SIZE to save a process in the case of small here docs,
-                # which are the common case.  (dash does this.)
-                start_process = True
-                #start_process = False
-
-                if start_process:
-                    here_proc = Process(thunk, self.job_control, self.job_list,
-                                        self.tracer)
-
-                    # NOTE: we could close the read pipe here, but it doesn't really
-                    # matter because we control the code.
-                    here_proc.StartProcess(trace.HereDoc)
-                    #log('Started %s as %d', here_proc, pid)
-                    self._PushWait(here_proc)
-
-                    # Now that we've started the child, close it in the parent.
-                    posix.close(write_fd)
-
-                else:
+                # No writer process is needed.  Like dash, small bodies are
+                # written to a pipe, which can't block.  Big bodies go in an
+                # anonymous file that's rewound, like bash's temp files.
+                if len(arg.body) <= PIPE_BUF:
+                    read_fd, write_fd = posix.pipe()
                     posix.write(write_fd, arg.body)
                     posix.close(write_fd)
+                else:
+                    read_fd, err_num = pyos.AnonymousFile()
+                    if read_fd < 0:
+                        self.errfmt.Print_(
+                            "Can't create here doc: %s" %
+                            posix.strerror(err_num),
+                            blame_loc=r.op_loc)
+                        raise IOError(err_num)
+                    posix.write(read_fd, arg.body)
+                    posix.lseek(read_fd, 0, SEEK_SET)
+
+                new_fd = self._PushDup(read_fd, r.loc)  # stdin is now the body
+                if new_fd != NO_FD:
+                    posix.close(read_fd)
 
     def Push(self, redirects):
         # type: (List[RedirValue]) -> bool
@@ -506,6 +503,20 @@ class FdState(object):
         self._PushDup(r, redir_loc.Fd(0))
         return True
 
+    def PushStdoutToFile(self, fd):
+        # type: (int) -> None
+        """Save the current stdout and make it go to descriptor 'fd'.
+
+        For running the first part of a pipeline in this process, e.g.
+
+        echo "$x" | while read line; do ...; done
+        """
+        new_frame = _FdFrame()
+        self.stack.append(new_frame)
+        self.cur_frame = new_frame
+
+        self._PushDup(fd, redir_loc.Fd(1))
+
     def Pop(self):
         # type: () -> None
         frame = self.stack.pop()
@@ -531,10 +542,6 @@ class FdState(object):
                 posix.close(rf.saved_fd)
                 #log('dup2 %s %s', saved, orig)
 
-        # Wait for here doc processes to finish.
-        for proc in frame.need_wait:
-            unused_status = proc.Wait(self.waiter)
-
     def MakePermanent(self):
         # type: () -> None
         self.cur_frame.Forget()
@@ -575,6 +582,27 @@ class StdinFromPipe(ChildStateChange):
         #log('child CLOSE w %d pid=%d', self.w, posix.getpid())
 
 
+class StdinFromFile(ChildStateChange):
+    """For the first forked part of a pipeline, when the part before it ran
+    in the shell process.
+
+    'fd' is the read end of a pipe, or an anonymous file.
+    """
+
+    def __init__(self, fd):
+        # type: (int) -> None
+        self.fd = fd
+
+    def __repr__(self):
+        # type: () -> str
+        return '<StdinFromFile %d>' % self.fd
+
+    def Apply(self):
+        # type: () -> None
+        posix.dup2(self.fd, 0)
+        posix.close(self.fd)  # close after dup
+
+
 class StdoutToPipe(ChildStateChange):
     def __init__(self, r, pipe_write_fd):
         # type: (int, int) -> None
@@ -824,38 +852,6 @@ class SubProgramThunk(Thunk):
         posix._exit(status)
 
 
-class _HereDocWriterThunk(Thunk):
-    """Write a here doc to one end of a pipe.
-
-    May be be executed in either a child process or the main shell
-    process.
-    """
-
-    def __init__(self, w, body_str):
-        # type: (int, str) -> None
-        self.w = w
-        self.body_str = body_str
-
-    def UserString(self):
-        # type: () -> str
-
-        # You can hit Ctrl-Z and the here doc writer will be suspended!  Other
-        # shells don't have this problem because they use temp files!  That's a bit
-        # unfortunate.
-        return '[here doc writer]'
-
-    def Run(self):
-        # type: () -> None
-        """do_exit: For small pipelines."""
-        #log('Writing %r', self.body_str)
-        posix.write(self.w, self.body_str)
-        #log('Wrote %r', self.body_str)
-        posix.close(self.w)
-        #log('Closed %d', self.w)
-
-        posix._exit(0)
-
-
 class Job(object):
     """Interface for both Process and Pipeline.
 
@@ -891,6 +887,19 @@ class Job(object):
         raise NotImplementedError()
 
 
+def _WaitForExec(fd):
+    # type: (int) -> None
+    """Read until EOF, which happens when the child calls execve() or
+    exits."""
+    chunks = []  # type: List[str]
+    while True:
+        n, err_num = pyos.Read(fd, 4096, chunks)
+        if n == 0:
+            break
+        if n < 0 and err_num != EINTR:
+            break
+
+
 class Process(Job):
     """A process to run.
 
@@ -923,6 +932,12 @@ class Process(Job):
         self.pid = -1
         self.status = -1
 
+        # Set by StartProcess(), for the elapsed time
+        self.start_secs = 0
+        self.start_usecs = 0
+        # Set by the Waiter when the process is done
+        self.stats = None  # type: Optional[ProcessStats]
+
     def Init_ParentPipeline(self, pi):
         # type: (Pipeline) -> None
         """For updating PIPESTATUS."""
@@ -968,6 +983,19 @@ class Process(Job):
     def StartProcess(self, why):
         # type: (trace_t) -> int
         """Start this process with fork(), handling redirects."""
+        profiler = self.tracer.profiler
+        exec_r = -1
+        exec_w = -1
+        if profiler.enabled:
+            profiler.PushFrame('fork')
+            if why.tag() == trace_e.External:
+                # The child closes this pipe when it calls execve(), so we can
+                # measure the time until then.
+                exec_r, exec_w = posix.pipe()
+                fcntl_.fcntl(exec_r, F_SETFD, FD_CLOEXEC)
+                fcntl_.fcntl(exec_w, F_SETFD, FD_CLOEXEC)
+
+        self.start_secs, self.start_usecs = pyos.MonotonicTime()
         pid = posix.fork()
         if pid < 0:
             # When does this happen?
@@ -1009,6 +1037,14 @@ class Process(Job):
             # Never returns
 
         #log('STARTED process %s, pid = %d', self, pid)
+        if profiler.enabled:
+            profiler.PopFrame()
+            if exec_r != -1:
+                posix.close(exec_w)
+                with dev.ctx_Profile(profiler, 'exec'):
+                    _WaitForExec(exec_r)
+                posix.close(exec_r)
+
         self.tracer.OnProcessStart(pid, why)
 
         # Class invariant: after the process is started, it stores its PID.
@@ -1081,7 +1117,9 @@ class Process(Job):
             # QUESTION: Can the PGID of a single process just be the PID?  i.e. avoid
             # calling getpgid()?
             self.job_control.MaybeGiveTerminal(posix.getpgid(self.pid))
-        return self.Wait(waiter)
+        with dev.ctx_Profile(self.tracer.profiler, 'wait'):
+            status = self.Wait(waiter)
+        return status
 
 
 class ctx_Pipe(object):
@@ -1099,6 +1137,21 @@ class ctx_Pipe(object):
         self.fd_state.Pop()
 
 
+class ctx_StdoutToFile(object):
+    def __init__(self, fd_state, fd):
+        # type: (FdState, int) -> None
+        fd_state.PushStdoutToFile(fd)
+        self.fd_state = fd_state
+
+    def __enter__(self):
+        # type: () -> None
+        pass
+
+    def __exit__(self, type, value, traceback):
+        # type: (Any, Any, Any) -> None
+        self.fd_state.Pop()
+
+
 class Pipeline(Job):
     """A pipeline of processes to run.
 
@@ -1123,6 +1176,9 @@ class Pipeline(Job):
         self.last_thunk = None  # type: Tuple[CommandEvaluator, command_t]
         self.last_pipe = None  # type: Tuple[int, int]
 
+        # Optional: what the first part reads, see SetInput()
+        self.input_fd = -1
+
         self.sigpipe_status_ok = sigpipe_status_ok
 
     def DisplayJob(self, job_id, f, style):
@@ -1170,6 +1226,16 @@ class Pipeline(Job):
 
         self.procs.append(p)
 
+    def SetInput(self, fd):
+        # type: (int) -> None
+        """Make the first part read from 'fd', instead of inheriting stdin.
+
+        This is for when the shell already ran the part before it, e.g.
+        'echo hi' in 'echo hi | wc -l'.  'fd' is the read end of a pipe, or
+        an anonymous file holding the output.  The pipeline closes it.
+        """
+        self.input_fd = fd
+
     def AddLast(self, thunk):
         # type: (Tuple[CommandEvaluator, command_t]) -> None
         """Append the last noden to the pipeline.
@@ -1179,7 +1245,11 @@ class Pipeline(Job):
         """
         self.last_thunk = thunk
 
-        assert len(self.procs) != 0
+        if len(self.procs) == 0:
+            # Nothing to fork, e.g. echo hi | read x.  The last part reads the
+            # input directly.
+            assert self.input_fd != -1
+            return
 
         r, w = posix.pipe()
         prev = self.procs[-1]
@@ -1200,6 +1270,8 @@ class Pipeline(Job):
         for i, proc in enumerate(self.procs):
             if pgid != INVALID_PGID:
                 proc.AddStateChange(SetPgid(pgid))
+            if i == 0 and self.input_fd != -1:
+                proc.AddStateChange(StdinFromFile(self.input_fd))
 
             pid = proc.StartProcess(trace.PipelinePart)
             if i == 0 and pgid != INVALID_PGID:
@@ -1215,6 +1287,9 @@ class Pipeline(Job):
             # from non-adjacent pipes.
             proc.MaybeClosePipe()
 
+            if i == 0 and self.input_fd != -1:
+                posix.close(self.input_fd)  # only the first part reads it
+
         if self.last_thunk:
             self.pipe_status.append(-1)  # for self.last_thunk
 
@@ -1230,7 +1305,7 @@ class Pipeline(Job):
         # type: (Waiter) -> List[int]
         """Wait for this pipeline to finish."""
 
-        assert self.procs, "no procs for Wait()"
+        assert self.procs or self.last_thunk, "nothing to Wait() for"
         # waitpid(-1) zero or more times
         while self.state == job_state_e.Running:
             # Keep waiting until there's nothing to wait for.
@@ -1264,7 +1339,8 @@ class Pipeline(Job):
         """
         assert len(self.pids) == len(self.procs)
 
-        self.job_control.MaybeGiveTerminal(posix.getpgid(self.pids[0]))
+        if len(self.pids):
+            self.job_control.MaybeGiveTerminal(posix.getpgid(self.pids[0]))
 
         # Run the last part of the pipeline IN PARALLEL with other processes.  It
         # may or may not fork:
@@ -1273,9 +1349,11 @@ class Pipeline(Job):
 
         cmd_ev, last_node = self.last_thunk
 
-        assert self.last_pipe is not None
-        r, w = self.last_pipe  # set in AddLast()
-        posix.close(w)  # we will not write here
+        if self.last_pipe is None:  # nothing was forked, see AddLast()
+            r = self.input_fd
+        else:
+            r, w = self.last_pipe  # set in AddLast()
+            posix.close(w)  # we will not write here
 
         with ctx_Pipe(fd_state, r):
             cmd_ev.ExecuteAndCatch(last_node)
@@ -1653,6 +1731,8 @@ class Waiter(object):
         self.tracer = tracer
         self.last_status = 127  # wait -n error code
 
+        self.ru = pyos.RUsage()  # mutated by each WaitPid() to save allocations
+
     def WaitForOne(self):
         # type: () -> int
         """Wait until the next process returns (or maybe Ctrl-C).
@@ -1689,7 +1769,7 @@ class Waiter(object):
         | Done(int pid, int status)  -- process done
         | EINTR(bool sigint)         -- may or may not retry
         """
-        pid, status = pyos.WaitPid()
+        pid, status = pyos.WaitPid(self.ru)
         if pid < 0:  # error case
             err_num = status
             #log('waitpid() error => %d %s', e.errno, pyutil.strerror(e))
@@ -1723,14 +1803,12 @@ class Waiter(object):
             if term_sig == SIGINT:
                 print('')
 
-            self.job_list.WhenDone(pid)
-            proc.WhenDone(pid, status)
+            self._WhenDone(proc, pid, status)
 
         elif WIFEXITED(status):
             status = WEXITSTATUS(status)
             #log('exit status: %s', status)
-            self.job_list.WhenDone(pid)
-            proc.WhenDone(pid, status)
+            self._WhenDone(proc, pid, status)
 
         elif WIFSTOPPED(status):
             #status = WEXITSTATUS(status)
@@ -1747,3 +1825,25 @@ class Waiter(object):
         self.last_status = status  # for wait -n
         self.tracer.OnProcessEnd(pid, status)
         return W1_OK
+
+    def _WhenDone(self, proc, pid, status):
+        # type: (Process, int, int) -> None
+        """Record what the process used, and update the job state."""
+        secs, usecs = pyos.MonotonicTime()
+        secs -= proc.start_secs
+        usecs -= proc.start_usecs
+        if usecs < 0:
+            usecs += 1000000
+            secs -= 1
+
+        ru = self.ru
+        proc.stats = ProcessStats(pid, status, secs, usecs, ru.user_secs,
+                                  ru.user_usecs, ru.sys_secs, ru.sys_usecs,
+                                  ru.max_rss_KiB)
+
+        process_log = self.tracer.process_log
+        if process_log.enabled:
+            process_log.OnProcessEnd(proc.stats, proc.thunk.UserString())
+
+        self.job_list.WhenDone(pid)
+        proc.WhenDone(pid, status)
@@ -5,17 +5,19 @@ Like py{error,util}.py, it won't be translated to C++.
 """
 from __future__ import print_function
 
-from errno import EINTR
+from errno import EEXIST, EINTR
 import pwd
 import resource
 import signal
 import select
+import stat
 import sys
 import termios  # for read -n
 import time
 
 from core import pyutil
 from mycpp.mylib import log
+from pylib import os_path
 
 import posix_ as posix
 from posix_ import WUNTRACED
@@ -27,6 +29,11 @@ _ = log
 EOF_SENTINEL = 256  # bigger than any byte
 NEWLINE_CH = 10  # ord('\n')
 
+# Kinds of entries returned by ListDir()
+DIR_ENTRY_OTHER = 0  # not a directory
+DIR_ENTRY_DIR = 1
+DIR_ENTRY_DIR_LINK = 2  # symlink to a directory
+
 
 def FlushStdout():
     # type: () -> None
@@ -34,18 +41,45 @@ def FlushStdout():
     sys.stdout.flush()
 
 
-def WaitPid():
-    # type: () -> Tuple[int, int]
+class RUsage(object):
+    """Resources used by a child process, filled in by WaitPid().
+
+    Times are split into two ints so they don't overflow in C++.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self.user_secs = 0
+        self.user_usecs = 0
+        self.sys_secs = 0
+        self.sys_usecs = 0
+        self.max_rss_KiB = 0  # ru_maxrss is in KiB on Linux
+
+
+def _SplitSecs(t):
+    # type: (float) -> Tuple[int, int]
+    secs = int(t)
+    return secs, int((t - secs) * 1000000)
+
+
+def WaitPid(ru):
+    # type: (RUsage) -> Tuple[int, int]
     try:
         # Notes:
         # - The arg -1 makes it like wait(), which waits for any process.
         # - WUNTRACED is necessary to get stopped jobs.  What about WCONTINUED?
         # - We don't retry on EINTR, because the 'wait' builtin should be
         #   interruptable.
-        pid, status = posix.waitpid(-1, WUNTRACED)
+        # - wait4() is waitpid() that also returns the resources the child
+        #   used, for dev.ProcessLog and $_process_stats.
+        pid, status, r = posix.wait4(-1, WUNTRACED)
     except OSError as e:
         return -1, e.errno
 
+    # r is a resource.struct_rusage: ru_utime, ru_stime, ru_maxrss, ...
+    ru.user_secs, ru.user_usecs = _SplitSecs(r[0])
+    ru.sys_secs, ru.sys_usecs = _SplitSecs(r[1])
+    ru.max_rss_KiB = r[2]
     return pid, status
 
 
@@ -83,10 +117,38 @@ def Read(fd, n, chunks):
         return length, 0
 
 
+def AnonymousFile():
+    # type: () -> Tuple[int, int]
+    """Open a read-write file that has no name, like memfd_create().
+
+    The C++ version uses memfd_create(), so the bytes stay in memory.  Here we
+    create a file in $TMPDIR and unlink it right away.
+
+    Returns:
+      (-1, errno) on failure
+      (fd, 0) on success
+    """
+    tmp_dir = posix.environ.get('TMPDIR', '/tmp')
+    path = os_path.join(tmp_dir, 'osh-anon-%d' % posix.getpid())
+    mode = posix.O_CREAT | posix.O_EXCL | posix.O_RDWR
+    try:
+        try:
+            fd = posix.open(path, mode, 0o600)
+        except OSError as e:
+            if e.errno != EEXIST:
+                raise
+            posix.unlink(path)  # left over from a crash, since we unlink
+            fd = posix.open(path, mode, 0o600)
+        posix.unlink(path)
+    except OSError as e:
+        return -1, e.errno
+    return fd, 0
+
+
 def ReadByte(fd):
     # type: (int) -> Tuple[int, int]
     """Another low level interface with a return value interface.  Used by
-    _ReadUntilDelim() and _ReadLineSlowly().
+    _ReadUntilDelim().
 
     Returns:
       failure: (-1, errno) on failure
@@ -222,6 +284,18 @@ def Time():
     return t, u.ru_utime, u.ru_stime
 
 
+def MonotonicTime():
+    # type: () -> Tuple[int, int]
+    """Returns (seconds, microseconds) for measuring intervals.
+
+    Python 2 has no monotonic clock, so this uses gettimeofday().  The C++
+    version uses CLOCK_MONOTONIC.
+    """
+    t = time.time()
+    secs = int(t)
+    return secs, int((t - secs) * 1000000)
+
+
 def PrintTimes():
     # type: () -> None
     utime, stime, cutime, cstime, elapsed = posix.times()
@@ -401,3 +475,35 @@ def MakeDirCacheKey(path):
     directory accesses."""
     st = posix.stat(path)
     return (path, int(st.st_mtime))
+
+
+def _DirEntryKind(path):
+    # type: (str) -> int
+    try:
+        st = posix.lstat(path)
+    except OSError:
+        return DIR_ENTRY_OTHER  # deleted in between
+    if stat.S_ISDIR(st.st_mode):
+        return DIR_ENTRY_DIR
+    if stat.S_ISLNK(st.st_mode):
+        try:
+            st = posix.stat(path)
+        except OSError:
+            return DIR_ENTRY_OTHER  # dangling symlink
+        if stat.S_ISDIR(st.st_mode):
+            return DIR_ENTRY_DIR_LINK
+    return DIR_ENTRY_OTHER
+
+
+def ListDir(path):
+    # type: (str) -> Tuple[List[str], List[int]]
+    """Returns the names in a directory, and a parallel list of DIR_ENTRY_*.
+
+    The C++ version uses d_type from readdir(), so it only has to stat()
+    symlinks.  Raises OSError if the directory can't be read.
+    """
+    names = posix.listdir(path)
+    kinds = []  # type: List[int]
+    for name in names:
+        kinds.append(_DirEntryKind(os_path.join(path, name)))
+    return names, kinds
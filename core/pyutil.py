@@ -69,12 +69,18 @@ def strerror(e):
     return posix.strerror(e.errno)
 
 
+_oil_grammar = None  # type: grammar.Grammar
+
+
 def LoadOilGrammar(loader):
     # type: (_ResourceLoader) -> grammar.Grammar
-    oil_grammar = grammar.Grammar()
-    contents = loader.Get('_devbuild/gen/grammar.marshal')
-    oil_grammar.loads(contents)
-    return oil_grammar
+    """Load the grammar once per process, like the C++ version."""
+    global _oil_grammar
+    if _oil_grammar is None:
+        _oil_grammar = grammar.Grammar()
+        contents = loader.Get('_devbuild/gen/grammar.marshal')
+        _oil_grammar.loads(contents)
+    return _oil_grammar
 
 
 class _ResourceLoader(object):
@@ -440,14 +440,15 @@ def Main(lang, arg_r, environ, login_shell, loader, readline):
     # feedback between runtime and parser
     aliases = {}  # type: Dict[str, str]
 
-    oil_grammar = pyutil.LoadOilGrammar(loader)
-
     if flag.one_pass_parse and not exec_opts.noexec():
         raise error.Usage('--one-pass-parse requires noexec (-n)', loc.Missing)
+
+    # Passing None means the YSH grammar is loaded when the first expression
+    # is parsed, which speeds up startup.
     parse_ctx = parse_lib.ParseContext(arena,
                                        parse_opts,
                                        aliases,
-                                       oil_grammar,
+                                       None,
                                        one_pass_parse=flag.one_pass_parse)
 
     # Three ParseContext instances SHARE aliases.
@@ -460,15 +461,14 @@ def Main(lang, arg_r, environ, login_shell, loader, readline):
     comp_ctx = parse_lib.ParseContext(comp_arena,
                                       parse_opts,
                                       aliases,
-                                      oil_grammar,
+                                      None,
                                       one_pass_parse=True)
     comp_ctx.Init_Trail(trail1)
 
     hist_arena = alloc.Arena()
     hist_arena.PushSource(source.Unused('history'))
     trail2 = parse_lib.Trail()
-    hist_ctx = parse_lib.ParseContext(hist_arena, parse_opts, aliases,
-                                      oil_grammar)
+    hist_ctx = parse_lib.ParseContext(hist_arena, parse_opts, aliases, None)
     hist_ctx.Init_Trail(trail2)
 
     # Deps helps manages dependencies.  These dependencies are circular:
@@ -513,6 +513,26 @@ def Main(lang, arg_r, environ, login_shell, loader, readline):
     tracer = dev.Tracer(parse_ctx, exec_opts, mutable_opts, mem, trace_f)
     fd_state.tracer = tracer  # circular dep
 
+    profile_path = environ.get('OILS_PROFILE')
+    if profile_path is not None:
+        try:
+            profile_f = fd_state.OpenForOverwrite(profile_path)
+        except (IOError, OSError) as e:
+            print_stderr("%s: Couldn't open %r: %s" %
+                         (lang, profile_path, posix.strerror(e.errno)))
+            return 2
+        tracer.profiler = dev.Profiler(profile_f)
+
+    process_log_path = environ.get('OILS_PROCESS_LOG')
+    if process_log_path is not None:
+        try:
+            process_log_f = fd_state.OpenForOverwrite(process_log_path)
+        except (IOError, OSError) as e:
+            print_stderr("%s: Couldn't open %r: %s" %
+                         (lang, process_log_path, posix.strerror(e.errno)))
+            return 2
+        tracer.process_log = dev.ProcessLog(process_log_f)
+
     signal_safe = pyos.InitSignalSafe()
     trap_state = builtin_trap.TrapState(signal_safe)
 
@@ -653,7 +673,7 @@ def Main(lang, arg_r, environ, login_shell, loader, readline):
                                                  tracer, errfmt)
     builtins[builtin_i.read] = builtin_misc.Read(splitter, mem, parse_ctx,
                                                  cmd_ev, errfmt)
-    mapfile = builtin_misc.MapFile(mem, errfmt, cmd_ev)
+    mapfile = builtin_misc.MapFile(mem, parse_ctx, cmd_ev, errfmt)
     builtins[builtin_i.mapfile] = mapfile
     builtins[builtin_i.readarray] = mapfile
 
@@ -793,6 +813,7 @@ def Main(lang, arg_r, environ, login_shell, loader, readline):
         cmd_ev.MaybeRunExitTrap(mut_status)
         status = mut_status.i
 
+        tracer.profiler.WriteStacks()
         return status
 
     # Note: headless mode above doesn't use c_parser
@@ -874,6 +895,8 @@ def Main(lang, arg_r, environ, login_shell, loader, readline):
             cmd_ev.MaybeRunExitTrap(mut_status)
             status = mut_status.i
 
+        tracer.profiler.WriteStacks()
+
         if readline:
             hist_file = sh_files.HistoryFile()
             if hist_file is not None:
@@ -914,5 +937,7 @@ def Main(lang, arg_r, environ, login_shell, loader, readline):
         cmd_ev.MaybeRunExitTrap(mut_status)
         status = mut_status.i
 
+    tracer.profiler.WriteStacks()
+
     # NOTE: We haven't closed the file opened with fd_state.Open
     return status
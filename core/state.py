@@ -15,7 +15,7 @@ from _devbuild.gen.id_kind_asdl import Id
 from _devbuild.gen.option_asdl import option_i
 from _devbuild.gen.runtime_asdl import (value, value_e, value_t, lvalue,
                                         lvalue_e, lvalue_t, scope_e, scope_t,
-                                        HayNode, Cell)
+                                        HayNode, Cell, ProcessStats)
 from _devbuild.gen.syntax_asdl import loc, Token
 from _devbuild.gen.types_asdl import opt_group_i
 from asdl import runtime
@@ -1222,6 +1222,7 @@ class ctx_Registers(object):
         # frame.
         mem.pipe_status.append([])
         mem.process_sub_status.append([])
+        mem.process_stats.append([])
 
         mem.regex_matches.append([])
         self.mem = mem
@@ -1233,6 +1234,7 @@ class ctx_Registers(object):
     def __exit__(self, type, value, traceback):
         # type: (Any, Any, Any) -> None
         self.mem.regex_matches.pop()
+        self.mem.process_stats.pop()
         self.mem.process_sub_status.pop()
         self.mem.pipe_status.pop()
         self.mem.try_status.pop()
@@ -1316,6 +1318,7 @@ class Mem(object):
         self.try_status = [0]  # type: List[int]  # a stack
         self.pipe_status = [[]]  # type: List[List[int]]  # stack
         self.process_sub_status = [[]]  # type: List[List[int]]  # stack
+        self.process_stats = [[]]  # type: List[List[ProcessStats]]  # stack
 
         # A stack but NOT a register?
         self.this_dir = []  # type: List[str]
@@ -1457,6 +1460,14 @@ class Mem(object):
         # type: (List[int]) -> None
         self.process_sub_status[-1] = x
 
+    def LastProcessStats(self):
+        # type: () -> List[ProcessStats]
+        return self.process_stats[-1]
+
+    def SetProcessStats(self, x):
+        # type: (List[ProcessStats]) -> None
+        self.process_stats[-1] = x
+
     #
     # Call Stack
     #
@@ -2021,6 +2032,17 @@ class Mem(object):
                        ]  # type: List[str]
             return value.MaybeStrArray(sub_strs)
 
+        if name == '_process_stats':
+            # One row per process: pid status elapsed_secs user_secs sys_secs
+            # max_rss_KiB
+            stats_strs = [
+                '%d %d %d.%06d %d.%06d %d.%06d %d' %
+                (st.pid, st.status, st.elapsed_secs, st.elapsed_usecs,
+                 st.user_secs, st.user_usecs, st.sys_secs, st.sys_usecs,
+                 st.max_rss_KiB) for st in self.process_stats[-1]
+            ]  # type: List[str]
+            return value.MaybeStrArray(stats_strs)
+
         if name == 'BASH_REMATCH':
             return value.MaybeStrArray(self.regex_matches[-1])  # top of stack
 
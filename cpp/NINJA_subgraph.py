@@ -66,6 +66,7 @@ def NinjaGraph(ru):
         'cpp/frontend_match.cc',
       ],
       deps = [
+        '//frontend/consts',  # for IsValidVarName()
         '//frontend/syntax.asdl',
         '//frontend/types.asdl',
         '//mycpp/runtime',
@@ -2,20 +2,25 @@
 
 #include "cpp/core.h"
 
-#include <ctype.h>  // ispunct()
+#include <ctype.h>   // ispunct()
+#include <dirent.h>  // opendir(), readdir()
 #include <errno.h>
+#include <fcntl.h>  // AT_SYMLINK_NOFOLLOW
+#include <limits.h>  // PATH_MAX
 #include <math.h>  // fmod()
 #include <pwd.h>   // passwd
 #include <signal.h>
+#include <stdlib.h>        // getenv(), mkstemp()
+#include <sys/mman.h>      // memfd_create()
 #include <sys/resource.h>  // getrusage
 #include <sys/select.h>    // select(), FD_ISSET, FD_SET, FD_ZERO
 #include <sys/stat.h>      // stat
 #include <sys/time.h>      // gettimeofday
 #include <sys/times.h>     // tms / times()
 #include <sys/utsname.h>   // uname
-#include <sys/wait.h>      // waitpid()
+#include <sys/wait.h>      // wait4()
 #include <termios.h>       // tcgetattr(), tcsetattr()
-#include <time.h>          // time()
+#include <time.h>          // time(), clock_gettime()
 #include <unistd.h>        // getuid(), environ
 
 #include "_gen/frontend/consts.h"  // gVersion
@@ -24,15 +29,21 @@ namespace pyos {
 
 SignalSafe* gSignalSafe = nullptr;
 
-Tuple2<int, int> WaitPid() {
+Tuple2<int, int> WaitPid(RUsage* ru) {
   int status;
-  int result = ::waitpid(-1, &status, WUNTRACED);
+  struct rusage r;
+  int result = ::wait4(-1, &status, WUNTRACED, &r);
   if (result < 0) {
     if (errno == EINTR && gSignalSafe->PollSigInt()) {
       throw Alloc<KeyboardInterrupt>();
     }
     return Tuple2<int, int>(-1, errno);
   }
+  ru->user_secs = r.ru_utime.tv_sec;
+  ru->user_usecs = r.ru_utime.tv_usec;
+  ru->sys_secs = r.ru_stime.tv_sec;
+  ru->sys_usecs = r.ru_stime.tv_usec;
+  ru->max_rss_KiB = r.ru_maxrss;
   return Tuple2<int, int>(result, status);
 }
 
@@ -57,6 +68,32 @@ Tuple2<int, int> Read(int fd, int n, List<Str*>* chunks) {
   return Tuple2<int, int>(length, 0);
 }
 
+Tuple2<int, int> AnonymousFile() {
+  int fd;
+#ifdef MFD_CLOEXEC
+  fd = ::memfd_create("osh-anon", MFD_CLOEXEC);
+  if (fd >= 0) {
+    return Tuple2<int, int>(fd, 0);
+  }
+  if (errno != ENOSYS) {
+    return Tuple2<int, int>(-1, errno);
+  }
+#endif
+  // Old kernel: fall back to an unlinked file in $TMPDIR
+  const char* tmp_dir = getenv("TMPDIR");
+  if (tmp_dir == nullptr) {
+    tmp_dir = "/tmp";
+  }
+  char path[PATH_MAX];
+  snprintf(path, PATH_MAX, "%s/osh-anon-XXXXXX", tmp_dir);
+  fd = ::mkstemp(path);
+  if (fd < 0) {
+    return Tuple2<int, int>(-1, errno);
+  }
+  ::unlink(path);
+  return Tuple2<int, int>(fd, 0);
+}
+
 Tuple2<int, int> ReadByte(int fd) {
   unsigned char buf[1];
   ssize_t n = read(fd, &buf, 1);
@@ -101,7 +138,7 @@ Dict<Str*, Str*>* Environ() {
 }
 
 int Chdir(Str* dest_dir) {
-  if (chdir(dest_dir->data_) == 0) {
+  if (chdir(dest_dir->c_str()) == 0) {
     return 0;  // success
   } else {
     return errno;
@@ -122,7 +159,7 @@ Str* GetMyHomeDir() {
 
 Str* GetHomeDir(Str* user_name) {
   // Don't free this.  (May return a pointer to a static area)
-  struct passwd* entry = getpwnam(user_name->data_);
+  struct passwd* entry = getpwnam(user_name->c_str());
   if (entry == nullptr) {
     return nullptr;
   }
@@ -198,6 +235,14 @@ Tuple3<double, double, double> Time() {
   return Tuple3<double, double, double>(real, user, sys);
 }
 
+Tuple2<int, int> MonotonicTime() {
+  struct timespec ts;
+  if (clock_gettime(CLOCK_MONOTONIC, &ts) < 0) {
+    throw Alloc<IOError>(errno);
+  }
+  return Tuple2<int, int>(ts.tv_sec, ts.tv_nsec / 1000);
+}
+
 static void PrintClock(clock_t ticks, long ticks_per_sec) {
   double seconds = static_cast<double>(ticks) / ticks_per_sec;
   printf("%ldm%.3fs", static_cast<long>(seconds) / 60, std::fmod(seconds, 60));
@@ -259,13 +304,72 @@ void RegisterSignalInterest(int sig_num) {
 
 Tuple2<Str*, int>* MakeDirCacheKey(Str* path) {
   struct stat st;
-  if (::stat(path->data(), &st) == -1) {
+  if (::stat(path->c_str(), &st) == -1) {
     throw Alloc<OSError>(errno);
   }
 
   return Alloc<Tuple2<Str*, int>>(path, st.st_mtime);
 }
 
+// Classify an entry without a stat() when d_type tells us it's not a symlink.
+static int DirEntryKind(DIR* dirp, struct dirent* ep) {
+  struct stat st;
+  switch (ep->d_type) {
+  case DT_DIR:
+    return DIR_ENTRY_DIR;
+  case DT_UNKNOWN:  // some file systems don't fill in d_type
+    if (::fstatat(dirfd(dirp), ep->d_name, &st, AT_SYMLINK_NOFOLLOW) == -1) {
+      return DIR_ENTRY_OTHER;  // deleted in between
+    }
+    if (S_ISDIR(st.st_mode)) {
+      return DIR_ENTRY_DIR;
+    }
+    if (!S_ISLNK(st.st_mode)) {
+      return DIR_ENTRY_OTHER;
+    }
+    // fall through
+  case DT_LNK:
+    if (::fstatat(dirfd(dirp), ep->d_name, &st, 0) == -1) {
+      return DIR_ENTRY_OTHER;  // dangling symlink
+    }
+    return S_ISDIR(st.st_mode) ? DIR_ENTRY_DIR_LINK : DIR_ENTRY_OTHER;
+  default:
+    return DIR_ENTRY_OTHER;
+  }
+}
+
+Tuple2<List<Str*>*, List<int>*> ListDir(Str* path) {
+  DIR* dirp = ::opendir(path->c_str());
+  if (dirp == nullptr) {
+    throw Alloc<OSError>(errno);
+  }
+
+  List<Str*>* names = NewList<Str*>();
+  List<int>* kinds = NewList<int>();
+  while (true) {
+    errno = 0;
+    struct dirent* ep = ::readdir(dirp);
+    if (ep == nullptr) {
+      if (errno != 0) {
+        ::closedir(dirp);
+        throw Alloc<OSError>(errno);
+      }
+      break;  // no more files
+    }
+    // Skip . and ..
+    int name_len = strlen(ep->d_name);
+    if (ep->d_name[0] == '.' &&
+        (name_len == 1 || (ep->d_name[1] == '.' && name_len == 2))) {
+      continue;
+    }
+    names->append(StrFromC(ep->d_name, name_len));
+    kinds->append(DirEntryKind(dirp, ep));
+  }
+  ::closedir(dirp);
+
+  return Tuple2<List<Str*>*, List<int>*>(names, kinds);
+}
+
 Tuple2<int, void*> PushTermAttrs(int fd, int mask) {
   struct termios* term_attrs =
       static_cast<struct termios*>(malloc(sizeof(struct termios)));
@@ -302,7 +406,7 @@ static grammar::Grammar* gOilGrammar = nullptr;
 bool IsValidCharEscape(Str* c) {
   DCHECK(len(c) == 1);
 
-  int ch = c->data_[0];
+  int ch = c->data()[0];
 
   if (ch == '/' || ch == '.' || ch == '-') {
     return false;
@@ -341,7 +445,7 @@ void ShowAppVersion(_ResourceLoader* loader) {
   // osh --version is more elaborate, with compiler and so forth.
   // python -V is similarly simple.
 
-  printf("Oils for Unix %s\n", consts::gVersion->data_);
+  printf("Oils for Unix %s\n", consts::gVersion->c_str());
   printf("\n");
   printf("    https://oils-for-unix.org/\n");
   printf("\n");
@@ -353,8 +457,8 @@ Str* BackslashEscape(Str* s, Str* meta_chars) {
   char* p = buf->data_;
 
   for (int i = 0; i < len(s); ++i) {
-    char c = s->data_[i];
-    if (memchr(meta_chars->data_, c, len(meta_chars))) {
+    char c = s->data()[i];
+    if (memchr(meta_chars->data(), c, len(meta_chars))) {
       *p++ = '\\';
     }
     *p++ = c;
@@ -35,8 +35,31 @@ const int EOF_SENTINEL = 256;
 const int NEWLINE_CH = 10;
 const int UNTRAPPED_SIGWINCH = -1;
 
-Tuple2<int, int> WaitPid();
+// Kinds of entries returned by ListDir()
+const int DIR_ENTRY_OTHER = 0;
+const int DIR_ENTRY_DIR = 1;
+const int DIR_ENTRY_DIR_LINK = 2;
+
+class RUsage {
+ public:
+  RUsage()
+      : user_secs(0), user_usecs(0), sys_secs(0), sys_usecs(0), max_rss_KiB(0) {
+  }
+
+  static constexpr ObjHeader obj_header() {
+    return ObjHeader::ClassFixed(kZeroMask, sizeof(RUsage));
+  }
+
+  int user_secs;
+  int user_usecs;
+  int sys_secs;
+  int sys_usecs;
+  int max_rss_KiB;
+};
+
+Tuple2<int, int> WaitPid(RUsage* ru);
 Tuple2<int, int> Read(int fd, int n, List<Str*>* chunks);
+Tuple2<int, int> AnonymousFile();
 Tuple2<int, int> ReadByte(int fd);
 Str* ReadLine();
 Dict<Str*, Str*>* Environ();
@@ -85,6 +108,8 @@ Str* OsType();
 
 Tuple3<double, double, double> Time();
 
+Tuple2<int, int> MonotonicTime();
+
 void PrintTimes();
 
 bool InputAvailable(int fd);
@@ -147,6 +172,7 @@ class SignalSafe {
 
     // Make sure we have a distinct list to reuse.
     DCHECK(empty_list_ != pending_signals_);
+    WriteBarrier(pending_signals_);
     pending_signals_ = empty_list_;
 
     return ret;
@@ -158,6 +184,7 @@ class SignalSafe {
     DCHECK(len(empty_list) == 0);            // main thread clears
     DCHECK(empty_list->capacity_ == kMaxPendingSignals);
 
+    WriteBarrier(empty_list_);
     empty_list_ = empty_list;
   }
 
@@ -237,6 +264,8 @@ void RegisterSignalInterest(int sig_num);
 
 Tuple2<Str*, int>* MakeDirCacheKey(Str* path);
 
+Tuple2<List<Str*>*, List<int>*> ListDir(Str* path);
+
 }  // namespace pyos
 
 namespace pyutil {
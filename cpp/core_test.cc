@@ -5,6 +5,7 @@
 #include <signal.h>       // SIG*, kill()
 #include <sys/stat.h>     // stat
 #include <sys/utsname.h>  // uname
+#include <sys/wait.h>     // WEXITSTATUS
 #include <unistd.h>       // getpid(), getuid(), environ
 
 #include "cpp/stdlib.h"         // posix::getcwd
@@ -138,15 +139,51 @@ TEST pyos_read_test() {
   PASS();
 }
 
+TEST anonymous_file_test() {
+  Tuple2<int, int> tup = pyos::AnonymousFile();
+  int fd = tup.at0();
+  ASSERT(fd >= 0);
+  ASSERT_EQ(0, tup.at1());
+
+  ASSERT_EQ(3, write(fd, "abc", 3));
+  ASSERT_EQ(0, lseek(fd, 0, SEEK_SET));
+
+  List<Str*>* chunks = NewList<Str*>();
+  tup = pyos::Read(fd, 4096, chunks);
+  ASSERT_EQ(3, tup.at0());
+  ASSERT(str_equals(StrFromC("abc"), chunks->index_(0)));
+
+  close(fd);
+
+  PASS();
+}
+
 TEST pyos_test() {
   Tuple3<double, double, double> t = pyos::Time();
   ASSERT(t.at0() > 0.0);
   ASSERT(t.at1() >= 0.0);
   ASSERT(t.at2() >= 0.0);
 
-  Tuple2<int, int> result = pyos::WaitPid();
+  Tuple2<int, int> m1 = pyos::MonotonicTime();
+  Tuple2<int, int> m2 = pyos::MonotonicTime();
+  ASSERT(m1.at1() >= 0 && m1.at1() < 1000000);
+  ASSERT(m2.at0() > m1.at0() ||
+         (m2.at0() == m1.at0() && m2.at1() >= m1.at1()));
+
+  pyos::RUsage* ru = Alloc<pyos::RUsage>();
+  Tuple2<int, int> result = pyos::WaitPid(ru);
   ASSERT_EQ(-1, result.at0());  // no children to wait on
 
+  int pid = fork();
+  if (pid == 0) {
+    _exit(42);
+  }
+  result = pyos::WaitPid(ru);
+  ASSERT_EQ(pid, result.at0());
+  ASSERT_EQ(42, WEXITSTATUS(result.at1()));
+  ASSERT(ru->user_usecs >= 0 && ru->user_usecs < 1000000);
+  ASSERT(ru->max_rss_KiB > 0);
+
   // This test isn't hermetic but it should work in most places, including in a
   // container
 
@@ -331,6 +368,35 @@ TEST dir_cache_key_test() {
   PASS();
 }
 
+TEST list_dir_test() {
+  Tuple2<List<Str*>*, List<int>*> result = pyos::ListDir(StrFromC("/"));
+  List<Str*>* names = result.at0();
+  List<int>* kinds = result.at1();
+  ASSERT_EQ(len(names), len(kinds));
+
+  bool found_etc = false;
+  for (int i = 0; i < len(names); ++i) {
+    if (str_equals(names->index_(i), StrFromC("etc"))) {
+      ASSERT_EQ_FMT(pyos::DIR_ENTRY_DIR, kinds->index_(i), "%d");
+      found_etc = true;
+    }
+    // . and .. are skipped
+    ASSERT(!str_equals(names->index_(i), StrFromC(".")));
+    ASSERT(!str_equals(names->index_(i), StrFromC("..")));
+  }
+  ASSERT(found_etc);
+
+  int ec = -1;
+  try {
+    pyos::ListDir(StrFromC("nonexistent_ZZ"));
+  } catch (IOError_OSError* e) {
+    ec = e->errno_;
+  }
+  ASSERT(ec == ENOENT);
+
+  PASS();
+}
+
 // Test the theory that LeakSanitizer tests for reachability from global
 // variables.
 struct Node {
@@ -364,6 +430,7 @@ int main(int argc, char** argv) {
   RUN_TEST(uname_test);
   RUN_TEST(pyos_readbyte_test);
   RUN_TEST(pyos_read_test);
+  RUN_TEST(anonymous_file_test);
   RUN_TEST(pyos_test);  // non-hermetic
   RUN_TEST(pyutil_test);
   RUN_TEST(strerror_test);
@@ -373,6 +440,7 @@ int main(int argc, char** argv) {
 
   RUN_TEST(passwd_test);
   RUN_TEST(dir_cache_key_test);
+  RUN_TEST(list_dir_test);
   RUN_TEST(asan_global_leak_test);
 
   gHeap.CleanProcessExit();
@@ -2,10 +2,15 @@
 
 #include "cpp/frontend_flag_spec.h"
 
+#include <string.h>  // memchr, strlen
+
+#include <vector>
+
 #include "_gen/frontend/arg_types.h"
 #include "mycpp/gc_builtins.h"
-// TODO: This prebuilt header should not be included in the tarball
-// for definition of args::Reader, etc.
+// TODO: These prebuilt headers should not be included in the tarball
+// for definition of args::Reader, e_usage(), etc.
+#include "prebuilt/core/error.mycpp.h"
 #include "prebuilt/frontend/args.mycpp.h"
 
 namespace flag_spec {
@@ -15,6 +20,7 @@ using arg_types::kFlagSpecsAndMore;
 using runtime_asdl::flag_type_e;
 using runtime_asdl::value;
 using runtime_asdl::value_t;
+using syntax_asdl::loc;
 
 void _CreateStrList(const char** in, List<Str*>* out) {
   int i = 0;
@@ -135,8 +141,6 @@ void _CreateActions(Action_c* in, Dict<Str*, args::_Action*>* out) {
 }
 
 // "Inflate" the static C data into a heap-allocated ASDL data structure.
-//
-// TODO: Make a GLOBAL CACHE?  It could be shared between subinterpreters even?
 flag_spec::_FlagSpec* CreateSpec(FlagSpec_c* in) {
   auto out = Alloc<flag_spec::_FlagSpec>();
   out->arity0 = NewList<Str*>();
@@ -185,6 +189,20 @@ flag_spec::_FlagSpecAndMore* CreateSpec2(FlagSpecAndMore_c* in) {
   return out;
 }
 
+// The specs are static data in the binary, which costs nothing until it's
+// used.  Each spec is inflated on first use and cached, since builtins like
+// 'echo' and 'read' are called many times.  Flag parsing doesn't mutate specs.
+static std::vector<flag_spec::_FlagSpec*> gSpecCache;
+static std::vector<flag_spec::_FlagSpecAndMore*> gSpecCache2;
+
+template <typename T>
+static T** CacheSlot(std::vector<T*>* cache, int i) {
+  if (i >= static_cast<int>(cache->size())) {
+    cache->resize(i + 1, nullptr);
+  }
+  return &(*cache)[i];
+}
+
 flag_spec::_FlagSpec* LookupFlagSpec(Str* spec_name) {
   int i = 0;
   while (true) {
@@ -194,7 +212,12 @@ flag_spec::_FlagSpec* LookupFlagSpec(Str* spec_name) {
     }
     if (str_equals0(name, spec_name)) {
       // log("%s found", spec_name->data_);
-      return CreateSpec(&kFlagSpecs[i]);
+      flag_spec::_FlagSpec** slot = CacheSlot(&gSpecCache, i);
+      if (*slot == nullptr) {
+        *slot = CreateSpec(&kFlagSpecs[i]);
+        gHeap.RootGlobalVar(*slot);
+      }
+      return *slot;
     }
 
     i++;
@@ -212,7 +235,12 @@ flag_spec::_FlagSpecAndMore* LookupFlagSpec2(Str* spec_name) {
     }
     if (str_equals0(name, spec_name)) {
       // log("%s found", spec_name->data_);
-      return CreateSpec2(&kFlagSpecsAndMore[i]);
+      flag_spec::_FlagSpecAndMore** slot = CacheSlot(&gSpecCache2, i);
+      if (*slot == nullptr) {
+        *slot = CreateSpec2(&kFlagSpecsAndMore[i]);
+        gHeap.RootGlobalVar(*slot);
+      }
+      return *slot;
     }
 
     i++;
@@ -230,8 +258,7 @@ args::_Attributes* Parse(Str* spec_name, args::Reader* arg_r) {
 
 Tuple2<args::_Attributes*, args::Reader*> ParseCmdVal(
     Str* spec_name, runtime_asdl::cmd_value__Argv* cmd_val) {
-  auto arg_r = Alloc<args::Reader>(cmd_val->argv, cmd_val->arg_locs);
-  arg_r->Next();  // move past the builtin name
+  auto arg_r = CmdValReader(cmd_val);
 
   flag_spec::_FlagSpec* spec = LookupFlagSpec(spec_name);
   assert(spec);  // should always be found
@@ -264,4 +291,285 @@ args::_Attributes* ParseMore(Str* spec_name, args::Reader* arg_r) {
   return args::ParseMore(spec, arg_r);
 }
 
+args::Reader* CmdValReader(runtime_asdl::cmd_value::Argv* cmd_val) {
+  auto arg_r = Alloc<args::Reader>(cmd_val->argv, cmd_val->arg_locs);
+  arg_r->Next();  // move past the builtin name
+  return arg_r;
+}
+
+// With optional arg
+args::Reader* CmdValReader(runtime_asdl::cmd_value::Argv* cmd_val,
+                           bool accept_typed_args) {
+  // TODO: disallow typed args!
+  return CmdValReader(cmd_val);
+}
+
+//
+// Typed parsing.  This mirrors args::Parse() and args::ParseLikeEcho(),
+// including the error messages, so the two can be used interchangeably.
+//
+
+GLOBAL_STR(kPlusStr, "+");
+GLOBAL_STR(kMinusStr, "-");
+
+template <typename T>
+static inline T* _Field(void* out, int offset) {
+  return reinterpret_cast<T*>(static_cast<char*>(out) + offset);
+}
+
+static TypedFlag_c* _FindShort(TypedFlag_c* flags, char ch) {
+  if (flags == nullptr) {
+    return nullptr;
+  }
+  for (TypedFlag_c* p = flags; p->key; ++p) {
+    if (p->key[0] == ch && p->key[1] == '\0') {
+      return p;
+    }
+  }
+  return nullptr;
+}
+
+static TypedFlag_c* _FindLong(TypedFlag_c* flags, const char* name, int n) {
+  for (TypedFlag_c* p = flags; p->key; ++p) {
+    if (static_cast<int>(strlen(p->key)) == n && memcmp(p->key, name, n) == 0) {
+      return p;
+    }
+  }
+  return nullptr;
+}
+
+static Str* _ValidStr(const char** strs) {
+  auto valid = NewList<Str*>();
+  for (int i = 0; strs[i]; ++i) {
+    valid->append(StrFromC(strs[i]));
+  }
+  return StrFromC("|")->join(valid);
+}
+
+static bool _IsValid(const char** strs, Str* arg) {
+  for (int i = 0; strs[i]; ++i) {
+    if (str_equals0(strs[i], arg)) {
+      return true;
+    }
+  }
+  return false;
+}
+
+// Like _Action::OnMatch() for the action types that FlagSpec() uses.  'out'
+// was just allocated, so storing Str* fields doesn't need a write barrier.
+static void _OnMatch(TypedFlag_c* flag, Str* attached_arg, args::Reader* arg_r,
+                     void* out) {
+  switch (flag->type) {
+  case ActionType_c::SetToTrue:
+    *_Field<bool>(out, flag->offset) = true;
+    return;
+
+  case ActionType_c::SetAttachedBool: {
+    bool b = true;
+    if (attached_arg != nullptr) {  // '0' in --verbose=0
+      // Same strings as args::SetAttachedBool
+      if (str_equals0("0", attached_arg) || str_equals0("F", attached_arg) ||
+          str_equals0("false", attached_arg) ||
+          str_equals0("False", attached_arg)) {
+        b = false;
+      } else if (str_equals0("1", attached_arg) ||
+                 str_equals0("T", attached_arg) ||
+                 str_equals0("true", attached_arg) ||
+                 str_equals0("Talse", attached_arg)) {
+        b = true;
+      } else {
+        error::e_usage(
+            StrFormat("got invalid argument to boolean flag: %r", attached_arg),
+            loc::Missing);
+      }
+    }
+    *_Field<bool>(out, flag->offset) = b;
+    return;
+  }
+
+  default:
+    break;
+  }
+
+  // The rest take an argument, like _ArgAction::OnMatch()
+  Str* arg = nullptr;
+  if (attached_arg != nullptr) {  // for the ',' in -d,
+    arg = attached_arg;
+  } else {
+    arg_r->Next();
+    arg = arg_r->Peek();
+    if (arg == nullptr) {
+      error::e_usage(
+          StrFormat("expected argument to %r", StrFromC(flag->name)),
+          arg_r->Location());
+    }
+  }
+  syntax_asdl::loc_t* location = arg_r->Location();
+
+  switch (flag->type) {
+  case ActionType_c::SetToString:
+    if (flag->strs && !_IsValid(flag->strs, arg)) {
+      error::e_usage(
+          StrFormat("got invalid argument %r to %r, expected one of: %s", arg,
+                    StrFromC(flag->name), _ValidStr(flag->strs)),
+          location);
+    }
+    *_Field<Str*>(out, flag->offset) = arg;
+    break;
+
+  case ActionType_c::SetToInt: {
+    int i;
+    try {
+      i = to_int(arg);
+    } catch (ValueError*) {
+      error::e_usage(StrFormat("expected integer after %s, got %r",
+                               StrFromC(flag->name), arg),
+                     location);
+    }
+    // So far all our int values are > 0, so use -1 as the 'unset' value
+    if (i < 0) {
+      error::e_usage(StrFormat("got invalid integer for %s: %s",
+                               StrFromC(flag->name), arg),
+                     location);
+    }
+    *_Field<int>(out, flag->offset) = i;
+  } break;
+
+  case ActionType_c::SetToFloat: {
+    double f;
+    try {
+      f = to_float(arg);
+    } catch (ValueError*) {
+      error::e_usage(StrFormat("expected number after %r, got %r",
+                               StrFromC(flag->name), arg),
+                     location);
+    }
+    if (f < 0) {
+      error::e_usage(StrFormat("got invalid float for %s: %s",
+                               StrFromC(flag->name), arg),
+                     location);
+    }
+    *_Field<float>(out, flag->offset) = f;
+  } break;
+
+  default:
+    FAIL(kShouldNotGetHere);
+  }
+}
+
+void ParseTyped(TypedSpec_c* spec, void* out, args::Reader* arg_r) {
+  Str* arg = nullptr;
+  Str* attached_arg = nullptr;
+  StackRoots _roots({&out, &arg_r, &arg, &attached_arg});
+
+  bool has_long = spec->long_flags && spec->long_flags[0].key;
+  bool has_plus = spec->plus_flags && spec->plus_flags[0].key;
+
+  while (!arg_r->AtEnd()) {
+    arg = arg_r->Peek();
+    const char* data = arg->data();
+    int n = len(arg);
+
+    if (n == 2 && data[0] == '-' && data[1] == '-') {
+      arg_r->Next();
+      break;
+    }
+
+    // Only accept -- if there are any long flags defined
+    if (has_long && n >= 2 && data[0] == '-' && data[1] == '-') {
+      const char* eq = static_cast<const char*>(memchr(data + 2, '=', n - 2));
+      int name_len = eq ? eq - data - 2 : n - 2;
+      attached_arg = eq ? arg->slice(eq - data + 1) : nullptr;
+
+      TypedFlag_c* flag = _FindLong(spec->long_flags, data + 2, name_len);
+      if (flag == nullptr) {
+        error::e_usage(StrFormat("got invalid flag %r", arg),
+                       arg_r->Location());
+      }
+      _OnMatch(flag, attached_arg, arg_r, out);
+      arg_r->Next();
+      continue;
+    }
+
+    if (n > 1 && data[0] == '-') {
+      for (int i = 1; i < n; ++i) {  // parse flag combos like -rx
+        char ch = data[i];
+        if (ch == '0') {
+          ch = 'Z';  // hack for read -0
+        }
+
+        TypedFlag_c* flag = _FindShort(spec->plus_flags, ch);
+        if (flag) {
+          *_Field<Str*>(out, flag->offset) = kMinusStr;
+          continue;
+        }
+
+        flag = _FindShort(spec->short_flags, ch);
+        if (flag && flag->type == ActionType_c::SetToTrue) {  // e.g. read -r
+          *_Field<bool>(out, flag->offset) = true;
+          continue;
+        }
+        if (flag) {  // e.g. read -t1.0
+          // make sure we don't pass empty string for read -t
+          attached_arg = i < n - 1 ? arg->slice(i + 1) : nullptr;
+          _OnMatch(flag, attached_arg, arg_r, out);
+          break;
+        }
+
+        char flag_str[] = {'-', ch, '\0'};
+        error::e_usage(
+            StrFormat("doesn't accept flag %s", StrFromC(flag_str, 2)),
+            arg_r->Location());
+      }
+      arg_r->Next();  // next arg
+      continue;
+    }
+
+    // Only accept + if there are ANY options defined, e.g. for declare +rx.
+    if (has_plus && n > 1 && data[0] == '+') {
+      for (int i = 1; i < n; ++i) {
+        TypedFlag_c* flag = _FindShort(spec->plus_flags, data[i]);
+        if (flag == nullptr) {
+          char flag_str[] = {'+', data[i], '\0'};
+          error::e_usage(
+              StrFormat("doesn't accept option %s", StrFromC(flag_str, 2)),
+              arg_r->Location());
+        }
+        *_Field<Str*>(out, flag->offset) = kPlusStr;
+      }
+      arg_r->Next();  // next arg
+      continue;
+    }
+
+    break;  // a regular arg
+  }
+}
+
+void ParseTypedLikeEcho(TypedSpec_c* spec, void* out, args::Reader* arg_r) {
+  StackRoots _roots({&out, &arg_r});
+
+  while (!arg_r->AtEnd()) {
+    Str* arg = arg_r->Peek();
+    const char* data = arg->data();
+    int n = len(arg);
+    if (n < 2 || data[0] != '-') {
+      break;  // Looks like an arg
+    }
+
+    // Check if it looks like -en or not
+    for (int i = 1; i < n; ++i) {
+      TypedFlag_c* flag = _FindShort(spec->short_flags, data[i]);
+      if (flag == nullptr || flag->type != ActionType_c::SetToTrue) {
+        return;
+      }
+    }
+    for (int i = 1; i < n; ++i) {
+      TypedFlag_c* flag = _FindShort(spec->short_flags, data[i]);
+      *_Field<bool>(out, flag->offset) = true;
+    }
+
+    arg_r->Next();  // next arg
+  }
+}
+
 }  // namespace flag_spec
@@ -80,6 +80,27 @@ struct FlagSpecAndMore_c {
   DefaultPair_c* defaults;
 };
 
+//
+// Types for the typed parsers generated by frontend/flag_gen.py, e.g.
+// arg_types::Parse_read().  They write each flag directly into a field of an
+// arg_types:: object, rather than going through Dict<Str*, value_t*>.
+//
+
+struct TypedFlag_c {
+  const char* key;    // 'r' for -r, 'with-eol' for --with-eol
+  ActionType_c type;  // SetToTrue, SetToString, SetToInt, SetToFloat, or
+                      // SetAttachedBool
+  const char* name;   // for error messages, e.g. '-t'
+  int offset;         // of the field, e.g. offsetof(arg_types::read, t)
+  const char** strs;  // valid args for SetToString, NULL terminated
+};
+
+struct TypedSpec_c {
+  TypedFlag_c* short_flags;  // arity0 and arity1, NULL terminated
+  TypedFlag_c* long_flags;   // NULL terminated
+  TypedFlag_c* plus_flags;   // Str fields set to '-' or '+'
+};
+
 namespace flag_spec {
 
 class _FlagSpec {
@@ -156,6 +177,17 @@ Tuple2<args::_Attributes*, args::Reader*> ParseLikeEcho(
 
 args::_Attributes* ParseMore(Str* spec_name, args::Reader* arg_r);
 
+args::Reader* CmdValReader(runtime_asdl::cmd_value::Argv* cmd_val);
+
+// With optional arg
+args::Reader* CmdValReader(runtime_asdl::cmd_value::Argv* cmd_val,
+                           bool accept_typed_args);
+
+// Like args::Parse() and args::ParseLikeEcho(), but 'out' is an arg_types::
+// object that already holds the defaults.
+void ParseTyped(TypedSpec_c* spec, void* out, args::Reader* arg_r);
+void ParseTypedLikeEcho(TypedSpec_c* spec, void* out, args::Reader* arg_r);
+
 }  // namespace flag_spec
 
 #endif  // FRONTEND_FLAG_SPEC_H
@@ -1,5 +1,8 @@
 #include "cpp/frontend_flag_spec.h"
 
+#include "_gen/frontend/arg_types.h"
+#include "prebuilt/core/error.mycpp.h"
+#include "prebuilt/frontend/args.mycpp.h"
 #include "vendor/greatest.h"
 
 using runtime_asdl::flag_type_e;
@@ -76,6 +79,12 @@ TEST flag_spec_test() {
   spec = flag_spec::LookupFlagSpec(StrFromC("readonly"));
   ASSERT(spec != nullptr);
 
+  // Inflated once, and cached
+  ASSERT_EQ(spec, flag_spec::LookupFlagSpec(StrFromC("readonly")));
+  gHeap.Collect();
+  ASSERT_EQ(spec, flag_spec::LookupFlagSpec(StrFromC("readonly")));
+  ASSERT(spec->defaults != nullptr);  // ASAN checks it wasn't freed
+
   spec = flag_spec::LookupFlagSpec(StrFromC("zzz"));
   ASSERT(spec == nullptr);
 
@@ -83,6 +92,7 @@ TEST flag_spec_test() {
 
   spec2 = flag_spec::LookupFlagSpec2(StrFromC("main"));
   ASSERT(spec2 != nullptr);
+  ASSERT_EQ(spec2, flag_spec::LookupFlagSpec2(StrFromC("main")));
 
   spec2 = flag_spec::LookupFlagSpec2(StrFromC("zzz"));
   ASSERT(spec2 == nullptr);
@@ -113,6 +123,137 @@ TEST flag_spec_test() {
   PASS();
 }
 
+args::Reader* MakeReader(std::initializer_list<const char*> words) {
+  auto argv = NewList<Str*>();
+  for (const char* w : words) {
+    argv->append(StrFromC(w));
+  }
+  return Alloc<args::Reader>(argv);
+}
+
+TEST typed_parse_test() {
+  args::Reader* arg_r = nullptr;
+  arg_types::read* typed = nullptr;
+  arg_types::read* untyped = nullptr;
+  StackRoots _roots({&arg_r, &typed, &untyped});
+
+  flag_spec::_FlagSpec* spec = flag_spec::LookupFlagSpec(StrFromC("read"));
+
+  // The typed parser gives the same result as the dict-based one
+  std::initializer_list<const char*> cases[] = {
+      {"x"},
+      {"-r", "x"},
+      {"-rs", "-n", "3", "-t0.5", "x"},
+      {"-0", "-d", ",", "--all", "--", "-r"},
+      {"-d,", "-a", "arr", "--with-eol"},
+  };
+  for (auto words : cases) {
+    arg_r = MakeReader(words);
+    typed = arg_types::Parse_read(arg_r);
+    int typed_pos = arg_r->i;
+
+    arg_r = MakeReader(words);
+    untyped = Alloc<arg_types::read>(args::Parse(spec, arg_r)->attrs);
+    ASSERT_EQ(arg_r->i, typed_pos);
+
+    ASSERT_EQ(untyped->r, typed->r);
+    ASSERT_EQ(untyped->s, typed->s);
+    ASSERT_EQ(untyped->Z, typed->Z);
+    ASSERT_EQ(untyped->all, typed->all);
+    ASSERT_EQ(untyped->with_eol, typed->with_eol);
+    ASSERT_EQ(untyped->n, typed->n);
+    ASSERT_EQ(untyped->u, typed->u);
+    ASSERT_EQ(untyped->t, typed->t);
+    ASSERT_EQ(untyped->d == nullptr, typed->d == nullptr);
+    if (typed->d) {
+      ASSERT(str_equals(untyped->d, typed->d));
+    }
+    ASSERT_EQ(untyped->a == nullptr, typed->a == nullptr);
+  }
+
+  arg_r = MakeReader({"-rt", "1.5", "--line", "x"});
+  typed = arg_types::Parse_read(arg_r);
+  ASSERT(typed->r);
+  ASSERT_EQ(1.5, typed->t);
+  ASSERT(typed->line);
+  ASSERT_EQ(-1, typed->n);
+  ASSERT(str_equals0("x", arg_r->Peek()));
+
+  // Errors, with the same messages
+  const char* bad[] = {"-x", "-n", "-nfoo", "--bad", "-t-1"};
+  for (const char* b : bad) {
+    arg_r = MakeReader({b});
+    bool caught = false;
+    try {
+      arg_types::Parse_read(arg_r);
+    } catch (error::Usage* e) {
+      log("%s -> %s", b, e->msg->data_);
+      caught = true;
+    }
+    ASSERT(caught);
+  }
+
+  // Plus flags, and defaults that aren't -1
+  auto new_var = arg_types::Parse_new_var(MakeReader({"-x", "+r", "-a"}));
+  ASSERT(str_equals0("-", new_var->x));
+  ASSERT(str_equals0("+", new_var->r));
+  ASSERT_EQ(nullptr, new_var->n);
+  ASSERT(new_var->a);
+
+  auto jw = arg_types::Parse_json_write(MakeReader({"--pretty=0"}));
+  ASSERT_EQ(false, jw->pretty);
+  ASSERT_EQ(2, jw->indent);
+
+  auto echo = arg_types::ParseLikeEcho_echo(MakeReader({"-en", "-x", "y"}));
+  ASSERT(echo->e);
+  ASSERT(echo->n);
+
+  PASS();
+}
+
+// Long args from slice(), split(), and readline() may be a StrSlice, which
+// has no inline data_
+TEST typed_parse_slice_test() {
+  Str* long_arg = nullptr;
+  Str* colons = nullptr;
+  args::Reader* arg_r = nullptr;
+  Str* not_flag = nullptr;
+  List<Str*>* argv = nullptr;
+  StackRoots _roots({&long_arg, &colons, &not_flag, &arg_r, &argv});
+
+  colons = StrFromC(":::::::::::::::::::::::::::::::::::::::::");  // 41
+  long_arg = str_concat(StrFromC("xx-rd"), colons)->slice(2);
+  ASSERT(IsStrSlice(long_arg));
+
+  argv = NewList<Str*>(std::initializer_list<Str*>{long_arg, StrFromC("x")});
+  arg_r = Alloc<args::Reader>(argv);
+  auto typed = arg_types::Parse_read(arg_r);
+  ASSERT(typed->r);
+  ASSERT(str_equals(colons, typed->d));
+  ASSERT(str_equals0("x", arg_r->Peek()));
+
+  // Separate arg
+  argv = NewList<Str*>(std::initializer_list<Str*>{StrFromC("-d"), long_arg});
+  arg_r = Alloc<args::Reader>(argv);
+  typed = arg_types::Parse_read(arg_r);
+  ASSERT(!typed->r);
+  ASSERT(str_equals(long_arg, typed->d));
+
+  // All valid echo flags, then a long arg that isn't a flag
+  long_arg = StrFromC("xx-eeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeen")->slice(2);
+  ASSERT(IsStrSlice(long_arg));
+  not_flag = str_concat(StrFromC("xx-ez"), colons)->slice(2);
+  ASSERT(IsStrSlice(not_flag));
+  argv = NewList<Str*>(std::initializer_list<Str*>{long_arg, not_flag});
+  arg_r = Alloc<args::Reader>(argv);
+  auto echo = arg_types::ParseLikeEcho_echo(arg_r);
+  ASSERT(echo->e);
+  ASSERT(echo->n);
+  ASSERT(str_equals(not_flag, arg_r->Peek()));
+
+  PASS();
+}
+
 TEST show_sizeof() {
   log("sizeof(flag_spec::_FlagSpecAndMore) = %d",
       sizeof(flag_spec::_FlagSpecAndMore));
@@ -145,6 +286,8 @@ int main(int argc, char** argv) {
   GREATEST_MAIN_BEGIN();
 
   RUN_TEST(flag_spec_test);
+  RUN_TEST(typed_parse_test);
+  RUN_TEST(typed_parse_slice_test);
   RUN_TEST(show_sizeof);
 
   gHeap.CleanProcessExit();
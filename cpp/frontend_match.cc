@@ -2,6 +2,8 @@
 
 #include "frontend_match.h"
 
+#include "_gen/frontend/consts.h"  // IsValidVarName()
+
 // This order is required to get it to compile, despite clang-format
 // clang-format off
 #include "_gen/frontend/types.asdl_c.h"
@@ -19,7 +21,7 @@ Tuple2<Id_t, int> OneToken(lex_mode_t lex_mode, Str* line, int start_pos) {
 
   // TODO: get rid of these casts
   MatchOshToken(static_cast<int>(lex_mode),
-                reinterpret_cast<const unsigned char*>(line->data_), len(line),
+                reinterpret_cast<const unsigned char*>(line->data()), len(line),
                 start_pos, &id, &end_pos);
   return Tuple2<Id_t, int>(static_cast<Id_t>(id), end_pos);
 }
@@ -27,13 +29,11 @@ Tuple2<Id_t, int> OneToken(lex_mode_t lex_mode, Str* line, int start_pos) {
 Tuple2<Id_t, Str*> SimpleLexer::Next() {
   int id;
   int end_pos;
-  match_func_(reinterpret_cast<const unsigned char*>(s_->data_), len(s_), pos_,
+  match_func_(reinterpret_cast<const unsigned char*>(s_->data()), len(s_), pos_,
               &id, &end_pos);
 
   int len = end_pos - pos_;
-  Str* val = NewStr(len);
-  memcpy(val->data_, s_->data_ + pos_, len);  // copy the list item
-  val->data_[len] = '\0';
+  Str* val = StrFromC(s_->data() + pos_, len);
 
   pos_ = end_pos;
   return Tuple2<Id_t, Str*>(static_cast<Id_t>(id), val);
@@ -75,25 +75,25 @@ List<Tuple2<Id_t, Str*>*>* Ps1Tokens(Str* s) {
 }
 
 Id_t BracketUnary(Str* s) {
-  return ::BracketUnary(reinterpret_cast<const unsigned char*>(s->data_),
+  return ::BracketUnary(reinterpret_cast<const unsigned char*>(s->data()),
                         len(s));
 }
 Id_t BracketBinary(Str* s) {
-  return ::BracketBinary(reinterpret_cast<const unsigned char*>(s->data_),
+  return ::BracketBinary(reinterpret_cast<const unsigned char*>(s->data()),
                          len(s));
 }
 Id_t BracketOther(Str* s) {
-  return ::BracketOther(reinterpret_cast<const unsigned char*>(s->data_),
+  return ::BracketOther(reinterpret_cast<const unsigned char*>(s->data()),
                         len(s));
 }
 
 bool IsValidVarName(Str* s) {
-  return ::IsValidVarName(reinterpret_cast<const unsigned char*>(s->data_),
-                          len(s));
+  // A table lookup per byte, generated by frontend/consts_gen.py
+  return consts::IsValidVarName(s->data(), len(s));
 }
 
 bool ShouldHijack(Str* s) {
-  return ::ShouldHijack(reinterpret_cast<const unsigned char*>(s->data_),
+  return ::ShouldHijack(reinterpret_cast<const unsigned char*>(s->data()),
                         len(s));
 }
 
@@ -36,7 +36,7 @@ static char* do_complete(const char* text, int state) {
 
   // According to https://web.mit.edu/gnu/doc/html/rlman_2.html#SEC37, readline
   // will free any memory we return to it.
-  return strdup(result->data());
+  return strdup(result->c_str());
 }
 
 static char** completion_handler(const char* text, int start, int end) {
@@ -103,7 +103,7 @@ void Readline::parse_and_bind(Str* s) {
 void Readline::add_history(Str* line) {
 #if HAVE_READLINE
   assert(line != nullptr);
-  ::add_history(line->data());
+  ::add_history(line->c_str());
 #else
   assert(0);  // not implemented
 #endif
@@ -111,9 +111,9 @@ void Readline::add_history(Str* line) {
 
 void Readline::read_history_file(Str* path) {
 #if HAVE_READLINE
-  char* p = nullptr;
+  const char* p = nullptr;
   if (path != nullptr) {
-    p = path->data();
+    p = path->c_str();
   }
   read_history(p);
 #else
@@ -123,9 +123,9 @@ void Readline::read_history_file(Str* path) {
 
 void Readline::write_history_file(Str* path) {
 #if HAVE_READLINE
-  char* p = nullptr;
+  const char* p = nullptr;
   if (path != nullptr) {
-    p = path->data();
+    p = path->c_str();
   }
   write_history(p);
 #else
@@ -135,6 +135,7 @@ void Readline::write_history_file(Str* path) {
 
 void Readline::set_completer(completion::ReadlineCallback* completer) {
 #if HAVE_READLINE
+  WriteBarrier(completer_);
   completer_ = completer;
 #else
   assert(0);  // not implemented
@@ -143,6 +144,7 @@ void Readline::set_completer(completion::ReadlineCallback* completer) {
 
 void Readline::set_completer_delims(Str* delims) {
 #if HAVE_READLINE
+  WriteBarrier(completer_delims_);
   completer_delims_ = StrFromC(delims->data(), len(delims));
   rl_completer_word_break_characters = completer_delims_->data();
 #else
@@ -153,6 +155,7 @@ void Readline::set_completer_delims(Str* delims) {
 void Readline::set_completion_display_matches_hook(
     comp_ui::_IDisplay* display) {
 #if HAVE_READLINE
+  WriteBarrier(display_);
   display_ = display;
 #else
   assert(0);  // not implemented
@@ -260,7 +263,7 @@ Str* readline(Str* prompt) {
 #if HAVE_READLINE
   fd_set fds;
   FD_ZERO(&fds);
-  rl_callback_handler_install(prompt->data(), readline_cb);
+  rl_callback_handler_install(prompt->c_str(), readline_cb);
 
   gReadline->latest_line_ = nullptr;
   gReadline->ready_ = false;
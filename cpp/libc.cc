@@ -28,7 +28,7 @@ Str* gethostname() {
 
 Str* realpath(Str* path) {
   Str* result = OverAllocatedStr(PATH_MAX);
-  char* p = ::realpath(path->data_, result->data_);
+  char* p = ::realpath(path->c_str(), result->data_);
   if (p == nullptr) {
     throw Alloc<OSError>(errno);
   }
@@ -36,16 +36,16 @@ Str* realpath(Str* path) {
   return result;
 }
 
-int fnmatch(Str* pat, Str* str) {
+int fnmatch(Str* pat, Str* str, bool extglob) {
   // TODO: We should detect this at ./configure time, and then maybe flag these
   // at parse time, not runtime
 #ifdef FNM_EXTMATCH
-  int flags = FNM_EXTMATCH;
+  int flags = extglob ? FNM_EXTMATCH : 0;
 #else
   int flags = 0;
 #endif
 
-  int result = ::fnmatch(pat->data_, str->data_, flags);
+  int result = ::fnmatch(pat->c_str(), str->c_str(), flags);
   switch (result) {
   case 0:
     return 1;
@@ -64,7 +64,7 @@ List<Str*>* glob(Str* pat) {
   int flags = 0;
   // int flags = GLOB_APPEND;
   // flags |= GLOB_NOMAGIC;
-  int ret = glob(pat->data_, flags, NULL, &results);
+  int ret = glob(pat->c_str(), flags, NULL, &results);
 
   const char* err_str = NULL;
   switch (ret) {
@@ -110,14 +110,14 @@ List<Str*>* regex_match(Str* pattern, Str* str) {
   List<Str*>* results = NewList<Str*>();
 
   regex_t pat;
-  if (regcomp(&pat, pattern->data_, REG_EXTENDED) != 0) {
+  if (regcomp(&pat, pattern->c_str(), REG_EXTENDED) != 0) {
     // TODO: check error code, as in func_regex_parse()
     throw Alloc<RuntimeError>(StrFromC("Invalid regex syntax (regex_match)"));
   }
 
   int outlen = pat.re_nsub + 1;  // number of captures
 
-  const char* s0 = str->data_;
+  const char* s0 = str->c_str();
   regmatch_t* pmatch =
       static_cast<regmatch_t*>(malloc(sizeof(regmatch_t) * outlen));
   int match = regexec(&pat, s0, outlen, pmatch, 0) == 0;
@@ -155,13 +155,13 @@ Tuple2<int, int>* regex_first_group_match(Str* pattern, Str* str, int pos) {
   // Could have been checked by regex_parse for [[ =~ ]], but not for glob
   // patterns like ${foo/x*/y}.
 
-  if (regcomp(&pat, pattern->data_, REG_EXTENDED) != 0) {
+  if (regcomp(&pat, pattern->c_str(), REG_EXTENDED) != 0) {
     throw Alloc<RuntimeError>(
         StrFromC("Invalid regex syntax (func_regex_first_group_match)"));
   }
 
   // Match at offset 'pos'
-  int result = regexec(&pat, str->data_ + pos, NMATCH, m, 0 /*flags*/);
+  int result = regexec(&pat, str->c_str() + pos, NMATCH, m, 0 /*flags*/);
   regfree(&pat);
 
   if (result != 0) {
@@ -181,7 +181,7 @@ int wcswidth(Str* s) {
   // Behavior of mbstowcs() depends on LC_CTYPE
 
   // Calculate length first
-  int num_wide_chars = mbstowcs(NULL, s->data_, 0);
+  int num_wide_chars = mbstowcs(NULL, s->c_str(), 0);
   if (num_wide_chars == -1) {
     throw Alloc<UnicodeError>(StrFromC("mbstowcs() 1"));
   }
@@ -192,7 +192,7 @@ int wcswidth(Str* s) {
   assert(wide_chars != nullptr);
 
   // Convert to wide chars
-  num_wide_chars = mbstowcs(wide_chars, s->data_, num_wide_chars);
+  num_wide_chars = mbstowcs(wide_chars, s->c_str(), num_wide_chars);
   if (num_wide_chars == -1) {
     throw Alloc<UnicodeError>(StrFromC("mbstowcs() 2"));
   }
@@ -20,7 +20,7 @@ Str* realpath(Str* path);
 
 Str* gethostname();
 
-int fnmatch(Str* pat, Str* str);
+int fnmatch(Str* pat, Str* str, bool extglob = true);
 
 List<Str*>* glob(Str* pat);
 
@@ -60,6 +60,10 @@ TEST libc_test() {
   // extended glob
   ASSERT(libc::fnmatch(StrFromC("*(foo|bar).py"), StrFromC("foo.py")));
   ASSERT(!libc::fnmatch(StrFromC("*(foo|bar).py"), StrFromC("foo.p")));
+  // without extended glob, ( and | are literals
+  ASSERT(!libc::fnmatch(StrFromC("*(foo|bar).py"), StrFromC("foo.py"), false));
+  ASSERT(libc::fnmatch(StrFromC("*(foo|bar).py"), StrFromC("(foo|bar).py"),
+                       false));
 
   List<Str*>* results =
       libc::regex_match(StrFromC("(a+).(a+)"), StrFromC("-abaacaaa"));
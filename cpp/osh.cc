@@ -38,7 +38,7 @@ bool isatty(Str* fd_str, word_t* blame_word) {
 }
 
 bool DoUnaryOp(Id_t op_id, Str* s) {
-  const char* zPath = s->data_;
+  const char* zPath = s->c_str();
 
   if (op_id == Id::BoolUnary_h || op_id == Id::BoolUnary_L) {
     struct stat st;
@@ -136,13 +136,13 @@ bool DoUnaryOp(Id_t op_id, Str* s) {
 bool DoBinaryOp(Id_t op_id, Str* s1, Str* s2) {
   int m1 = 0;
   struct stat st1;
-  if (stat(s1->data_, &st1) == 0) {
+  if (stat(s1->c_str(), &st1) == 0) {
     m1 = st1.st_mtime;
   }
 
   int m2 = 0;
   struct stat st2;
-  if (stat(s2->data_, &st2) == 0) {
+  if (stat(s2->c_str(), &st2) == 0) {
     m2 = st2.st_mtime;
   }
 
@@ -35,13 +35,13 @@ namespace sh_expr_eval {
 
 inline bool IsLower(Str* ch) {
   assert(len(ch) == 1);
-  uint8_t c = ch->data_[0];
+  uint8_t c = ch->data()[0];
   return ('a' <= c && c <= 'z');
 }
 
 inline bool IsUpper(Str* ch) {
   assert(len(ch) == 1);
-  uint8_t c = ch->data_[0];
+  uint8_t c = ch->data()[0];
   return ('A' <= c && c <= 'Z');
 }
 
@@ -10,25 +10,25 @@
 
 namespace grammar {
 
-typedef Tuple2<int, int> arc_t;
-typedef Dict<int, int> first_t;
-typedef List<List<arc_t*>*> states_t;
-typedef Tuple2<states_t*, first_t*> dfa_t;
-
 class Grammar {
  public:
   Grammar();
 
   Dict<Str*, int>* symbol2number;
   Dict<int, Str*>* number2symbol;
-  List<List<Tuple2<int, int>*>*>* states;
-  Dict<int, Tuple2<List<List<Tuple2<int, int>*>*>*, Dict<int, int>*>*>* dfas;
   List<int>* labels;
   Dict<Str*, int>* keywords;
   Dict<int, int>* tokens;
   Dict<Str*, int>* symbol2label;
   int start;
 
+  // Static data.  The DFAs are only used by pgen to compute these.
+  List<int>* dfa_start;
+  List<int>* actions;
+  List<int>* action_base;
+  List<int>* action_check;
+  List<int>* action_default;
+
   static constexpr ObjHeader obj_header() {
     return ObjHeader::ClassFixed(field_mask(), sizeof(Grammar));
   }
@@ -36,8 +36,6 @@ class Grammar {
   static constexpr uint32_t field_mask() {
     return maskbit(offsetof(Grammar, symbol2number)) |
            maskbit(offsetof(Grammar, number2symbol)) |
-           maskbit(offsetof(Grammar, states)) |
-           maskbit(offsetof(Grammar, dfas)) |
            maskbit(offsetof(Grammar, labels)) |
            maskbit(offsetof(Grammar, keywords)) |
            maskbit(offsetof(Grammar, tokens)) |
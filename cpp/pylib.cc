@@ -15,7 +15,7 @@ Str* rstrip_slashes(Str* s) {
 
   int new_len = n;
   for (int i = n - 1; i >= 0; i--) {
-    char c = s->data_[i];
+    char c = s->data()[i];
     if (c == '/') {
       new_len--;
     } else {
@@ -29,7 +29,7 @@ Str* rstrip_slashes(Str* s) {
 
   // Truncate to new_len
   Str* result = NewStr(new_len);
-  memcpy(result->data_, s->data_, new_len);
+  memcpy(result->data_, s->data(), new_len);
   result->data_[new_len] = '\0';
   return result;
 }
@@ -40,7 +40,16 @@ namespace path_stat {
 
 bool exists(Str* path) {
   struct stat st;
-  if (::stat(path->data_, &st) < 0) {
+  if (::stat(path->c_str(), &st) < 0) {
+    return false;
+  } else {
+    return true;
+  }
+}
+
+bool lexists(Str* path) {
+  struct stat st;
+  if (::lstat(path->c_str(), &st) < 0) {
     return false;
   } else {
     return true;
@@ -49,7 +58,7 @@ bool exists(Str* path) {
 
 bool isdir(Str* path) {
   struct stat st;
-  if (::stat(path->data_, &st) < 0) {
+  if (::stat(path->c_str(), &st) < 0) {
     return false;
   }
   return S_ISDIR(st.st_mode);
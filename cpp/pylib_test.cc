@@ -26,6 +26,9 @@ TEST os_path_test() {
   ASSERT(path_stat::exists(StrFromC("/")));
   ASSERT(!path_stat::exists(StrFromC("/nonexistent_ZZZ")));
 
+  ASSERT(path_stat::lexists(StrFromC("/")));
+  ASSERT(!path_stat::lexists(StrFromC("/nonexistent_ZZZ")));
+
   PASS();
 }
 
@@ -9,20 +9,20 @@ namespace qsn {
 
 inline bool IsUnprintableLow(Str* ch) {
   assert(len(ch) == 1);
-  return ch->data_[0] < ' ';
+  return ch->data()[0] < ' ';
 }
 
 inline bool IsUnprintableHigh(Str* ch) {
   assert(len(ch) == 1);
   // 255 should not be -1!
-  // log("ch->data_[0] %d", ch->data_[0]);
-  unsigned char c = static_cast<unsigned char>(ch->data_[0]);
+  // log("ch->data()[0] %d", ch->data()[0]);
+  unsigned char c = static_cast<unsigned char>(ch->data()[0]);
   return c >= 0x7f;
 }
 
 inline bool IsPlainChar(Str* ch) {
   assert(len(ch) == 1);
-  uint8_t c = ch->data_[0];
+  uint8_t c = ch->data()[0];
   switch (c) {
   case '.':
   case '-':
@@ -36,7 +36,7 @@ inline bool IsPlainChar(Str* ch) {
 inline Str* XEscape(Str* ch) {
   assert(len(ch) == 1);
   Str* result = NewStr(4);
-  sprintf(result->data(), "\\x%02x", ch->data_[0] & 0xff);
+  sprintf(result->data(), "\\x%02x", ch->data()[0] & 0xff);
   return result;
 }
 
@@ -47,7 +47,7 @@ mode_t umask(mode_t mask) {
 }
 
 int open(Str* path, int flags, int perms) {
-  int result = ::open(path->data_, flags, perms);
+  int result = ::open(path->c_str(), flags, perms);
   if (result < 0) {
     throw Alloc<OSError>(errno);
   }
@@ -61,7 +61,7 @@ void dup2(int oldfd, int newfd) {
 }
 void putenv(Str* name, Str* value) {
   int overwrite = 1;
-  int ret = ::setenv(name->data_, value->data_, overwrite);
+  int ret = ::setenv(name->c_str(), value->c_str(), overwrite);
   if (ret < 0) {
     throw Alloc<IOError>(errno);
   }
@@ -75,9 +75,15 @@ mylib::LineReader* fdopen(int fd, Str* c_mode) {
   }
 
   // CPython does some fcntl() stuff with mode == 'a', which we don't support
-  DCHECK(c_mode->data_[0] != 'a');
+  DCHECK(c_mode->data()[0] != 'a');
 
-  FILE* f = ::fdopen(fd, c_mode->data_);
+  if (str_equals0("r", c_mode)) {
+    return Alloc<mylib::FdLineReader>(fd);
+  }
+
+  // Callers cast the result to mylib::Writer in this case
+
+  FILE* f = ::fdopen(fd, c_mode->c_str());
   if (f == nullptr) {
     throw Alloc<OSError>(errno);
   }
@@ -93,7 +99,7 @@ void execve(Str* argv0, List<Str*>* argv, Dict<Str*, Str*>* environ) {
   // Annoying const_cast
   // https://stackoverflow.com/questions/190184/execv-and-const-ness
   for (int i = 0; i < n_args; ++i) {
-    _argv[i] = const_cast<char*>(argv->index_(i)->data_);
+    _argv[i] = const_cast<char*>(argv->index_(i)->c_str());
   }
   _argv[n_args] = nullptr;
 
@@ -108,16 +114,16 @@ void execve(Str* argv0, List<Str*>* argv, Dict<Str*, Str*>* environ) {
 
     int joined_len = len(k) + len(v) + 1;
     char* buf = static_cast<char*>(malloc(joined_len + 1));
-    memcpy(buf, k->data_, len(k));
+    memcpy(buf, k->data(), len(k));
     buf[len(k)] = '=';
-    memcpy(buf + len(k) + 1, v->data_, len(v));
+    memcpy(buf + len(k) + 1, v->data(), len(v));
     buf[joined_len] = '\0';
 
     envp[env_index++] = buf;
   }
   envp[n_env] = nullptr;
 
-  int ret = ::execve(argv0->data_, _argv, envp);
+  int ret = ::execve(argv0->c_str(), _argv, envp);
   if (ret == -1) {
     throw Alloc<OSError>(errno);
   }
@@ -139,7 +145,7 @@ void killpg(int pgid, int sig) {
 }
 
 List<Str*>* listdir(Str* path) {
-  DIR* dirp = opendir(path->data());
+  DIR* dirp = opendir(path->c_str());
   if (dirp == NULL) {
     throw Alloc<OSError>(errno);
   }
@@ -208,7 +214,7 @@ Str* strftime(Str* s, time_t ts) {
 
   const int max_len = 1024;
   Str* result = OverAllocatedStr(max_len);
-  int n = strftime(result->data(), max_len, s->data_, loc_time);
+  int n = strftime(result->data(), max_len, s->c_str(), loc_time);
   if (n == 0) {
     // bash silently truncates on large format string like
     //   printf '%(%Y)T'
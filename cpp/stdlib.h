@@ -5,6 +5,7 @@
 
 #include <errno.h>
 #include <sys/types.h>  // mode_t
+#include <sys/wait.h>   // waitpid()
 #include <unistd.h>
 
 #include "mycpp/runtime.h"
@@ -23,7 +24,7 @@ mode_t umask(mode_t mask);
 
 inline bool access(Str* pathname, int mode) {
   // No error case: 0 is success, -1 is error AND false.
-  return ::access(pathname->data_, mode) == 0;
+  return ::access(pathname->c_str(), mode) == 0;
 }
 
 inline Str* getcwd() {
@@ -83,6 +84,14 @@ inline void close(int fd) {
   }
 }
 
+inline int lseek(int fd, int pos, int how) {
+  off_t result = ::lseek(fd, pos, how);
+  if (result < 0) {
+    throw Alloc<OSError>(errno);
+  }
+  return result;
+}
+
 void putenv(Str* name, Str* value);
 
 inline int fork() {
@@ -93,6 +102,15 @@ inline int fork() {
   return result;
 }
 
+inline Tuple2<int, int> waitpid(int pid, int options) {
+  int status;
+  int result = ::waitpid(pid, &status, options);
+  if (result < 0) {
+    throw Alloc<OSError>(errno);
+  }
+  return Tuple2<int, int>(result, status);
+}
+
 inline void _exit(int status) {
   // No error case: does not return
   ::_exit(status);
@@ -103,7 +121,7 @@ inline void write(int fd, Str* s) {
   // IMPORTANT TODO: Write in a loop like posix_write() in pyext/posixmodule.c
   //
 
-  if (::write(fd, s->data_, len(s)) < 0) {
+  if (::write(fd, s->data(), len(s)) < 0) {
     throw Alloc<OSError>(errno);
   }
 }
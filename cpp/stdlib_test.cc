@@ -1,6 +1,7 @@
 #include "cpp/stdlib.h"
 
 #include <errno.h>
+#include <fcntl.h>  // O_RDONLY
 #include <sys/stat.h>
 
 #include "mycpp/gc_builtins.h"
@@ -60,6 +61,28 @@ TEST open_test() {
   PASS();
 }
 
+TEST lseek_test() {
+  int fd = posix::open(StrFromC("cpp/stdlib_test.cc"), O_RDONLY, 0);
+  ASSERT_EQ(0, posix::lseek(fd, 0, SEEK_CUR));
+  ASSERT_EQ(10, posix::lseek(fd, 10, SEEK_CUR));
+  ASSERT_EQ(6, posix::lseek(fd, -4, SEEK_CUR));
+  posix::close(fd);
+
+  Tuple2<int, int> fds = posix::pipe();
+  bool caught = false;
+  try {
+    posix::lseek(fds.at0(), 0, SEEK_CUR);
+  } catch (IOError_OSError* e) {
+    ASSERT_EQ(ESPIPE, e->errno_);
+    caught = true;
+  }
+  ASSERT(caught);
+  posix::close(fds.at0());
+  posix::close(fds.at1());
+
+  PASS();
+}
+
 TEST time_test() {
   int ts = time_::time();
   log("ts = %d", ts);
@@ -120,6 +143,27 @@ TEST listdir_test() {
   PASS();
 }
 
+TEST waitpid_test() {
+  int pid = posix::fork();
+  if (pid == 0) {
+    posix::_exit(42);
+  }
+  Tuple2<int, int> result = posix::waitpid(pid, 0);
+  ASSERT_EQ(pid, result.at0());
+  ASSERT(WIFEXITED(result.at1()));
+  ASSERT_EQ(42, WEXITSTATUS(result.at1()));
+
+  int ec = -1;
+  try {
+    posix::waitpid(pid, 0);  // already reaped
+  } catch (IOError_OSError* e) {
+    ec = e->errno_;
+  }
+  ASSERT_EQ(ECHILD, ec);
+
+  PASS();
+}
+
 TEST for_test_coverage() {
   time_::sleep(0);
 
@@ -139,9 +183,11 @@ int main(int argc, char** argv) {
   RUN_TEST(posix_test);
   RUN_TEST(putenv_test);
   RUN_TEST(open_test);
+  RUN_TEST(lseek_test);
   RUN_TEST(time_test);
   RUN_TEST(mtime_demo);
   RUN_TEST(listdir_test);
+  RUN_TEST(waitpid_test);
 
   RUN_TEST(for_test_coverage);
 
@@ -25,6 +25,10 @@ class OilEvaluator {
   void* EvalExpr(syntax_asdl::expr_t* node) {
     assert(0);
   }
+  runtime_asdl::value_t* EvalForIterable(syntax_asdl::expr_t* node,
+                                         syntax_asdl::loc_t* blame_loc) {
+    assert(0);
+  }
   void CheckCircularDeps() {
     assert(0);
   }
@@ -74,7 +74,7 @@ def GenStringLookup(type_name, func_name, pairs, f):
   int length = len(s);
   if (length == 0) return 0;  // consts.NO_INDEX
 
-  const char* data = s->data_;
+  const char* data = s->data();
   switch (data[0]) {
 """ % (type_name, func_name))
 
@@ -108,7 +108,7 @@ bool %s(Str* s) {
   int length = len(s);
   if (length == 0) return false;
 
-  const char* data = s->data_;
+  const char* data = s->data();
   switch (data[0]) {
 """ % func_name)
 
@@ -157,7 +157,7 @@ def GenCharLookup(func_name, lookup, f, required=False):
 Str* %s(Str* c) {
   assert(len(c) == 1);
 
-  char ch = c->data_[0];
+  char ch = c->data()[0];
 
   // TODO-intern: return value
   switch (ch) {
@@ -180,6 +180,74 @@ Str* %s(Str* c) {
 """)
 
 
+def GenIdKindTable(id_to_kind, num_ids, out):
+    """Kind of each Id, indexed by Id.  0 means the Id has no Kind."""
+    from _devbuild.gen.id_kind_asdl import Id_str
+
+    out('constexpr uint8_t kIdKind[%d] = {', num_ids)
+    for id_ in xrange(num_ids):
+        kind = id_to_kind.get(id_)
+        if kind is None:
+            out('    0,')
+        else:
+            assert 0 < kind < 256, kind
+            out('    %d,  // %s', kind, Id_str(id_))
+    out('};')
+    out('')
+
+
+def GenIfsEdgeTable(edges, out):
+    """The IFS state machine as a dense state x char_kind array.
+
+    Each cell packs (new_state << 16) | emit, and unused cells are -1.
+    """
+    max_state = max(edge[0] for edge in edges)
+    max_char_kind = max(edge[1] for edge in edges)
+
+    out('constexpr int kIfsEdge[%d][%d] = {', max_state + 1, max_char_kind + 1)
+    for i in xrange(max_state + 1):
+        cells = []
+        for j in xrange(max_char_kind + 1):
+            entry = edges.get((i, j))
+            if entry is None:
+                cells.append('-1')
+            else:
+                cells.append('(%d << 16) | %d' % entry)
+        out('    {%s},', ', '.join('%13s' % cell for cell in cells))
+    out('};')
+    out('')
+
+
+# Bits in kVarNameChar
+VAR_NAME_FIRST = 1
+VAR_NAME_REST = 2
+
+
+def GenVarNameTable(var_name_re, out):
+    """Which bytes can start or continue a variable name, e.g. 'a' or '0'.
+
+    Derived from the same regex that the lexer and Python's
+    match.IsValidVarName() use.
+    """
+    import re
+    whole = re.compile(var_name_re + r'\Z')
+
+    out('constexpr uint8_t kVarNameChar[256] = {')
+    for row in xrange(16):
+        cells = []
+        for col in xrange(16):
+            c = chr(row * 16 + col)
+            bits = 0
+            if whole.match(c):
+                bits |= VAR_NAME_FIRST
+            if whole.match('a' + c):
+                bits |= VAR_NAME_REST
+            cells.append(str(bits))
+        out('    %s,', ', '.join(cells))
+    out('};')
+    out('')
+
+
 def GenStrList(l, name, out):
     element_globals = []
     for i, elem in enumerate(l):
@@ -296,6 +364,9 @@ from asdl import pybase
 
         prefix = argv[2]
 
+        from frontend import lexer_def  # break circular dep
+        from _devbuild.gen.id_kind_asdl import Id
+
         with open(prefix + '.h', 'w') as f:
 
             def out(fmt, *args):
@@ -305,6 +376,8 @@ from asdl import pybase
 #ifndef CONSTS_H
 #define CONSTS_H
 
+#include <stdint.h>
+
 #include "mycpp/runtime.h"
 
 #include "_gen/frontend/id_kind.asdl.h"
@@ -332,7 +405,6 @@ extern Str* gVersion;
 int RedirDefaultFd(id_kind_asdl::Id_t id);
 types_asdl::redir_arg_type_t RedirArgType(id_kind_asdl::Id_t id);
 types_asdl::bool_arg_type_t BoolArgType(id_kind_asdl::Id_t id);
-id_kind_asdl::Kind GetKind(id_kind_asdl::Id_t id);
 
 types_asdl::opt_group_t OptionGroupNum(Str* s);
 option_asdl::option_t OptionNum(Str* s);
@@ -346,12 +418,58 @@ Str* LookupCharPrompt(Str* c);
 
 Str* OptionName(option_asdl::option_t opt_num);
 
-Tuple2<runtime_asdl::state_t, runtime_asdl::emit_t> IfsEdge(runtime_asdl::state_t state, runtime_asdl::char_kind_t ch);
+//
+// Lookup tables for hot paths.  They're constexpr arrays, so each lookup is a
+// load rather than a switch or a Dict.
+//
+""")
+
+            GenIdKindTable(ID_TO_KIND, Id.ARRAY_SIZE, out)
+
+            out("""\
+inline id_kind_asdl::Kind GetKind(id_kind_asdl::Id_t id) {
+  DCHECK(0 < id && id < id_kind_asdl::Id::ARRAY_SIZE);
+  DCHECK(kIdKind[id] != 0);
+  return static_cast<id_kind_asdl::Kind>(kIdKind[id]);
+}
+""")
+
+            GenIfsEdgeTable(consts._IFS_EDGES, out)
+
+            out("""\
+inline Tuple2<runtime_asdl::state_t, runtime_asdl::emit_t> IfsEdge(
+    runtime_asdl::state_t state, runtime_asdl::char_kind_t ch) {
+  int cell = kIfsEdge[state][ch];
+  DCHECK(cell != -1);
+  return Tuple2<runtime_asdl::state_t, runtime_asdl::emit_t>(cell >> 16,
+                                                             cell & 0xFFFF);
+}
+""")
+
+            GenVarNameTable(lexer_def.VAR_NAME_RE, out)
+
+            out("""\
+const int kVarNameFirst = %d;
+const int kVarNameRest = %d;
+
+// For match::IsValidVarName()
+inline bool IsValidVarName(const char* s, int n) {
+  if (n == 0 ||
+      !(kVarNameChar[static_cast<unsigned char>(s[0])] & kVarNameFirst)) {
+    return false;
+  }
+  for (int i = 1; i < n; ++i) {
+    if (!(kVarNameChar[static_cast<unsigned char>(s[i])] & kVarNameRest)) {
+      return false;
+    }
+  }
+  return true;
+}
 
 }  // namespace consts
 
 #endif  // CONSTS_H
-""")
+""" % (VAR_NAME_FIRST, VAR_NAME_REST))
 
         with open(prefix + '.cc', 'w') as f:
 
@@ -434,21 +552,6 @@ types_asdl::bool_arg_type_t BoolArgType(id_kind_asdl::Id_t id) {
   }
   FAIL(kShouldNotGetHere);
 }
-""")
-
-            out("""\
-Kind GetKind(id_kind_asdl::Id_t id) {
-  // relies on "switch lowering"
-  switch (id) {
-""")
-            for id_ in sorted(ID_TO_KIND):
-                a = Id_str(id_).replace('.', '::')
-                b = Kind_str(ID_TO_KIND[id_]).replace('.', '::')
-                out('  case %s: return %s;' % (a, b))
-            out("""\
-  }
-  FAIL(kShouldNotGetHere);
-}
 """)
 
             pairs = consts.OPTION_GROUPS.items()
@@ -463,7 +566,6 @@ Kind GetKind(id_kind_asdl::Id_t id) {
             GenBuiltinLookup(b, 'LookupAssignBuiltin', 'assign', f)
             GenBuiltinLookup(b, 'LookupSpecialBuiltin', 'special', f)
 
-            from frontend import lexer_def  # break circular dep
             GenStringMembership('IsControlFlow', lexer_def.CONTROL_FLOW_NAMES,
                                 f)
             GenStringMembership('IsKeyword', consts.OSH_KEYWORD_NAMES, f)
@@ -490,52 +592,6 @@ Str* OptionName(option_asdl::option_t opt_num) {
   }
   return StrFromC(s);  // TODO-intern
 }
-""")
-
-            #
-            # Generate a tightly packed 2D array for C, from a Python dict.
-            #
-
-            edges = consts._IFS_EDGES
-            max_state = max(edge[0] for edge in edges)
-            max_char_kind = max(edge[1] for edge in edges)
-
-            edge_array = []
-            for i in xrange(max_state + 1):
-                # unused cells get -1
-                edge_array.append(['-1'] * (max_char_kind + 1))
-
-            for i in xrange(max_state + 1):
-                for j in xrange(max_char_kind + 1):
-                    entry = edges.get((i, j))
-                    if entry is not None:
-                        # pack (new_state, action) into 32 bits
-                        edge_array[i][j] = '(%d<<16)|%d' % entry
-
-            parts = []
-            for i in xrange(max_state + 1):
-                parts.append('  {')
-                parts.append(', '.join('%10s' % cell for cell in edge_array[i]))
-                parts.append(' },\n')
-
-            out("""\
-int _IFS_EDGE[%d][%d] = { 
-%s
-};
-""" % (max_state + 1, max_char_kind + 1, ''.join(parts)))
-
-            out("""\
-// Note: all of these are integers, e.g. state_i, emit_i, char_kind_i
-using runtime_asdl::state_t;
-using runtime_asdl::emit_t;
-using runtime_asdl::char_kind_t;
-
-Tuple2<state_t, emit_t> IfsEdge(state_t state, runtime_asdl::char_kind_t ch) {
-  int cell = _IFS_EDGE[state][ch];
-  state_t new_state = cell >> 16;
-  emit_t emit = cell & 0xFFFF;
-  return Tuple2<state_t, emit_t>(new_state, emit);
-}
 """)
 
             GenStrList(consts.BUILTIN_NAMES, 'BUILTIN_NAMES', out)
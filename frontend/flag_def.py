@@ -119,7 +119,13 @@ READ_SPEC.LongFlag('--with-eol')
 READ_SPEC.ShortFlag('-q', long_name='--qsn')
 
 MAPFILE_SPEC = FlagSpec('mapfile')
-MAPFILE_SPEC.ShortFlag('-t')
+MAPFILE_SPEC.ShortFlag('-t')  # strip the delimiter
+MAPFILE_SPEC.ShortFlag('-d', args.String)  # delimiter instead of newline
+MAPFILE_SPEC.ShortFlag('-n', args.Int)  # copy at most this many lines
+MAPFILE_SPEC.ShortFlag('-s', args.Int)  # discard this many lines first
+MAPFILE_SPEC.ShortFlag('-O', args.Int)  # origin: first index to assign
+MAPFILE_SPEC.ShortFlag('-C', args.String)  # callback
+MAPFILE_SPEC.ShortFlag('-c', args.Int)  # callback quantum
 
 CD_SPEC = FlagSpec('cd')
 CD_SPEC.ShortFlag('-L')
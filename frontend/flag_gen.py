@@ -10,7 +10,7 @@ from mycpp.mylib import log
 from frontend import args
 from frontend import flag_def  # side effect: flags are defined!
 from frontend import flag_spec
-from mycpp.mylib import switch
+from mycpp.mylib import switch, tagswitch
 # This causes a circular build dependency!  That is annoying.
 # builtin_comp -> core/completion -> pylib/{os_path,path_stat,...} -> posix_
 #from osh import builtin_comp
@@ -168,6 +168,142 @@ def _WriteDefaults(cc_f, defaults_name, defaults):
 ''')
 
 
+# Specs that are parsed with args.ParseLikeEcho() rather than args.Parse()
+_LIKE_ECHO = ['echo']
+
+
+def _TypedAction(action):
+    """Return the ActionType_c and field name for a FlagSpec() action."""
+    if isinstance(action, args.SetToString):
+        assert not action.quit_parsing_flags, action
+        action_type = 'SetToString'
+    elif isinstance(action, args.SetToInt):
+        action_type = 'SetToInt'
+    elif isinstance(action, args.SetToFloat):
+        action_type = 'SetToFloat'
+    elif isinstance(action, args.SetToTrue):
+        action_type = 'SetToTrue'
+    elif isinstance(action, args.SetAttachedBool):
+        action_type = 'SetAttachedBool'
+    else:
+        raise AssertionError(action)
+
+    return action_type, action.name.replace('-', '_')
+
+
+def _WriteTypedFlags(f, var_name, spec_name, flags, counter):
+    """
+    Args:
+      flags: list of (key, ActionType_c, name, field name, valid strings)
+    """
+    param_names = []
+    for _, _, _, _, valid in flags:
+        if valid:
+            param_name = 'params_%d' % counter.next()
+            _WriteStrArray(f, param_name, valid)
+        else:
+            param_name = None
+        param_names.append(param_name)
+
+    f.write('TypedFlag_c %s[] = {\n' % var_name)
+    for i, (key, action_type, name, field_name, _) in enumerate(flags):
+        f.write('    {"%s", ActionType_c::%s, "%s", offsetof(%s, %s), %s},\n' %
+                (key, action_type, name, spec_name, field_name, param_names[i]
+                 or 'nullptr'))
+    f.write('''\
+    {},
+};
+
+''')
+
+
+def _WriteTypedParser(f, spec_name, spec, counter):
+    """Write a constructor with defaults, and a Parse_*() function that fills
+    in the fields directly.
+    """
+    i = counter.next()
+
+    init_vals = []
+    for field_name in sorted(spec.fields):
+        val = spec.defaults[field_name]
+        with tagswitch(val) as case:
+            if case(value_e.Bool):
+                v = 'true' if val.b else 'false'
+            elif case(value_e.Int):
+                v = str(val.i)
+            elif case(value_e.Float):
+                v = repr(val.f)
+            elif case(value_e.Undef):
+                v = 'nullptr'
+            elif case(value_e.Str):
+                v = 'default_%d_%s' % (i, field_name.replace('-', '_'))
+                f.write('GLOBAL_STR(%s, %s);\n' % (v, CString(val.s)))
+            else:
+                raise AssertionError(val)
+        init_vals.append((field_name.replace('-', '_'), v))
+
+    f.write('\n')
+    f.write('%s::%s()' % (spec_name, spec_name))
+    for j, (field_name, v) in enumerate(init_vals):
+        f.write('\n    %s %s(%s)' % (',' if j else ':', field_name, v))
+    f.write(' {\n}\n\n')
+
+    short_flags = []
+    for ch in spec.arity0:
+        short_flags.append((ch, 'SetToTrue', '-' + ch, ch, None))
+    for ch in sorted(spec.arity1):
+        action = spec.arity1[ch]
+        action_type, field_name = _TypedAction(action)
+        valid = getattr(action, 'valid', None)
+        short_flags.append(
+            (ch, action_type, '-' + action.name, field_name, valid))
+
+    long_flags = []
+    for key in sorted(spec.actions_long):
+        action = spec.actions_long[key]
+        action_type, field_name = _TypedAction(action)
+        valid = getattr(action, 'valid', None)
+        long_flags.append(
+            (key, action_type, '-' + action.name, field_name, valid))
+
+    plus_flags = []
+    for ch in spec.plus_flags:
+        plus_flags.append((ch, 'SetToString', '+' + ch, ch, None))
+
+    names = []
+    for prefix, flags in [('typed_short', short_flags),
+                          ('typed_long', long_flags),
+                          ('typed_plus', plus_flags)]:
+        if flags:
+            var_name = '%s_%d' % (prefix, i)
+            _WriteTypedFlags(f, var_name, spec_name, flags, counter)
+        else:
+            var_name = 'nullptr'
+        names.append(var_name)
+
+    typed_name = 'typed_%d' % i
+    f.write('TypedSpec_c %s = {%s};\n' % (typed_name, ', '.join(names)))
+    f.write('\n')
+
+    if spec_name in _LIKE_ECHO:
+        func_names = [('Parse_', 'ParseTyped'),
+                      ('ParseLikeEcho_', 'ParseTypedLikeEcho')]
+    else:
+        func_names = [('Parse_', 'ParseTyped')]
+
+    for prefix, parse_func in func_names:
+        f.write("""\
+%s* %s%s(args::Reader* arg_r) {
+  %s* out = Alloc<%s>();
+  StackRoots _roots({&arg_r, &out});
+  flag_spec::%s(&%s, out, arg_r);
+  return out;
+}
+
+""" % (spec_name, prefix, spec_name, spec_name, spec_name, parse_func,
+        typed_name))
+
+
 def Cpp(specs, header_f, cc_f):
     counter = itertools.count()
 
@@ -259,10 +395,19 @@ attrs->index_(StrFromC("%s"))->tag() == value_e::Undef
             obj_tag = 'HeapTag::Opaque'
             mask_str = 'kZeroMask'
 
+        # Only FlagSpec() has typed parsers so far, not FlagSpecAndMore()
+        typed = spec_name in flag_spec.FLAG_SPEC
+
         header_f.write("""
 class %s {
- public:
-  %s(Dict<Str*, runtime_asdl::value_t*>* attrs)""" % (spec_name, spec_name))
+ public:""" % spec_name)
+        if typed:
+            header_f.write("""
+  // Fields have their defaults.  See Parse_%s().
+  %s();
+""" % (spec_name, spec_name))
+        header_f.write("""
+  %s(Dict<Str*, runtime_asdl::value_t*>* attrs)""" % spec_name)
 
         if field_names:
             header_f.write('\n      : ')
@@ -296,6 +441,14 @@ class %s {
         header_f.write("""\
 };
 """)
+        if typed:
+            header_f.write("""
+%s* Parse_%s(args::Reader* arg_r);
+""" % (spec_name, spec_name))
+            if spec_name in _LIKE_ECHO:
+                header_f.write("""\
+%s* ParseLikeEcho_%s(args::Reader* arg_r);
+""" % (spec_name, spec_name))
 
     header_f.write("""
 extern FlagSpec_c kFlagSpecs[];
@@ -413,8 +566,19 @@ namespace arg_types {
     cc_f.write("""\
     {},
 };
+
+//
+// Typed parsers
+//
+
 """)
 
+    for spec_name in sorted(flag_spec.FLAG_SPEC):
+        spec = specs[spec_name]
+        if not spec.fields:
+            continue
+        _WriteTypedParser(cc_f, spec_name, spec, counter)
+
     cc_f.write("""\
 }  // namespace arg_types
 """)
@@ -458,6 +622,8 @@ def main(argv):
 
     elif action == 'mypy':
         print("""
+from frontend import args
+from frontend import flag_spec
 from frontend.args import _Attributes
 from _devbuild.gen.runtime_asdl import value, value_e, value_t
 from typing import cast, Dict, Optional
@@ -513,6 +679,24 @@ class %s(object):
 
             print()
 
+            # The typed parsers are generated for C++.  In Python, args.Parse()
+            # is the reference implementation.
+            if spec_name in flag_spec.FLAG_SPEC:
+                print("""
+def Parse_%s(arg_r):
+  # type: (args.Reader) -> %s
+  attrs = args.Parse(flag_spec.FLAG_SPEC[%r], arg_r)
+  return %s(attrs.attrs)
+""" % (spec_name, spec_name, spec_name, spec_name))
+
+            if spec_name in _LIKE_ECHO:
+                print("""
+def ParseLikeEcho_%s(arg_r):
+  # type: (args.Reader) -> %s
+  attrs = args.ParseLikeEcho(flag_spec.FLAG_SPEC[%r], arg_r)
+  return %s(attrs.attrs)
+""" % (spec_name, spec_name, spec_name, spec_name))
+
     else:
         raise RuntimeError('Invalid action %r' % action)
 
@@ -47,9 +47,12 @@ def Parse(spec_name, arg_r):
     return args.Parse(spec, arg_r)
 
 
-def ParseCmdVal(spec_name, cmd_val, accept_typed_args=False):
-    # type: (str, cmd_value.Argv, bool) -> Tuple[args._Attributes, args.Reader]
+def CmdValReader(cmd_val, accept_typed_args=False):
+    # type: (cmd_value.Argv, bool) -> args.Reader
+    """Return a Reader positioned after the builtin name.
 
+    For the generated typed parsers, e.g. arg_types.Parse_read(arg_r).
+    """
     from frontend import typed_args  # break circular dependency
 
     if not accept_typed_args:
@@ -57,6 +60,12 @@ def ParseCmdVal(spec_name, cmd_val, accept_typed_args=False):
 
     arg_r = args.Reader(cmd_val.argv, locs=cmd_val.arg_locs)
     arg_r.Next()  # move past the builtin name
+    return arg_r
+
+
+def ParseCmdVal(spec_name, cmd_val, accept_typed_args=False):
+    # type: (str, cmd_value.Argv, bool) -> Tuple[args._Attributes, args.Reader]
+    arg_r = CmdValReader(cmd_val, accept_typed_args=accept_typed_args)
 
     spec = FLAG_SPEC[spec_name]
     return args.Parse(spec, arg_r), arg_r
@@ -12,6 +12,7 @@ from _devbuild.gen.syntax_asdl import Token, SourceLine
 from _devbuild.gen.types_asdl import lex_mode_t, lex_mode_e
 from _devbuild.gen.id_kind_asdl import Id_t, Id, Id_str, Kind
 from asdl import runtime
+from mycpp import mylib
 from mycpp.mylib import log
 from frontend import consts
 from frontend import match
@@ -42,18 +43,24 @@ def TokenVal(tok):
 
 def TokenSliceLeft(tok, left_index):
     # type: (Token, int) -> str
-    """Slice token directly, without creating intermediate string."""
+    """Slice token directly, without creating intermediate string.
+
+    The result is usually a name like $foo -> foo, so it's interned.
+    """
     assert left_index > 0
     left = tok.col + left_index
-    return tok.line.content[left:tok.col + tok.length]
+    return mylib.Intern(tok.line.content[left:tok.col + tok.length])
 
 
 def TokenSliceRight(tok, right_index):
     # type: (Token, int) -> str
-    """Slice token directly, without creating intermediate string."""
+    """Slice token directly, without creating intermediate string.
+
+    The result is usually a name like foo= -> foo, so it's interned.
+    """
     assert right_index < 0
     right = tok.col + tok.length + right_index
-    return tok.line.content[tok.col:right]
+    return mylib.Intern(tok.line.content[tok.col:right])
 
 
 def DummyToken(id_, val):
@@ -243,6 +250,10 @@ class LineLexer(object):
             tok_val = None  # type: Optional[str]
         else:
             tok_val = line_str[line_pos:end_pos]
+            # Command names, ${name}, etc.  Interning makes lookups in Mem and
+            # the builtin/function tables compare pointers.
+            if tok_type in (Id.Lit_Chars, Id.VSub_Name):
+                tok_val = mylib.Intern(tok_val)
         # NOTE: We're putting the arena hook in LineLexer and not Lexer because we
         # want it to be "low level".  The only thing fabricated here is a newline
         # added at the last line, so we don't end with \0.
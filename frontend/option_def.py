@@ -217,7 +217,6 @@ _NO_OPS = [
     'extquote',
     'force_fignore',
     'globasciiranges',
-    'globstar',  # TODO:  implement **
     'gnu_errfmt',
     'histreedit',
     'histverify',
@@ -276,6 +275,7 @@ def _Init(opt_def):
     # shopt options that aren't in any groups.
     opt_def.Add('failglob')
     opt_def.Add('extglob')
+    opt_def.Add('globstar')
 
     # Compatibility
     opt_def.Add(
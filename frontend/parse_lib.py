@@ -8,6 +8,7 @@ from _devbuild.gen.syntax_asdl import (Token, CompoundWord, expr_t, Redir,
 from _devbuild.gen.types_asdl import lex_mode_e
 from _devbuild.gen import grammar_nt
 
+from core import pyutil
 from core import state
 from frontend import lexer
 from frontend import reader
@@ -24,7 +25,7 @@ from mycpp.mylib import log
 
 _ = log
 
-from typing import Any, List, Tuple, Dict, TYPE_CHECKING
+from typing import Any, List, Tuple, Dict, Optional, TYPE_CHECKING
 if TYPE_CHECKING:
     from core.alloc import Arena
     from core.util import _DebugFile
@@ -197,24 +198,24 @@ class ParseContext(object):
                  aliases,
                  oil_grammar,
                  one_pass_parse=False):
-        # type: (Arena, optview.Parse, Dict[str, str], Grammar, bool) -> None
+        # type: (Arena, optview.Parse, Dict[str, str], Optional[Grammar], bool) -> None
+        """
+        Args:
+          oil_grammar: if None, it's loaded when the first YSH expression is
+            parsed.  Most shell scripts don't have any.
+        """
         self.arena = arena
         self.parse_opts = parse_opts
         self.aliases = aliases
         self.oil_grammar = oil_grammar
         self.one_pass_parse = one_pass_parse
 
-        # NOTE: The transformer is really a pure function.
-        if oil_grammar:
-            self.tr = expr_to_ast.Transformer(oil_grammar)
-        else:  # hack for unit tests, which pass None
-            self.tr = None
+        # NOTE: The transformer is really a pure function.  Like the grammar,
+        # it's created lazily.
+        self.tr = None  # type: expr_to_ast.Transformer
 
         if mylib.PYTHON:
-            if self.tr:
-                self.p_printer = self.tr.p_printer
-            else:
-                self.p_printer = None
+            self.p_printer = None  # type: expr_parse.ParseTreePrinter
 
         # Completion state lives here since it may span multiple parsers.
         self.trail = _BaseTrail()  # no-op by default
@@ -293,12 +294,27 @@ class ParseContext(object):
         lx = self.MakeLexer(line_reader)
         return word_parse.WordParser(self, lx, line_reader)
 
+    def _LoadGrammar(self):
+        # type: () -> None
+        if self.tr:
+            return
+
+        if self.oil_grammar is None:
+            self.oil_grammar = pyutil.LoadOilGrammar(
+                pyutil.GetResourceLoader())
+        self.tr = expr_to_ast.Transformer(self.oil_grammar)
+
+        if mylib.PYTHON:
+            self.p_printer = self.tr.p_printer
+
     def _YshParser(self):
         # type: () -> expr_parse.ExprParser
+        self._LoadGrammar()
         return expr_parse.ExprParser(self, self.oil_grammar, False)
 
     def _TeaParser(self):
         # type: () -> expr_parse.ExprParser
+        self._LoadGrammar()
         return expr_parse.ExprParser(self, self.oil_grammar, True)
 
     def ParseVarDecl(self, kw_token, lexer):
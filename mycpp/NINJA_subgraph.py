@@ -72,10 +72,15 @@ def DefineTargets(ru):
 
       'mycpp/small_str_test.cc',
   ]:
+    matrix = COMPILERS_VARIANTS
+    if test_main in ('mycpp/mark_sweep_heap_test.cc',
+                     'mycpp/gc_stress_test.cc'):
+      # Test the other way of tracking roots
+      matrix = matrix + [('cxx', 'asan+frameroots')]
     ru.cc_binary(
         test_main,
         deps = ['//mycpp/runtime'],
-        matrix = COMPILERS_VARIANTS,
+        matrix = matrix,
         phony_prefix = 'mycpp-unit')
 
   for test_main in [
@@ -71,9 +71,9 @@ RawObject* CheneyHeap::Relocate(RawObject* obj, ObjHeader* header) {
   #if 0
     if (obj->heap_tag == HeapTag::Opaque) {
       Str* s = static_cast<Str*>(obj);
-      log("from = %s", s->data_);
+      log("from = %s", s->data());
       Str* s2 = static_cast<Str*>(new_location);
-      log("to = %s", s2->data_);
+      log("to = %s", s2->data());
     }
   #endif
     // aligned() like Heap::Allocate()
@@ -9,6 +9,7 @@ import sys
 from typing import overload, Union, Optional, Any, Dict
 
 from mypy.visitor import ExpressionVisitor, StatementVisitor
+from mypy.traverser import TraverserVisitor
 from mypy.types import (Type, AnyType, NoneTyp, TupleType, Instance, NoneType,
                         Overloaded, CallableType, UnionType, UninhabitedType,
                         PartialType, TypeAliasType)
@@ -175,6 +176,96 @@ def _CheckCondition(node, types):
     return True
 
 
+# Builtins that translate to C++ functions that never allocate
+_NON_ALLOCATING_FUNCS = ('len', 'isinstance', 'ord', 'chr')
+
+# Str methods that return bool or int
+_NON_ALLOCATING_STR_METHODS = ('startswith', 'endswith', 'isdigit', 'isalpha',
+                               'isupper', 'find', 'rfind')
+
+
+class _AllocFinder(TraverserVisitor):
+    """Find out whether a function may allocate.
+
+    A function that doesn't allocate can't trigger a collection, and it
+    doesn't call anything that could.  So it doesn't need a StackRoots record
+    for its params and locals.  This is conservative: any call except a few
+    builtins counts as an allocation.
+    """
+
+    def __init__(self, types):
+        TraverserVisitor.__init__(self)
+        self.types = types
+        self.allocates = False
+
+    def _IsType(self, expr, fullname):
+        t = self.types.get(expr)
+        return isinstance(t, Instance) and t.type.fullname == fullname
+
+    def visit_call_expr(self, o: 'mypy.nodes.CallExpr') -> None:
+        callee = o.callee
+        if isinstance(callee, NameExpr):
+            if callee.name not in _NON_ALLOCATING_FUNCS:
+                self.allocates = True
+        elif isinstance(callee, MemberExpr):
+            if not (callee.name in _NON_ALLOCATING_STR_METHODS and
+                    self._IsType(callee.expr, 'builtins.str')):
+                self.allocates = True
+        else:
+            self.allocates = True
+        TraverserVisitor.visit_call_expr(self, o)
+
+    def visit_op_expr(self, o: 'mypy.nodes.OpExpr') -> None:
+        # str + str, str % args, list * n, etc.
+        if o.op in ('+', '%', '*') and not self._IsType(o.left,
+                                                         'builtins.int'):
+            self.allocates = True
+        TraverserVisitor.visit_op_expr(self, o)
+
+    def visit_operator_assignment_stmt(
+            self, o: 'mypy.nodes.OperatorAssignmentStmt') -> None:
+        if o.op in ('+', '%', '*') and not self._IsType(o.lvalue,
+                                                         'builtins.int'):
+            self.allocates = True
+        TraverserVisitor.visit_operator_assignment_stmt(self, o)
+
+    def visit_assignment_stmt(self, o: 'mypy.nodes.AssignmentStmt') -> None:
+        # d[k] = v may grow the dict
+        for lval in o.lvalues:
+            if isinstance(lval, IndexExpr):
+                self.allocates = True
+        TraverserVisitor.visit_assignment_stmt(self, o)
+
+    def visit_index_expr(self, o: 'mypy.nodes.IndexExpr') -> None:
+        if isinstance(o.index, SliceExpr):
+            self.allocates = True
+        TraverserVisitor.visit_index_expr(self, o)
+
+    def visit_list_expr(self, o: 'mypy.nodes.ListExpr') -> None:
+        self.allocates = True
+
+    def visit_dict_expr(self, o: 'mypy.nodes.DictExpr') -> None:
+        self.allocates = True
+
+    def visit_list_comprehension(self,
+                                 o: 'mypy.nodes.ListComprehension') -> None:
+        self.allocates = True
+
+    def visit_dictionary_comprehension(
+            self, o: 'mypy.nodes.DictionaryComprehension') -> None:
+        self.allocates = True
+
+    def visit_yield_expr(self, o: 'mypy.nodes.YieldExpr') -> None:
+        self.allocates = True  # appends to a List
+
+
+def FuncAllocates(func_node, types):
+    # type: (FuncDef, Dict[Expression, Type]) -> bool
+    finder = _AllocFinder(types)
+    func_node.body.accept(finder)
+    return finder.allocates
+
+
 def CTypeIsManaged(c_type):
     # type: (str) -> bool
     """For rooting and field masks."""
@@ -380,6 +471,8 @@ class Generate(ExpressionVisitor[T], StatementVisitor[None]):
         self.local_var_list = []  # Collected at assignment
         self.prepend_to_block = None  # For writing vars after {
         self.current_func_node = None
+        # False for leaf functions, which don't need StackRoots
+        self.current_func_allocates = True
         self.current_stmt_node = None
         # Temporary lists to use as output params for generators
         self.yield_accumulators = {
@@ -1204,6 +1297,21 @@ class Generate(ExpressionVisitor[T], StatementVisitor[None]):
     def visit_temp_node(self, o: 'mypy.nodes.TempNode') -> T:
         pass
 
+    def _WriteBarrier(self, lval, c_type):
+        """Emit WriteBarrier(self->foo) before a pointer field is overwritten.
+
+        Fields of self assigned in __init__ belong to a new object, so they're
+        skipped.  Other objects' fields, like self.parser.foo, aren't.
+        """
+        if (self.current_method_name == '__init__' and
+                isinstance(lval.expr, NameExpr) and lval.expr.name == 'self'):
+            return
+        if not c_type.endswith('*'):
+            return
+        self.write_ind('WriteBarrier(')
+        self.accept(lval)
+        self.write(');\n')
+
     def _write_tuple_unpacking(self,
                                temp_name,
                                lval_items,
@@ -1224,6 +1332,8 @@ class Generate(ExpressionVisitor[T], StatementVisitor[None]):
                 self.write_ind('%s', lval_item.name)
             else:
                 # Could be MemberExpr like self.foo, self.bar = baz
+                if isinstance(lval_item, MemberExpr):
+                    self._WriteBarrier(lval_item, GetCType(item_type))
                 self.write_ind('')
                 self.accept(lval_item)
 
@@ -1502,6 +1612,7 @@ class Generate(ExpressionVisitor[T], StatementVisitor[None]):
             self.write(';\n')
 
         elif isinstance(lval, MemberExpr):
+            self._WriteBarrier(lval, GetCType(self.types[lval]))
             self.write_ind('')
             self.accept(lval)
             self.write(' = ')
@@ -1773,7 +1884,8 @@ class Generate(ExpressionVisitor[T], StatementVisitor[None]):
             # it's called in a loop by _ExecuteList().  Although the 'child'
             # variable is already live by other means.
             # TODO: Test how much this affects performance.
-            if CTypeIsManaged(c_item_type):
+            if (CTypeIsManaged(c_item_type) and
+                    self.current_func_allocates):
                 self.write_ind('  StackRoots _for({&')
                 self.accept(index_expr)
                 self.write_ind('});\n')
@@ -2181,9 +2293,11 @@ class Generate(ExpressionVisitor[T], StatementVisitor[None]):
                 (lval_name, c_type, lval_name in arg_names)
                 for (lval_name, c_type) in self.local_vars[o]
             ]
+            self.current_func_allocates = FuncAllocates(o, self.types)
 
         self.accept(o.body)
         self.current_func_node = None
+        self.current_func_allocates = True
 
     def visit_overloaded_func_def(self,
                                   o: 'mypy.nodes.OverloadedFuncDef') -> T:
@@ -2583,7 +2697,8 @@ class Generate(ExpressionVisitor[T], StatementVisitor[None]):
                     roots.append(lval_name)
             #self.log('roots %s', roots)
 
-            if len(roots):
+            # A function that doesn't allocate can't trigger a collection
+            if len(roots) and self.current_func_allocates:
                 self.write_ind('StackRoots _roots({')
                 for i, r in enumerate(roots):
                     if i != 0:
@@ -2610,6 +2725,8 @@ class Generate(ExpressionVisitor[T], StatementVisitor[None]):
 
     def visit_operator_assignment_stmt(
             self, o: 'mypy.nodes.OperatorAssignmentStmt') -> T:
+        if isinstance(o.lvalue, MemberExpr):  # self.s += 'x'
+            self._WriteBarrier(o.lvalue, GetCType(self.types[o.lvalue]))
         self.write_ind('')
         self.accept(o.lvalue)
         self.write(' %s= ', o.op)  # + to +=
@@ -24,6 +24,44 @@ extern CheneyHeap gHeap;
 
 #define VALIDATE_ROOTS 0
 
+#if defined(MARK_SWEEP) && defined(GC_FRAME_ROOTS)
+
+// mycpp generates code that keeps track of the root set.  This version links
+// a frame record into gHeap.root_frames_; see RootFrame.
+class StackRoots : public RootFrame {
+ public:
+  StackRoots(std::initializer_list<void*> roots) {
+    int n = roots.size();
+    n_ = n < kMaxFrameRoots ? n : kMaxFrameRoots;
+    num_pushed_ = n - n_;
+
+    int i = 0;
+    for (auto root : roots) {  // can't use roots[i]
+      if (i < kMaxFrameRoots) {
+        roots_[i] = reinterpret_cast<RawObject**>(root);
+      } else {  // rare: too many to store inline
+        gHeap.PushRoot(reinterpret_cast<RawObject**>(root));
+      }
+      i++;
+    }
+
+    prev_ = gHeap.root_frames_;
+    gHeap.root_frames_ = this;
+  }
+
+  ~StackRoots() {
+    gHeap.root_frames_ = prev_;
+    for (int i = 0; i < num_pushed_; ++i) {
+      gHeap.PopRoot();
+    }
+  }
+
+ private:
+  int num_pushed_;
+};
+
+#else
+
 // mycpp generates code that keeps track of the root set
 class StackRoots {
  public:
@@ -75,6 +113,8 @@ class StackRoots {
   int n_;
 };
 
+#endif  // GC_FRAME_ROOTS
+
 // Note:
 // - This function causes code bloat due to template expansion on hundreds of
 //   types.  Could switch to a GC_NEW() macro
@@ -187,10 +227,12 @@ inline Str* OverAllocatedStr(int len) {
 
 // Copy C string into the managed heap.
 inline Str* StrFromC(const char* data, int len) {
-  // Optimization that could be taken out once we have SmallStr
   if (len == 0) {
     return kEmptyString;
   }
+  if (len == 1) {
+    return OneByteStr(data[0]);
+  }
   Str* s = NewStr(len);
   memcpy(s->data_, data, len);
   DCHECK(s->data_[len] == '\0');  // should be true because Heap was zeroed
@@ -202,6 +244,24 @@ inline Str* StrFromC(const char* data) {
   return StrFromC(data, strlen(data));
 }
 
+// Return parent[begin : begin+len].  Long slices share the bytes of the
+// parent, and short ones are copied.
+inline Str* NewStrSlice(Str* parent, int begin, int len) {
+  if (len < kMinSliceLen) {
+    return StrFromC(parent->data() + begin, len);
+  }
+  if (IsStrSlice(parent)) {  // point to the underlying Str instead
+    StrSlice* p = reinterpret_cast<StrSlice*>(parent);
+    begin += p->begin_;
+    parent = p->parent_;
+  }
+  StrSlice* slice = Alloc<StrSlice>();
+  slice->len_ = len;
+  slice->begin_ = begin;
+  slice->parent_ = parent;
+  return reinterpret_cast<Str*>(slice);
+}
+
 // Create a slab with a number of entries of a certain type.
 // Note: entries will be zero'd because we use calloc().  TODO: Consider
 // zeroing them separately.
@@ -231,4 +291,19 @@ inline Slab<T>* NewSlab(int len) {
   return slab;
 }
 
+// Call before overwriting or removing a pointer in an existing object, so an
+// incremental collection doesn't miss what it pointed to.  See
+// MarkSweepHeap::WriteBarrier().
+template <typename T>
+inline void WriteBarrier(T* old) {
+#if MARK_SWEEP
+  gHeap.WriteBarrier(reinterpret_cast<RawObject*>(old));
+#endif
+}
+
+// Items of List<int>, Dict<int, int>, etc. aren't objects
+template <typename T>
+inline void WriteBarrier(T old) {
+}
+
 #endif  // MYCPP_GC_ALLOC_H
@@ -17,11 +17,14 @@ Str* readline(Str*);
 
 // Translation of Python's print().
 void print(Str* s) {
-  fputs(s->data_, stdout);  // print until first NUL
+  fputs(s->c_str(), stdout);  // print until first NUL
   fputc('\n', stdout);
 }
 
 Str* str(int i) {
+  if (0 <= i && i <= 9) {  // e.g. $? and loop indices
+    return OneByteStr('0' + i);
+  }
   Str* s = OverAllocatedStr(kIntBufSize);
   int length = snprintf(s->data(), kIntBufSize, "%d", i);
   s->MaybeShrink(length);
@@ -38,7 +41,7 @@ Str* repr(Str* s) {
 
   // Single quote by default.
   char quote = '\'';
-  if (memchr(s->data_, '\'', n) && !memchr(s->data_, '"', n)) {
+  if (memchr(s->data(), '\'', n) && !memchr(s->data(), '"', n)) {
     quote = '"';
   }
   char* p = result->data_;
@@ -46,7 +49,7 @@ Str* repr(Str* s) {
   // From PyString_Repr()
   *p++ = quote;
   for (int i = 0; i < n; ++i) {
-    char c = s->data_[i];
+    char c = s->data()[i];
     if (c == quote || c == '\\') {
       *p++ = '\\';
       *p++ = c;
@@ -126,7 +129,7 @@ bool StringToInteger(const char* s, int length, int base, int* result) {
 
 int to_int(Str* s, int base) {
   int i;
-  if (StringToInteger(s->data_, len(s), base, &i)) {
+  if (StringToInteger(s->data(), len(s), base, &i)) {
     return i;
   } else {
     throw Alloc<ValueError>();
@@ -135,7 +138,7 @@ int to_int(Str* s, int base) {
 
 int to_int(Str* s) {
   int i;
-  if (StringToInteger(s->data_, len(s), 10, &i)) {
+  if (StringToInteger(s->data(), len(s), 10, &i)) {
     return i;
   } else {
     throw Alloc<ValueError>();
@@ -143,17 +146,14 @@ int to_int(Str* s) {
 }
 
 Str* chr(int i) {
-  // NOTE: i should be less than 256, in which we could return an object from
-  // GLOBAL_STR() pool, like StrIter
-  auto result = NewStr(1);
-  result->data_[0] = i;
-  return result;
+  // NOTE: i should be less than 256
+  return OneByteStr(i);
 }
 
 int ord(Str* s) {
   assert(len(s) == 1);
   // signed to unsigned conversion, so we don't get values like -127
-  uint8_t c = static_cast<uint8_t>(s->data_[0]);
+  uint8_t c = static_cast<uint8_t>(s->data()[0]);
   return c;
 }
 
@@ -162,14 +162,14 @@ bool to_bool(Str* s) {
 }
 
 double to_float(Str* s) {
-  char* begin = s->data_;
-  char* end = begin + len(s);
+  const char* begin = s->c_str();  // strtod() needs a NUL terminator
+  char* end = nullptr;
 
   errno = 0;
   double result = strtod(begin, &end);
 
   if (errno == ERANGE) {  // error: overflow or underflow
-    // log("OVERFLOW or UNDERFLOW %s", s->data_);
+    // log("OVERFLOW or UNDERFLOW %s", s->data());
     // log("result %f", result);
     throw Alloc<ValueError>();
   }
@@ -184,26 +184,15 @@ double to_float(Str* s) {
 bool str_contains(Str* haystack, Str* needle) {
   // Common case
   if (len(needle) == 1) {
-    return memchr(haystack->data_, needle->data_[0], len(haystack));
+    return memchr(haystack->data(), needle->data()[0], len(haystack));
   }
 
   if (len(needle) > len(haystack)) {
     return false;
   }
 
-  // General case. TODO: We could use a smarter substring algorithm.
-
-  const char* end = haystack->data_ + len(haystack);
-  const char* last_possible = end - len(needle);
-  const char* p = haystack->data_;
-
-  while (p <= last_possible) {
-    if (memcmp(p, needle->data_, len(needle)) == 0) {
-      return true;
-    }
-    p++;
-  }
-  return false;
+  // glibc's memmem() is a vectorized Two-Way search
+  return memmem(haystack->data(), len(haystack), needle->data(), len(needle));
 }
 
 Str* str_repeat(Str* s, int times) {
@@ -217,7 +206,7 @@ Str* str_repeat(Str* s, int times) {
 
   char* dest = result->data_;
   for (int i = 0; i < times; i++) {
-    memcpy(dest, s->data_, len_);
+    memcpy(dest, s->data(), len_);
     dest += len_;
   }
   return result;
@@ -234,13 +223,13 @@ Str* str_concat3(Str* a, Str* b, Str* c) {
   Str* result = NewStr(new_len);
   char* pos = result->data_;
 
-  memcpy(pos, a->data_, a_len);
+  memcpy(pos, a->data(), a_len);
   pos += a_len;
 
-  memcpy(pos, b->data_, b_len);
+  memcpy(pos, b->data(), b_len);
   pos += b_len;
 
-  memcpy(pos, c->data_, c_len);
+  memcpy(pos, c->data(), c_len);
 
   assert(pos + c_len == result->data_ + new_len);
 
@@ -250,12 +239,19 @@ Str* str_concat3(Str* a, Str* b, Str* c) {
 Str* str_concat(Str* a, Str* b) {
   int a_len = len(a);
   int b_len = len(b);
+  // Strings are immutable, so we can return one of the arguments
+  if (a_len == 0) {
+    return b;
+  }
+  if (b_len == 0) {
+    return a;
+  }
   int new_len = a_len + b_len;
   Str* result = NewStr(new_len);
   char* buf = result->data_;
 
-  memcpy(buf, a->data_, a_len);
-  memcpy(buf + a_len, b->data_, b_len);
+  memcpy(buf, a->data(), a_len);
+  memcpy(buf + a_len, b->data(), b_len);
 
   return result;
 }
@@ -280,7 +276,15 @@ bool str_equals(Str* left, Str* right) {
 
   if (left->len_ == right->len_) {
     // assert(len(left) == len(right));
-    return memcmp(left->data_, right->data_, left->len_) == 0;
+
+    // Different hashes mean different strings.  Interned strings and dict
+    // keys usually have them.
+    int h1 = CachedHash(left);
+    int h2 = CachedHash(right);
+    if (h1 && h2 && h1 != h2) {
+      return false;
+    }
+    return memcmp(left->data(), right->data(), left->len_) == 0;
   }
 
   return false;
@@ -339,21 +343,39 @@ bool keys_equal(Tuple2<Str*, int>* t1, Tuple2<Str*, int>* t2) {
 bool str_equals0(const char* c_string, Str* s) {
   int n = strlen(c_string);
   if (len(s) == n) {
-    return memcmp(s->data_, c_string, n) == 0;
+    return memcmp(s->data(), c_string, n) == 0;
   } else {
     return false;
   }
 }
 
 int hash(Str* s) {
+  int cached = CachedHash(s);
+  if (cached) {
+    return cached;
+  }
+
   // FNV-1 from http://www.isthe.com/chongo/tech/comp/fnv/#FNV-1
   int h = 2166136261;          // 32-bit FNV-1 offset basis
   constexpr int p = 16777619;  // 32-bit FNV-1 prime
-  for (int i = 0; i < len(s); i++) {
-    h *= s->data()[i];
+  const char* data = s->data();
+  int n = len(s);
+  for (int i = 0; i < n; i++) {
+    h *= data[i];
     h ^= p;
   }
-  return h;
+
+  // Fold into the 24 bits of the header that an Opaque Str doesn't use.  0
+  // means "not computed".
+  unsigned u = static_cast<unsigned>(h);
+  int folded = (u ^ (u >> 24)) & 0xffffff;
+  if (folded == 0) {
+    folded = 1;
+  }
+  if (!IsStrSlice(s)) {
+    FIELD_MASK(*ObjHeader::FromObject(s)) = folded;
+  }
+  return folded;
 }
 
 int max(int a, int b) {
@@ -280,6 +280,24 @@ TEST hash_str_test() {
   Str* b = StrFromC("123456789");
   ASSERT(hash(a) != hash(b));
 
+  // The hash is cached in the header
+  int h = hash(a);
+  ASSERT(h != 0);
+  ASSERT_EQ_FMT(h, CachedHash(a), "%d");
+  ASSERT_EQ_FMT(h, hash(StrFromC("foobarbaz")), "%d");
+  ASSERT_EQ_FMT(0, CachedHash(StrFromC("foobarbaz")), "%d");
+
+  // Strings with different cached hashes are unequal without a memcmp()
+  ASSERT(!str_equals(a, b));
+  ASSERT(str_equals(a, StrFromC("foobarbaz")));
+
+  // Slices don't cache it, since their header holds a field mask
+  Str* big = StrFromC("0123456789abcdefghijklmnopqrstuvwxyz!");
+  Str* sl = big->slice(1);
+  ASSERT_EQ_FMT(hash(StrFromC("123456789abcdefghijklmnopqrstuvwxyz!")),
+                hash(sl), "%d");
+  ASSERT_EQ_FMT(0, CachedHash(sl), "%d");
+
   PASS();
 }
 
@@ -194,6 +194,9 @@ void Dict<K, V>::reserve(int n) {
       memcpy(new_k->items_, keys_->items_, len_ * sizeof(K));
       memcpy(new_v->items_, values_->items_, len_ * sizeof(V));
     }
+    // Their items may not be marked yet
+    WriteBarrier(keys_);
+    WriteBarrier(values_);
 
     entry_ = new_i;
     keys_ = new_k;
@@ -255,9 +258,15 @@ void Dict<K, V>::clear() {
   }
 
   if (keys_) {
+    for (int i = 0; i < len_; ++i) {
+      WriteBarrier(keys_->items_[i]);
+    }
     memset(keys_->items_, 0, len_ * sizeof(K));  // zero for GC scan
   }
   if (values_) {
+    for (int i = 0; i < len_; ++i) {
+      WriteBarrier(values_->items_[i]);
+    }
     memset(values_->items_, 0, len_ * sizeof(V));  // zero for GC scan
   }
   len_ = 0;
@@ -305,6 +314,7 @@ void Dict<K, V>::set(K key, V val) {
 
     ++len_;
   } else {
+    WriteBarrier(values_->items_[pos]);
     values_->items_[pos] = val;
   }
 }
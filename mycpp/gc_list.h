@@ -255,6 +255,7 @@ void List<T>::reserve(int n) {
     // log("Copying %d bytes", len_ * sizeof(T));
     memcpy(new_slab->items_, slab_->items_, len_ * sizeof(T));
   }
+  WriteBarrier(slab_);  // its items may not be marked yet
   slab_ = new_slab;
 }
 
@@ -268,6 +269,7 @@ void List<T>::set(int i, T item) {
   DCHECK(i >= 0);
   DCHECK(i < capacity_);
 
+  WriteBarrier(slab_->items_[i]);
   slab_->items_[i] = item;
 }
 
@@ -309,6 +311,7 @@ T List<T>::pop() {
   }
   len_--;
   T result = slab_->items_[len_];
+  WriteBarrier(result);
   slab_->items_[len_] = 0;  // zero for GC scan
   return result;
 }
@@ -321,6 +324,7 @@ T List<T>::pop(int i) {
   }
 
   T result = index_(i);
+  WriteBarrier(result);
   len_--;
 
   // Shift everything by one
@@ -345,6 +349,9 @@ void List<T>::remove(T x) {
 template <typename T>
 void List<T>::clear() {
   if (slab_) {
+    for (int i = 0; i < len_; ++i) {
+      WriteBarrier(slab_->items_[i]);
+    }
     memset(slab_->items_, 0, len_ * sizeof(T));  // zero for GC scan
   }
   len_ = 0;
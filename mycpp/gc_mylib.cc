@@ -1,8 +1,12 @@
 #include "mycpp/gc_mylib.h"
 
 #include <errno.h>
+#include <fcntl.h>  // open
 #include <stdio.h>
-#include <unistd.h>  // isatty
+#include <string.h>  // memchr
+#include <unistd.h>  // isatty, read
+
+#include <unordered_set>
 
 namespace mylib {
 
@@ -16,7 +20,7 @@ void InitCppOnly() {
 }
 
 void print_stderr(Str* s) {
-  fputs(s->data_, stderr);  // prints until first NUL
+  fputs(s->c_str(), stderr);  // prints until first NUL
   fputc('\n', stderr);
 }
 
@@ -25,7 +29,7 @@ void writeln(Str* s, int fd) {
   // TODO: handle errors and write in a loop, like posix::write().  If possible,
   // use posix::write directly, but that introduces some dependency problems.
 
-  if (write(fd, s->data_, len(s)) < 0) {
+  if (write(fd, s->data(), len(s)) < 0) {
     assert(0);
   }
   if (write(fd, "\n", 1) < 0) {
@@ -48,8 +52,8 @@ MutableStr* NewMutableStr(int cap) {
 Tuple2<Str*, Str*> split_once(Str* s, Str* delim) {
   assert(len(delim) == 1);
 
-  const char* start = s->data_;  // note: this pointer may move
-  char c = delim->data_[0];
+  const char* start = s->data();
+  char c = delim->data()[0];
   int length = len(s);
 
   const char* p = static_cast<const char*>(memchr(start, c, length));
@@ -61,11 +65,8 @@ Tuple2<Str*, Str*> split_once(Str* s, Str* delim) {
     Str* s1 = nullptr;
     Str* s2 = nullptr;
     // Allocate together to avoid 's' moving in between
-    s1 = NewStr(len1);
-    s2 = NewStr(len2);
-
-    memcpy(s1->data_, s->data_, len1);
-    memcpy(s2->data_, s->data_ + len1 + 1, len2);
+    s1 = NewStrSlice(s, 0, len1);
+    s2 = NewStrSlice(s, len1 + 1, len2);
 
     return Tuple2<Str*, Str*>(s1, s2);
   } else {
@@ -73,16 +74,119 @@ Tuple2<Str*, Str*> split_once(Str* s, Str* delim) {
   }
 }
 
+// Names are short, and we don't want to keep arbitrary data alive forever.
+const int kMaxInternLen = 31;
+
+struct InternHash {
+  size_t operator()(Str* s) const {
+    return hash(s);
+  }
+};
+
+struct InternEqual {
+  bool operator()(Str* a, Str* b) const {
+    return str_equals(a, b);
+  }
+};
+
+static std::unordered_set<Str*, InternHash, InternEqual> gInterned;
+
+Str* Intern(Str* s) {
+  if (len(s) > kMaxInternLen) {  // note: this excludes StrSlice
+    return s;
+  }
+  auto it = gInterned.find(s);
+  if (it != gInterned.end()) {
+    return *it;
+  }
+  gInterned.insert(s);
+  if (ObjHeader::FromObject(s)->heap_tag != HeapTag::Global) {
+    gHeap.RootGlobalVar(s);
+  }
+  return s;
+}
+
 LineReader* gStdin;
 
 LineReader* open(Str* path) {
-  // TODO: Don't use C I/O; use POSIX I/O!
-  FILE* f = fopen(path->data_, "r");
-  if (f == nullptr) {
+  int fd = ::open(path->c_str(), O_RDONLY);
+  if (fd < 0) {
     throw Alloc<IOError>(errno);
   }
 
-  return Alloc<CFileLineReader>(f);
+  return Alloc<FdLineReader>(fd);
+}
+
+// Big enough that source'ing a typical script is one read(2)
+const int kLineBufSize = 64 * 1024;
+
+Str* FdLineReader::readline() {
+  if (buf_ == nullptr) {
+    buf_ = NewStr(kLineBufSize);
+  }
+
+  int scan = start_;  // bytes before this have no newline
+  while (true) {
+    const char* data = buf_->data_;
+    const char* p =
+        static_cast<const char*>(memchr(data + scan, '\n', end_ - scan));
+    if (p) {
+      int line_end = p - data + 1;  // past newline char
+      Str* line = ::StrFromC(data + start_, line_end - start_);
+      start_ = line_end;
+      return line;
+    }
+    scan = end_;
+
+    if (eof_) {
+      if (start_ == end_) {
+        return kEmptyString;
+      }
+      // leftover line without a newline
+      Str* line = ::StrFromC(data + start_, end_ - start_);
+      start_ = end_;
+      return line;
+    }
+
+    // Make room: move the partial line to the front, and grow the buffer if
+    // the line fills it.
+    if (start_ != 0) {
+      memmove(buf_->data_, data + start_, end_ - start_);
+      end_ -= start_;
+      scan -= start_;
+      start_ = 0;
+    }
+    int capacity = len(buf_);
+    if (end_ == capacity) {
+      Str* bigger = NewStr(capacity * 2);
+      memcpy(bigger->data_, buf_->data_, end_);
+      WriteBarrier(buf_);
+      buf_ = bigger;
+    }
+
+    int n = ::read(fd_, buf_->data_ + end_, len(buf_) - end_);
+    if (n < 0) {
+      // Like getline(), EINTR is an error, so the caller can run signal
+      // handlers
+      throw Alloc<IOError>(errno);
+    }
+    if (n == 0) {
+      eof_ = true;
+    } else {
+      end_ += n;
+    }
+  }
+}
+
+bool FdLineReader::isatty() {
+  return ::isatty(fd_);
+}
+
+void FdLineReader::close() {
+  ::close(fd_);
+  WriteBarrier(buf_);
+  buf_ = nullptr;
+  start_ = end_ = 0;
 }
 
 Str* CFileLineReader::readline() {
@@ -113,10 +217,8 @@ bool CFileLineReader::isatty() {
   return ::isatty(fileno(f_));
 }
 
-// Problem: most Str methods like index() and slice() COPY so they have a
-// NUL terminator.
-// log("%s") falls back on sprintf, so it expects a NUL terminator.
-// It would be easier for us to just share.
+// Long lines share the bytes of s_ (see StrSlice), so reading a big here doc
+// or eval string line by line doesn't copy it.
 Str* BufLineReader::readline() {
   Str* line = nullptr;
 
@@ -126,11 +228,13 @@ Str* BufLineReader::readline() {
   }
 
   int orig_pos = pos_;
-  const char* p = strchr(s_->data_ + pos_, '\n');
+  const char* data = s_->data();
+  const char* p = static_cast<const char*>(
+      memchr(data + pos_, '\n', str_len - pos_));
   // log("pos_ = %s", pos_);
   int line_len;
   if (p) {
-    int new_pos = p - s_->data_;
+    int new_pos = p - data;
     line_len = new_pos - pos_ + 1;  // past newline char
     pos_ = new_pos + 1;
   } else {             // leftover line
@@ -143,9 +247,7 @@ Str* BufLineReader::readline() {
     }
   }
 
-  line = NewStr(line_len);
-  memcpy(line->data_, s_->data_ + orig_pos, line_len);
-  assert(line->data_[line_len] == '\0');
+  line = NewStrSlice(s_, orig_pos, line_len);
   return line;
 }
 
@@ -158,7 +260,7 @@ Writer* gStderr;
 
 void CFileWriter::write(Str* s) {
   // note: throwing away the return value
-  fwrite(s->data_, sizeof(char), len(s), f_);
+  fwrite(s->data(), sizeof(char), len(s), f_);
 }
 
 void CFileWriter::flush() {
@@ -192,7 +294,7 @@ void BufWriter::Extend(Str* s) {
 
   assert(capacity() >= len_ + n);
 
-  memcpy(end(), s->data_, n);
+  memcpy(end(), s->data(), n);
   len_ += n;
   data()[len_] = '\0';
 }
@@ -205,6 +307,7 @@ void BufWriter::EnsureCapacity(int cap) {
     auto* s = NewMutableStr(std::max(capacity() * 2, cap));
     memcpy(s->data_, str_->data_, len_);
     s->data_[len_] = '\0';
+    WriteBarrier(str_);
     str_ = s;
   }
 }
@@ -240,6 +343,7 @@ Str* BufWriter::getvalue() {
   } else {
     Str* s = str_;
     s->MaybeShrink(len_);
+    WriteBarrier(str_);
     str_ = nullptr;
     len_ = -1;
     return s;
@@ -30,6 +30,14 @@ inline void MaybeCollect() {
   gHeap.MaybeCollect();
 }
 
+inline void CollectIdle() {
+#if MARK_SWEEP
+  gHeap.CollectIdle();
+#else
+  gHeap.MaybeCollect();
+#endif
+}
+
 // Used by generated _build/cpp/osh_eval.cc
 inline Str* StrFromC(const char* s) {
   return ::StrFromC(s);
@@ -44,6 +52,11 @@ void print_stderr(Str* s);
 
 Tuple2<Str*, Str*> split_once(Str* s, Str* delim);
 
+// Return the canonical instance of a short string like a variable name, so
+// that comparing names from different parts of a program is a pointer
+// comparison.  Interned strings are never freed.
+Str* Intern(Str* s);
+
 template <typename K, typename V>
 void dict_erase(Dict<K, V>* haystack, K needle) {
   int pos = haystack->position_of_key(needle);
@@ -51,6 +64,8 @@ void dict_erase(Dict<K, V>* haystack, K needle) {
     return;
   }
   haystack->entry_->items_[pos] = kDeletedEntry;
+  WriteBarrier(haystack->keys_->items_[pos]);
+  WriteBarrier(haystack->values_->items_[pos]);
   // Zero out for GC.  These could be nullptr or 0
   haystack->keys_->items_[pos] = 0;
   haystack->values_->items_[pos] = 0;
@@ -146,6 +161,38 @@ class CFileLineReader : public LineReader {
   DISALLOW_COPY_AND_ASSIGN(CFileLineReader)
 };
 
+// Read lines from a file descriptor with read(2).  Bytes land in a reusable
+// buffer that's scanned with memchr(), and each line is copied once, into its
+// own Str.
+class FdLineReader : public LineReader {
+ public:
+  explicit FdLineReader(int fd)
+      : LineReader(), buf_(nullptr), start_(0), end_(0), fd_(fd), eof_(false) {
+  }
+  virtual Str* readline();
+  virtual bool isatty();
+  void close();
+
+  // Grown when a line doesn't fit.  Unconsumed bytes are [start_, end_).
+  Str* buf_;
+  int start_;
+  int end_;
+
+  static constexpr ObjHeader obj_header() {
+    return ObjHeader::ClassFixed(field_mask(), sizeof(FdLineReader));
+  }
+
+  static constexpr uint32_t field_mask() {
+    return LineReader::field_mask() | maskbit(offsetof(FdLineReader, buf_));
+  }
+
+ private:
+  int fd_;
+  bool eof_;
+
+  DISALLOW_COPY_AND_ASSIGN(FdLineReader)
+};
+
 extern LineReader* gStdin;
 
 inline LineReader* Stdin() {
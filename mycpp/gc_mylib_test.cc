@@ -1,5 +1,8 @@
 #include "mycpp/gc_mylib.h"
 
+#include <errno.h>
+#include <unistd.h>  // write, unlink
+
 #include "mycpp/gc_alloc.h"  // gHeap
 #include "mycpp/gc_str.h"
 #include "vendor/greatest.h"
@@ -258,6 +261,77 @@ TEST files_test() {
   PASS();
 }
 
+TEST FdLineReader_test() {
+  char tmp_name[] = "/tmp/fd_line_reader_test.XXXXXX";
+  int fd = mkstemp(tmp_name);
+  ASSERT(fd >= 0);
+
+  // A line longer than the buffer, then a short one without a newline
+  int long_len = 200 * 1000;
+  char* long_line = static_cast<char*>(malloc(long_len));
+  memset(long_line, 'x', long_len - 1);
+  long_line[long_len - 1] = '\n';
+
+  const char* head = "one\ntwo\n\n";
+  ASSERT_EQ(9, write(fd, head, strlen(head)));
+  ASSERT_EQ(long_len, write(fd, long_line, long_len));
+  ASSERT_EQ(4, write(fd, "last", 4));
+  close(fd);
+
+  mylib::LineReader* r = nullptr;
+  Str* line = nullptr;
+  StackRoots _roots({&r, &line});
+
+  r = mylib::open(StrFromC(tmp_name));
+  ASSERT(str_equals(StrFromC("one\n"), r->readline()));
+  ASSERT(str_equals(StrFromC("two\n"), r->readline()));
+  ASSERT(str_equals(StrFromC("\n"), r->readline()));
+
+  line = r->readline();
+  ASSERT_EQ(long_len, len(line));
+  ASSERT_EQ(0, memcmp(long_line, line->data(), long_len));
+
+  ASSERT(str_equals(StrFromC("last"), r->readline()));
+  ASSERT_EQ(kEmptyString, r->readline());
+  ASSERT_EQ(kEmptyString, r->readline());
+  ASSERT_EQ(false, r->isatty());
+  r->close();
+
+  free(long_line);
+  unlink(tmp_name);
+
+  bool caught = false;
+  try {
+    mylib::open(StrFromC("/nonexistent/ZZ"));
+  } catch (IOError* e) {
+    ASSERT_EQ(ENOENT, e->errno_);
+    caught = true;
+  }
+  ASSERT(caught);
+
+  PASS();
+}
+
+TEST intern_test() {
+  Str* a = mylib::Intern(StrFromC("foo"));
+  Str* b = mylib::Intern(StrFromC("foo"));
+  ASSERT_EQ(a, b);
+  ASSERT(mylib::Intern(StrFromC("bar")) != a);
+
+  // The table roots interned strings
+  gHeap.Collect();
+  ASSERT(str_equals0("foo", a));
+  ASSERT_EQ(a, mylib::Intern(StrFromC("foo")));
+
+  // Long strings aren't interned
+  Str* long1 = StrFromC("0123456789abcdefghijklmnopqrstuvwxyz");
+  Str* long2 = StrFromC("0123456789abcdefghijklmnopqrstuvwxyz");
+  ASSERT_EQ(long1, mylib::Intern(long1));
+  ASSERT_EQ(long2, mylib::Intern(long2));
+
+  PASS();
+}
+
 TEST for_test_coverage() {
   mylib::MaybeCollect();  // trivial wrapper for translation
   mylib::StrFromC("x");   // trivial wrapper for translation
@@ -291,6 +365,8 @@ int main(int argc, char** argv) {
   RUN_TEST(BufWriter_test);
   RUN_TEST(BufLineReader_test);
   RUN_TEST(files_test);
+  RUN_TEST(FdLineReader_test);
+  RUN_TEST(intern_test);
   RUN_TEST(for_test_coverage);
 
   gHeap.CleanProcessExit();
@@ -105,6 +105,12 @@ struct ObjHeader {
     return {kNotInPool, TypeTag::Str, kZeroMask, HeapTag::Opaque, kUndefinedId};
   }
 
+  // A Str that refers to the bytes of its parent Str, which is its only child
+  static constexpr ObjHeader StrSlice(uint32_t field_mask) {
+    return {kNotInPool, TypeTag::Str, field_mask, HeapTag::FixedSize,
+            kUndefinedId};
+  }
+
   static constexpr ObjHeader Slab(uint8_t heap_tag, uint32_t num_pointers) {
     return {kNotInPool, TypeTag::Slab, num_pointers, heap_tag, kUndefinedId};
   }
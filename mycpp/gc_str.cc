@@ -2,6 +2,7 @@
 
 #include <ctype.h>  // isalpha(), isdigit()
 #include <stdarg.h>
+#include <string.h>  // memchr(), memmem()
 
 #include <regex>
 
@@ -12,31 +13,97 @@
 
 GLOBAL_STR(kEmptyString, "");
 
+// Same layout as GLOBAL_STR()
+#define ONE_BYTE_STR(c)                                                  \
+  {                                                                      \
+    {kNotInPool, TypeTag::Str, kZeroMask, HeapTag::Global, kIsGlobal}, { \
+      1, { static_cast<char>(c), '\0' }                                  \
+    }                                                                    \
+  }
+#define ONE_BYTE_STR_4(c)                                       \
+  ONE_BYTE_STR(c), ONE_BYTE_STR(c + 1), ONE_BYTE_STR(c + 2), \
+      ONE_BYTE_STR(c + 3)
+#define ONE_BYTE_STR_16(c)                                          \
+  ONE_BYTE_STR_4(c), ONE_BYTE_STR_4(c + 4), ONE_BYTE_STR_4(c + 8), \
+      ONE_BYTE_STR_4(c + 12)
+#define ONE_BYTE_STR_64(c)                                              \
+  ONE_BYTE_STR_16(c), ONE_BYTE_STR_16(c + 16), ONE_BYTE_STR_16(c + 32), \
+      ONE_BYTE_STR_16(c + 48)
+
+GcGlobal<GlobalStr<2>> gOneByteStr[256] = {
+    ONE_BYTE_STR_64(0), ONE_BYTE_STR_64(64), ONE_BYTE_STR_64(128),
+    ONE_BYTE_STR_64(192)};
+
+#undef ONE_BYTE_STR
+#undef ONE_BYTE_STR_4
+#undef ONE_BYTE_STR_16
+#undef ONE_BYTE_STR_64
+
+const char* Str::c_str() {
+  if (!IsStrSlice(this)) {
+    return data_;
+  }
+  StrSlice* slice = reinterpret_cast<StrSlice*>(this);
+  Str* parent = slice->parent_;
+  if (slice->begin_ + slice->len_ < len(parent)) {
+    // Not a suffix, so there's no NUL terminator.  Copy the bytes once, and
+    // point the slice at the copy.
+    Str* copy = NewStr(slice->len_);
+    memcpy(copy->data_, parent->data_ + slice->begin_, slice->len_);
+    WriteBarrier(parent);
+    slice->parent_ = copy;
+    slice->begin_ = 0;
+  }
+  return slice->parent_->data_ + slice->begin_;
+}
+
 static const std::regex gStrFmtRegex("([^%]*)(?:%(-?[0-9]*)(.))?");
 static const int kMaxFmtWidth = 256;  // arbitrary...
 
+// Searching is done with memchr(), memrchr() and memmem().  glibc picks SSE2,
+// AVX2 or EVEX versions of them when the program is loaded, based on the CPU,
+// and has scalar fallbacks.  So we don't need our own intrinsics.
+
+// Like memmem(), but returns the end of the haystack on no match
+static inline const char* FindBytes(const char* p, const char* end,
+                                    const char* needle, int needle_len) {
+  const char* q;
+  if (needle_len == 1) {
+    q = static_cast<const char*>(memchr(p, needle[0], end - p));
+  } else {
+    q = static_cast<const char*>(memmem(p, end - p, needle, needle_len));
+  }
+  return q ? q : end;
+}
+
 int Str::find(Str* needle, int pos) {
   int len_ = len(this);
   assert(len(needle) == 1);  // Oil's usage
-  char c = needle->data_[0];
-  for (int i = pos; i < len_; ++i) {
-    if (data_[i] == c) {
-      return i;
-    }
+  if (pos >= len_) {
+    return -1;
   }
-  return -1;
+  char c = needle->data()[0];
+  const char* d = data();
+  const char* p = static_cast<const char*>(memchr(d + pos, c, len_ - pos));
+  return p ? p - d : -1;
 }
 
 int Str::rfind(Str* needle) {
   int len_ = len(this);
   assert(len(needle) == 1);  // Oil's usage
-  char c = needle->data_[0];
+  char c = needle->data()[0];
+  const char* d = data();
+#ifdef __GLIBC__
+  const char* p = static_cast<const char*>(memrchr(d, c, len_));
+  return p ? p - d : -1;
+#else
   for (int i = len_ - 1; i >= 0; --i) {
-    if (data_[i] == c) {
+    if (d[i] == c) {
       return i;
     }
   }
   return -1;
+#endif
 }
 
 bool Str::isdigit() {
@@ -44,8 +111,9 @@ bool Str::isdigit() {
   if (n == 0) {
     return false;  // special case
   }
+  const char* d = data();
   for (int i = 0; i < n; ++i) {
-    if (!::isdigit(data_[i])) {
+    if (!::isdigit(d[i])) {
       return false;
     }
   }
@@ -57,8 +125,9 @@ bool Str::isalpha() {
   if (n == 0) {
     return false;  // special case
   }
+  const char* d = data();
   for (int i = 0; i < n; ++i) {
-    if (!::isalpha(data_[i])) {
+    if (!::isalpha(d[i])) {
       return false;
     }
   }
@@ -71,8 +140,9 @@ bool Str::isupper() {
   if (n == 0) {
     return false;  // special case
   }
+  const char* d = data();
   for (int i = 0; i < n; ++i) {
-    if (!::isupper(data_[i])) {
+    if (!::isupper(d[i])) {
       return false;
     }
   }
@@ -84,7 +154,7 @@ bool Str::startswith(Str* s) {
   if (n > len(this)) {
     return false;
   }
-  return memcmp(data_, s->data_, n) == 0;
+  return memcmp(data(), s->data(), n) == 0;
 }
 
 bool Str::endswith(Str* s) {
@@ -93,8 +163,8 @@ bool Str::endswith(Str* s) {
   if (len_s > len_this) {
     return false;
   }
-  const char* start = data_ + len_this - len_s;
-  return memcmp(start, s->data_, len_s) == 0;
+  const char* start = data() + len_this - len_s;
+  return memcmp(start, s->data(), len_s) == 0;
 }
 
 // Get a string with one character
@@ -106,9 +176,7 @@ Str* Str::index_(int i) {
   assert(i >= 0);
   assert(i < len_);  // had a problem here!
 
-  Str* result = NewStr(1);
-  result->data_[0] = data_[i];
-  return result;
+  return OneByteStr(data()[i]);
 }
 
 // s[begin:end:step]
@@ -153,11 +221,16 @@ Str* Str::slice(int begin, int end, int step) {
   assert(new_len >= 0);
   assert(new_len <= len_);
 
+  const char* d = data();
+  if (new_len == 1) {
+    return OneByteStr(d[begin]);
+  }
+
   Str* result = NewStr(new_len + 1);
   // step might be negative
   int j = 0;
   for (int i = begin; begin <= i && i < end; i += step, j++) {
-    result->data_[j] = data_[i];
+    result->data_[j] = d[i];
   }
   result->data_[new_len] = '\0';
 
@@ -204,10 +277,15 @@ Str* Str::slice(int begin, int end) {
   assert(new_len >= 0);
   assert(new_len <= len_);
 
-  Str* result = NewStr(new_len);
-  memcpy(result->data_, data_ + begin, new_len);
+  if (new_len == len_) {
+    return this;  // s[:] and s[0:n]
+  }
+  if (new_len == 1) {
+    return OneByteStr(data()[begin]);
+  }
 
-  return result;
+  // Long slices share our bytes
+  return NewStrSlice(this, begin, new_len);
 }
 
 // s[begin:]
@@ -233,8 +311,9 @@ Str* Str::upper() {
   int len_ = len(this);
   Str* result = NewStr(len_);
   char* buffer = result->data();
+  const char* d = data();
   for (int char_index = 0; char_index < len_; ++char_index) {
-    buffer[char_index] = toupper(data_[char_index]);
+    buffer[char_index] = toupper(d[char_index]);
   }
   return result;
 }
@@ -243,8 +322,9 @@ Str* Str::lower() {
   int len_ = len(this);
   Str* result = NewStr(len_);
   char* buffer = result->data();
+  const char* d = data();
   for (int char_index = 0; char_index < len_; ++char_index) {
-    buffer[char_index] = tolower(data_[char_index]);
+    buffer[char_index] = tolower(d[char_index]);
   }
   return result;
 }
@@ -258,8 +338,8 @@ Str* Str::ljust(int width, Str* fillchar) {
     return this;
   } else {
     Str* result = NewStr(width);
-    char c = fillchar->data_[0];
-    memcpy(result->data_, data_, len_);
+    char c = fillchar->data()[0];
+    memcpy(result->data_, data(), len_);
     for (int i = len_; i < width; ++i) {
       result->data_[i] = c;
     }
@@ -276,35 +356,32 @@ Str* Str::rjust(int width, Str* fillchar) {
     return this;
   } else {
     Str* result = NewStr(width);
-    char c = fillchar->data_[0];
+    char c = fillchar->data()[0];
     for (int i = 0; i < num_fill; ++i) {
       result->data_[i] = c;
     }
-    memcpy(result->data_ + num_fill, data_, len_);
+    memcpy(result->data_ + num_fill, data(), len_);
     return result;
   }
 }
 
 Str* Str::replace(Str* old, Str* new_str) {
-  // log("replacing %s with %s", old_data, new_str->data_);
-  const char* old_data = old->data_;
+  // log("replacing %s with %s", old_data, new_str->data());
+  const char* old_data = old->data();
+  const char* this_data = data();
 
   int this_len = len(this);
   int old_len = len(old);
+  DCHECK(old_len > 0);
 
-  const char* last_possible = data_ + this_len - old_len;
-
-  const char* p_this = data_;  // advances through 'this'
+  const char* end = this_data + this_len;
 
   // First pass: Calculate number of replacements, and hence new length
   int replace_count = 0;
-  while (p_this <= last_possible) {
-    if (memcmp(p_this, old_data, old_len) == 0) {  // equal
-      replace_count++;
-      p_this += old_len;
-    } else {
-      p_this++;
-    }
+  const char* p_this = FindBytes(this_data, end, old_data, old_len);
+  while (p_this != end) {
+    replace_count++;
+    p_this = FindBytes(p_this + old_len, end, old_data, old_len);
   }
 
   // log("replacements %d", replace_count);
@@ -319,26 +396,22 @@ Str* Str::replace(Str* old, Str* new_str) {
 
   Str* result = NewStr(result_len);
 
-  const char* new_data = new_str->data_;
+  const char* new_data = new_str->data();
   const size_t new_len = new_str_len;
 
   // Second pass: Copy pieces into 'result'
-  p_this = data_;                  // back to beginning
+  p_this = this_data;              // back to beginning
   char* p_result = result->data_;  // advances through 'result'
 
-  while (p_this <= last_possible) {
-    // Note: would be more efficient if we remembered the match positions
-    if (memcmp(p_this, old_data, old_len) == 0) {  // equal
-      memcpy(p_result, new_data, new_len);         // Copy from new_str
-      p_result += new_len;
-      p_this += old_len;
-    } else {  // copy 1 byte
-      *p_result = *p_this;
-      p_result++;
-      p_this++;
-    }
+  for (int i = 0; i < replace_count; ++i) {
+    const char* match = FindBytes(p_this, end, old_data, old_len);
+    memcpy(p_result, p_this, match - p_this);  // Copy the part before it
+    p_result += match - p_this;
+    memcpy(p_result, new_data, new_len);  // Copy from new_str
+    p_result += new_len;
+    p_this = match + old_len;
   }
-  memcpy(p_result, p_this, data_ + this_len - p_this);  // last part of string
+  memcpy(p_result, p_this, end - p_this);  // last part
   return result;
 }
 
@@ -395,11 +468,11 @@ Str* StripAny(Str* s, StripWhere where, int what) {
     return s;
   }
 
-  // Note: makes a copy in leaky version, and will in GC version too
   int new_len = j - i;
-  Str* result = NewStr(new_len);
-  memcpy(result->data(), s->data() + i, new_len);
-  return result;
+  if (new_len == 1) {
+    return OneByteStr(char_data[i]);
+  }
+  return NewStrSlice(s, i, new_len);
 }
 
 Str* Str::strip() {
@@ -409,7 +482,7 @@ Str* Str::strip() {
 // Used for CommandSub in osh/cmd_exec.py
 Str* Str::rstrip(Str* chars) {
   assert(len(chars) == 1);
-  int c = chars->data_[0];
+  int c = chars->data()[0];
   return StripAny(this, StripWhere::Right, c);
 }
 
@@ -419,7 +492,7 @@ Str* Str::rstrip() {
 
 Str* Str::lstrip(Str* chars) {
   assert(len(chars) == 1);
-  int c = chars->data_[0];
+  int c = chars->data()[0];
   return StripAny(this, StripWhere::Left, c);
 }
 
@@ -456,14 +529,14 @@ Str* Str::join(List<Str*>* items) {
   for (int i = 0; i < num_parts; ++i) {
     // log("i %d", i);
     if (i != 0 && this_len) {             // optimize common case of ''.join()
-      memcpy(p_result, data_, this_len);  // copy the separator
+      memcpy(p_result, data(), this_len);  // copy the separator
       p_result += this_len;
       // log("this_len %d", this_len);
     }
 
     int n = len(items->index_(i));
     // log("n: %d", n);
-    memcpy(p_result, items->index_(i)->data_, n);  // copy the list item
+    memcpy(p_result, items->index_(i)->data(), n);  // copy the list item
     p_result += n;
   }
 
@@ -475,9 +548,10 @@ static void AppendPart(List<Str*>* result, Str* s, int left, int right) {
   Str* part;
   if (new_len == 0) {
     part = kEmptyString;
+  } else if (new_len == 1) {
+    part = OneByteStr(s->data()[left]);
   } else {
-    part = NewStr(new_len);
-    memcpy(part->data_, s->data_ + left, new_len);
+    part = NewStrSlice(s, left, new_len);
   }
   result->append(part);
 }
@@ -487,7 +561,8 @@ static void AppendPart(List<Str*>* result, Str* s, int left, int right) {
 List<Str*>* Str::split(Str* sep, int max_split) {
   DCHECK(sep != nullptr);
   DCHECK(len(sep) == 1);  // we can only split one char
-  char sep_char = sep->data_[0];
+  char sep_char = sep->data()[0];
+  const char* d = data();
 
   int str_len = len(this);
   if (str_len == 0) {
@@ -502,15 +577,16 @@ List<Str*>* Str::split(Str* sep, int max_split) {
 
   while (right < str_len && num_parts < max_split) {
     // search for separator
-    for (; right < str_len; right++) {
-      if (data_[right] == sep_char) {
-        AppendPart(result, this, left, right);
-        right++;
-        left = right;
-        num_parts++;
-        break;
-      }
+    const char* p = static_cast<const char*>(
+        memchr(d + right, sep_char, str_len - right));
+    if (p == nullptr) {
+      break;
     }
+    right = p - d;
+    AppendPart(result, this, left, right);
+    right++;
+    left = right;
+    num_parts++;
   }
   if (num_parts == 0) {  // Optimization when there is no split
     result->append(this);
@@ -628,10 +704,7 @@ static inline Str* _StrFormat(const char* fmt, int fmt_len, va_list args) {
 }
 
 Str* StrIter::Value() {  // similar to index_()
-  Str* result = NewStr(1);
-  result->data_[0] = s_->data_[i_];
-  DCHECK(result->data_[1] == '\0');
-  return result;
+  return OneByteStr(s_->data()[i_]);
 }
 
 Str* StrFormat(const char* fmt, ...) {
@@ -13,9 +13,13 @@ class Str {
   Str() {
   }
 
-  char* data() {
-    return data_;
-  }
+  // The bytes of the string.  A Str may be a StrSlice that shares the bytes
+  // of another Str, so they are NOT necessarily NUL-terminated.
+  inline char* data();
+
+  // For passing to libc, which expects a NUL terminator.  This may copy the
+  // bytes of a StrSlice.
+  const char* c_str();
 
   // Call this after writing into buffer created by OverAllocatedStr()
   void MaybeShrink(int str_len);
@@ -75,7 +79,9 @@ class Str {
   }
 
   int len_;
-  char data_[1];  // flexible array
+  // Flexible array.  Fill it in after NewStr(), but read it with data(),
+  // which handles StrSlice.
+  char data_[1];
 
  private:
   int _strip_left_pos();
@@ -86,7 +92,51 @@ class Str {
 
 constexpr int kStrHeaderSize = offsetof(Str, data_);
 
+// A Str that shares the bytes of its parent, rather than copying them.  It's
+// returned by Str::slice(), split(), and BufLineReader::readline() for long
+// pieces, and it keeps its parent alive.
+//
+// It has TypeTag::Str like other strings, but HeapTag::FixedSize so the GC
+// traces the parent.  Code that reads a Str must call data() or c_str(), not
+// access data_ directly.
+class StrSlice {
+ public:
+  int len_;      // at the same offset as Str::len_, so len() works
+  int begin_;    // offset into the parent
+  Str* parent_;  // never another StrSlice
+
+  static constexpr ObjHeader obj_header() {
+    return ObjHeader::StrSlice(maskbit(offsetof(StrSlice, parent_)));
+  }
+};
+
+// Shorter slices are copied.  The memcpy() is cheap, and a StrSlice object is
+// about as big as a short copy, without keeping the parent alive.
+const int kMinSliceLen = 32;
+
+inline bool IsStrSlice(const Str* s) {
+  return ObjHeader::FromObject(s)->heap_tag == HeapTag::FixedSize;
+}
+
+// hash() caches its result in the header bits that the GC doesn't use for an
+// Opaque Str.  Returns 0 if it hasn't been computed.
+inline int CachedHash(const Str* s) {
+  if (IsStrSlice(s)) {
+    return 0;  // the bits hold the field mask
+  }
+  return FIELD_MASK(*ObjHeader::FromObject(s));
+}
+
+inline char* Str::data() {
+  if (IsStrSlice(this)) {
+    StrSlice* slice = reinterpret_cast<StrSlice*>(this);
+    return slice->parent_->data_ + slice->begin_;
+  }
+  return data_;
+}
+
 // Note: for SmallStr, we might copy into the VALUE
+// Only valid for a fresh string, not a StrSlice.
 inline void Str::MaybeShrink(int str_len) {
   len_ = str_len;
   data_[len_] = '\0';  // NUL terminate
@@ -166,4 +216,17 @@ class GlobalStr {
       {sizeof(val) - 1, val}};                                           \
   Str* name = reinterpret_cast<Str*>(&_##name.obj);
 
+// Shared instances of all 1-byte strings.  Most strings the shell creates are
+// tiny, e.g. s[i], chr(), IFS chars, and single-char tokens.  Returning these
+// avoids a heap allocation, and the GC never marks or sweeps them.
+//
+// This is only valid because Str is immutable once it's returned from a
+// "constructor".  (NewStr() and OverAllocatedStr() return fresh objects for
+// the caller to fill in.)
+extern GcGlobal<GlobalStr<2>> gOneByteStr[256];
+
+inline Str* OneByteStr(uint8_t c) {
+  return reinterpret_cast<Str*>(&gOneByteStr[c].obj);
+}
+
 #endif  // MYCPP_GC_STR_H
@@ -1,6 +1,7 @@
 #include "mycpp/gc_str.h"
 
 #include <limits.h>  // INT_MAX
+#include <time.h>    // clock_gettime()
 
 #include "mycpp/comparators.h"  // str_equals
 #include "mycpp/gc_alloc.h"     // gHeap
@@ -1430,6 +1431,220 @@ TEST str_iters_test() {
   PASS();
 }
 
+TEST one_byte_str_test() {
+  Str* s = StrFromC("a:b");
+
+  // These don't allocate
+  Str* a = OneByteStr('a');
+  ASSERT_EQ(a, s->index_(0));
+  ASSERT_EQ(a, s->slice(0, 1));
+  ASSERT_EQ(a, chr('a'));
+  ASSERT_EQ(a, StrFromC("a"));
+  ASSERT_EQ(a, StrFromC(" a ")->strip());
+
+  List<Str*>* parts = s->split(StrFromC(":"));
+  ASSERT_EQ(a, parts->index_(0));
+  ASSERT_EQ(OneByteStr('b'), parts->index_(1));
+
+  ASSERT_EQ(OneByteStr('7'), str(7));
+  ASSERT(str_equals0("10", str(10)));
+
+  StrIter it(s);
+  ASSERT_EQ(a, it.Value());
+
+  // All bytes, including NUL
+  for (int i = 0; i < 256; ++i) {
+    Str* c = OneByteStr(i);
+    ASSERT_EQ_FMT(1, len(c), "%d");
+    ASSERT_EQ_FMT(i, ord(c), "%d");
+    ASSERT_EQ_FMT('\0', c->data_[1], "%d");
+    ASSERT_EQ_FMT(HeapTag::Global, ObjHeader::FromObject(c)->heap_tag, "%d");
+  }
+
+  // s[:] and concatenation with '' return the same string
+  ASSERT_EQ(s, s->slice(0, 3));
+  ASSERT_EQ(s, str_concat(s, kEmptyString));
+  ASSERT_EQ(s, str_concat(kEmptyString, s));
+
+  PASS();
+}
+
+TEST str_slice_share_test() {
+  Str* s = nullptr;
+  Str* sl = nullptr;
+  Str* part = nullptr;
+  StackRoots _roots({&s, &sl, &part});
+
+  s = StrFromC("0123456789abcdefghijklmnopqrstuvwxyz:ABCDEFGHIJKLMNOPQRSTUVWXYZ");
+
+  // Short slices are copied
+  Str* short_slice = s->slice(0, 3);
+  ASSERT(!IsStrSlice(short_slice));
+  ASSERT(str_equals0("012", short_slice));
+
+  // Long slices share the bytes of the original string
+  sl = s->slice(1, 35);
+  ASSERT(IsStrSlice(sl));
+  ASSERT_EQ_FMT(34, len(sl), "%d");
+  ASSERT_EQ(s->data() + 1, sl->data());
+  ASSERT(str_equals0("123456789abcdefghijklmnopqrstuvwxy", sl));
+  ASSERT(sl->startswith(StrFromC("1234")));
+  ASSERT(sl->endswith(StrFromC("wxy")));
+  ASSERT_EQ_FMT(33, sl->find(StrFromC("y")), "%d");
+  ASSERT(str_equals(sl, StrFromC("123456789abcdefghijklmnopqrstuvwxy")));
+
+  // A slice of a slice points to the original
+  Str* sl2 = sl->slice(1, 33);
+  ASSERT(IsStrSlice(sl2));
+  ASSERT_EQ(s, reinterpret_cast<StrSlice*>(sl2)->parent_);
+  ASSERT_EQ(s->data() + 2, sl2->data());
+
+  // split() shares long parts
+  List<Str*>* parts = s->split(StrFromC(":"));
+  ASSERT_EQ_FMT(2, len(parts), "%d");
+  part = parts->index_(0);
+  ASSERT(IsStrSlice(part));
+  ASSERT(str_equals0("0123456789abcdefghijklmnopqrstuvwxyz", part));
+  part = parts->index_(1);
+  ASSERT(!IsStrSlice(part));  // shorter than kMinSliceLen
+  ASSERT(str_equals0("ABCDEFGHIJKLMNOPQRSTUVWXYZ", part));
+
+  // A suffix is already NUL-terminated, so c_str() doesn't copy
+  Str* suffix = s->slice(2);
+  ASSERT(IsStrSlice(suffix));
+  ASSERT_EQ(s->data() + 2, suffix->c_str());
+
+  // Otherwise c_str() copies once
+  const char* c = sl->c_str();
+  ASSERT(c != s->data() + 1);
+  ASSERT_EQ_FMT(34, static_cast<int>(strlen(c)), "%d");
+  ASSERT_EQ(c, sl->c_str());
+  ASSERT(str_equals0("123456789abcdefghijklmnopqrstuvwxy", sl));
+
+  // The slice keeps its parent alive
+  sl = s->slice(3, 40);
+  s = nullptr;
+  gHeap.Collect();
+  ASSERT(str_equals0("3456789abcdefghijklmnopqrstuvwxyz:ABC", sl));
+
+  PASS();
+}
+
+// The byte loops that find(), replace() and str_contains() used before they
+// were built on memchr() and memmem()
+
+static int NaiveFind(const char* d, int n, char c) {
+  for (int i = 0; i < n; ++i) {
+    if (d[i] == c) {
+      return i;
+    }
+  }
+  return -1;
+}
+
+static int NaiveCount(const char* d, int n, const char* needle, int needle_len) {
+  int count = 0;
+  const char* last_possible = d + n - needle_len;
+  const char* p = d;
+  while (p <= last_possible) {
+    if (memcmp(p, needle, needle_len) == 0) {
+      count++;
+      p += needle_len;
+    } else {
+      p++;
+    }
+  }
+  return count;
+}
+
+static double NowMs() {
+  struct timespec ts;
+  clock_gettime(CLOCK_MONOTONIC, &ts);
+  return ts.tv_sec * 1000.0 + ts.tv_nsec / 1e6;
+}
+
+TEST str_search_test() {
+  ASSERT_EQ(4, StrFromC("abc-abc")->find(StrFromC("a"), 1));
+  ASSERT_EQ(-1, StrFromC("abc-abc")->find(StrFromC("a"), 5));
+  ASSERT_EQ(-1, StrFromC("abc")->find(StrFromC("a"), 3));
+
+  // Matches don't overlap
+  ASSERT(str_equals0("ba", StrFromC("aaa")->replace(StrFromC("aa"),
+                                                    StrFromC("b"))));
+  ASSERT(str_equals0("-X-X-", StrFromC("-ab-ab-")->replace(StrFromC("ab"),
+                                                           StrFromC("X"))));
+  ASSERT(str_equals0("xyzxyz", StrFromC("..")->replace(StrFromC("."),
+                                                       StrFromC("xyz"))));
+
+  ASSERT(str_contains(StrFromC("foo.bar"), StrFromC("o.b")));
+  ASSERT(str_contains(StrFromC("foo.bar"), kEmptyString));
+  ASSERT(!str_contains(StrFromC("foo.bar"), StrFromC("o.x")));
+
+  PASS();
+}
+
+// Microbenchmark against the old loops.  Timings are only logged.
+TEST str_search_bench_test() {
+  const int n = 1 << 20;
+  const int iters = 50;
+
+  Str* big = nullptr;
+  Str* needle = nullptr;
+  StackRoots _roots({&big, &needle});
+
+  // A PATH-like string with the interesting bytes at the end
+  big = NewStr(n);
+  for (int i = 0; i < n; ++i) {
+    big->data_[i] = 'a' + i % 23;
+  }
+  memcpy(big->data_ + n - 8, ":/bin/ls", 8);
+  needle = StrFromC("/bin");
+
+  double start = NowMs();
+  int expected = 0;
+  for (int i = 0; i < iters; ++i) {
+    expected = NaiveFind(big->data_, n, ':');
+  }
+  double naive_ms = NowMs() - start;
+
+  start = NowMs();
+  int actual = 0;
+  for (int i = 0; i < iters; ++i) {
+    actual = big->find(StrFromC(":"));
+  }
+  double fast_ms = NowMs() - start;
+  ASSERT_EQ(expected, actual);
+  log("find()     loop %.2f ms, memchr %.2f ms", naive_ms, fast_ms);
+
+  start = NowMs();
+  for (int i = 0; i < iters; ++i) {
+    expected = NaiveCount(big->data_, n, needle->data_, len(needle));
+  }
+  naive_ms = NowMs() - start;
+
+  start = NowMs();
+  Str* replaced = nullptr;
+  for (int i = 0; i < iters; ++i) {
+    replaced = big->replace(needle, StrFromC("/usr/bin"));
+  }
+  fast_ms = NowMs() - start;
+  ASSERT_EQ(1, expected);
+  ASSERT_EQ(n + 4, len(replaced));
+  log("replace()  loop %.2f ms (count only), memmem %.2f ms", naive_ms,
+      fast_ms);
+
+  start = NowMs();
+  bool found = false;
+  for (int i = 0; i < iters; ++i) {
+    found = str_contains(big, needle);
+  }
+  fast_ms = NowMs() - start;
+  ASSERT(found);
+  log("contains() memmem %.2f ms", fast_ms);
+
+  PASS();
+}
+
 GREATEST_MAIN_DEFS();
 
 int main(int argc, char** argv) {
@@ -1467,6 +1682,10 @@ int main(int argc, char** argv) {
   RUN_TEST(str_methods_test);
   RUN_TEST(str_funcs_test);
   RUN_TEST(str_iters_test);
+  RUN_TEST(one_byte_str_test);
+  RUN_TEST(str_slice_share_test);
+  RUN_TEST(str_search_test);
+  RUN_TEST(str_search_bench_test);
 
   gHeap.CleanProcessExit();
 
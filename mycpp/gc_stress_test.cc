@@ -2,6 +2,8 @@
 
 #include <unistd.h>  // STDERR_FILENO
 
+#include <vector>
+
 #include "mycpp/runtime.h"
 #include "vendor/greatest.h"
 
@@ -200,6 +202,135 @@ TEST dict_growth_test() {
   PASS();
 }
 
+// Build a big graph, and collect it with several threads, like
+// OILS_GC_THREADS=4
+TEST parallel_collect_test() {
+  gHeap.Init(1 << 30);  // only collect explicitly
+  gHeap.gc_threads_ = 4;
+
+  List<List<Str*>*>* outer = nullptr;
+  List<Str*>* inner = nullptr;
+  Str* s = nullptr;
+  StackRoots _roots({&outer, &inner, &s});
+
+  int base = gHeap.Collect();
+
+  outer = NewList<List<Str*>*>();
+  int n = 2000;
+  int m = 50;
+  for (int i = 0; i < n; ++i) {
+    inner = NewList<Str*>();
+    outer->append(inner);
+    for (int j = 0; j < m; ++j) {
+      s = str(i * m + j);
+      inner->append(s);
+      inner->append(s);  // shared child is marked once
+    }
+    // Garbage
+    for (int j = 0; j < 10; ++j) {
+      NewList<Str*>();
+    }
+  }
+  inner = nullptr;
+  s = nullptr;
+
+  // outer + its slab, n lists and n slabs, n*m strings, minus one-byte ones
+  int expected = base + 2 + 2 * n + (n * m - 10);
+  for (int round = 0; round < 3; ++round) {
+    ASSERT_EQ_FMT(expected, gHeap.Collect(), "%d");
+  }
+
+  // Check that nothing live was freed
+  int total = 0;
+  for (int i = 0; i < n; ++i) {
+    List<Str*>* L = outer->index_(i);
+    for (int j = 0; j < m; ++j) {
+      total += to_int(L->index_(2 * j)) == i * m + j;
+    }
+  }
+  ASSERT_EQ_FMT(n * m, total, "%d");
+
+  // Drop everything
+  outer = nullptr;
+  ASSERT_EQ_FMT(base, gHeap.Collect(), "%d");
+
+  gHeap.gc_threads_ = 1;
+  PASS();
+}
+
+// Mutate a dict of lists while MaybeCollect() collects in slices, like
+// OILS_GC_PAUSE_US=1
+TEST incremental_collect_test() {
+  gHeap.Init(1000);
+  gHeap.gc_pause_usec_ = 1;
+
+  Dict<Str*, List<Str*>*>* D = nullptr;
+  List<Str*>* L = nullptr;
+  Str* key = nullptr;
+  Str* s = nullptr;
+  List<Str*>* moved = nullptr;  // the last root is marked first
+  StackRoots _roots({&D, &L, &key, &s, &moved});
+
+  D = Alloc<Dict<Str*, List<Str*>*>>();
+  moved = NewList<Str*>();
+  std::vector<int> expected;
+
+  int m = 300;
+  for (int i = 0; i < 30000; ++i) {
+    gHeap.MaybeCollect();
+
+    key = str(i % m);
+    L = D->get(key, nullptr);
+    if (L == nullptr || i % 7 == 0) {
+      L = NewList<Str*>();
+      D->set(key, L);  // overwrites a list
+    }
+    s = str(i);
+    L->append(s);
+    if (i % 13 == 0) {
+      L->set(0, str(i + m));  // same key
+    }
+    if (i % 11 == 0) {
+      // Only the write barrier in pop() keeps this alive if moved is already
+      // marked
+      s = L->pop(0);
+      moved->append(s);
+      expected.push_back(to_int(s));
+      if (len(L) == 0) {
+        D->set(key, NewList<Str*>());
+      }
+    }
+  }
+  key = nullptr;
+  L = nullptr;
+  s = nullptr;
+  log("%d slices", gHeap.num_slices_);
+#ifndef GC_ALWAYS
+  // GC_ALWAYS makes MaybeCollect() do a full Collect(), never a slice.  The
+  // checks below still apply.
+  ASSERT(gHeap.num_slices_ > 0);
+#endif
+
+  // Check that nothing live was freed
+  for (int k = 0; k < m; ++k) {
+    L = D->index_(str(k));
+    for (ListIter<Str*> it(L); !it.Done(); it.Next()) {
+      ASSERT_EQ_FMT(k, to_int(it.Value()) % m, "%d");
+    }
+  }
+  int n = expected.size();
+  ASSERT_EQ_FMT(n, len(moved), "%d");
+  for (int i = 0; i < n; ++i) {
+    ASSERT_EQ_FMT(expected[i], to_int(moved->index_(i)), "%d");
+  }
+
+  gHeap.gc_pause_usec_ = 0;
+  gHeap.Collect();  // finishes the incremental collection too
+  ASSERT(gHeap.phase() == GcPhase::Idle);
+
+  PASS();
+}
+
 GREATEST_MAIN_DEFS();
 
 int main(int argc, char** argv) {
@@ -214,6 +345,8 @@ int main(int argc, char** argv) {
   RUN_TEST(list_slice_append_test);
   RUN_TEST(list_str_growth_test);
   RUN_TEST(dict_growth_test);
+  RUN_TEST(parallel_collect_test);
+  RUN_TEST(incremental_collect_test);
 
   gHeap.CleanProcessExit();
 
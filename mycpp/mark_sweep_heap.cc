@@ -1,12 +1,18 @@
 #include "mycpp/mark_sweep_heap.h"
 
 #include <inttypes.h>  // PRId64
+#include <sched.h>     // sched_yield()
+#include <stdint.h>    // INT64_MAX
 #include <stdlib.h>    // getenv()
 #include <string.h>    // strlen()
 #include <sys/time.h>  // gettimeofday()
 #include <time.h>      // clock_gettime(), CLOCK_PROCESS_CPUTIME_ID
 #include <unistd.h>    // STDERR_FILENO
 
+#include <atomic>
+#include <mutex>
+#include <thread>
+
 #include "_build/detected-cpp-config.h"  // for GC_TIMING
 #include "mycpp/gc_builtins.h"           // StringToInteger()
 #include "mycpp/gc_slab.h"
@@ -14,6 +20,29 @@
 // TODO: Remove this guard when we have separate binaries
 #if MARK_SWEEP
 
+// Smaller heaps are collected on one thread, since starting threads costs
+// more than it saves
+const int kMinParallelLive = 50000;
+
+const int kMaxGcThreads = 64;
+
+// Incremental collection checks the clock after this many objects
+const int kSliceCheckInterval = 256;
+// and after sweeping this many pool blocks
+const int kSliceCheckBlocks = 16;
+
+// Slices at the prompt can be longer, since the user isn't waiting on them
+const int kIdleSliceFactor = 4;
+
+// Wall clock time, for pause budgets and stats
+static int64_t NowMicros() {
+  struct timespec ts;
+  if (clock_gettime(CLOCK_MONOTONIC, &ts) < 0) {
+    assert(0);
+  }
+  return static_cast<int64_t>(ts.tv_sec) * 1000000 + ts.tv_nsec / 1000;
+}
+
 void MarkSweepHeap::Init() {
   Init(1000);  // collect at 1000 objects in tests
 }
@@ -31,6 +60,22 @@ void MarkSweepHeap::Init(int gc_threshold) {
     }
   }
 
+  e = getenv("OILS_GC_THREADS");
+  if (e) {
+    int result;
+    if (StringToInteger(e, strlen(e), 10, &result) && result >= 1) {
+      gc_threads_ = std::min(result, kMaxGcThreads);
+    }
+  }
+
+  e = getenv("OILS_GC_PAUSE_US");
+  if (e) {
+    int result;
+    if (StringToInteger(e, strlen(e), 10, &result) && result >= 0) {
+      gc_pause_usec_ = result;
+    }
+  }
+
   // only for developers
   e = getenv("_OILS_GC_VERBOSE");
   if (e && strcmp(e, "1") == 0) {
@@ -47,8 +92,14 @@ int MarkSweepHeap::MaybeCollect() {
   int result = Collect();
   #else
   int result = -1;
-  if (num_live() > gc_threshold_) {
-    result = Collect();
+  if (phase_ != GcPhase::Idle) {
+    result = CollectSlice(gc_pause_usec_);  // continue
+  } else if (num_live() > gc_threshold_) {
+    if (gc_pause_usec_) {
+      result = CollectSlice(gc_pause_usec_);
+    } else {
+      result = Collect();
+    }
   }
   #endif
 
@@ -56,6 +107,19 @@ int MarkSweepHeap::MaybeCollect() {
   return result;
 }
 
+// Waiting for input is a good time to collect.  Start collections early, at
+// half the threshold, and do more work per slice.
+void MarkSweepHeap::CollectIdle() {
+  if (gc_pause_usec_ == 0) {
+    MaybeCollect();
+    return;
+  }
+  if (phase_ != GcPhase::Idle || num_live() > gc_threshold_ / 2) {
+    CollectSlice(gc_pause_usec_ * kIdleSliceFactor);
+  }
+  num_gc_points_++;
+}
+
   #if defined(BUMP_SMALL) || defined(BUMP_BIG)
     #include "mycpp/bump_leak_heap.h"
 
@@ -69,7 +133,11 @@ void* MarkSweepHeap::Allocate(size_t num_bytes, int* obj_id, bool* in_pool) {
   #ifndef NO_POOL_ALLOC
   if (num_bytes <= pool_.kMaxObjSize) {
     *in_pool = true;
-    return pool_.Allocate(obj_id);
+    void* result = pool_.Allocate(obj_id);
+    if (phase_ == GcPhase::Marking) {
+      pool_.Mark(*obj_id);  // new objects survive the current collection
+    }
+    return result;
   }
   *in_pool = false;
   #endif
@@ -103,6 +171,11 @@ void* MarkSweepHeap::Allocate(size_t num_bytes, int* obj_id, bool* in_pool) {
     free(dead);
   }
 
+  if (phase_ == GcPhase::Marking) {
+    mark_set_.Grow(greatest_obj_id_);
+    mark_set_.Mark(*obj_id);  // new objects survive the current collection
+  }
+
   void* result = malloc(num_bytes);
   DCHECK(result != nullptr);
 
@@ -166,44 +239,296 @@ void MarkSweepHeap::MaybeMarkAndPush(RawObject* obj) {
   }
 }
 
+void MarkSweepHeap::TraceObject(ObjHeader* header) {
+  switch (header->heap_tag) {
+  case HeapTag::FixedSize: {
+    auto fixed = reinterpret_cast<LayoutFixed*>(header->ObjectAddress());
+    int mask = FIELD_MASK(*header);
+
+    for (int i = 0; i < kFieldMaskBits; ++i) {
+      if (mask & (1 << i)) {
+        RawObject* child = fixed->children_[i];
+        if (child) {
+          MaybeMarkAndPush(child);
+        }
+      }
+    }
+    break;
+  }
+
+  case HeapTag::Scanned: {
+    auto slab = reinterpret_cast<Slab<RawObject*>*>(header->ObjectAddress());
+
+    int n = NUM_POINTERS(*header);
+    for (int i = 0; i < n; ++i) {
+      RawObject* child = slab->items_[i];
+      if (child) {
+        MaybeMarkAndPush(child);
+      }
+    }
+    break;
+  }
+  default:
+    // Only FixedSize and Scanned are pushed
+    FAIL(kShouldNotGetHere);
+  }
+}
+
 void MarkSweepHeap::TraceChildren() {
   while (!gray_stack_.empty()) {
     ObjHeader* header = gray_stack_.back();
     gray_stack_.pop_back();
+    TraceObject(header);
+  }
+}
+
+// Returns true when marking is done, or false if the deadline passed first
+bool MarkSweepHeap::TraceSome(int64_t deadline_usec) {
+  int n = 0;
+  while (!gray_stack_.empty()) {
+    ObjHeader* header = gray_stack_.back();
+    gray_stack_.pop_back();
+    TraceObject(header);
+
+    if (++n % kSliceCheckInterval == 0 && NowMicros() >= deadline_usec) {
+      return gray_stack_.empty();
+    }
+  }
+  return true;
+}
+
+bool MarkSweepHeap::TryMark(ObjHeader* header) {
+  if (header->heap_tag == HeapTag::Global) {  // don't mark or push
+    return false;
+  }
+  #ifndef NO_POOL_ALLOC
+  if (header->in_pool) {
+    return pool_.TryMark(header->obj_id);
+  }
+  #endif
+  return mark_set_.TryMark(header->obj_id);
+}
 
+// Gray objects that a marking thread shares with the others
+struct SharedGrayStack {
+  std::mutex mu;
+  std::vector<ObjHeader*> items;
+  std::atomic<int> size{0};  // read without the lock
+};
+
+// Marks the heap with work-stealing.  Each thread traces from a private
+// stack.  When the stack is big, it moves half of it to its shared stack.  A
+// thread that runs out of work takes its own shared stack, or steals half of
+// another thread's.  Marking ends when all threads are idle, which implies
+// that all stacks are empty.
+class ParallelMarker {
+ public:
+  // Share work when the private stack is bigger than this
+  static const int kShareThreshold = 256;
+
+  ParallelMarker(MarkSweepHeap* heap, int num_threads)
+      : heap_(heap),
+        num_threads_(num_threads),
+        shared_(num_threads),
+        num_active_(num_threads) {
+  }
+
+  void Run(std::vector<ObjHeader*>* gray) {
+    // Deal out the objects reachable from roots
+    int n = gray->size();
+    for (int i = 0; i < n; ++i) {
+      SharedGrayStack& s = shared_[i % num_threads_];
+      s.items.push_back((*gray)[i]);
+      s.size++;
+    }
+    gray->clear();
+
+    std::vector<std::thread> threads;
+    for (int i = 1; i < num_threads_; ++i) {
+      threads.emplace_back(&ParallelMarker::Work, this, i);
+    }
+    Work(0);
+    for (auto& t : threads) {
+      t.join();
+    }
+  }
+
+ private:
+  void Trace(ObjHeader* header, std::vector<ObjHeader*>* local) {
     switch (header->heap_tag) {
     case HeapTag::FixedSize: {
       auto fixed = reinterpret_cast<LayoutFixed*>(header->ObjectAddress());
       int mask = FIELD_MASK(*header);
-
       for (int i = 0; i < kFieldMaskBits; ++i) {
         if (mask & (1 << i)) {
-          RawObject* child = fixed->children_[i];
-          if (child) {
-            MaybeMarkAndPush(child);
-          }
+          MaybePush(fixed->children_[i], local);
         }
       }
       break;
     }
-
     case HeapTag::Scanned: {
       auto slab = reinterpret_cast<Slab<RawObject*>*>(header->ObjectAddress());
-
       int n = NUM_POINTERS(*header);
       for (int i = 0; i < n; ++i) {
-        RawObject* child = slab->items_[i];
-        if (child) {
-          MaybeMarkAndPush(child);
-        }
+        MaybePush(slab->items_[i], local);
       }
       break;
     }
     default:
-      // Only FixedSize and Scanned are pushed
       FAIL(kShouldNotGetHere);
     }
   }
+
+  void MaybePush(RawObject* child, std::vector<ObjHeader*>* local) {
+    if (!child) {
+      return;
+    }
+    ObjHeader* header = ObjHeader::FromObject(child);
+    if (!heap_->TryMark(header)) {
+      return;
+    }
+    if (header->heap_tag != HeapTag::Opaque) {  // has children
+      local->push_back(header);
+    }
+  }
+
+  void MaybeShare(int self, std::vector<ObjHeader*>* local) {
+    SharedGrayStack& s = shared_[self];
+    if (s.size.load() != 0) {
+      return;  // others haven't taken the last batch
+    }
+    std::lock_guard<std::mutex> lock(s.mu);
+    int half = local->size() / 2;
+    s.items.insert(s.items.end(), local->begin(), local->begin() + half);
+    local->erase(local->begin(), local->begin() + half);
+    s.size = s.items.size();
+  }
+
+  // Take all of our own shared stack, or half of another thread's
+  bool Steal(int self, std::vector<ObjHeader*>* local) {
+    for (int k = 0; k < num_threads_; ++k) {
+      SharedGrayStack& s = shared_[(self + k) % num_threads_];
+      if (s.size.load() == 0) {
+        continue;
+      }
+      std::lock_guard<std::mutex> lock(s.mu);
+      int n = s.items.size();
+      int take = k == 0 ? n : (n + 1) / 2;
+      local->insert(local->end(), s.items.end() - take, s.items.end());
+      s.items.resize(n - take);
+      s.size = s.items.size();
+      if (take) {
+        return true;
+      }
+    }
+    return false;
+  }
+
+  bool AnyShared() {
+    for (int i = 0; i < num_threads_; ++i) {
+      if (shared_[i].size.load() != 0) {
+        return true;
+      }
+    }
+    return false;
+  }
+
+  void Work(int self) {
+    std::vector<ObjHeader*> local;
+    while (true) {
+      while (!local.empty()) {
+        ObjHeader* header = local.back();
+        local.pop_back();
+        Trace(header, &local);
+        if (static_cast<int>(local.size()) > kShareThreshold) {
+          MaybeShare(self, &local);
+        }
+      }
+      if (Steal(self, &local)) {
+        continue;
+      }
+
+      // Idle until another thread shares work, or all threads are idle
+      num_active_--;
+      while (true) {
+        if (num_active_.load() == 0) {
+          return;
+        }
+        if (AnyShared()) {
+          num_active_++;
+          if (Steal(self, &local)) {
+            break;
+          }
+          num_active_--;
+        }
+        sched_yield();
+      }
+    }
+  }
+
+  MarkSweepHeap* heap_;
+  int num_threads_;
+  std::vector<SharedGrayStack> shared_;
+  std::atomic<int> num_active_;
+};
+
+void MarkSweepHeap::ParallelTraceChildren() {
+  ParallelMarker marker(this, gc_threads_);
+  marker.Run(&gray_stack_);
+}
+
+// Each thread sweeps a range of live_objs_, and the pool is swept on this
+// thread.  Then the survivors in each range are moved together.
+void MarkSweepHeap::ParallelSweep() {
+  int num_objs = live_objs_.size();
+  int n = gc_threads_;
+  std::vector<int> begins(n + 1);
+  for (int t = 0; t <= n; ++t) {
+    begins[t] = static_cast<int64_t>(num_objs) * t / n;
+  }
+  std::vector<int> num_kept(n);
+  std::vector<std::vector<ObjHeader*>> dead(n);
+
+  auto sweep_range = [&](int t) {
+    int kept = begins[t];
+    for (int i = begins[t]; i < begins[t + 1]; ++i) {
+      ObjHeader* obj = live_objs_[i];
+      if (mark_set_.IsMarked(obj->obj_id)) {
+        live_objs_[kept++] = obj;
+      } else {
+        dead[t].push_back(obj);
+      }
+    }
+    num_kept[t] = kept - begins[t];
+  };
+
+  std::vector<std::thread> threads;
+  for (int t = 1; t < n; ++t) {
+    threads.emplace_back(sweep_range, t);
+  }
+  #ifndef NO_POOL_ALLOC
+  pool_.Sweep();
+  #endif
+  sweep_range(0);
+  for (auto& th : threads) {
+    th.join();
+  }
+
+  int last_live_index = num_kept[0];
+  for (int t = 1; t < n; ++t) {
+    auto first = live_objs_.begin() + begins[t];
+    std::copy(first, first + num_kept[t],
+              live_objs_.begin() + last_live_index);
+    last_live_index += num_kept[t];
+
+    to_free_.insert(to_free_.end(), dead[t].begin(), dead[t].end());
+  }
+  to_free_.insert(to_free_.end(), dead[0].begin(), dead[0].end());
+  live_objs_.resize(last_live_index);
+  num_live_ = last_live_index;
+
+  num_collections_++;
+  max_survived_ = std::max(max_survived_, num_live());
 }
 
 void MarkSweepHeap::Sweep() {
@@ -235,14 +560,46 @@ void MarkSweepHeap::Sweep() {
   max_survived_ = std::max(max_survived_, num_live());
 }
 
-int MarkSweepHeap::Collect() {
-  #ifdef GC_TIMING
-  struct timespec start, end;
-  if (clock_gettime(CLOCK_PROCESS_CPUTIME_ID, &start) < 0) {
-    assert(0);
+// Returns true when sweeping is done, or false if the deadline passed first
+bool MarkSweepHeap::SweepSome(int64_t deadline_usec) {
+  #ifndef NO_POOL_ALLOC
+  while (!pool_.SweepBlocks(kSliceCheckBlocks)) {
+    if (NowMicros() >= deadline_usec) {
+      return false;
+    }
   }
   #endif
 
+  while (sweep_pos_ < sweep_end_) {
+    int end = std::min(sweep_pos_ + kSliceCheckInterval, sweep_end_);
+    for (; sweep_pos_ < end; ++sweep_pos_) {
+      ObjHeader* obj = live_objs_[sweep_pos_];
+      if (mark_set_.IsMarked(obj->obj_id)) {
+        live_objs_[sweep_kept_++] = obj;
+      } else {
+        to_free_.push_back(obj);
+        num_live_--;
+      }
+    }
+    if (sweep_pos_ < sweep_end_ && NowMicros() >= deadline_usec) {
+      return false;
+    }
+  }
+
+  // Objects allocated while sweeping are live
+  int num_objs = live_objs_.size();
+  for (int i = sweep_end_; i < num_objs; ++i) {
+    live_objs_[sweep_kept_++] = live_objs_[i];
+  }
+  live_objs_.resize(sweep_kept_);
+
+  num_collections_++;
+  max_survived_ = std::max(max_survived_, num_live());
+  return true;
+}
+
+// Mark the objects that roots point to, and push them on the gray stack
+void MarkSweepHeap::MarkRoots() {
   int num_roots = roots_.size();
   int num_globals = global_roots_.size();
 
@@ -274,11 +631,19 @@ int MarkSweepHeap::Collect() {
     }
   }
 
-  // Traverse object graph.
-  TraceChildren();
-
-  Sweep();
+  #ifdef GC_FRAME_ROOTS
+  for (RootFrame* frame = root_frames_; frame; frame = frame->prev_) {
+    for (int i = 0; i < frame->n_; ++i) {
+      RawObject* root = *(frame->roots_[i]);
+      if (root) {
+        MaybeMarkAndPush(root);
+      }
+    }
+  }
+  #endif
+}
 
+void MarkSweepHeap::AfterCollection() {
   if (gc_verbose_) {
     log("    %d live after sweep", num_live());
   }
@@ -297,6 +662,115 @@ int MarkSweepHeap::Collect() {
           gc_threshold_);
     }
   }
+}
+
+void MarkSweepHeap::RecordPause(double millis) {
+  if (millis > max_pause_millis_) {
+    max_pause_millis_ = millis;
+  }
+}
+
+int MarkSweepHeap::num_allocated_total() {
+  return num_allocated_
+  #ifndef NO_POOL_ALLOC
+         + pool_.num_allocated()
+  #endif
+      ;
+}
+
+int MarkSweepHeap::CollectSlice(int pause_usec) {
+  int64_t start_usec = NowMicros();
+  #ifdef GC_TIMING
+  struct timespec start, end;
+  if (clock_gettime(CLOCK_PROCESS_CPUTIME_ID, &start) < 0) {
+    assert(0);
+  }
+  #endif
+
+  if (phase_ == GcPhase::Idle) {
+    MarkRoots();
+    phase_ = GcPhase::Marking;
+    cycle_start_allocs_ = num_allocated_total();
+  #ifdef GC_TIMING
+    cycle_millis_ = 0.0;
+  #endif
+  }
+  num_slices_++;
+
+  // A pause of 0 means finish the collection.  If the program allocates more
+  // than a threshold's worth during a collection, also finish it, rather than
+  // letting the heap grow without bound.
+  int64_t deadline_usec = start_usec + pause_usec;
+  if (pause_usec == 0 ||
+      num_allocated_total() - cycle_start_allocs_ > gc_threshold_) {
+    deadline_usec = INT64_MAX;
+  }
+
+  int result = -1;
+  if (phase_ == GcPhase::Marking && TraceSome(deadline_usec)) {
+  #ifndef NO_POOL_ALLOC
+    pool_.StartSweep();
+  #endif
+    sweep_end_ = live_objs_.size();
+    sweep_pos_ = 0;
+    sweep_kept_ = 0;
+    phase_ = GcPhase::Sweeping;
+  }
+  if (phase_ == GcPhase::Sweeping && SweepSome(deadline_usec)) {
+    phase_ = GcPhase::Idle;
+    AfterCollection();
+    result = num_live();
+  }
+
+  RecordPause((NowMicros() - start_usec) / 1000.0);
+
+  #ifdef GC_TIMING
+  if (clock_gettime(CLOCK_PROCESS_CPUTIME_ID, &end) < 0) {
+    assert(0);
+  }
+  double start_secs = start.tv_sec + start.tv_nsec / 1e9;
+  double end_secs = end.tv_sec + end.tv_nsec / 1e9;
+  double slice_millis = (end_secs - start_secs) * 1000.0;
+
+  total_gc_millis_ += slice_millis;
+  cycle_millis_ += slice_millis;
+  if (phase_ == GcPhase::Idle && cycle_millis_ > max_gc_millis_) {
+    max_gc_millis_ = cycle_millis_;
+  }
+  #endif
+
+  return result;
+}
+
+int MarkSweepHeap::Collect() {
+  // Finish an incremental collection first.  Objects that died after it
+  // started are still marked, so the full collection below is still needed.
+  if (phase_ != GcPhase::Idle) {
+    CollectSlice(0);
+  }
+
+  int64_t start_usec = NowMicros();
+  #ifdef GC_TIMING
+  struct timespec start, end;
+  if (clock_gettime(CLOCK_PROCESS_CPUTIME_ID, &start) < 0) {
+    assert(0);
+  }
+  #endif
+
+  MarkRoots();
+
+  // Traverse object graph.
+  bool parallel = gc_threads_ > 1 && num_live() >= kMinParallelLive;
+  if (parallel) {
+    ParallelTraceChildren();
+    ParallelSweep();
+  } else {
+    TraceChildren();
+    Sweep();
+  }
+
+  AfterCollection();
+  RecordPause((NowMicros() - start_usec) / 1000.0);
 
   #ifdef GC_TIMING
   if (clock_gettime(CLOCK_PROCESS_CPUTIME_ID, &end) < 0) {
@@ -351,6 +825,8 @@ void MarkSweepHeap::PrintStats(int fd) {
   dprintf(fd, "\n");
   dprintf(fd, "  max gc millis    = %10.1f\n", max_gc_millis_);
   dprintf(fd, "total gc millis    = %10.1f\n", total_gc_millis_);
+  dprintf(fd, "  max pause millis = %10.1f\n", max_pause_millis_);
+  dprintf(fd, "  num gc slices    = %10d\n", num_slices_);
   dprintf(fd, "\n");
   dprintf(fd, "roots capacity     = %10d\n",
           static_cast<int>(roots_.capacity()));
@@ -385,6 +861,9 @@ void MarkSweepHeap::MaybePrintStats() {
 void MarkSweepHeap::FreeEverything() {
   roots_.clear();
   global_roots_.clear();
+  #ifdef GC_FRAME_ROOTS
+  root_frames_ = nullptr;
+  #endif
 
   Collect();
 
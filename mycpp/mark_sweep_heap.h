@@ -3,6 +3,7 @@
 
 #include <stdlib.h>
 
+#include <algorithm>  // min()
 #include <vector>
 
 #include "mycpp/common.h"
@@ -23,6 +24,15 @@ class MarkSet {
     bits_.resize(max_byte_index);
   }
 
+  // Like ReInit(), but keeps the marks.  Called when objects are allocated
+  // while an incremental collection is marking.
+  void Grow(int max_obj_id) {
+    int max_byte_index = (max_obj_id >> 3) + 1;
+    if (max_byte_index > static_cast<int>(bits_.size())) {
+      bits_.resize(max_byte_index);
+    }
+  }
+
   // Called by MarkObjects()
   void Mark(int obj_id) {
     DCHECK(obj_id >= 0);
@@ -34,6 +44,16 @@ class MarkSet {
     bits_[byte_index] |= (1 << bit_index);
   }
 
+  // Atomic version of IsMarked() then Mark(), for parallel marking.  Returns
+  // true if this call set the bit.
+  bool TryMark(int obj_id) {
+    DCHECK(obj_id >= 0);
+    int byte_index = obj_id >> 3;
+    uint8_t bit = 1 << (obj_id & 0b111);
+    uint8_t old = __atomic_fetch_or(&bits_[byte_index], bit, __ATOMIC_RELAXED);
+    return (old & bit) == 0;
+  }
+
   // Called by Sweep()
   bool IsMarked(int obj_id) {
     DCHECK(obj_id >= 0);
@@ -80,12 +100,20 @@ class Pool {
   void* Allocate(int* obj_id) {
     num_allocated_++;
 
+    // During an incremental sweep, free cells come from swept blocks first
+    while (!free_list_ && sweep_block_ < num_sweep_blocks_) {
+      SweepBlocks(1);
+    }
+
     if (!free_list_) {
       // Allocate a new Block and add every new Cell to the free list.
       Block* block = static_cast<Block*>(malloc(sizeof(Block)));
       blocks_.push_back(block);
       bytes_allocated_ += kBlockSize;
       num_free_ += CellsPerBlock;
+      if (gc_underway_) {
+        mark_set_.Grow(blocks_.size() * CellsPerBlock);
+      }
 
       // The starting cell_id for Cells in this block.
       int cell_id = (blocks_.size() - 1) * CellsPerBlock;
@@ -120,14 +148,31 @@ class Pool {
     mark_set_.Mark(cell_id);
   }
 
-  void Sweep() {
+  bool TryMark(int cell_id) {
+    DCHECK(gc_underway_);
+    return mark_set_.TryMark(cell_id);
+  }
+
+  // Start building a new free list from the unmarked cells.  The blocks that
+  // exist now are swept by SweepBlocks(), or by Allocate() when the free list
+  // runs out.
+  void StartSweep() {
     DCHECK(gc_underway_);
-    // Iterate over every Cell linking the free ones into a new free list.
     num_free_ = 0;
     free_list_ = nullptr;
-    int cell_id = 0;
-    for (Block* block : blocks_) {
-      for (Cell& cell : block->cells) {
+    sweep_block_ = 0;
+    num_sweep_blocks_ = blocks_.size();
+  }
+
+  // Sweep up to n blocks.  Returns true when every block is swept.
+  bool SweepBlocks(int n) {
+    if (!gc_underway_) {
+      return true;  // already swept
+    }
+    int end = std::min(sweep_block_ + n, num_sweep_blocks_);
+    for (; sweep_block_ < end; ++sweep_block_) {
+      int cell_id = sweep_block_ * CellsPerBlock;
+      for (Cell& cell : blocks_[sweep_block_]->cells) {
         if (!mark_set_.IsMarked(cell_id)) {
           num_free_++;
           FreeCell* free_cell = reinterpret_cast<FreeCell*>(cell);
@@ -138,7 +183,17 @@ class Pool {
         cell_id++;
       }
     }
-    gc_underway_ = false;
+    if (sweep_block_ == num_sweep_blocks_) {
+      sweep_block_ = num_sweep_blocks_ = 0;
+      gc_underway_ = false;
+      return true;
+    }
+    return false;
+  }
+
+  void Sweep() {
+    StartSweep();
+    SweepBlocks(num_sweep_blocks_);
   }
 
   void Free() {
@@ -179,6 +234,9 @@ class Pool {
 
   // Whether a GC is underway, for asserting that calls are in order.
   bool gc_underway_ = false;
+  // Blocks [sweep_block_, num_sweep_blocks_) are waiting to be swept
+  int sweep_block_ = 0;
+  int num_sweep_blocks_ = 0;
 
   FreeCell* free_list_ = nullptr;
   int num_free_ = 0;
@@ -190,6 +248,24 @@ class Pool {
   DISALLOW_COPY_AND_ASSIGN(Pool<CellsPerBlock COMMA CellSize>);
 };
 
+#ifdef GC_FRAME_ROOTS
+// Roots stored inline in a function's StackRoots record.  More are pushed on
+// MarkSweepHeap::roots_.
+const int kMaxFrameRoots = 8;
+
+// With -D GC_FRAME_ROOTS, each StackRoots record is a RootFrame.  They form a
+// linked list (a shadow stack), which is pushed and popped with one store
+// each, instead of one vector operation per root.
+struct RootFrame {
+  RootFrame* prev_;
+  int n_;
+  RawObject** roots_[kMaxFrameRoots];
+};
+#endif
+
+// An incremental collection marks, then sweeps, in slices of bounded length.
+enum class GcPhase { Idle, Marking, Sweeping };
+
 class MarkSweepHeap {
  public:
   // reserve 32 frames to start
@@ -219,11 +295,38 @@ class MarkSweepHeap {
   int MaybeCollect();
   int Collect();
 
+  // Incremental collection with OILS_GC_PAUSE_US.  Does marking or sweeping
+  // work for about the pause budget, starting a collection if needed.
+  // Returns num_live() when a collection finishes, and -1 otherwise.
+  int CollectSlice(int pause_usec);
+  // Called when the shell is about to wait for input
+  void CollectIdle();
+
+  // Must be called before a pointer in an existing object is overwritten or
+  // removed.  While marking, the old value is marked, so everything that was
+  // reachable when the collection started survives it ("snapshot at the
+  // beginning").  Objects allocated while marking are marked when allocated.
+  void WriteBarrier(RawObject* old) {
+    if (phase_ == GcPhase::Marking && old) {
+      MaybeMarkAndPush(old);
+    }
+  }
+
   void MaybeMarkAndPush(RawObject* obj);
   void TraceChildren();
 
   void Sweep();
 
+  GcPhase phase() {
+    return phase_;
+  }
+
+  // With OILS_GC_THREADS=N, big heaps are marked and swept by N threads
+  void ParallelTraceChildren();
+  void ParallelSweep();
+  // Marks the object if it's unmarked, and returns true if it should be traced
+  bool TryMark(ObjHeader* header);
+
   void PrintStats(int fd);  // public for testing
 
   void CleanProcessExit();  // do one last GC so ASAN passes
@@ -248,6 +351,13 @@ class MarkSweepHeap {
   // Show debug logging
   bool gc_verbose_ = false;
 
+  // Number of threads for marking and sweeping, set by OILS_GC_THREADS
+  int gc_threads_ = 1;
+
+  // Pause budget for incremental collection, set by OILS_GC_PAUSE_US.  0
+  // means each collection stops the world.
+  int gc_pause_usec_ = 0;
+
   // Current stats
   int num_live_ = 0;
   // Should we keep track of sizes?
@@ -262,6 +372,8 @@ class MarkSweepHeap {
   int num_growths_;
   double max_gc_millis_ = 0.0;
   double total_gc_millis_ = 0.0;
+  int num_slices_ = 0;            // incremental steps
+  double max_pause_millis_ = 0.0;  // longest collection or slice, wall time
 
 #ifndef NO_POOL_ALLOC
   Pool<128, 32> pool_;
@@ -269,6 +381,9 @@ class MarkSweepHeap {
 
   std::vector<RawObject**> roots_;
   std::vector<RawObject*> global_roots_;
+#ifdef GC_FRAME_ROOTS
+  RootFrame* root_frames_ = nullptr;  // innermost frame
+#endif
 
   // Allocate() appends live objects, and Sweep() compacts it
   std::vector<ObjHeader*> live_objs_;
@@ -281,9 +396,26 @@ class MarkSweepHeap {
   int greatest_obj_id_ = 0;
 
  private:
+  void MarkRoots();
+  void TraceObject(ObjHeader* header);
+  bool TraceSome(int64_t deadline_usec);
+  bool SweepSome(int64_t deadline_usec);
+  void AfterCollection();
+  void RecordPause(double millis);
+  int num_allocated_total();
+
   void FreeEverything();
   void MaybePrintStats();
 
+  GcPhase phase_ = GcPhase::Idle;
+  int cycle_start_allocs_ = 0;  // num allocations when the collection started
+  // live_objs_[0, sweep_end_) existed when sweeping started.  Survivors before
+  // sweep_pos_ have been moved to [0, sweep_kept_).
+  int sweep_end_ = 0;
+  int sweep_pos_ = 0;
+  int sweep_kept_ = 0;
+  double cycle_millis_ = 0.0;  // GC_TIMING of the slices of this collection
+
   DISALLOW_COPY_AND_ASSIGN(MarkSweepHeap);
 };
 
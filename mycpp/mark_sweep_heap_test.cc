@@ -114,6 +114,38 @@ TEST string_collection_test() {
   PASS();
 }
 
+// Also run with -D GC_FRAME_ROOTS, where more than kMaxFrameRoots roots in
+// one frame are pushed on a vector
+TEST many_roots_test() {
+  Str *a = nullptr, *b = nullptr, *c = nullptr, *d = nullptr, *e = nullptr;
+  Str *f = nullptr, *g = nullptr, *h = nullptr, *i = nullptr, *j = nullptr;
+  StackRoots _roots({&a, &b, &c, &d, &e, &f, &g, &h, &i, &j});
+
+  a = StrFromC("a1");
+  e = StrFromC("e1");
+  j = StrFromC("j1");
+
+  int num_live = gHeap.num_live();
+  {
+    Str* inner = StrFromC("inner");
+    StackRoots _roots2({&inner});
+
+    gHeap.Collect();
+    ASSERT_EQ_FMT(num_live + 1, gHeap.num_live(), "%d");
+    ASSERT(str_equals0("inner", inner));
+  }
+
+  // The inner frame was popped
+  gHeap.Collect();
+  ASSERT_EQ_FMT(num_live, gHeap.num_live(), "%d");
+
+  ASSERT(str_equals0("a1", a));
+  ASSERT(str_equals0("e1", e));
+  ASSERT(str_equals0("j1", j));
+
+  PASS();
+}
+
 TEST list_collection_test() {
   {
     Str *test_str0 = nullptr;
@@ -194,6 +226,84 @@ TEST cycle_collection_test() {
   PASS();
 }
 
+// A string too big for the pool, so it's in gHeap.mark_set_
+Str *BigStr(const char *prefix) {
+  char buf[100];
+  int n = snprintf(buf, sizeof(buf), "%s and enough bytes to not fit in a pool",
+                   prefix);
+  return StrFromC(buf, n);
+}
+
+bool IsMarked(Str *s) {
+  return gHeap.mark_set_.IsMarked(ObjHeader::FromObject(s)->obj_id);
+}
+
+TEST incremental_collection_test() {
+  List<List<Str *> *> *big = nullptr;
+  List<Str *> *last = nullptr;
+  StackRoots _roots({&big, &last});
+
+  // The graph is traced depth first, from the end of the list, so
+  // big->index_(0) is traced last
+  big = NewList<List<Str *> *>();
+  for (int i = 0; i < 5000; ++i) {
+    big->append(NewList<Str *>());
+  }
+  last = big->index_(0);
+  last->append(BigStr("popped"));
+  last->append(BigStr("replaced"));
+  last->append(BigStr("kept"));
+  last = nullptr;
+
+  // 1 microsecond isn't enough to mark all of it
+  ASSERT_EQ(-1, gHeap.CollectSlice(1));
+  ASSERT(gHeap.phase() == GcPhase::Marking);
+
+  {
+    Str *popped = nullptr;
+    Str *replaced = nullptr;
+    Str *fresh = nullptr;
+    StackRoots _roots2({&popped, &replaced, &fresh});
+
+    // These roots aren't in the snapshot, and the objects are only reachable
+    // from them.  The write barrier keeps them alive.
+    List<Str *> *first = big->index_(0);
+    popped = first->pop(0);
+    replaced = first->index_(0);
+    first->set(0, BigStr("new"));
+    big->set(0, NewList<Str *>());
+
+    // Objects allocated while marking survive
+    fresh = BigStr("fresh");
+
+    int num_live = -1;
+    int num_slices = 1;
+    while (num_live == -1) {
+      num_live = gHeap.CollectSlice(1);
+      num_slices++;
+    }
+    log("incremental collection took %d slices", num_slices);
+    ASSERT(num_slices > 2);
+    ASSERT(gHeap.phase() == GcPhase::Idle);
+
+    ASSERT(IsMarked(popped));
+    ASSERT(IsMarked(replaced));
+    ASSERT(IsMarked(fresh));
+
+    gHeap.Collect();
+    ASSERT(str_equals(BigStr("popped"), popped));
+    ASSERT(str_equals(BigStr("replaced"), replaced));
+    ASSERT(str_equals(BigStr("fresh"), fresh));
+  }
+
+  big = nullptr;
+  gHeap.Collect();
+  ASSERT(gHeap.max_pause_millis_ > 0.0);
+  ASSERT(gHeap.num_slices_ > 2);
+
+  PASS();
+}
+
 TEST pool_sanity_check() {
   Pool<2, 32> p;
 
@@ -244,6 +354,38 @@ TEST pool_sweep() {
   PASS();
 }
 
+TEST pool_incremental_sweep() {
+  Pool<2, 32> p;
+
+  int ids[6];
+  for (int i = 0; i < 6; ++i) {
+    p.Allocate(&ids[i]);
+  }
+  p.PrepareForGc();
+  for (int i = 0; i < 6; ++i) {
+    if (i % 2 == 0) {
+      p.Mark(ids[i]);
+    }
+  }
+
+  p.StartSweep();
+  ASSERT_EQ(false, p.SweepBlocks(1));
+
+  // The free list is empty, so Allocate() sweeps more blocks before making a
+  // new one
+  int obj_id;
+  p.Allocate(&obj_id);
+  p.Allocate(&obj_id);
+  ASSERT_EQ(p.bytes_allocated(), 3 * 64);
+
+  ASSERT_EQ(true, p.SweepBlocks(5));
+  ASSERT_EQ(true, p.SweepBlocks(5));  // no-op
+  ASSERT_EQ(p.num_live(), 5);
+
+  p.Free();
+  PASS();
+}
+
 TEST pool_marked_objs_are_kept_alive() {
   Pool<1, 32> p;
 
@@ -263,6 +405,7 @@ TEST pool_marked_objs_are_kept_alive() {
 SUITE(pool_alloc) {
   RUN_TEST(pool_sanity_check);
   RUN_TEST(pool_sweep);
+  RUN_TEST(pool_incremental_sweep);
   RUN_TEST(pool_marked_objs_are_kept_alive);
 }
 
@@ -277,8 +420,10 @@ int main(int argc, char **argv) {
   RUN_TEST(mark_set_test);
   RUN_TEST(api_test);
   RUN_TEST(string_collection_test);
+  RUN_TEST(many_roots_test);
   RUN_TEST(list_collection_test);
   RUN_TEST(cycle_collection_test);
+  RUN_TEST(incremental_collection_test);
 
   RUN_SUITE(pool_alloc);
 
@@ -29,11 +29,26 @@ def MaybeCollect():
     pass
 
 
+def CollectIdle():
+    # type: () -> None
+    """Like MaybeCollect(), but the shell is about to wait for input."""
+    pass
+
+
 def StrFromC(s):
     """Hack to translate const char* s to Str * in C++."""
     return s
 
 
+def Intern(s):
+    # type: (str) -> str
+    """Return the canonical instance of a short string like a variable name.
+
+    In C++, comparing interned strings is a pointer comparison.
+    """
+    return intern(s)
+
+
 def NewDict():
     """Make dictionaries ordered in Python, e.g. for JSON.
   
@@ -515,8 +515,8 @@ class Unset(vm._Builtin):
 
     def Run(self, cmd_val):
         # type: (cmd_value.Argv) -> int
-        attrs, arg_r = flag_spec.ParseCmdVal('unset', cmd_val)
-        arg = arg_types.unset(attrs.attrs)
+        arg_r = flag_spec.CmdValReader(cmd_val)
+        arg = arg_types.Parse_unset(arg_r)
 
         argv, arg_locs = arg_r.Rest2()
         for i, name in enumerate(argv):
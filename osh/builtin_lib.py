@@ -55,8 +55,8 @@ class History(vm._Builtin):
             e_usage("is disabled because Oil wasn't compiled with 'readline'",
                     loc.Missing)
 
-        attrs, arg_r = flag_spec.ParseCmdVal('history', cmd_val)
-        arg = arg_types.history(attrs.attrs)
+        arg_r = flag_spec.CmdValReader(cmd_val)
+        arg = arg_types.Parse_history(arg_r)
 
         # Clear all history
         if arg.c:
@@ -154,10 +154,8 @@ class Command(vm._Builtin):
         # type: (cmd_value.Argv) -> int
 
         # accept_typed_args=True because we invoke other builtins
-        attrs, arg_r = flag_spec.ParseCmdVal('command',
-                                             cmd_val,
-                                             accept_typed_args=True)
-        arg = arg_types.command(attrs.attrs)
+        arg_r = flag_spec.CmdValReader(cmd_val, accept_typed_args=True)
+        arg = arg_types.Parse_command(arg_r)
         if arg.v:
             status = 0
             names = arg_r.Rest()
@@ -402,8 +400,8 @@ class Type(vm._Builtin):
 
     def Run(self, cmd_val):
         # type: (cmd_value.Argv) -> int
-        attrs, arg_r = flag_spec.ParseCmdVal('type', cmd_val)
-        arg = arg_types.type(attrs.attrs)
+        arg_r = flag_spec.CmdValReader(cmd_val)
+        arg = arg_types.Parse_type(arg_r)
 
         if arg.f:
             funcs = {}  # type: Dict[str, Proc]
@@ -13,16 +13,19 @@ from __future__ import print_function
 from errno import EINTR
 
 from _devbuild.gen import arg_types
-from _devbuild.gen.runtime_asdl import (span_e, cmd_value, value, scope_e)
+from _devbuild.gen.runtime_asdl import (span_e, cmd_value, value, value_e,
+                                        scope_e)
 from _devbuild.gen.syntax_asdl import source, loc
 from core import alloc
 from core import error
 from core.error import e_usage, e_die, e_die_status
+from core import main_loop
 from core import pyos
 from core import pyutil
 from core import state
 from core import ui
 from core import vm
+from data_lang import qsn
 from data_lang import qsn_native
 from frontend import flag_spec
 from frontend import location
@@ -35,8 +38,9 @@ from pylib import os_path
 
 import libc
 import posix_ as posix
+from posix_ import SEEK_CUR
 
-from typing import Tuple, List, Optional, Any, TYPE_CHECKING
+from typing import Tuple, List, Optional, Any, cast, TYPE_CHECKING
 if TYPE_CHECKING:
     from _devbuild.gen.runtime_asdl import span_t
     from core.pyutil import _ResourceLoader
@@ -143,8 +147,8 @@ def _AppendParts(s, spans, max_results, join_next, parts):
 
 
 #
-# Three read() wrappers for 'read' builtin that RunPendingTraps: _ReadN,
-# _ReadUntilDelim, and _ReadLineSlowly
+# read() wrappers for the 'read' and 'mapfile' builtins that RunPendingTraps:
+# _ReadN, _ReadUntilDelim, and _MapFileReader
 #
 
 
@@ -205,37 +209,104 @@ def _ReadUntilDelim(delim_byte, cmd_ev):
 # sys.stdin.readline() in Python has its own buffering which is incompatible
 # with shell semantics.  dash, mksh, and zsh all read a single byte at a
 # time with read(0, 1).
+#
+# mapfile can read big chunks when no other reader of stdin could tell the
+# difference: either it reads until EOF, or stdin is seekable and the unused
+# bytes can be given back with lseek().  bash does the same.
 
-# TODO:
-# - _ReadLineSlowly should have keep_newline (mapfile -t)
-#   - this halves memory usage!
+# Like the buffer in mylib.FdLineReader
+_MAPFILE_CHUNK_SIZE = 64 * 1024
 
 
-def _ReadLineSlowly(cmd_ev):
-    # type: (CommandEvaluator) -> str
-    """Read a line from stdin."""
-    ch_array = []  # type: List[int]
-    while True:
-        ch, err_num = pyos.ReadByte(0)
+class _MapFileReader(object):
+    """Split stdin into records ending with a delimiter, for mapfile.
 
-        if ch < 0:
-            if err_num == EINTR:
-                cmd_ev.RunPendingTraps()
-                # retry after running traps
-            else:
-                raise pyos.ReadError(err_num)
+    Chunks are scanned with str.find(), which is memchr() in C++, and each
+    record is sliced out once.
+    """
 
-        elif ch == pyos.EOF_SENTINEL:
-            break
+    def __init__(self, delim_byte, buffered, seekable, cmd_ev):
+        # type: (int, bool, bool, CommandEvaluator) -> None
+        self.delim_byte = delim_byte
+        self.delim = chr(delim_byte)
+        self.buffered = buffered
+        self.seekable = seekable
+        self.cmd_ev = cmd_ev
 
-        else:
-            ch_array.append(ch)
+        # Unconsumed bytes are buf[pos:], and there's no delimiter before
+        # buf[scan:]
+        self.buf = ''
+        self.pos = 0
+        self.scan = 0
+        self.eof = False
+
+    def Next(self, chop):
+        # type: (bool) -> Optional[str]
+        """Return the next record, or None at EOF.
+
+        Args:
+          chop: whether to remove the trailing delimiter
+        """
+        if not self.buffered:  # one byte at a time, so we never read too far
+            s, eof = _ReadUntilDelim(self.delim_byte, self.cmd_ev)
+            if eof:
+                return s if len(s) else None
+            return s if chop else s + self.delim
 
-        # TODO: Add option to omit newline
-        if ch == pyos.NEWLINE_CH:
-            break
+        while True:
+            i = self.buf.find(self.delim, self.scan)
+            if i != -1:
+                end = i if chop else i + 1
+                record = self.buf[self.pos:end]
+                self.pos = self.scan = i + 1
+                return record
+
+            if self.eof:
+                if self.pos == len(self.buf):
+                    return None
+                record = self.buf[self.pos:]  # last record with no delimiter
+                self.pos = self.scan = len(self.buf)
+                return record
+
+            chunks = []  # type: List[str]
+            n, err_num = pyos.Read(STDIN_FILENO, _MAPFILE_CHUNK_SIZE, chunks)
+            if n < 0:
+                if err_num == EINTR:
+                    self.cmd_ev.RunPendingTraps()
+                    # retry after running traps
+                else:
+                    raise pyos.ReadError(err_num)
+
+            elif n == 0:  # EOF
+                self.eof = True
 
-    return pyutil.ChArrayToString(ch_array)
+            else:
+                if self.pos == len(self.buf):
+                    self.buf = chunks[0]
+                else:  # keep the partial record
+                    self.buf = self.buf[self.pos:] + chunks[0]
+                self.scan = len(self.buf) - n
+                self.pos = 0
+
+    def SyncFd(self):
+        # type: () -> None
+        """Seek stdin back to the end of the last record returned.
+
+        So that 'mapfile -n', and mapfile callbacks, leave the rest of a file
+        for the next reader.
+        """
+        if not self.seekable:
+            return
+        unused = len(self.buf) - self.pos
+        if unused:
+            try:
+                posix.lseek(STDIN_FILENO, -unused, SEEK_CUR)
+            except OSError as e:
+                raise pyos.ReadError(e.errno)
+        self.buf = ''
+        self.pos = 0
+        self.scan = 0
+        self.eof = False
 
 
 def ReadAll():
@@ -296,7 +367,7 @@ class Read(vm._Builtin):
         # type: (arg_types.read, str) -> int
         """For read --line."""
 
-        # Use an optimized C implementation rather than _ReadLineSlowly, which
+        # Use an optimized C implementation rather than _ReadUntilDelim, which
         # calls ReadByte() over and over.
         line = pyos.ReadLine()
         if len(line) == 0:  # EOF
@@ -360,8 +431,8 @@ class Read(vm._Builtin):
 
     def _Run(self, cmd_val):
         # type: (cmd_value.Argv) -> int
-        attrs, arg_r = flag_spec.ParseCmdVal('read', cmd_val)
-        arg = arg_types.read(attrs.attrs)
+        arg_r = flag_spec.CmdValReader(cmd_val)
+        arg = arg_types.Parse_read(arg_r)
         names = arg_r.Rest()
 
         # Don't respect any of the other options here?  This is buffered I/O.
@@ -510,16 +581,51 @@ class Read(vm._Builtin):
 class MapFile(vm._Builtin):
     """Mapfile / readarray."""
 
-    def __init__(self, mem, errfmt, cmd_ev):
-        # type: (Mem, ErrorFormatter, CommandEvaluator) -> None
+    def __init__(self, mem, parse_ctx, cmd_ev, errfmt):
+        # type: (Mem, ParseContext, CommandEvaluator, ErrorFormatter) -> None
         self.mem = mem
-        self.errfmt = errfmt
+        self.parse_ctx = parse_ctx
+        self.arena = parse_ctx.arena
         self.cmd_ev = cmd_ev
+        self.errfmt = errfmt
+
+    def _GetStrs(self, var_name, index):
+        # type: (str, int) -> List[str]
+        """Return the list that holds the array, with at least 'index' items.
+
+        Lines are appended to it directly.  We look it up again after running
+        a callback, which may have unset or replaced the array.
+        """
+        which_scopes = self.mem.ScopesForWriting()
+        cell = self.mem.GetCell(var_name, which_scopes)
+        if (cell is None or cell.readonly or
+                cell.val.tag() != value_e.MaybeStrArray):
+            # state.py checks readonly, and replaces other values
+            state.BuiltinSetArray(self.mem, var_name, [])
+            cell = self.mem.GetCell(var_name, which_scopes)
+
+        strs = cast(value.MaybeStrArray, cell.val).strs
+        no_str = None  # type: Optional[str]
+        while len(strs) < index:
+            strs.append(no_str)
+        return strs
+
+    def _RunCallback(self, callback, index, line):
+        # type: (str, int, str) -> None
+        """Like bash, evaluate the code: callback INDEX LINE"""
+        code_str = '%s %d %s' % (callback, index, qsn.maybe_shell_encode(line))
+
+        line_reader = reader.StringLineReader(code_str, self.arena)
+        c_parser = self.parse_ctx.MakeOshParser(line_reader)
+
+        src = source.ArgvWord('mapfile', loc.Missing)
+        with alloc.ctx_Location(self.arena, src):
+            main_loop.Batch(self.cmd_ev, c_parser, self.errfmt)
 
     def Run(self, cmd_val):
         # type: (cmd_value.Argv) -> int
-        attrs, arg_r = flag_spec.ParseCmdVal('mapfile', cmd_val)
-        arg = arg_types.mapfile(attrs.attrs)
+        arg_r = flag_spec.CmdValReader(cmd_val)
+        arg = arg_types.Parse_mapfile(arg_r)
 
         var_name, _ = arg_r.Peek2()
         if var_name is None:
@@ -528,23 +634,94 @@ class MapFile(vm._Builtin):
             if var_name.startswith(':'):
                 var_name = var_name[1:]
 
-        lines = []  # type: List[str]
-        while True:
-            # bash uses this slow algorithm; YSH could provide read --all-lines
-            try:
-                line = _ReadLineSlowly(self.cmd_ev)
-            except pyos.ReadError as e:
-                self.errfmt.PrintMessage("mapfile: read() error: %s" %
-                                         posix.strerror(e.err_num))
-                return 1
-            if len(line) == 0:
-                break
-            # note: at least on Linux, bash doesn't strip \r\n
-            if arg.t and line.endswith('\n'):
-                line = line[:-1]
-            lines.append(line)
+        # -1 means the flag wasn't passed
+        if arg.n < -1:
+            e_usage('got invalid line count %d' % arg.n, loc.Missing)
+        if arg.s < -1:
+            e_usage('got invalid line count %d' % arg.s, loc.Missing)
+        if arg.O < -1:
+            e_usage('got invalid array origin %d' % arg.O, loc.Missing)
+        if arg.c == -1:
+            quantum = 5000  # bash default
+        elif arg.c <= 0:
+            e_usage('got invalid callback quantum %d' % arg.c, loc.Missing)
+        else:
+            quantum = arg.c
+
+        max_lines = arg.n if arg.n > 0 else 0  # 0 means all lines
+        num_skip = arg.s if arg.s > 0 else 0
+
+        if arg.d is not None:
+            if len(arg.d):
+                delim_byte = ord(arg.d[0])
+            else:
+                delim_byte = 0  # -d '' delimits by NUL
+        else:
+            delim_byte = pyos.NEWLINE_CH
+
+        if arg.O == -1:  # Unlike -O 0, remove existing items
+            state.BuiltinSetArray(self.mem, var_name, [])
+            index = 0
+        else:
+            index = arg.O
+
+        seekable = True
+        try:
+            posix.lseek(STDIN_FILENO, 0, SEEK_CUR)
+        except OSError:
+            seekable = False
+
+        # Without -n, we read until EOF anyway.  Note that a callback that
+        # reads from a pipe won't see bytes mapfile has already read.
+        buffered = seekable or max_lines == 0
+        r = _MapFileReader(delim_byte, buffered, seekable, self.cmd_ev)
+
+        try:
+            num_skipped = 0
+            while num_skipped < num_skip:
+                if r.Next(False) is None:
+                    break
+                num_skipped += 1
+
+            # bash strings can't hold NUL, so the delimiter of -d '' is
+            # always removed
+            chop = arg.t or delim_byte == 0
+
+            strs = self._GetStrs(var_name, index)
+            base = 0  # index of strs[0]
+            num_lines = 0
+            while max_lines == 0 or num_lines < max_lines:
+                line = r.Next(chop)  # note: bash doesn't strip \r\n either
+                if line is None:
+                    break
+                num_lines += 1
+
+                # Called with each quantum'th line, before it's assigned
+                if arg.C is not None and num_lines % quantum == 0:
+                    r.SyncFd()
+                    self._RunCallback(arg.C, index, line)
+                    strs = self._GetStrs(var_name, 0)
+                    if len(strs) == 0:
+                        # The callback used the batch and cleared the array.
+                        # Unlike bash, the next batch starts at index 0, so
+                        # memory doesn't grow with the input.
+                        base = index
+                    strs = self._GetStrs(var_name, index - base)
+
+                i = index - base
+                if i < len(strs):
+                    strs[i] = line
+                else:
+                    strs.append(line)
+                index += 1
+
+            r.SyncFd()
+
+        except pyos.ReadError as e:
+            self.errfmt.PrintMessage("mapfile: read() error: %s" %
+                                     posix.strerror(e.err_num))
+            return 1
 
-        state.BuiltinSetArray(self.mem, var_name, lines)
         return 0
 
 
@@ -577,10 +754,8 @@ class Cd(vm._Builtin):
 
     def Run(self, cmd_val):
         # type: (cmd_value.Argv) -> int
-        attrs, arg_r = flag_spec.ParseCmdVal('cd',
-                                             cmd_val,
-                                             accept_typed_args=True)
-        arg = arg_types.cd(attrs.attrs)
+        arg_r = flag_spec.CmdValReader(cmd_val, accept_typed_args=True)
+        arg = arg_types.Parse_cd(arg_r)
 
         dest_dir, arg_loc = arg_r.Peek2()
         if dest_dir is None:
@@ -767,8 +942,8 @@ class Dirs(vm._Builtin):
 
     def Run(self, cmd_val):
         # type: (cmd_value.Argv) -> int
-        attrs, arg_r = flag_spec.ParseCmdVal('dirs', cmd_val)
-        arg = arg_types.dirs(attrs.attrs)
+        arg_r = flag_spec.CmdValReader(cmd_val)
+        arg = arg_types.Parse_dirs(arg_r)
 
         home_dir = state.MaybeString(self.mem, 'HOME')
         style = SINGLE_LINE
@@ -801,8 +976,8 @@ class Pwd(vm._Builtin):
 
     def Run(self, cmd_val):
         # type: (cmd_value.Argv) -> int
-        attrs, arg_r = flag_spec.ParseCmdVal('pwd', cmd_val)
-        arg = arg_types.pwd(attrs.attrs)
+        arg_r = flag_spec.CmdValReader(cmd_val)
+        arg = arg_types.Parse_pwd(arg_r)
 
         # NOTE: 'pwd' will succeed even if the directory has disappeared.  Other
         # shells behave that way too.
@@ -451,8 +451,8 @@ class Printf(vm._Builtin):
         """
     printf: printf [-v var] format [argument ...]
     """
-        attrs, arg_r = flag_spec.ParseCmdVal('printf', cmd_val)
-        arg = arg_types.printf(attrs.attrs)
+        arg_r = flag_spec.CmdValReader(cmd_val)
+        arg = arg_types.Parse_printf(arg_r)
 
         fmt, fmt_loc = arg_r.ReadRequired2('requires a format string')
         varargs, locs = arg_r.Rest2()
@@ -39,8 +39,8 @@ class Jobs(vm._Builtin):
     def Run(self, cmd_val):
         # type: (cmd_value.Argv) -> int
 
-        attrs, arg_r = flag_spec.ParseCmdVal('jobs', cmd_val)
-        arg = arg_types.jobs(attrs.attrs)
+        arg_r = flag_spec.CmdValReader(cmd_val)
+        arg = arg_types.Parse_jobs(arg_r)
 
         if arg.l:
             style = process.STYLE_LONG
@@ -212,8 +212,8 @@ class Wait(vm._Builtin):
 
     def _Run(self, cmd_val):
         # type: (cmd_value.Argv) -> int
-        attrs, arg_r = flag_spec.ParseCmdVal('wait', cmd_val)
-        arg = arg_types.wait(attrs.attrs)
+        arg_r = flag_spec.CmdValReader(cmd_val)
+        arg = arg_types.Parse_wait(arg_r)
 
         job_ids, arg_locs = arg_r.Rest2()
 
@@ -199,11 +199,8 @@ class Shopt(vm._Builtin):
 
     def Run(self, cmd_val):
         # type: (cmd_value.Argv) -> int
-        attrs, arg_r = flag_spec.ParseCmdVal('shopt',
-                                             cmd_val,
-                                             accept_typed_args=True)
-
-        arg = arg_types.shopt(attrs.attrs)
+        arg_r = flag_spec.CmdValReader(cmd_val, accept_typed_args=True)
+        arg = arg_types.Parse_shopt(arg_r)
         opt_names = arg_r.Rest()
 
         if arg.p:  # print values
@@ -277,8 +274,8 @@ class Hash(vm._Builtin):
 
     def Run(self, cmd_val):
         # type: (cmd_value.Argv) -> int
-        attrs, arg_r = flag_spec.ParseCmdVal('hash', cmd_val)
-        arg = arg_types.hash(attrs.attrs)
+        arg_r = flag_spec.CmdValReader(cmd_val)
+        arg = arg_types.Parse_hash(arg_r)
 
         rest = arg_r.Rest()
         if arg.r:
@@ -519,8 +516,8 @@ class Echo(vm._Builtin):
             # Avoid parsing -e -n
             arg = self._SimpleFlag()
         else:
-            attrs, arg_r = flag_spec.ParseLikeEcho('echo', cmd_val)
-            arg = arg_types.echo(attrs.attrs)
+            arg_r = flag_spec.CmdValReader(cmd_val)
+            arg = arg_types.ParseLikeEcho_echo(arg_r)
             argv = arg_r.Rest()
 
         backslash_c = False  # \c terminates input
@@ -186,8 +186,8 @@ class Trap(vm._Builtin):
 
     def Run(self, cmd_val):
         # type: (cmd_value.Argv) -> int
-        attrs, arg_r = flag_spec.ParseCmdVal('trap', cmd_val)
-        arg = arg_types.trap(attrs.attrs)
+        arg_r = flag_spec.CmdValReader(cmd_val)
+        arg = arg_types.Parse_trap(arg_r)
 
         if arg.p:  # Print registered handlers
             # The unit tests rely on this being one line.
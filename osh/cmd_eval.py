@@ -84,7 +84,7 @@ from osh import braces
 from osh import sh_expr_eval
 from osh import word_eval
 from mycpp import mylib
-from mycpp.mylib import log, switch, tagswitch, StrFromC
+from mycpp.mylib import log, switch, tagswitch, iteritems, StrFromC
 
 import posix_ as posix
 import libc  # for fnmatch
@@ -155,6 +155,18 @@ if mylib.PYTHON:
 
         return val
 
+    def _PyObjToLoopVal(py_val):
+        # type: (Any) -> value_t
+        """Bind strings and integers in YSH loops without value.Obj."""
+        if isinstance(py_val, str):
+            return value.Str(py_val)
+
+        # bool is a subclass of int
+        if isinstance(py_val, int) and not isinstance(py_val, bool):
+            return value.Int(py_val)
+
+        return value.Obj(py_val)
+
 
 def _PackFlags(keyword_id, flags=0):
     # type: (Id_t, int) -> int
@@ -1261,115 +1273,18 @@ class CommandEvaluator(object):
                 status = 0  # in case we don't loop
 
                 if iter_list is None:  # for_expr.YshExpr
-                    if mylib.PYTHON:
-                        obj = self.expr_ev.EvalExpr(iter_expr, loc.Missing)
-
-                        # TODO: Once expr_eval.py is statically typed, consolidate this
-                        # with the shell-style loop.
-                        with ctx_LoopLevel(self):
-                            if isinstance(obj, list):
-
-                                n = len(node.iter_names)
-                                assert n > 0
-                                if n == 1:
-                                    i_name = None
-                                    val_name = location.LName(
-                                        node.iter_names[0])
-                                elif n == 2:
-                                    i_name = location.LName(node.iter_names[0])
-                                    val_name = location.LName(
-                                        node.iter_names[1])
-                                else:
-                                    # This is similar to a parse error
-                                    e_die_status(
-                                        2,
-                                        'List iteration expects at most 2 loop variables',
-                                        node.keyword)
-
-                                index = 0
-                                for item in obj:
-                                    if i_name:
-                                        self.mem.SetValue(
-                                            i_name, value.Obj(index),
-                                            scope_e.LocalOnly)
-                                    self.mem.SetValue(val_name, value.Obj(item),
-                                                      scope_e.LocalOnly)
-
-                                    try:
-                                        status = self._Execute(
-                                            node.body)  # last one wins
-                                    except vm.ControlFlow as e:
-                                        status = 0
-                                        action = e.HandleLoop()
-                                        if action == flow_e.Break:
-                                            break
-                                        elif action == flow_e.Raise:
-                                            raise
-                                    index += 1
-
-                            elif isinstance(obj, dict):
-
-                                n = len(node.iter_names)
-                                assert n > 0
-                                if n == 1:
-                                    i_name = None
-                                    key_name = location.LName(
-                                        node.iter_names[0])
-                                    val_name = None
-                                elif n == 2:
-                                    i_name = None
-                                    key_name = location.LName(
-                                        node.iter_names[0])
-                                    val_name = location.LName(
-                                        node.iter_names[1])
-                                elif n == 3:
-                                    i_name = location.LName(node.iter_names[0])
-                                    key_name = location.LName(
-                                        node.iter_names[1])
-                                    val_name = location.LName(
-                                        node.iter_names[2])
-                                else:
-                                    # already checked at parse time
-                                    assert False
-
-                                index = 0
-                                for key in obj:
-                                    self.mem.SetValue(key_name, value.Obj(key),
-                                                      scope_e.LocalOnly)
-                                    if val_name:
-                                        dict_value = obj[key]
-                                        self.mem.SetValue(
-                                            val_name, value.Obj(dict_value),
-                                            scope_e.LocalOnly)
-                                    if i_name:
-                                        self.mem.SetValue(
-                                            i_name, value.Obj(index),
-                                            scope_e.LocalOnly)
-
-                                    try:
-                                        status = self._Execute(
-                                            node.body)  # last one wins
-                                    except vm.ControlFlow as e:
-                                        status = 0
-                                        action = e.HandleLoop()
-                                        if action == flow_e.Break:
-                                            break
-                                        elif action == flow_e.Raise:
-                                            raise
-
-                                    index += 1
-
-                            else:
-                                raise error.Expr(
-                                    "Expected list or dict, got %r" % type(obj),
-                                    iter_expr_blame)
+                    val = self.expr_ev.EvalForIterable(iter_expr,
+                                                       iter_expr_blame)
+                    with ctx_LoopLevel(self):
+                        status = self._ForEachValue(node, val,
+                                                    iter_expr_blame)
 
                 else:
                     with ctx_LoopLevel(self):
                         n = len(node.iter_names)
                         assert n > 0
                         if n == 1:
-                            i_name = None
+                            i_name = None  # type: lvalue.Named
                             val_name = location.LName(node.iter_names[0])
                         elif n == 2:
                             i_name = location.LName(node.iter_names[0])
@@ -1384,25 +1299,16 @@ class CommandEvaluator(object):
                         index = 0
                         for x in iter_list:
                             #log('> ForEach setting %r', x)
-                            if mylib.PYTHON:
-                                # value.Obj not available in C++
-                                if i_name:
-                                    self.mem.SetValue(i_name, value.Obj(index),
-                                                      scope_e.LocalOnly)
+                            if i_name:
+                                self.mem.SetValue(i_name, value.Int(index),
+                                                  scope_e.LocalOnly)
                             self.mem.SetValue(val_name, value.Str(x),
                                               scope_e.LocalOnly)
                             #log('<')
 
-                            try:
-                                status = self._Execute(
-                                    node.body)  # last one wins
-                            except vm.ControlFlow as e:
-                                status = 0
-                                action = e.HandleLoop()
-                                if action == flow_e.Break:
-                                    break
-                                elif action == flow_e.Raise:
-                                    raise
+                            status, do_break = self._ExecuteLoopBody(node.body)
+                            if do_break:
+                                break
                             index += 1
 
             elif case(command_e.ForExpr):
@@ -1613,7 +1519,9 @@ class CommandEvaluator(object):
                     # redirects can fail.
                     with vm.ctx_Redirect(self.shell_ex):
                         try:
-                            status = self._Dispatch(node, cmd_st)
+                            with dev.ctx_ProfileLine(self.tracer.profiler,
+                                                     node):
+                                status = self._Dispatch(node, cmd_st)
                             check_errexit = cmd_st.check_errexit
                         except error.FailGlob as e:
                             if not e.HasLocation():  # Last resort!
@@ -1736,6 +1644,213 @@ class CommandEvaluator(object):
                 node = cast(BraceGroup, UP_node)
                 self._NoForkLast(node.children[-1])
 
+    def _ExecuteLoopBody(self, body):
+        # type: (command_t) -> Tuple[int, bool]
+        """Run one iteration of a loop.
+
+        Returns:
+          (status, whether to break)
+        """
+        try:
+            status = self._Execute(body)
+        except vm.ControlFlow as e:
+            action = e.HandleLoop()
+            if action == flow_e.Break:
+                return 0, True
+            elif action == flow_e.Raise:
+                raise
+            return 0, False
+        return status, False
+
+    def _ForEachValue(self, node, val, blame_tok):
+        # type: (command.ForEach, value_t, Token) -> int
+        """The YSH loop, e.g. for x in (mylist) or for k, v in (mydict).
+
+        Loop variables are bound to typed values like value.Str and
+        value.Int, and ranges are iterated without creating a list.
+        """
+        n = len(node.iter_names)
+        assert n > 0
+
+        is_dict = val.tag() in (value_e.Dict, value_e.AssocArray)
+        if mylib.PYTHON:
+            if val.tag() == value_e.Obj:
+                is_dict = isinstance(cast(value.Obj, val).obj, dict)
+
+        # Create each lvalue once, not once per iteration
+        i_name = None  # type: lvalue.Named
+        key_name = None  # type: lvalue.Named
+        val_name = None  # type: lvalue.Named
+        if is_dict:
+            if n == 1:
+                key_name = location.LName(node.iter_names[0])
+            elif n == 2:
+                key_name = location.LName(node.iter_names[0])
+                val_name = location.LName(node.iter_names[1])
+            elif n == 3:
+                i_name = location.LName(node.iter_names[0])
+                key_name = location.LName(node.iter_names[1])
+                val_name = location.LName(node.iter_names[2])
+            else:
+                # already checked at parse time
+                raise AssertionError()
+        else:
+            if n == 1:
+                val_name = location.LName(node.iter_names[0])
+            elif n == 2:
+                i_name = location.LName(node.iter_names[0])
+                val_name = location.LName(node.iter_names[1])
+            else:
+                # This is similar to a parse error
+                e_die_status(2,
+                             'List iteration expects at most 2 loop variables',
+                             node.keyword)
+
+        status = 0
+        index = 0
+        UP_val = val
+        with tagswitch(val) as case:
+            if case(value_e.List):
+                val = cast(value.List, UP_val)
+                for item in val.items:
+                    if i_name:
+                        self.mem.SetValue(i_name, value.Int(index),
+                                          scope_e.LocalOnly)
+                    self.mem.SetValue(val_name, item, scope_e.LocalOnly)
+
+                    status, do_break = self._ExecuteLoopBody(node.body)
+                    if do_break:
+                        break
+                    index += 1
+
+            elif case(value_e.MaybeStrArray):
+                val = cast(value.MaybeStrArray, UP_val)
+                for s in val.strs:
+                    if s is None:  # skip holes, like "${a[@]}"
+                        continue
+                    if i_name:
+                        self.mem.SetValue(i_name, value.Int(index),
+                                          scope_e.LocalOnly)
+                    self.mem.SetValue(val_name, value.Str(s),
+                                      scope_e.LocalOnly)
+
+                    status, do_break = self._ExecuteLoopBody(node.body)
+                    if do_break:
+                        break
+                    index += 1
+
+            elif case(value_e.Range):
+                val = cast(value.Range, UP_val)
+                if val.upper is None:
+                    e_die("Can't iterate over a range with no upper bound",
+                          blame_tok)
+                i = 0
+                if val.lower:
+                    i = val.lower.i
+                upper = val.upper.i
+                step = 1
+                if val.step:
+                    step = val.step.i
+                if step <= 0:
+                    e_die('Range step must be positive', blame_tok)
+
+                while i < upper:
+                    if i_name:
+                        self.mem.SetValue(i_name, value.Int(index),
+                                          scope_e.LocalOnly)
+                    self.mem.SetValue(val_name, value.Int(i),
+                                      scope_e.LocalOnly)
+
+                    status, do_break = self._ExecuteLoopBody(node.body)
+                    if do_break:
+                        break
+                    i += step
+                    index += 1
+
+            elif case(value_e.Dict):
+                val = cast(value.Dict, UP_val)
+                for key, dict_val in iteritems(val.d):
+                    if i_name:
+                        self.mem.SetValue(i_name, value.Int(index),
+                                          scope_e.LocalOnly)
+                    self.mem.SetValue(key_name, value.Str(key),
+                                      scope_e.LocalOnly)
+                    if val_name:
+                        self.mem.SetValue(val_name, dict_val,
+                                          scope_e.LocalOnly)
+
+                    status, do_break = self._ExecuteLoopBody(node.body)
+                    if do_break:
+                        break
+                    index += 1
+
+            elif case(value_e.AssocArray):
+                val = cast(value.AssocArray, UP_val)
+                for key, s in iteritems(val.d):
+                    if i_name:
+                        self.mem.SetValue(i_name, value.Int(index),
+                                          scope_e.LocalOnly)
+                    self.mem.SetValue(key_name, value.Str(key),
+                                      scope_e.LocalOnly)
+                    if val_name:
+                        self.mem.SetValue(val_name, value.Str(s),
+                                          scope_e.LocalOnly)
+
+                    status, do_break = self._ExecuteLoopBody(node.body)
+                    if do_break:
+                        break
+                    index += 1
+
+            elif case(value_e.Obj):
+                if mylib.PYTHON:
+                    # A list, dict, or xrange
+                    obj = cast(value.Obj, UP_val).obj
+                    if isinstance(obj, dict):
+                        for key in obj:
+                            if i_name:
+                                self.mem.SetValue(i_name, value.Int(index),
+                                                  scope_e.LocalOnly)
+                            self.mem.SetValue(key_name, value.Str(key),
+                                              scope_e.LocalOnly)
+                            if val_name:
+                                self.mem.SetValue(val_name,
+                                                  _PyObjToLoopVal(obj[key]),
+                                                  scope_e.LocalOnly)
+
+                            status, do_break = self._ExecuteLoopBody(
+                                node.body)
+                            if do_break:
+                                break
+                            index += 1
+
+                    elif isinstance(obj, (list, xrange)):
+                        for item in obj:
+                            if i_name:
+                                self.mem.SetValue(i_name, value.Int(index),
+                                                  scope_e.LocalOnly)
+                            self.mem.SetValue(val_name, _PyObjToLoopVal(item),
+                                              scope_e.LocalOnly)
+
+                            status, do_break = self._ExecuteLoopBody(
+                                node.body)
+                            if do_break:
+                                break
+                            index += 1
+
+                    else:
+                        raise error.Expr(
+                            "Expected list or dict, got %r" % type(obj),
+                            blame_tok)
+                else:
+                    raise AssertionError()
+
+            else:
+                raise error.Expr(
+                    "Expected List, Dict, or Range, got %s" % ui.ValType(val),
+                    blame_tok)
+
+        return status
+
     def _RemoveSubshells(self, node):
         # type: (command_t) -> command_t
         """Eliminate redundant subshells like ( echo hi ) | wc -l etc."""
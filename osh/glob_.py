@@ -1,5 +1,7 @@
 """Glob_.py."""
 
+import time as time_
+
 import libc
 
 from _devbuild.gen.id_kind_asdl import Id, Id_t
@@ -11,11 +13,13 @@ from _devbuild.gen.syntax_asdl import (
     glob_part_e,
     glob_part_t,
 )
+from core import pyos
 from core import pyutil
 from frontend import match
-from mycpp.mylib import log, print_stderr
+from mycpp.mylib import log
+from pylib import path_stat
 
-from typing import List, Tuple, cast, TYPE_CHECKING
+from typing import Dict, List, Optional, Tuple, cast, TYPE_CHECKING
 if TYPE_CHECKING:
     from core import optview
     from frontend.match import SimpleLexer
@@ -369,6 +373,51 @@ def GlobToERE(pat):
     return regex, warnings
 
 
+def _LiteralComponent(comp):
+    # type: (str) -> Optional[str]
+    """If a path component has no glob operators, return it unescaped.
+
+    Otherwise return None, and the component is matched against directory
+    entries with fnmatch().
+    """
+    lexer = match.GlobLexer(comp)
+    p = _GlobParser(lexer)
+    parts, _ = p.Parse()
+
+    chars = []  # type: List[str]
+    for part in parts:
+        if part.tag() != glob_part_e.Literal:
+            return None
+        lit = cast(glob_part.Literal, part)
+        # libc may still parse a char class that we consider malformed, like
+        # [[z].  fnmatch() handles both cases.
+        if lit.id == Id.Glob_LBracket:
+            return None
+        if lit.id == Id.Glob_EscapedChar:
+            chars.append(lit.s[1])
+        else:
+            chars.append(lit.s)
+    return ''.join(chars)
+
+
+def _JoinPath(prefix, name, sep='/'):
+    # type: (str, str, str) -> str
+    if len(prefix) == 0:
+        return name
+    if prefix.endswith('/'):
+        return prefix + name
+    return prefix + sep + name
+
+
+class _DirListing(object):
+    """The result of pyos.ListDir(), which is cached by Globber."""
+
+    def __init__(self, names, kinds):
+        # type: (List[str], List[int]) -> None
+        self.names = names
+        self.kinds = kinds  # pyos.DIR_ENTRY_*
+
+
 # Notes for implementing extglob
 # - libc glob() doesn't have any extension!
 # - Nix stdenv uses !(foo) and @(foo|bar)
@@ -380,17 +429,37 @@ def GlobToERE(pat):
 #   - or do dynamic parsing
 #     - LooksLikeGlob() would have to respect extglob!  ugh!
 # - See 2 calls in osh/word_eval.py
+# - Now that we walk the file system ourselves, each component is matched with
+#   fnmatch(..., FNM_EXTMATCH).  We only filter full paths when an alternative
+#   contains /.
 
 
 class Globber(object):
+    """Expands globs by walking the file system.
+
+    Rather than calling libc glob(), we split the pattern on /, and match each
+    component against directory entries with fnmatch().  This lets us
+
+    - implement ** (globstar),
+    - match extended globs like @(a|b) with FNM_EXTMATCH, without globbing
+      and then filtering, and
+    - cache directory listings, e.g. for 'for i in ...; do echo src/*.c; done'.
+    """
+
     def __init__(self, exec_opts):
         # type: (optview.Exec) -> None
         self.exec_opts = exec_opts
 
+        # (dir, mtime) -> entries.  Cleared after every command line; see
+        # ClearCache().
+        #
+        # NOTE: Like completion.ExternalCommandAction, this assumes that
+        # stat() is cheaper than listing a directory.
+        self.dir_cache = {}  # type: Dict[Tuple[str, int], _DirListing]
+
         # Other unimplemented bash options:
         #
         # dotglob           dotfiles are matched
-        # globstar          ** for directories
         # globasciiranges   ascii or unicode char classes (unicode by default)
         # nocaseglob
         # extglob          the @() !() syntax -- libc helps us with fnmatch(), but
@@ -400,33 +469,224 @@ class Globber(object):
         # do.  Could a default GLOBIGNORE to ignore flags on the file system be
         # part of the security solution?  It doesn't seem totally sound.
 
+    def ClearCache(self):
+        # type: () -> None
+        """Called by the main loop, so the cache doesn't grow without bound."""
+        self.dir_cache.clear()
+
+    def _ListDir(self, path):
+        # type: (str) -> Optional[_DirListing]
+        """Return the entries of a directory, or None if it can't be read."""
+        dir_path = path if len(path) else '.'
+        try:
+            key = pyos.MakeDirCacheKey(dir_path)
+        except (IOError, OSError):
+            return None
+
+        listing = self.dir_cache.get(key)
+        if listing is None:
+            try:
+                names, kinds = pyos.ListDir(dir_path)
+            except (IOError, OSError):
+                return None
+            listing = _DirListing(names, kinds)
+
+            # The mtime has a resolution of 1 second, so a directory modified
+            # in this second could change again without a new mtime.  Like
+            # "racily clean" entries in git, don't cache it.
+            mtime = key[1]
+            if mtime + 1 <= time_.time():
+                self.dir_cache[key] = listing
+
+        return listing
+
+    def _Emit(self, path, results):
+        # type: (str, List[str]) -> None
+
+        # Omit files starting with -
+        # dashglob turned OFF with shopt -s oil:upgrade.
+        if not self.exec_opts.dashglob() and path.startswith('-'):
+            return
+        results.append(path)
+
+    def _WalkDirs(self, prefix, dirs):
+        # type: (str, List[str]) -> None
+        """Append all directories under prefix, for ** in the middle of a
+        pattern.
+
+        Like bash, we don't descend into hidden directories or symlinks.
+        """
+        listing = self._ListDir(prefix)
+        if listing is None:
+            return
+        for i, name in enumerate(listing.names):
+            if name.startswith('.'):
+                continue
+            if listing.kinds[i] == pyos.DIR_ENTRY_DIR:
+                path = _JoinPath(prefix, name)
+                dirs.append(path)
+                self._WalkDirs(path, dirs)
+
+    def _WalkAll(self, prefix, dirs_only, results):
+        # type: (str, bool, List[str]) -> None
+        """Emit all entries under prefix, for ** at the end of a pattern."""
+        listing = self._ListDir(prefix)
+        if listing is None:
+            return
+        for i, name in enumerate(listing.names):
+            if name.startswith('.'):
+                continue
+            kind = listing.kinds[i]
+            path = _JoinPath(prefix, name)
+            if kind == pyos.DIR_ENTRY_OTHER:
+                if not dirs_only:
+                    self._Emit(path, results)
+                continue
+
+            self._Emit(path + '/' if dirs_only else path, results)
+            if kind == pyos.DIR_ENTRY_DIR:
+                self._WalkAll(path, dirs_only, results)
+
     def _Glob(self, arg, out):
         # type: (str, List[str]) -> int
-        try:
-            results = libc.glob(arg)
-        except RuntimeError as e:
-            # These errors should be rare: I/O error, out of memory, or unknown
-            # There are no syntax errors.  (But see comment about globerr() in
-            # native/libc.c.)
-            # note: MyPy doesn't know RuntimeError has e.message (and e.args)
-            msg = e.message  # type: str
-            print_stderr("Error expanding glob %r: %s" % (arg, msg))
-            raise
-        #log('glob %r -> %r', arg, g)
+        """Append the sorted matches of a glob pattern to 'out'."""
+        return self._GlobComponents(arg.split('/'), None, out)
+
+    def _GlobComponents(self, comps, ext_comps, out):
+        # type: (List[str], Optional[List[str]], List[str]) -> int
+        """Match each component of a pattern against directory entries.
+
+        Args:
+          comps: components of the glob pattern
+          ext_comps: if not None, the corresponding components with extended
+            glob syntax like @(a|b), which are matched with FNM_EXTMATCH.
+            comps has * in place of each extglob.
+
+        Errors reading directories are ignored, like glob() without GLOB_ERR.
+        """
+
+        # Like bash, runs of slashes are kept until the first component with
+        # a glob operator, e.g. d//*.c -> d//x.c, and after it they're
+        # collapsed, e.g. d*//x.c -> d/x.c.  seps[i] joins comps[i] to its
+        # prefix.
+        n = len(comps)
+        lead = 0
+        while lead < n - 1 and len(comps[lead]) == 0:
+            lead += 1
+        end = n
+        while end - 1 > lead and len(comps[end - 1]) == 0:
+            end -= 1
+        num_trailing = n - end
+
+        seps = []  # type: List[str]
+        kept = []  # type: List[int]
+        num_empty = 0
+        for i in xrange(lead, end):
+            if len(comps[i]) == 0:
+                num_empty += 1
+                continue
+            seps.append('' if len(kept) == 0 else '/' * (num_empty + 1))
+            kept.append(i)
+            num_empty = 0
+
+        # Prefixes of matched paths.  Each component of the pattern expands
+        # them.  An absolute path starts with its leading slashes.
+        prefixes = ['/' * lead]
+
+        # With a trailing slash, like */, only directories match
+        dirs_only = num_trailing > 0
+
+        globstar = self.exec_opts.globstar()
+        results = []  # type: List[str]
+
+        all_literal = True  # no glob operator in any component so far
+        num_kept = len(kept)
+        for k, i in enumerate(kept):
+            comp = comps[i]
+            sep = seps[k] if all_literal else '/'
+            last = (k == num_kept - 1)
+            new_prefixes = []  # type: List[str]
+
+            # The extglob *(a) also turns into *
+            is_ext = ext_comps is not None and ext_comps[i] != comp
+            pat = ext_comps[i] if is_ext else comp
+
+            if globstar and comp == '**' and not is_ext:
+                all_literal = False
+                for prefix in prefixes:
+                    # ** matches zero directories, so d//**/*.c includes
+                    # d//x.c
+                    prefix = _JoinPath(prefix, '', sep)
+                    if last:
+                        # Like bash, d/** includes d/ itself.  Literal
+                        # components before it haven't been checked yet.
+                        if len(prefix) and path_stat.isdir(prefix):
+                            self._Emit(prefix, results)
+                        self._WalkAll(prefix, dirs_only, results)
+                    else:
+                        # Zero or more directories
+                        new_prefixes.append(prefix)
+                        self._WalkDirs(prefix, new_prefixes)
+                prefixes = new_prefixes
+                continue
+
+            lit = None if is_ext else _LiteralComponent(comp)
+            if lit is not None:
+                # d// isn't a glob, so it keeps its slashes
+                tail = '/' * num_trailing if all_literal else '/'
+                for prefix in prefixes:
+                    path = _JoinPath(prefix, lit, sep)
+                    if last:
+                        if dirs_only:
+                            if path_stat.isdir(path):
+                                self._Emit(path + tail, results)
+                        elif path_stat.lexists(path):  # like glibc
+                            self._Emit(path, results)
+                    else:
+                        new_prefixes.append(path)
+                prefixes = new_prefixes
+                continue
+
+            all_literal = False
+
+            # A leading . must be matched explicitly, like FNM_PERIOD
+            match_hidden = comp.startswith('.') or comp.startswith('\\.')
+            need_dir = not last or dirs_only
+
+            for prefix in prefixes:
+                # glob() returns . and .. for .*
+                if match_hidden:
+                    for name in ['.', '..']:
+                        if libc.fnmatch(pat, name, is_ext):
+                            path = _JoinPath(prefix, name, sep)
+                            if last:
+                                self._Emit(path + '/' if dirs_only else path,
+                                           results)
+                            else:
+                                new_prefixes.append(path)
+
+                listing = self._ListDir(prefix)
+                if listing is None:
+                    continue
+                for j, name in enumerate(listing.names):
+                    if name.startswith('.') and not match_hidden:
+                        continue
+                    if need_dir and listing.kinds[j] == pyos.DIR_ENTRY_OTHER:
+                        continue
+                    if not libc.fnmatch(pat, name, is_ext):
+                        continue
+                    path = _JoinPath(prefix, name, sep)
+                    if last:
+                        self._Emit(path + '/' if dirs_only else path, results)
+                    else:
+                        new_prefixes.append(path)
+            prefixes = new_prefixes
 
         n = len(results)
         if n:  # Something matched
-            # Omit files starting with -
-            # dashglob turned OFF with shopt -s oil:upgrade.
-            if not self.exec_opts.dashglob():
-                tmp = [s for s in results if not s.startswith('-')]
-                results = tmp  # idiom to work around mycpp limitation
-                n = len(results)
-
+            results.sort()
             out.extend(results)
-            return n
-
-        return 0
+        return n
 
     def Expand(self, arg, out):
         # type: (str, List[str]) -> int
@@ -464,13 +724,22 @@ class Globber(object):
             out.append(fnmatch_pat)
             return 1
 
-        tmp = []  # type: List[str]
-        self._Glob(glob_pat, tmp)
-        filtered = [s for s in tmp if libc.fnmatch(fnmatch_pat, s)]
-        n = len(filtered)
+        glob_comps = glob_pat.split('/')
+        ext_comps = fnmatch_pat.split('/')
+        if len(glob_comps) == len(ext_comps):
+            # Match the extglob in each component directly against directory
+            # entries, rather than globbing with * and filtering the results.
+            n = self._GlobComponents(glob_comps, ext_comps, out)
+        else:
+            # An alternative contains /, like @(a/b|c), so the components
+            # don't line up.  Glob with * and filter the full paths.
+            tmp = []  # type: List[str]
+            self._Glob(glob_pat, tmp)
+            filtered = [s for s in tmp if libc.fnmatch(fnmatch_pat, s)]
+            n = len(filtered)
+            out.extend(filtered)
 
         if n:
-            out.extend(filtered)
             return n
 
         if self.exec_opts.failglob():
@@ -4,9 +4,15 @@ glob_test.py: Tests for glob.py
 """
 from __future__ import print_function
 
+import os
 import re
+import shutil
+import tempfile
 import unittest
 
+from _devbuild.gen.option_asdl import option_i
+from core import optview
+from core import state
 from frontend import match
 from osh import glob_
 
@@ -154,5 +160,117 @@ class GlobParserTest(unittest.TestCase):
             print('warnings: %s' % warnings)
 
 
+def _MakeGlobber(globstar=False, dashglob=True):
+    opt0_array = state.InitOpts()
+    opt0_array[option_i.globstar] = globstar
+    opt0_array[option_i.dashglob] = dashglob
+    opt_stacks = [None] * option_i.ARRAY_SIZE
+    return glob_.Globber(optview.Exec(opt0_array, opt_stacks))
+
+
+class GlobberTest(unittest.TestCase):
+    def setUp(self):
+        self.saved_cwd = os.getcwd()
+        self.tmp_dir = tempfile.mkdtemp()
+        os.chdir(self.tmp_dir)
+
+        for d in ['d/a/b', 'd/.h', 'e']:
+            os.makedirs(d)
+        for f in ['d/f.c', 'd/a/g.c', 'd/a/b/h.c', 'd/.h/i.c', 'top.c', '-n']:
+            open(f, 'w').close()
+        os.symlink('../e', 'd/lnk')
+
+    def tearDown(self):
+        os.chdir(self.saved_cwd)
+        shutil.rmtree(self.tmp_dir)
+
+    def _Glob(self, globber, pat):
+        out = []
+        n = globber._Glob(pat, out)
+        self.assertEqual(n, len(out))
+        return out
+
+    def testGlob(self):
+        g = _MakeGlobber()
+        self.assertEqual(['-n', 'd', 'e', 'top.c'], self._Glob(g, '*'))
+        self.assertEqual(['d/f.c'], self._Glob(g, '*/*.c'))
+        self.assertEqual(['d/', 'e/'], self._Glob(g, '*/'))
+        self.assertEqual(['d/a/g.c'], self._Glob(g, 'd/[a]/*.c'))
+        self.assertEqual(['d/.h/i.c'], self._Glob(g, 'd/.*/i.c'))
+        self.assertEqual(['d/a/'], self._Glob(g, 'd/a*/'))
+        # symlinks to directories match
+        self.assertEqual(['d/lnk/'], self._Glob(g, 'd/l*/'))
+        # literal components
+        self.assertEqual(['d/f.c'], self._Glob(g, 'd/f.[c]'))
+        self.assertEqual(['d/f.c'], self._Glob(g, '[d]/f.c'))
+        self.assertEqual([], self._Glob(g, '[d]/zz'))
+        # a dangling symlink exists
+        os.symlink('zz', 'e/dangling')
+        self.assertEqual(['e/dangling'], self._Glob(g, '[e]/dangling'))
+        # escaped
+        self.assertEqual([], self._Glob(g, r'\*'))
+        # slashes are kept before the first glob operator, like bash
+        self.assertEqual(['d//f.c'], self._Glob(g, 'd//*.c'))
+        self.assertEqual(['d/a/g.c'], self._Glob(g, 'd/[a]//*.c'))
+        self.assertEqual(['d/a/'], self._Glob(g, 'd/a*//'))
+        # ** is * without globstar
+        self.assertEqual(['d/a/g.c'], self._Glob(g, 'd/**/*.c'))
+
+    def testDashglob(self):
+        g = _MakeGlobber(dashglob=False)
+        self.assertEqual(['d', 'e', 'top.c'], self._Glob(g, '*'))
+
+    def testGlobstar(self):
+        g = _MakeGlobber(globstar=True)
+        self.assertEqual(['d/a/b/h.c', 'd/a/g.c', 'd/f.c', 'top.c'],
+                         self._Glob(g, '**/*.c'))
+        self.assertEqual(['d/a/b/h.c', 'd/a/g.c', 'd/f.c'],
+                         self._Glob(g, 'd/**/*.c'))
+        # doesn't descend into hidden dirs or symlinks, but lists them
+        self.assertEqual(
+            ['d/', 'd/a', 'd/a/b', 'd/a/b/h.c', 'd/a/g.c', 'd/f.c', 'd/lnk'],
+            self._Glob(g, 'd/**'))
+        self.assertEqual(['d/', 'd/a/', 'd/a/b/', 'd/lnk/'],
+                         self._Glob(g, 'd/**/'))
+        self.assertEqual(['d/a/b'], self._Glob(g, '**/b'))
+        # *** isn't special
+        self.assertEqual(['d/f.c'], self._Glob(g, '***/*.c'))
+
+    def testExpandExtended(self):
+        g = _MakeGlobber(globstar=True)
+
+        def Expand(glob_pat, fnmatch_pat):
+            out = []
+            n = g.ExpandExtended(glob_pat, fnmatch_pat, out)
+            self.assertEqual(n, len(out))
+            return out
+
+        self.assertEqual(['top.c'], Expand('*.c', '@(top|x).c'))
+        self.assertEqual(['d/a/g.c'], Expand('d/*/*.c', 'd/@(a|b)/*.c'))
+        self.assertEqual(['d/a/', 'd/lnk/'], Expand('d/*/', 'd/!(f.c)/'))
+        # hidden files aren't matched
+        self.assertEqual(['d/a', 'd/f.c', 'd/lnk'], Expand('d/*', 'd/!(x)'))
+        # *(a) isn't globstar
+        self.assertEqual(['top.c'], Expand('**.c', '*(top).c'))
+        # alternative containing /
+        self.assertEqual(['top.c'], Expand('*.c', '@(d/f|top).c'))
+        # no match returns the pattern
+        self.assertEqual(['@(x|y)'], Expand('*', '@(x|y)'))
+
+    def testDirCache(self):
+        g = _MakeGlobber()
+        # Make the mtime old enough to be cached
+        os.utime('d', (0, 0))
+        self.assertEqual(['d/f.c'], self._Glob(g, 'd/*.c'))
+        self.assertEqual(1, len(g.dir_cache))
+
+        # Modifying the directory changes its mtime, which invalidates the entry
+        open('d/new.c', 'w').close()
+        self.assertEqual(['d/f.c', 'd/new.c'], self._Glob(g, 'd/*.c'))
+
+        g.ClearCache()
+        self.assertEqual(0, len(g.dir_cache))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -8,6 +8,9 @@ from _devbuild.gen.syntax_asdl import (
     CompoundWord,
     DoubleQuoted,
     SingleQuoted,
+    SimpleVarSub,
+    BracedVarSub,
+    bracket_op_e,
     word,
     word_e,
     word_t,
@@ -261,6 +264,61 @@ def HasArrayPart(w):
     return False
 
 
+def _IsPurePart(part):
+    # type: (word_part_t) -> bool
+    UP_part = part
+    with tagswitch(part) as case:
+        if case(word_part_e.Literal, word_part_e.EscapedLiteral,
+                word_part_e.SingleQuoted, word_part_e.TildeSub):
+            return True
+
+        elif case(word_part_e.DoubleQuoted):
+            part = cast(DoubleQuoted, UP_part)
+            for p in part.parts:
+                if not _IsPurePart(p):
+                    return False
+            return True
+
+        elif case(word_part_e.SimpleVarSub):
+            part = cast(SimpleVarSub, UP_part)
+            return part.var_name not in ('BASHPID', 'RANDOM')
+
+        elif case(word_part_e.BracedVarSub):
+            part = cast(BracedVarSub, UP_part)
+            if part.var_name in ('BASHPID', 'RANDOM'):
+                return False
+            # ${#x} is OK, but not ${!ref}
+            if part.prefix_op and part.prefix_op.id != Id.VSub_Pound:
+                return False
+            # ${a[@]} is OK, but not ${a[i++]}
+            if (part.bracket_op and
+                    part.bracket_op.tag() != bracket_op_e.WholeArray):
+                return False
+            # No ${x:=default} or ${x:-$(date)}
+            return part.suffix_op is None
+
+        else:
+            return False
+
+
+def IsPure(UP_w):
+    # type: (word_t) -> bool
+    """Does evaluating this word give the same result in the shell process as
+    in a child process, without changing any shell state?
+
+    Used to run the first part of 'echo "$x" | wc -l' without forking.  We're
+    conservative: no command subs, arithmetic, or ${x:=default}, and no
+    $BASHPID or $RANDOM, which are different in a child.
+    """
+    if UP_w.tag() != word_e.Compound:
+        return False
+    w = cast(CompoundWord, UP_w)
+    for part in w.parts:
+        if not _IsPurePart(part):
+            return False
+    return True
+
+
 def ShFunctionName(w):
     # type: (CompoundWord) -> str
     """Returns a valid shell function name, or the empty string.
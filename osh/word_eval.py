@@ -224,6 +224,10 @@ def _ValueToPartValue(val, quoted):
             # TODO: Is this correct?
             return part_value.Array(val.d.values())
 
+        elif case(value_e.Int):  # e.g. bound by a YSH for loop
+            val = cast(value.Int, UP_val)
+            return part_value.String(str(val.i), quoted, not quoted)
+
         elif case(value_e.Obj):
             if mylib.PYTHON:
                 val = cast(value.Obj, UP_val)
@@ -233,6 +237,14 @@ def _ValueToPartValue(val, quoted):
             # Not in C++
             raise AssertionError()
 
+        elif case(value_e.Bool, value_e.Float, value_e.List, value_e.Dict):
+            if mylib.PYTHON:
+                from ysh import expr_eval
+                s = expr_eval.Stringify(val)
+                return part_value.String(s, quoted, not quoted)
+            # Not in C++
+            raise AssertionError()
+
         else:
             # Undef should be caught by _EmptyStrOrError().
             raise AssertionError(val.tag())
@@ -80,6 +80,27 @@ class Grammar(object):
 
     start         -- the number of the grammar's start symbol.
 
+    Oil addition: tables computed from the ones above by
+    pgen.MakeActionTables(), so that the parser does a constant amount of
+    work per token.  Each DFA state has a global number.
+
+    dfa_start     -- the global state of each DFA's start state, indexed by
+                     symbol number - 256.
+
+    actions       -- the (state, label) -> action table, packed by row
+                     displacement: the action for state s and label i is
+                     actions[action_base[s] + i] if action_check[] at that
+                     index is s, and action_default[s] otherwise.  See
+                     parse.py for the encoding of actions.
+
+    action_base   -- for each state, its offset into actions, or -1 if the
+                     state only accepts.
+
+    action_check  -- the state each entry of actions belongs to.
+
+    action_default -- for each state, ACTION_POP if it's final, and
+                     ACTION_ERROR otherwise.
+
     keywords      -- a dict mapping keyword strings to arc labels.
 
     tokens        -- a dict mapping token numbers to arc labels.
@@ -107,6 +128,12 @@ class Grammar(object):
         self.symbol2label = {}  # type: Dict[str, int]
         self.start = 256
 
+        self.dfa_start = []  # type: List[int]
+        self.actions = []  # type: List[int]
+        self.action_base = []  # type: List[int]
+        self.action_check = []  # type: List[int]
+        self.action_default = []  # type: List[int]
+
     if mylib.PYTHON:
       def dump(self, f):
           # type: (IO[str]) -> None
@@ -140,6 +167,11 @@ class Grammar(object):
             tokens,
             self.symbol2label,
             self.start,
+            self.dfa_start,
+            self.actions,
+            self.action_base,
+            self.action_check,
+            self.action_default,
           )  # tuple
           marshal.dump(payload, f)  # version 2 is latest
 
@@ -185,38 +217,34 @@ namespace grammar {
 
 """)
 
+          # The parser only uses these tables, and they're static data.
+          tables = [
+              ('dfa_start', self.dfa_start),
+              ('actions', self.actions),
+              ('action_base', self.action_base),
+              ('action_check', self.action_check),
+              ('action_default', self.action_default),
+          ]
+          for name, table in tables:
+              src_f.write('GLOBAL_LIST(int, %d, g_%s, {\n' % (len(table), name))
+              for i in xrange(0, len(table), 16):
+                  row = table[i:i + 16]
+                  sep = '' if i + 16 >= len(table) else ' COMMA'
+                  src_f.write('    %s%s\n' %
+                              (' COMMA '.join(str(n) for n in row), sep))
+              src_f.write('});\n\n')
+
           src_f.write('Grammar::Grammar() {\n')
           src_f.write('  symbol2number = Alloc<Dict<Str*, int>>();\n')
           src_f.write('  number2symbol = Alloc<Dict<int, Str*>>();\n')
-          src_f.write('  dfas = Alloc<Dict<int, dfa_t*>>();\n')
           src_f.write('  keywords = Alloc<Dict<Str*, int>>();\n')
           src_f.write('  tokens = Alloc<Dict<int, int>>();\n')
           src_f.write('  symbol2label = Alloc<Dict<Str*, int>>();\n')
           src_f.write('  start = %d;\n' % self.start)
+          for name, _ in tables:
+              src_f.write('  %s = g_%s;\n' % (name, name))
 
           src_f.write('\n')
-          for i, (states, first) in self.dfas.items():
-              src_f.write('  {\n')
-              src_f.write('    states_t* st = Alloc<states_t>();\n')
-              for s in states:
-                  src_f.write('    st->append(NewList<arc_t*>(\n')
-                  src_f.write('      std::initializer_list<arc_t*>{\n')
-                  for a, b in s:
-                      src_f.write('        Alloc<Tuple2<int, int>>(%d, %d),\n' % (a, b))
-
-                  src_f.write('      })\n')
-                  src_f.write('    );\n')
-
-              src_f.write('    first_t* first = Alloc<first_t>();\n')
-              for k, v in first.items():
-                  src_f.write('    first->set(%d, %d);\n' % (k, v))
-
-              src_f.write('    dfa_t* dfa = Alloc<dfa_t>(st, first);\n')
-              src_f.write('    dfas->set(%d, dfa);\n' % i)
-              src_f.write('    \n')
-              src_f.write('  }\n')
-              src_f.write('\n')
-
           for symbol, num in self.symbol2number.items():
               src_f.write('  symbol2number->set(StrFromC("%s"), %d);\n' % (symbol, num))
 
@@ -277,6 +305,11 @@ namespace grammar {
             self.tokens,
             self.symbol2label,
             self.start,
+            self.dfa_start,
+            self.actions,
+            self.action_base,
+            self.action_check,
+            self.action_default,
           ) = payload
           #self.report()
 
@@ -290,6 +323,7 @@ namespace grammar {
           log("number2symbol: %d entries", len(self.number2symbol))
           log("states: %d entries", len(self.states))
           log("dfas: %d entries", len(self.dfas))
+          log("actions: %d entries", len(self.actions))
           return
           from pprint import pprint
           print("labels")
@@ -17,7 +17,15 @@ from pgen2.pnode import PNode, PNodeAllocator
 
 if TYPE_CHECKING:
   from _devbuild.gen.syntax_asdl import Token
-  from pgen2.grammar import Grammar, dfa_t
+  from pgen2.grammar import Grammar
+
+# Actions in the tables computed by pgen.MakeActionTables().  The low 3 bits
+# are the kind, and the rest is an argument.
+ACTION_ERROR = 0
+ACTION_SHIFT = 1  # arg: the next state
+ACTION_PUSH = 2  # arg: the state to return to << 16 | the nonterminal
+ACTION_PUSH_UNARY = 3  # like PUSH, but the node is elided if it has 1 child
+ACTION_POP = 4  # in a final state: pop the nonterminal and try again
 
 
 class ParseError(Exception):
@@ -35,11 +43,15 @@ class ParseError(Exception):
 
 
 class _StackItem(object):
-  def __init__(self, dfa, state, node):
-    # type: (dfa_t, int, PNode) -> None
-    self.dfa = dfa
+  def __init__(self, state, typ, tok, node):
+    # type: (int, int, Optional[Token], Optional[PNode]) -> None
     self.state = state
+    self.typ = typ
+    self.tok = tok
+    # For ACTION_PUSH_UNARY, the node isn't allocated until it gets a second
+    # child.  Until then, the first child is here.
     self.node = node
+    self.child = None  # type: Optional[PNode]
 
 
 class Parser(object):
@@ -111,110 +123,110 @@ class Parser(object):
         """
         self.pnode_alloc = pnode_alloc
         newnode = self.pnode_alloc.NewPNode(start, None)
-        # Each stack entry is a tuple: (dfa, state, node).
-        self.stack = [_StackItem(self.grammar.dfas[start], 0, newnode)]
+        self.stack = [
+            _StackItem(self.grammar.dfa_start[start - 256], start, None,
+                       newnode)
+        ]
         self.rootnode = None
 
+    def _Action(self, state, ilabel):
+        # type: (int, int) -> int
+        """Look up the action for a token in the packed tables."""
+        gr = self.grammar
+        base = gr.action_base[state]
+        if base != -1:
+            i = base + ilabel
+            if i < len(gr.action_check) and gr.action_check[i] == state:
+                return gr.actions[i]
+        return gr.action_default[state]
+
     def addtoken(self, typ, opaque, ilabel):
         # type: (int, Token, int) -> bool
         """Add a token; return True iff this is the end of the program."""
-        # Loop until the token is shifted; may raise exceptions
-
-        # Andy NOTE: This is not linear time, i.e. a constant amount of work
-        # for each token?  Is it O(n^2) as the ANTLR paper says?
-        # Do the "accelerators" in pgen.c have anything to do with it?
-
+        # Loop until the token is shifted; may raise exceptions.  Each
+        # iteration is a constant amount of work, since pgen precomputed the
+        # arcs and first sets into the action tables.
         while True:
-            top = self.stack[-1]
-            states, _ = top.dfa
-            state = top.state
-
-            arcs = states[state]
-
-            # Look for a state with this label
-            found = False
-            for ilab, newstate in arcs:
-                t = self.grammar.labels[ilab]
-                if ilabel == ilab:
-                    # Look it up in the list of labels
-                    assert t < 256, t
-                    # Shift a token; we're done with it
-                    self.shift(typ, opaque, newstate)
-                    # Pop while we are in an accept-only state
-                    state = newstate
-                     
-                    while True:
-                        # mycpp: rewrite of tuple-in-list comparison
-                        if len(states[state]) != 1:
-                            break
-
-                        s0, s1 = states[state][0]
-                        if s0 != 0 or s1 != state:
-                            break
-
-                        self.pop()
-                        if len(self.stack) == 0:
-                            # Done parsing!
-                            return True
-                        top = self.stack[-1]
-                        states, _ = top.dfa
-                        state = top.state
-
-                    # Done with this token
-                    return False
-                elif t >= 256:
-                    # See if it's a symbol and if we're in its first set
-                    itsdfa = self.grammar.dfas[t]
-                    _, itsfirst = itsdfa
-                    if ilabel in itsfirst:
-                        # Push a symbol
-                        self.push(t, opaque, self.grammar.dfas[t], newstate)
-                        found = True
-                        break # To continue the outer while loop
-
-            if not found:
-                # Note: this condition was rewritten for mycpp tarnslation.
-                # if (0, state) in arcs:
-                #   ...
-                # else:
-                #   ...
-                found2 = False
-                for left, right in arcs:
-                    if left == 0 and right == state:
-                        # An accepting state, pop it and try something else
-                        self.pop()
-                        if len(self.stack) == 0:
-                            # Done parsing, but another token is input
-                            raise ParseError("too much input", typ, opaque)
-                        found2 = True
-
-                if not found2:
-                    # No success finding a transition
-                    raise ParseError("bad input", typ, opaque)
+            action = self._Action(self.stack[-1].state, ilabel)
+            kind = action & 7
+            arg = action >> 3
+
+            if kind == ACTION_SHIFT:
+                # Shift a token; we're done with it
+                self.shift(typ, opaque, arg)
+
+                # Pop while we are in an accept-only state
+                while self.grammar.action_base[self.stack[-1].state] == -1:
+                    self.pop()
+                    if len(self.stack) == 0:
+                        # Done parsing!
+                        return True
+
+                # Done with this token
+                return False
+
+            if kind == ACTION_PUSH or kind == ACTION_PUSH_UNARY:
+                # The token is in the first set of a nonterminal
+                self.push(arg & 0xffff, opaque, arg >> 16,
+                          kind == ACTION_PUSH_UNARY)
+
+            elif kind == ACTION_POP:
+                # An accepting state, pop it and try something else
+                self.pop()
+                if len(self.stack) == 0:
+                    # Done parsing, but another token is input
+                    raise ParseError("too much input", typ, opaque)
+
+            else:
+                # No success finding a transition
+                raise ParseError("bad input", typ, opaque)
+
+    def _AddChild(self, item, node):
+        # type: (_StackItem, PNode) -> None
+        if item.node is None:
+            if item.child is None:
+                item.child = node
+                return
+            item.node = self.pnode_alloc.NewPNode(item.typ, item.tok)
+            item.node.AddChild(item.child)
+            item.child = None
+        item.node.AddChild(node)
 
     def shift(self, typ, opaque, newstate):
         # type: (int, Token, int) -> None
         """Shift a token.  (Internal)"""
         top = self.stack[-1]
-        newnode = self.pnode_alloc.NewPNode(typ, opaque)
-        top.node.AddChild(newnode)
-        self.stack[-1].state = newstate
+        self._AddChild(top, self.pnode_alloc.NewPNode(typ, opaque))
+        top.state = newstate
 
-    def push(self, typ, opaque, newdfa, newstate):
-        # type: (int, Token, dfa_t, int) -> None
+    def push(self, typ, opaque, newstate, unary):
+        # type: (int, Token, int, bool) -> None
         """Push a nonterminal.  (Internal)"""
-        top = self.stack[-1]
-        newnode = self.pnode_alloc.NewPNode(typ, opaque)
         self.stack[-1].state = newstate
-        self.stack.append(_StackItem(newdfa, 0, newnode))
+        if unary:
+            newnode = None  # type: Optional[PNode]
+        else:
+            newnode = self.pnode_alloc.NewPNode(typ, opaque)
+        self.stack.append(
+            _StackItem(self.grammar.dfa_start[typ - 256], typ, opaque,
+                       newnode))
 
     def pop(self):
         # type: () -> None
         """Pop a nonterminal.  (Internal)"""
         top = self.stack.pop()
         newnode = top.node
+        if newnode is None:
+            child = top.child
+            if child is not None and child.typ >= 256:
+                # Elide a chain like test -> or_test -> ... -> atom
+                newnode = child
+            else:
+                newnode = self.pnode_alloc.NewPNode(top.typ, top.tok)
+                if child is not None:
+                    newnode.AddChild(child)
+
         if len(self.stack):
-            top2 = self.stack[-1]
-            top2.node.AddChild(newnode)
+            self._AddChild(self.stack[-1], newnode)
         else:
             self.rootnode = newnode
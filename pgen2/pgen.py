@@ -4,7 +4,7 @@
 # Pgen imports
 #import grammar, token, tokenize
 # NOTE: Need these special versions of token/tokenize for BACKQUOTE and such.
-from . import grammar, token, tokenize
+from . import grammar, parse, token, tokenize
 from mycpp.mylib import log
 
 
@@ -384,7 +384,90 @@ def make_first(tok_def, rawfirst, gr):
     return first
 
 
-def MakeGrammar(f, tok_def=None):
+def _MakeRow(gr, dfa_start, i, arcs, unary):
+  """Return the {label: action} entries for one state, and its default."""
+  row = {}
+  final = False
+  for ilab, newstate in arcs:
+    if ilab == 0:  # (0, j) marks a final state
+      final = True
+      continue
+    # As in the original parser loop, the first matching arc wins
+    t = gr.labels[ilab]
+    if t < 256:
+      row.setdefault(ilab, (dfa_start[i] + newstate) << 3 | parse.ACTION_SHIFT)
+    else:
+      kind = parse.ACTION_PUSH_UNARY if t in unary else parse.ACTION_PUSH
+      arg = (dfa_start[i] + newstate) << 16 | t
+      _, itsfirst = gr.dfas[t]
+      for ilabel in itsfirst:
+        row.setdefault(ilabel, arg << 3 | kind)
+
+  default = parse.ACTION_POP if final else parse.ACTION_ERROR
+  return row, default
+
+
+def MakeActionTables(gr, unary=None):
+  """Compute the parser's (state, label) -> action tables.
+
+  This does the work that the parser used to do for every token: scan the arcs
+  of a state, and test the first set of each nonterminal.
+
+  Args:
+    unary: names of nonterminals that the parser should elide when they have a
+           single nonterminal child, like 'test' in test -> or_test -> ...
+  """
+  unary_nts = set(gr.symbol2number[name] for name in (unary or []))
+
+  gr.dfa_start = []
+  num_states = 0
+  for i in xrange(len(gr.number2symbol)):
+    states, _ = gr.dfas[256 + i]
+    gr.dfa_start.append(num_states)
+    num_states += len(states)
+  # ACTION_PUSH is ((state << 16 | nonterminal) << 3), which must fit in a
+  # signed 32-bit int
+  assert num_states < (1 << 12), num_states
+
+  rows = []
+  gr.action_default = []
+  for i in xrange(len(gr.number2symbol)):
+    states, _ = gr.dfas[256 + i]
+    for arcs in states:
+      row, default = _MakeRow(gr, gr.dfa_start, i, arcs, unary_nts)
+      rows.append(row)
+      gr.action_default.append(default)
+
+  # Rows are sparse, so pack them into one array.  Placing long rows first
+  # leaves gaps that short rows fit into.
+  gr.actions = []
+  gr.action_check = []
+  gr.action_base = [-1] * num_states
+  order = sorted(xrange(num_states), key=lambda s: -len(rows[s]))
+  for state in order:
+    row = rows[state]
+    if not row:
+      assert gr.action_default[state] == parse.ACTION_POP, state
+      continue  # accept-only state
+
+    labels = sorted(row)
+    base = 0
+    while any(base + ilabel < len(gr.action_check) and
+              gr.action_check[base + ilabel] != -1 for ilabel in labels):
+      base += 1
+
+    n = base + labels[-1] + 1 - len(gr.action_check)
+    if n > 0:
+      gr.actions.extend([parse.ACTION_ERROR] * n)
+      gr.action_check.extend([-1] * n)
+
+    for ilabel in labels:
+      gr.actions[base + ilabel] = row[ilabel]
+      gr.action_check[base + ilabel] = state
+    gr.action_base[state] = base
+
+
+def MakeGrammar(f, tok_def=None, unary=None):
   """Construct a Grammar object from a file."""
 
   lexer = tokenize.generate_tokens(f.readline)
@@ -425,4 +508,6 @@ def MakeGrammar(f, tok_def=None):
       gr.dfas[gr.symbol2number[name]] = (states, fi)
 
   gr.start = gr.symbol2number[startsymbol]
+
+  MakeActionTables(gr, unary=unary)
   return gr
@@ -19,85 +19,84 @@ GLOBAL_STR(str10, "o");
 GLOBAL_STR(str11, "o");
 GLOBAL_STR(str12, "<span class=\"%s\">");
 GLOBAL_STR(str13, "</span>");
-GLOBAL_STR(str14, " ");
-GLOBAL_STR(str15, "\n");
+GLOBAL_STR(str14, "UNTYPED any");
+GLOBAL_STR(str15, "[");
 GLOBAL_STR(str16, " ");
 GLOBAL_STR(str17, "]");
 GLOBAL_STR(str18, " ");
 GLOBAL_STR(str19, " ");
-GLOBAL_STR(str20, "\n");
-GLOBAL_STR(str21, "\n");
-GLOBAL_STR(str22, " ");
-GLOBAL_STR(str23, "%s%s: [");
-GLOBAL_STR(str24, "\n");
-GLOBAL_STR(str25, "\n");
-GLOBAL_STR(str26, "%s]");
-GLOBAL_STR(str27, "%s%s: ");
+GLOBAL_STR(str20, " %s:");
+GLOBAL_STR(str21, " ");
+GLOBAL_STR(str22, "\n");
+GLOBAL_STR(str23, " ");
+GLOBAL_STR(str24, "]");
+GLOBAL_STR(str25, " ");
+GLOBAL_STR(str26, " ");
+GLOBAL_STR(str27, "\n");
 GLOBAL_STR(str28, "\n");
-GLOBAL_STR(str29, "\n");
-GLOBAL_STR(str30, " ");
-GLOBAL_STR(str31, "UNTYPED any");
-GLOBAL_STR(str32, " ");
-GLOBAL_STR(str33, " ");
-GLOBAL_STR(str34, " %s:");
-GLOBAL_STR(str35, "UNTYPED any");
-GLOBAL_STR(str36, "[");
+GLOBAL_STR(str29, " ");
+GLOBAL_STR(str30, "%s%s: [");
+GLOBAL_STR(str31, "\n");
+GLOBAL_STR(str32, "\n");
+GLOBAL_STR(str33, "%s]");
+GLOBAL_STR(str34, "%s%s: ");
+GLOBAL_STR(str35, "\n");
+GLOBAL_STR(str36, "\n");
 GLOBAL_STR(str37, " ");
-GLOBAL_STR(str38, "]");
-GLOBAL_STR(str39, "\u001b[0;0m");
-GLOBAL_STR(str40, "\u001b[1m");
-GLOBAL_STR(str41, "\u001b[4m");
-GLOBAL_STR(str42, "\u001b[7m");
-GLOBAL_STR(str43, "\u001b[31m");
-GLOBAL_STR(str44, "\u001b[32m");
-GLOBAL_STR(str45, "\u001b[33m");
-GLOBAL_STR(str46, "\u001b[34m");
-GLOBAL_STR(str47, "&");
-GLOBAL_STR(str48, "&amp;");
-GLOBAL_STR(str49, "<");
-GLOBAL_STR(str50, "&lt;");
-GLOBAL_STR(str51, ">");
-GLOBAL_STR(str52, "&gt;");
-GLOBAL_STR(str53, "\\'\r\n\t\u0000");
-GLOBAL_STR(str54, "$'");
+GLOBAL_STR(str38, "\u001b[0;0m");
+GLOBAL_STR(str39, "\u001b[1m");
+GLOBAL_STR(str40, "\u001b[4m");
+GLOBAL_STR(str41, "\u001b[7m");
+GLOBAL_STR(str42, "\u001b[31m");
+GLOBAL_STR(str43, "\u001b[32m");
+GLOBAL_STR(str44, "\u001b[33m");
+GLOBAL_STR(str45, "\u001b[34m");
+GLOBAL_STR(str46, "&");
+GLOBAL_STR(str47, "&amp;");
+GLOBAL_STR(str48, "<");
+GLOBAL_STR(str49, "&lt;");
+GLOBAL_STR(str50, ">");
+GLOBAL_STR(str51, "&gt;");
+GLOBAL_STR(str52, "\\'\r\n\t\u0000");
+GLOBAL_STR(str53, "$'");
+GLOBAL_STR(str54, "'");
 GLOBAL_STR(str55, "'");
-GLOBAL_STR(str56, "'");
-GLOBAL_STR(str57, "");
+GLOBAL_STR(str56, "");
+GLOBAL_STR(str57, "'");
 GLOBAL_STR(str58, "'");
-GLOBAL_STR(str59, "'");
-GLOBAL_STR(str60, "");
+GLOBAL_STR(str59, "");
+GLOBAL_STR(str60, "'");
 GLOBAL_STR(str61, "'");
-GLOBAL_STR(str62, "'");
-GLOBAL_STR(str63, "");
-GLOBAL_STR(str64, "\\");
-GLOBAL_STR(str65, "\\\\");
-GLOBAL_STR(str66, "'");
-GLOBAL_STR(str67, "\\'");
-GLOBAL_STR(str68, "\n");
-GLOBAL_STR(str69, "\\n");
-GLOBAL_STR(str70, "\r");
-GLOBAL_STR(str71, "\\r");
-GLOBAL_STR(str72, "\t");
-GLOBAL_STR(str73, "\\t");
-GLOBAL_STR(str74, "\u0000");
-GLOBAL_STR(str75, "\\x00");
-GLOBAL_STR(str76, "\\0");
+GLOBAL_STR(str62, "");
+GLOBAL_STR(str63, "\\");
+GLOBAL_STR(str64, "\\\\");
+GLOBAL_STR(str65, "'");
+GLOBAL_STR(str66, "\\'");
+GLOBAL_STR(str67, "\n");
+GLOBAL_STR(str68, "\\n");
+GLOBAL_STR(str69, "\r");
+GLOBAL_STR(str70, "\\r");
+GLOBAL_STR(str71, "\t");
+GLOBAL_STR(str72, "\\t");
+GLOBAL_STR(str73, "\u0000");
+GLOBAL_STR(str74, "\\x00");
+GLOBAL_STR(str75, "\\0");
+GLOBAL_STR(str76, "");
 GLOBAL_STR(str77, "");
 GLOBAL_STR(str78, "");
-GLOBAL_STR(str79, "");
-GLOBAL_STR(str80, "\\");
-GLOBAL_STR(str81, "\\\\");
-GLOBAL_STR(str82, "'");
-GLOBAL_STR(str83, "\\'");
-GLOBAL_STR(str84, "\n");
-GLOBAL_STR(str85, "\\n");
-GLOBAL_STR(str86, "\r");
-GLOBAL_STR(str87, "\\r");
-GLOBAL_STR(str88, "\t");
-GLOBAL_STR(str89, "\\t");
-GLOBAL_STR(str90, "\u0000");
-GLOBAL_STR(str91, "\\x00");
-GLOBAL_STR(str92, "\\0");
+GLOBAL_STR(str79, "\\");
+GLOBAL_STR(str80, "\\\\");
+GLOBAL_STR(str81, "'");
+GLOBAL_STR(str82, "\\'");
+GLOBAL_STR(str83, "\n");
+GLOBAL_STR(str84, "\\n");
+GLOBAL_STR(str85, "\r");
+GLOBAL_STR(str86, "\\r");
+GLOBAL_STR(str87, "\t");
+GLOBAL_STR(str88, "\\t");
+GLOBAL_STR(str89, "\u0000");
+GLOBAL_STR(str90, "\\x00");
+GLOBAL_STR(str91, "\\0");
 
 namespace ansi {  // forward declare
 
@@ -380,107 +379,291 @@ void AnsiOutput::PopColor() {
 }
 int INDENT = 2;
 
+Str* _ExternalStr(hnode::External* node) {
+  StackRoots _roots({&node});
+
+  // if not PYTHON
+  {
+    return str14;
+  }
+  // endif MYCPP
+}
+
 _PrettyPrinter::_PrettyPrinter(int max_col) {
   this->max_col = max_col;
+  this->widths = Alloc<List<int>>();
+  this->fit_widths = Alloc<List<int>>();
+  this->sizes = Alloc<List<int>>();
+  this->texts = Alloc<List<Str*>>();
+}
+
+int _PrettyPrinter::_Measure(hnode_asdl::hnode_t* node) {
+  int i;
+  int width;
+  int fit_width;
+  hnode_asdl::hnode_t* UP_node = nullptr;
+  int tag;
+  int j;
+  int c;
+  StackRoots _roots({&node, &UP_node});
+
+  i = len(this->widths);
+  this->widths->append(0);
+  this->fit_widths->append(0);
+  this->sizes->append(0);
+  this->texts->append(nullptr);
+  width = 0;
+  fit_width = -1;
+  UP_node = node;
+  tag = node->tag();
+  if (tag == hnode_e::Leaf) {
+    hnode::Leaf* node = static_cast<hnode::Leaf*>(UP_node);
+    this->texts->set(i, qsn::maybe_encode(node->s));
+    width = len(this->texts->index_(i));
+    fit_width = width;
+  }
+  else {
+    if (tag == hnode_e::External) {
+      hnode::External* node = static_cast<hnode::External*>(UP_node);
+      this->texts->set(i, _ExternalStr(node));
+      width = len(this->texts->index_(i));
+      fit_width = width;
+    }
+    else {
+      if (tag == hnode_e::Array) {
+        hnode::Array* node = static_cast<hnode::Array*>(UP_node);
+        width = 1;
+        j = 0;
+        for (ListIter<hnode_asdl::hnode_t*> it(node->children); !it.Done(); it.Next(), ++j) {
+          hnode_asdl::hnode_t* item = it.Value();
+          StackRoots _for({&item        });
+          if (j != 0) {
+            width += 1;
+          }
+          width += this->widths->index_(this->_Measure(item));
+        }
+        width += 1;
+        fit_width = width;
+      }
+      else {
+        if (tag == hnode_e::Record) {
+          hnode::Record* node = static_cast<hnode::Record*>(UP_node);
+          width = len(node->left);
+          if (node->abbrev) {
+            if (len(node->node_type)) {
+              width += (len(node->node_type) + 1);
+            }
+            j = 0;
+            for (ListIter<hnode_asdl::hnode_t*> it(node->unnamed_fields); !it.Done(); it.Next(), ++j) {
+              hnode_asdl::hnode_t* val = it.Value();
+              StackRoots _for({&val            });
+              if (j != 0) {
+                width += 1;
+              }
+              c = this->_Measure(val);
+              if (this->fit_widths->index_(c) != -1) {
+                fit_width = (width + this->fit_widths->index_(c));
+              }
+              width += this->widths->index_(c);
+            }
+          }
+          else {
+            width += len(node->node_type);
+            for (ListIter<hnode_asdl::Field*> it(node->fields); !it.Done(); it.Next()) {
+              hnode_asdl::Field* field = it.Value();
+              StackRoots _for({&field            });
+              width += (len(field->name) + 2);
+              c = this->_Measure(field->val);
+              if (this->fit_widths->index_(c) != -1) {
+                fit_width = (width + this->fit_widths->index_(c));
+              }
+              width += this->widths->index_(c);
+            }
+          }
+          width += len(node->right);
+        }
+        else {
+          assert(0);  // AssertionError
+        }
+      }
+    }
+  }
+  this->widths->set(i, width);
+  this->fit_widths->set(i, fit_width);
+  this->sizes->set(i, (len(this->widths) - i));
+  return i;
+}
+
+bool _PrettyPrinter::_Fits(int i, int max_chars) {
+  int fit_width;
+
+  fit_width = this->fit_widths->index_(i);
+  return (fit_width == -1 or fit_width <= max_chars);
 }
 
-bool _PrettyPrinter::_PrintWrappedArray(List<hnode_asdl::hnode_t*>* array, int prefix_len, format::ColorOutput* f, int indent) {
+void _PrettyPrinter::_PrintSingleLine(hnode_asdl::hnode_t* node, int i, format::ColorOutput* f) {
+  hnode_asdl::hnode_t* UP_node = nullptr;
+  int tag;
+  int c;
+  int j;
+  StackRoots _roots({&node, &f, &UP_node});
+
+  UP_node = node;
+  tag = node->tag();
+  if (tag == hnode_e::Leaf) {
+    hnode::Leaf* node = static_cast<hnode::Leaf*>(UP_node);
+    f->PushColor(node->color);
+    f->write(this->texts->index_(i));
+    f->PopColor();
+  }
+  else {
+    if (tag == hnode_e::External) {
+      f->PushColor(color_e::External);
+      f->write(this->texts->index_(i));
+      f->PopColor();
+    }
+    else {
+      if (tag == hnode_e::Array) {
+        hnode::Array* node = static_cast<hnode::Array*>(UP_node);
+        f->write(str15);
+        c = (i + 1);
+        j = 0;
+        for (ListIter<hnode_asdl::hnode_t*> it(node->children); !it.Done(); it.Next(), ++j) {
+          hnode_asdl::hnode_t* item = it.Value();
+          StackRoots _for({&item        });
+          if (j != 0) {
+            f->write(str16);
+          }
+          this->_PrintSingleLine(item, c, f);
+          c += this->sizes->index_(c);
+        }
+        f->write(str17);
+      }
+      else {
+        if (tag == hnode_e::Record) {
+          hnode::Record* node = static_cast<hnode::Record*>(UP_node);
+          f->write(node->left);
+          c = (i + 1);
+          if (node->abbrev) {
+            if (len(node->node_type)) {
+              f->PushColor(color_e::TypeName);
+              f->write(node->node_type);
+              f->PopColor();
+              f->write(str18);
+            }
+            j = 0;
+            for (ListIter<hnode_asdl::hnode_t*> it(node->unnamed_fields); !it.Done(); it.Next(), ++j) {
+              hnode_asdl::hnode_t* val = it.Value();
+              StackRoots _for({&val            });
+              if (j != 0) {
+                f->write(str19);
+              }
+              this->_PrintSingleLine(val, c, f);
+              c += this->sizes->index_(c);
+            }
+          }
+          else {
+            f->PushColor(color_e::TypeName);
+            f->write(node->node_type);
+            f->PopColor();
+            for (ListIter<hnode_asdl::Field*> it(node->fields); !it.Done(); it.Next()) {
+              hnode_asdl::Field* field = it.Value();
+              StackRoots _for({&field            });
+              f->write(StrFormat(" %s:", field->name));
+              this->_PrintSingleLine(field->val, c, f);
+              c += this->sizes->index_(c);
+            }
+          }
+          f->write(node->right);
+        }
+        else {
+          assert(0);  // AssertionError
+        }
+      }
+    }
+  }
+}
+
+bool _PrettyPrinter::_PrintWrappedArray(List<hnode_asdl::hnode_t*>* array, int first, int prefix_len, format::ColorOutput* f, int indent) {
   bool all_fit;
   int chars_so_far;
+  int c;
   int i;
-  format::ColorOutput* single_f = nullptr;
-  Str* s = nullptr;
-  int num_chars;
-  StackRoots _roots({&array, &f, &single_f, &s});
+  StackRoots _roots({&array, &f});
 
   all_fit = true;
   chars_so_far = prefix_len;
+  c = first;
   i = 0;
   for (ListIter<hnode_asdl::hnode_t*> it(array); !it.Done(); it.Next(), ++i) {
     hnode_asdl::hnode_t* val = it.Value();
     StackRoots _for({&val  });
     if (i != 0) {
-      f->write(str14);
+      f->write(str21);
     }
-    single_f = f->NewTempBuffer();
-    if (_TrySingleLine(val, single_f, (this->max_col - chars_so_far))) {
-      Tuple2<Str*, int> tup1 = single_f->GetRaw();
-      s = tup1.at0();
-      num_chars = tup1.at1();
-      f->WriteRaw((Alloc<Tuple2<Str*, int>>(s, num_chars)));
-      chars_so_far += single_f->NumChars();
+    if (this->_Fits(c, (this->max_col - chars_so_far))) {
+      this->_PrintSingleLine(val, c, f);
+      chars_so_far += this->widths->index_(c);
     }
     else {
-      f->write(str15);
-      this->PrintNode(val, f, (indent + INDENT));
+      f->write(str22);
+      this->PrintNode(val, c, f, (indent + INDENT));
       chars_so_far = 0;
       all_fit = false;
     }
+    c += this->sizes->index_(c);
   }
   return all_fit;
 }
 
-bool _PrettyPrinter::_PrintWholeArray(List<hnode_asdl::hnode_t*>* array, int prefix_len, format::ColorOutput* f, int indent) {
-  bool all_fit;
-  List<Tuple2<Str*, int>*>* pieces = nullptr;
+bool _PrettyPrinter::_PrintWholeArray(List<hnode_asdl::hnode_t*>* array, int first, int prefix_len, format::ColorOutput* f) {
   int chars_so_far;
-  format::ColorOutput* single_f = nullptr;
-  Str* s = nullptr;
-  int num_chars;
+  int c;
   int i;
-  StackRoots _roots({&array, &f, &pieces, &single_f, &s});
+  StackRoots _roots({&array, &f});
 
-  all_fit = true;
-  pieces = Alloc<List<Tuple2<Str*, int>*>>();
   chars_so_far = prefix_len;
+  c = first;
   for (ListIter<hnode_asdl::hnode_t*> it(array); !it.Done(); it.Next()) {
-    hnode_asdl::hnode_t* item = it.Value();
-    StackRoots _for({&item  });
-    single_f = f->NewTempBuffer();
-    if (_TrySingleLine(item, single_f, (this->max_col - chars_so_far))) {
-      Tuple2<Str*, int> tup2 = single_f->GetRaw();
-      s = tup2.at0();
-      num_chars = tup2.at1();
-      pieces->append((Alloc<Tuple2<Str*, int>>(s, num_chars)));
-      chars_so_far += single_f->NumChars();
-    }
-    else {
-      all_fit = false;
-      break;
+    hnode_asdl::hnode_t* _ = it.Value();
+    StackRoots _for({&_  });
+    if (!this->_Fits(c, (this->max_col - chars_so_far))) {
+      return false;
     }
+    chars_so_far += this->widths->index_(c);
+    c += this->sizes->index_(c);
   }
-  if (all_fit) {
-    i = 0;
-    for (ListIter<Tuple2<Str*, int>*> it(pieces); !it.Done(); it.Next(), ++i) {
-      Tuple2<Str*, int>* p = it.Value();
-      StackRoots _for({&p    });
-      if (i != 0) {
-        f->write(str16);
-      }
-      f->WriteRaw(p);
+  c = first;
+  i = 0;
+  for (ListIter<hnode_asdl::hnode_t*> it(array); !it.Done(); it.Next(), ++i) {
+    hnode_asdl::hnode_t* item = it.Value();
+    StackRoots _for({&item  });
+    if (i != 0) {
+      f->write(str23);
     }
-    f->write(str17);
+    this->_PrintSingleLine(item, c, f);
+    c += this->sizes->index_(c);
   }
-  return all_fit;
+  f->write(str24);
+  return true;
 }
 
-void _PrettyPrinter::_PrintRecord(hnode::Record* node, format::ColorOutput* f, int indent) {
+void _PrettyPrinter::_PrintRecord(hnode::Record* node, int i, format::ColorOutput* f, int indent) {
   Str* ind = nullptr;
   Str* prefix = nullptr;
   int prefix_len;
   bool all_fit;
+  int c;
   Str* name = nullptr;
   hnode_asdl::hnode_t* val = nullptr;
   Str* ind1 = nullptr;
   hnode_asdl::hnode_t* UP_val = nullptr;
   int tag;
   Str* name_str = nullptr;
-  format::ColorOutput* single_f = nullptr;
-  Str* s = nullptr;
-  int num_chars;
-  StackRoots _roots({&node, &f, &ind, &prefix, &name, &val, &ind1, &UP_val, &name_str, &single_f, &s});
+  int c2;
+  StackRoots _roots({&node, &f, &ind, &prefix, &name, &val, &ind1, &UP_val, &name_str});
 
-  ind = str_repeat(str18, indent);
+  ind = str_repeat(str25, indent);
   if (node->abbrev) {
     prefix = str_concat(ind, node->left);
     f->write(prefix);
@@ -488,12 +671,12 @@ void _PrettyPrinter::_PrintRecord(hnode::Record* node, format::ColorOutput* f, i
       f->PushColor(color_e::TypeName);
       f->write(node->node_type);
       f->PopColor();
-      f->write(str19);
+      f->write(str26);
     }
     prefix_len = ((len(prefix) + len(node->node_type)) + 1);
-    all_fit = this->_PrintWrappedArray(node->unnamed_fields, prefix_len, f, indent);
+    all_fit = this->_PrintWrappedArray(node->unnamed_fields, (i + 1), prefix_len, f, indent);
     if (!all_fit) {
-      f->write(str20);
+      f->write(str27);
       f->write(ind);
     }
     f->write(node->right);
@@ -503,13 +686,14 @@ void _PrettyPrinter::_PrintRecord(hnode::Record* node, format::ColorOutput* f, i
     f->PushColor(color_e::TypeName);
     f->write(node->node_type);
     f->PopColor();
-    f->write(str21);
+    f->write(str28);
+    c = (i + 1);
     for (ListIter<hnode_asdl::Field*> it(node->fields); !it.Done(); it.Next()) {
       hnode_asdl::Field* field = it.Value();
       StackRoots _for({&field    });
       name = field->name;
       val = field->val;
-      ind1 = str_repeat(str22, (indent + INDENT));
+      ind1 = str_repeat(str29, (indent + INDENT));
       UP_val = val;
       tag = val->tag();
       if (tag == hnode_e::Array) {
@@ -517,13 +701,15 @@ void _PrettyPrinter::_PrintRecord(hnode::Record* node, format::ColorOutput* f, i
         name_str = StrFormat("%s%s: [", ind1, name);
         f->write(name_str);
         prefix_len = len(name_str);
-        if (!this->_PrintWholeArray(val->children, prefix_len, f, indent)) {
-          f->write(str24);
+        if (!this->_PrintWholeArray(val->children, (c + 1), prefix_len, f)) {
+          f->write(str31);
+          c2 = (c + 1);
           for (ListIter<hnode_asdl::hnode_t*> it(val->children); !it.Done(); it.Next()) {
             hnode_asdl::hnode_t* child = it.Value();
             StackRoots _for({&child          });
-            this->PrintNode(child, f, ((indent + INDENT) + INDENT));
-            f->write(str25);
+            this->PrintNode(child, c2, f, ((indent + INDENT) + INDENT));
+            f->write(str32);
+            c2 += this->sizes->index_(c2);
           }
           f->write(StrFormat("%s]", ind1));
         }
@@ -532,41 +718,31 @@ void _PrettyPrinter::_PrintRecord(hnode::Record* node, format::ColorOutput* f, i
         name_str = StrFormat("%s%s: ", ind1, name);
         f->write(name_str);
         prefix_len = len(name_str);
-        single_f = f->NewTempBuffer();
-        if (_TrySingleLine(val, single_f, (this->max_col - prefix_len))) {
-          Tuple2<Str*, int> tup3 = single_f->GetRaw();
-          s = tup3.at0();
-          num_chars = tup3.at1();
-          f->WriteRaw((Alloc<Tuple2<Str*, int>>(s, num_chars)));
+        if (this->_Fits(c, (this->max_col - prefix_len))) {
+          this->_PrintSingleLine(val, c, f);
         }
         else {
-          f->write(str28);
-          this->PrintNode(val, f, ((indent + INDENT) + INDENT));
+          f->write(str35);
+          this->PrintNode(val, c, f, ((indent + INDENT) + INDENT));
         }
       }
-      f->write(str29);
+      f->write(str36);
+      c += this->sizes->index_(c);
     }
     f->write(str_concat(ind, node->right));
   }
 }
 
-void _PrettyPrinter::PrintNode(hnode_asdl::hnode_t* node, format::ColorOutput* f, int indent) {
+void _PrettyPrinter::PrintNode(hnode_asdl::hnode_t* node, int i, format::ColorOutput* f, int indent) {
   Str* ind = nullptr;
-  format::ColorOutput* single_f = nullptr;
-  Str* s = nullptr;
-  int num_chars;
   hnode_asdl::hnode_t* UP_node = nullptr;
   int tag;
-  StackRoots _roots({&node, &f, &ind, &single_f, &s, &UP_node});
-
-  ind = str_repeat(str30, indent);
-  single_f = f->NewTempBuffer();
-  single_f->write(ind);
-  if (_TrySingleLine(node, single_f, (this->max_col - indent))) {
-    Tuple2<Str*, int> tup4 = single_f->GetRaw();
-    s = tup4.at0();
-    num_chars = tup4.at1();
-    f->WriteRaw((Alloc<Tuple2<Str*, int>>(s, num_chars)));
+  StackRoots _roots({&node, &f, &ind, &UP_node});
+
+  ind = str_repeat(str37, indent);
+  if (this->_Fits(i, ((this->max_col - indent) - indent))) {
+    f->write(ind);
+    this->_PrintSingleLine(node, i, f);
     return ;
   }
   UP_node = node;
@@ -574,24 +750,19 @@ void _PrettyPrinter::PrintNode(hnode_asdl::hnode_t* node, format::ColorOutput* f
   if (tag == hnode_e::Leaf) {
     hnode::Leaf* node = static_cast<hnode::Leaf*>(UP_node);
     f->PushColor(node->color);
-    f->write(qsn::maybe_encode(node->s));
+    f->write(this->texts->index_(i));
     f->PopColor();
   }
   else {
     if (tag == hnode_e::External) {
-      hnode::External* node = static_cast<hnode::External*>(UP_node);
       f->PushColor(color_e::External);
-      // if not PYTHON
-      {
-        f->write(str31);
-      }
-      // endif MYCPP
+      f->write(this->texts->index_(i));
       f->PopColor();
     }
     else {
       if (tag == hnode_e::Record) {
         hnode::Record* node = static_cast<hnode::Record*>(UP_node);
-        this->_PrintRecord(node, f, indent);
+        this->_PrintRecord(node, i, f, indent);
       }
       else {
         assert(0);  // AssertionError
@@ -600,128 +771,28 @@ void _PrettyPrinter::PrintNode(hnode_asdl::hnode_t* node, format::ColorOutput* f
   }
 }
 
-bool _TrySingleLineObj(hnode::Record* node, format::ColorOutput* f, int max_chars) {
-  int i;
-  StackRoots _roots({&node, &f});
-
-  f->write(node->left);
-  if (node->abbrev) {
-    if (len(node->node_type)) {
-      f->PushColor(color_e::TypeName);
-      f->write(node->node_type);
-      f->PopColor();
-      f->write(str32);
-    }
-    i = 0;
-    for (ListIter<hnode_asdl::hnode_t*> it(node->unnamed_fields); !it.Done(); it.Next(), ++i) {
-      hnode_asdl::hnode_t* val = it.Value();
-      StackRoots _for({&val    });
-      if (i != 0) {
-        f->write(str33);
-      }
-      if (!_TrySingleLine(val, f, max_chars)) {
-        return false;
-      }
-    }
-  }
-  else {
-    f->PushColor(color_e::TypeName);
-    f->write(node->node_type);
-    f->PopColor();
-    for (ListIter<hnode_asdl::Field*> it(node->fields); !it.Done(); it.Next()) {
-      hnode_asdl::Field* field = it.Value();
-      StackRoots _for({&field    });
-      f->write(StrFormat(" %s:", field->name));
-      if (!_TrySingleLine(field->val, f, max_chars)) {
-        return false;
-      }
-    }
-  }
-  f->write(node->right);
-  return true;
-}
-
-bool _TrySingleLine(hnode_asdl::hnode_t* node, format::ColorOutput* f, int max_chars) {
-  hnode_asdl::hnode_t* UP_node = nullptr;
-  int tag;
-  int i;
-  int num_chars_so_far;
-  StackRoots _roots({&node, &f, &UP_node});
-
-  UP_node = node;
-  tag = node->tag();
-  if (tag == hnode_e::Leaf) {
-    hnode::Leaf* node = static_cast<hnode::Leaf*>(UP_node);
-    f->PushColor(node->color);
-    f->write(qsn::maybe_encode(node->s));
-    f->PopColor();
-  }
-  else {
-    if (tag == hnode_e::External) {
-      hnode::External* node = static_cast<hnode::External*>(UP_node);
-      f->PushColor(color_e::External);
-      // if not PYTHON
-      {
-        f->write(str35);
-      }
-      // endif MYCPP
-      f->PopColor();
-    }
-    else {
-      if (tag == hnode_e::Array) {
-        hnode::Array* node = static_cast<hnode::Array*>(UP_node);
-        f->write(str36);
-        i = 0;
-        for (ListIter<hnode_asdl::hnode_t*> it(node->children); !it.Done(); it.Next(), ++i) {
-          hnode_asdl::hnode_t* item = it.Value();
-          StackRoots _for({&item        });
-          if (i != 0) {
-            f->write(str37);
-          }
-          if (!_TrySingleLine(item, f, max_chars)) {
-            return false;
-          }
-        }
-        f->write(str38);
-      }
-      else {
-        if (tag == hnode_e::Record) {
-          hnode::Record* node = static_cast<hnode::Record*>(UP_node);
-          return _TrySingleLineObj(node, f, max_chars);
-        }
-        else {
-          assert(0);  // AssertionError
-        }
-      }
-    }
-  }
-  num_chars_so_far = f->NumChars();
-  if (num_chars_so_far > max_chars) {
-    return false;
-  }
-  return true;
-}
-
 void PrintTree(hnode_asdl::hnode_t* node, format::ColorOutput* f) {
   format::_PrettyPrinter* pp = nullptr;
+  int i;
   StackRoots _roots({&node, &f, &pp});
 
   pp = Alloc<_PrettyPrinter>(100);
-  pp->PrintNode(node, f, 0);
+  i = pp->_Measure(node);
+  pp->PrintNode(node, i, f, 0);
 }
 
 }  // define namespace format
 
 namespace ansi {  // define
 
-Str* RESET = str39;
-Str* BOLD = str40;
-Str* UNDERLINE = str41;
-Str* REVERSE = str42;
-Str* RED = str43;
-Str* GREEN = str44;
-Str* YELLOW = str45;
-Str* BLUE = str46;
+Str* RESET = str38;
+Str* BOLD = str39;
+Str* UNDERLINE = str40;
+Str* REVERSE = str41;
+Str* RED = str42;
+Str* GREEN = str43;
+Str* YELLOW = str44;
+Str* BLUE = str45;
 
 }  // define namespace ansi
 
@@ -731,9 +802,9 @@ namespace cgi {  // define
 Str* escape(Str* s) {
   StackRoots _roots({&s});
 
-  s = s->replace(str47, str48);
-  s = s->replace(str49, str50);
-  s = s->replace(str51, str52);
+  s = s->replace(str46, str47);
+  s = s->replace(str48, str49);
+  s = s->replace(str50, str51);
   return s;
 }
 
@@ -781,7 +852,7 @@ Str* maybe_shell_encode(Str* s, int flags) {
         continue;
       }
       quote = 1;
-      if ((str_contains(str53, ch) or IsUnprintableLow(ch))) {
+      if ((str_contains(str52, ch) or IsUnprintableLow(ch))) {
         quote = 2;
         break;
       }
@@ -793,13 +864,13 @@ Str* maybe_shell_encode(Str* s, int flags) {
   parts = Alloc<List<Str*>>();
   valid_utf8 = _encode(s, bit8_display, true, parts);
   if ((!valid_utf8 or quote == 2)) {
-    prefix = str54;
+    prefix = str53;
   }
   else {
-    prefix = str55;
+    prefix = str54;
   }
-  parts->append(str56);
-  return str_concat(prefix, str57->join(parts));
+  parts->append(str55);
+  return str_concat(prefix, str56->join(parts));
 }
 
 Str* maybe_encode(Str* s, int bit8_display) {
@@ -825,10 +896,10 @@ Str* maybe_encode(Str* s, int bit8_display) {
     return s;
   }
   parts = Alloc<List<Str*>>();
-  parts->append(str58);
+  parts->append(str57);
   _encode(s, bit8_display, false, parts);
-  parts->append(str59);
-  return str60->join(parts);
+  parts->append(str58);
+  return str59->join(parts);
 }
 
 Str* encode(Str* s, int bit8_display) {
@@ -836,10 +907,10 @@ Str* encode(Str* s, int bit8_display) {
   StackRoots _roots({&s, &parts});
 
   parts = Alloc<List<Str*>>();
-  parts->append(str61);
+  parts->append(str60);
   _encode(s, bit8_display, false, parts);
-  parts->append(str62);
-  return str63->join(parts);
+  parts->append(str61);
+  return str62->join(parts);
 }
 
 void _encode_bytes_x(Str* s, bool shell_compat, List<Str*>* parts) {
@@ -849,28 +920,28 @@ void _encode_bytes_x(Str* s, bool shell_compat, List<Str*>* parts) {
   for (StrIter it(s); !it.Done(); it.Next()) {
     Str* byte = it.Value();
     StackRoots _for({&byte  });
-    if (str_equals(byte, str64)) {
-      part = str65;
+    if (str_equals(byte, str63)) {
+      part = str64;
     }
     else {
-      if (str_equals(byte, str66)) {
-        part = str67;
+      if (str_equals(byte, str65)) {
+        part = str66;
       }
       else {
-        if (str_equals(byte, str68)) {
-          part = str69;
+        if (str_equals(byte, str67)) {
+          part = str68;
         }
         else {
-          if (str_equals(byte, str70)) {
-            part = str71;
+          if (str_equals(byte, str69)) {
+            part = str70;
           }
           else {
-            if (str_equals(byte, str72)) {
-              part = str73;
+            if (str_equals(byte, str71)) {
+              part = str72;
             }
             else {
-              if (str_equals(byte, str74)) {
-                part = shell_compat ? str75 : str76;
+              if (str_equals(byte, str73)) {
+                part = shell_compat ? str74 : str75;
               }
               else {
                 if (IsUnprintableLow(byte)) {
@@ -921,9 +992,9 @@ bool _encode_runes(Str* s, int bit8_display, bool shell_compat, List<Str*>* part
 
   valid_utf8 = true;
   state = Start;
-  r1 = str77;
-  r2 = str78;
-  r3 = str79;
+  r1 = str76;
+  r2 = str77;
+  r3 = str78;
   for (StrIter it(s); !it.Done(); it.Next()) {
     Str* byte = it.Value();
     StackRoots _for({&byte  });
@@ -968,28 +1039,28 @@ bool _encode_runes(Str* s, int bit8_display, bool shell_compat, List<Str*>* part
     }
     if (typ == Ascii) {
       state = Start;
-      if (str_equals(byte, str80)) {
-        out = str81;
+      if (str_equals(byte, str79)) {
+        out = str80;
       }
       else {
-        if (str_equals(byte, str82)) {
-          out = str83;
+        if (str_equals(byte, str81)) {
+          out = str82;
         }
         else {
-          if (str_equals(byte, str84)) {
-            out = str85;
+          if (str_equals(byte, str83)) {
+            out = str84;
           }
           else {
-            if (str_equals(byte, str86)) {
-              out = str87;
+            if (str_equals(byte, str85)) {
+              out = str86;
             }
             else {
-              if (str_equals(byte, str88)) {
-                out = str89;
+              if (str_equals(byte, str87)) {
+                out = str88;
               }
               else {
-                if (str_equals(byte, str90)) {
-                  out = shell_compat ? str91 : str92;
+                if (str_equals(byte, str89)) {
+                  out = shell_compat ? str90 : str91;
                 }
                 else {
                   if (IsUnprintableLow(byte)) {
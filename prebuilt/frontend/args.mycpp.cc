@@ -19,139 +19,138 @@ GLOBAL_STR(str10, "o");
 GLOBAL_STR(str11, "o");
 GLOBAL_STR(str12, "<span class=\"%s\">");
 GLOBAL_STR(str13, "</span>");
-GLOBAL_STR(str14, " ");
-GLOBAL_STR(str15, "\n");
+GLOBAL_STR(str14, "UNTYPED any");
+GLOBAL_STR(str15, "[");
 GLOBAL_STR(str16, " ");
 GLOBAL_STR(str17, "]");
 GLOBAL_STR(str18, " ");
 GLOBAL_STR(str19, " ");
-GLOBAL_STR(str20, "\n");
-GLOBAL_STR(str21, "\n");
-GLOBAL_STR(str22, " ");
-GLOBAL_STR(str23, "%s%s: [");
-GLOBAL_STR(str24, "\n");
-GLOBAL_STR(str25, "\n");
-GLOBAL_STR(str26, "%s]");
-GLOBAL_STR(str27, "%s%s: ");
+GLOBAL_STR(str20, " %s:");
+GLOBAL_STR(str21, " ");
+GLOBAL_STR(str22, "\n");
+GLOBAL_STR(str23, " ");
+GLOBAL_STR(str24, "]");
+GLOBAL_STR(str25, " ");
+GLOBAL_STR(str26, " ");
+GLOBAL_STR(str27, "\n");
 GLOBAL_STR(str28, "\n");
-GLOBAL_STR(str29, "\n");
-GLOBAL_STR(str30, " ");
-GLOBAL_STR(str31, "UNTYPED any");
-GLOBAL_STR(str32, " ");
-GLOBAL_STR(str33, " ");
-GLOBAL_STR(str34, " %s:");
-GLOBAL_STR(str35, "UNTYPED any");
-GLOBAL_STR(str36, "[");
+GLOBAL_STR(str29, " ");
+GLOBAL_STR(str30, "%s%s: [");
+GLOBAL_STR(str31, "\n");
+GLOBAL_STR(str32, "\n");
+GLOBAL_STR(str33, "%s]");
+GLOBAL_STR(str34, "%s%s: ");
+GLOBAL_STR(str35, "\n");
+GLOBAL_STR(str36, "\n");
 GLOBAL_STR(str37, " ");
-GLOBAL_STR(str38, "]");
-GLOBAL_STR(str39, "\u001b[0;0m");
-GLOBAL_STR(str40, "\u001b[1m");
-GLOBAL_STR(str41, "\u001b[4m");
-GLOBAL_STR(str42, "\u001b[7m");
-GLOBAL_STR(str43, "\u001b[31m");
-GLOBAL_STR(str44, "\u001b[32m");
-GLOBAL_STR(str45, "\u001b[33m");
-GLOBAL_STR(str46, "\u001b[34m");
-GLOBAL_STR(str47, "&");
-GLOBAL_STR(str48, "&amp;");
-GLOBAL_STR(str49, "<");
-GLOBAL_STR(str50, "&lt;");
-GLOBAL_STR(str51, ">");
-GLOBAL_STR(str52, "&gt;");
-GLOBAL_STR(str53, "\\'\r\n\t\u0000");
-GLOBAL_STR(str54, "$'");
+GLOBAL_STR(str38, "\u001b[0;0m");
+GLOBAL_STR(str39, "\u001b[1m");
+GLOBAL_STR(str40, "\u001b[4m");
+GLOBAL_STR(str41, "\u001b[7m");
+GLOBAL_STR(str42, "\u001b[31m");
+GLOBAL_STR(str43, "\u001b[32m");
+GLOBAL_STR(str44, "\u001b[33m");
+GLOBAL_STR(str45, "\u001b[34m");
+GLOBAL_STR(str46, "&");
+GLOBAL_STR(str47, "&amp;");
+GLOBAL_STR(str48, "<");
+GLOBAL_STR(str49, "&lt;");
+GLOBAL_STR(str50, ">");
+GLOBAL_STR(str51, "&gt;");
+GLOBAL_STR(str52, "\\'\r\n\t\u0000");
+GLOBAL_STR(str53, "$'");
+GLOBAL_STR(str54, "'");
 GLOBAL_STR(str55, "'");
-GLOBAL_STR(str56, "'");
-GLOBAL_STR(str57, "");
+GLOBAL_STR(str56, "");
+GLOBAL_STR(str57, "'");
 GLOBAL_STR(str58, "'");
-GLOBAL_STR(str59, "'");
-GLOBAL_STR(str60, "");
+GLOBAL_STR(str59, "");
+GLOBAL_STR(str60, "'");
 GLOBAL_STR(str61, "'");
-GLOBAL_STR(str62, "'");
-GLOBAL_STR(str63, "");
-GLOBAL_STR(str64, "\\");
-GLOBAL_STR(str65, "\\\\");
-GLOBAL_STR(str66, "'");
-GLOBAL_STR(str67, "\\'");
-GLOBAL_STR(str68, "\n");
-GLOBAL_STR(str69, "\\n");
-GLOBAL_STR(str70, "\r");
-GLOBAL_STR(str71, "\\r");
-GLOBAL_STR(str72, "\t");
-GLOBAL_STR(str73, "\\t");
-GLOBAL_STR(str74, "\u0000");
-GLOBAL_STR(str75, "\\x00");
-GLOBAL_STR(str76, "\\0");
+GLOBAL_STR(str62, "");
+GLOBAL_STR(str63, "\\");
+GLOBAL_STR(str64, "\\\\");
+GLOBAL_STR(str65, "'");
+GLOBAL_STR(str66, "\\'");
+GLOBAL_STR(str67, "\n");
+GLOBAL_STR(str68, "\\n");
+GLOBAL_STR(str69, "\r");
+GLOBAL_STR(str70, "\\r");
+GLOBAL_STR(str71, "\t");
+GLOBAL_STR(str72, "\\t");
+GLOBAL_STR(str73, "\u0000");
+GLOBAL_STR(str74, "\\x00");
+GLOBAL_STR(str75, "\\0");
+GLOBAL_STR(str76, "");
 GLOBAL_STR(str77, "");
 GLOBAL_STR(str78, "");
-GLOBAL_STR(str79, "");
-GLOBAL_STR(str80, "\\");
-GLOBAL_STR(str81, "\\\\");
-GLOBAL_STR(str82, "'");
-GLOBAL_STR(str83, "\\'");
-GLOBAL_STR(str84, "\n");
-GLOBAL_STR(str85, "\\n");
-GLOBAL_STR(str86, "\r");
-GLOBAL_STR(str87, "\\r");
-GLOBAL_STR(str88, "\t");
-GLOBAL_STR(str89, "\\t");
-GLOBAL_STR(str90, "\u0000");
-GLOBAL_STR(str91, "\\x00");
-GLOBAL_STR(str92, "\\0");
-GLOBAL_STR(str93, "<%s %r>");
-GLOBAL_STR(str94, "-");
-GLOBAL_STR(str95, "_");
-GLOBAL_STR(str96, "<_Attributes %s>");
-GLOBAL_STR(str97, "<args.Reader %r %d>");
-GLOBAL_STR(str98, "expected argument to %r");
-GLOBAL_STR(str99, "-");
-GLOBAL_STR(str100, "expected integer after %s, got %r");
-GLOBAL_STR(str101, "-");
-GLOBAL_STR(str102, "got invalid integer for %s: %s");
-GLOBAL_STR(str103, "-");
-GLOBAL_STR(str104, "expected number after %r, got %r");
-GLOBAL_STR(str105, "-");
-GLOBAL_STR(str106, "got invalid float for %s: %s");
-GLOBAL_STR(str107, "-");
-GLOBAL_STR(str108, "got invalid argument %r to %r, expected one of: %s");
-GLOBAL_STR(str109, "-");
-GLOBAL_STR(str110, "|");
-GLOBAL_STR(str111, "0");
-GLOBAL_STR(str112, "F");
-GLOBAL_STR(str113, "false");
-GLOBAL_STR(str114, "False");
-GLOBAL_STR(str115, "1");
-GLOBAL_STR(str116, "T");
-GLOBAL_STR(str117, "true");
-GLOBAL_STR(str118, "Talse");
-GLOBAL_STR(str119, "got invalid argument to boolean flag: %r");
+GLOBAL_STR(str79, "\\");
+GLOBAL_STR(str80, "\\\\");
+GLOBAL_STR(str81, "'");
+GLOBAL_STR(str82, "\\'");
+GLOBAL_STR(str83, "\n");
+GLOBAL_STR(str84, "\\n");
+GLOBAL_STR(str85, "\r");
+GLOBAL_STR(str86, "\\r");
+GLOBAL_STR(str87, "\t");
+GLOBAL_STR(str88, "\\t");
+GLOBAL_STR(str89, "\u0000");
+GLOBAL_STR(str90, "\\x00");
+GLOBAL_STR(str91, "\\0");
+GLOBAL_STR(str92, "<%s %r>");
+GLOBAL_STR(str93, "-");
+GLOBAL_STR(str94, "_");
+GLOBAL_STR(str95, "<_Attributes %s>");
+GLOBAL_STR(str96, "<args.Reader %r %d>");
+GLOBAL_STR(str97, "expected argument to %r");
+GLOBAL_STR(str98, "-");
+GLOBAL_STR(str99, "expected integer after %s, got %r");
+GLOBAL_STR(str100, "-");
+GLOBAL_STR(str101, "got invalid integer for %s: %s");
+GLOBAL_STR(str102, "-");
+GLOBAL_STR(str103, "expected number after %r, got %r");
+GLOBAL_STR(str104, "-");
+GLOBAL_STR(str105, "got invalid float for %s: %s");
+GLOBAL_STR(str106, "-");
+GLOBAL_STR(str107, "got invalid argument %r to %r, expected one of: %s");
+GLOBAL_STR(str108, "-");
+GLOBAL_STR(str109, "|");
+GLOBAL_STR(str110, "0");
+GLOBAL_STR(str111, "F");
+GLOBAL_STR(str112, "false");
+GLOBAL_STR(str113, "False");
+GLOBAL_STR(str114, "1");
+GLOBAL_STR(str115, "T");
+GLOBAL_STR(str116, "true");
+GLOBAL_STR(str117, "Talse");
+GLOBAL_STR(str118, "got invalid argument to boolean flag: %r");
+GLOBAL_STR(str119, "-");
 GLOBAL_STR(str120, "-");
-GLOBAL_STR(str121, "-");
-GLOBAL_STR(str122, "Invalid option %r");
-GLOBAL_STR(str123, "Expected argument for action");
-GLOBAL_STR(str124, "Invalid action name %r");
+GLOBAL_STR(str121, "Invalid option %r");
+GLOBAL_STR(str122, "Expected argument for action");
+GLOBAL_STR(str123, "Invalid action name %r");
+GLOBAL_STR(str124, "--");
 GLOBAL_STR(str125, "--");
-GLOBAL_STR(str126, "--");
-GLOBAL_STR(str127, "=");
-GLOBAL_STR(str128, "got invalid flag %r");
-GLOBAL_STR(str129, "-");
-GLOBAL_STR(str130, "0");
-GLOBAL_STR(str131, "Z");
-GLOBAL_STR(str132, "-");
-GLOBAL_STR(str133, "doesn't accept flag %s");
-GLOBAL_STR(str134, "-");
+GLOBAL_STR(str126, "=");
+GLOBAL_STR(str127, "got invalid flag %r");
+GLOBAL_STR(str128, "-");
+GLOBAL_STR(str129, "0");
+GLOBAL_STR(str130, "Z");
+GLOBAL_STR(str131, "-");
+GLOBAL_STR(str132, "doesn't accept flag %s");
+GLOBAL_STR(str133, "-");
+GLOBAL_STR(str134, "+");
 GLOBAL_STR(str135, "+");
-GLOBAL_STR(str136, "+");
-GLOBAL_STR(str137, "doesn't accept option %s");
-GLOBAL_STR(str138, "+");
-GLOBAL_STR(str139, "-");
+GLOBAL_STR(str136, "doesn't accept option %s");
+GLOBAL_STR(str137, "+");
+GLOBAL_STR(str138, "-");
+GLOBAL_STR(str139, "--");
 GLOBAL_STR(str140, "--");
-GLOBAL_STR(str141, "--");
-GLOBAL_STR(str142, "got invalid flag %r");
-GLOBAL_STR(str143, "-");
-GLOBAL_STR(str144, "+");
-GLOBAL_STR(str145, "got invalid flag %r");
-GLOBAL_STR(str146, "-");
+GLOBAL_STR(str141, "got invalid flag %r");
+GLOBAL_STR(str142, "-");
+GLOBAL_STR(str143, "+");
+GLOBAL_STR(str144, "got invalid flag %r");
+GLOBAL_STR(str145, "-");
 
 namespace ansi {  // forward declare
 
@@ -635,107 +634,291 @@ void AnsiOutput::PopColor() {
 }
 int INDENT = 2;
 
+Str* _ExternalStr(hnode::External* node) {
+  StackRoots _roots({&node});
+
+  // if not PYTHON
+  {
+    return str14;
+  }
+  // endif MYCPP
+}
+
 _PrettyPrinter::_PrettyPrinter(int max_col) {
   this->max_col = max_col;
+  this->widths = Alloc<List<int>>();
+  this->fit_widths = Alloc<List<int>>();
+  this->sizes = Alloc<List<int>>();
+  this->texts = Alloc<List<Str*>>();
 }
 
-bool _PrettyPrinter::_PrintWrappedArray(List<hnode_asdl::hnode_t*>* array, int prefix_len, format::ColorOutput* f, int indent) {
+int _PrettyPrinter::_Measure(hnode_asdl::hnode_t* node) {
+  int i;
+  int width;
+  int fit_width;
+  hnode_asdl::hnode_t* UP_node = nullptr;
+  int tag;
+  int j;
+  int c;
+  StackRoots _roots({&node, &UP_node});
+
+  i = len(this->widths);
+  this->widths->append(0);
+  this->fit_widths->append(0);
+  this->sizes->append(0);
+  this->texts->append(nullptr);
+  width = 0;
+  fit_width = -1;
+  UP_node = node;
+  tag = node->tag();
+  if (tag == hnode_e::Leaf) {
+    hnode::Leaf* node = static_cast<hnode::Leaf*>(UP_node);
+    this->texts->set(i, qsn::maybe_encode(node->s));
+    width = len(this->texts->index_(i));
+    fit_width = width;
+  }
+  else {
+    if (tag == hnode_e::External) {
+      hnode::External* node = static_cast<hnode::External*>(UP_node);
+      this->texts->set(i, _ExternalStr(node));
+      width = len(this->texts->index_(i));
+      fit_width = width;
+    }
+    else {
+      if (tag == hnode_e::Array) {
+        hnode::Array* node = static_cast<hnode::Array*>(UP_node);
+        width = 1;
+        j = 0;
+        for (ListIter<hnode_asdl::hnode_t*> it(node->children); !it.Done(); it.Next(), ++j) {
+          hnode_asdl::hnode_t* item = it.Value();
+          StackRoots _for({&item        });
+          if (j != 0) {
+            width += 1;
+          }
+          width += this->widths->index_(this->_Measure(item));
+        }
+        width += 1;
+        fit_width = width;
+      }
+      else {
+        if (tag == hnode_e::Record) {
+          hnode::Record* node = static_cast<hnode::Record*>(UP_node);
+          width = len(node->left);
+          if (node->abbrev) {
+            if (len(node->node_type)) {
+              width += (len(node->node_type) + 1);
+            }
+            j = 0;
+            for (ListIter<hnode_asdl::hnode_t*> it(node->unnamed_fields); !it.Done(); it.Next(), ++j) {
+              hnode_asdl::hnode_t* val = it.Value();
+              StackRoots _for({&val            });
+              if (j != 0) {
+                width += 1;
+              }
+              c = this->_Measure(val);
+              if (this->fit_widths->index_(c) != -1) {
+                fit_width = (width + this->fit_widths->index_(c));
+              }
+              width += this->widths->index_(c);
+            }
+          }
+          else {
+            width += len(node->node_type);
+            for (ListIter<hnode_asdl::Field*> it(node->fields); !it.Done(); it.Next()) {
+              hnode_asdl::Field* field = it.Value();
+              StackRoots _for({&field            });
+              width += (len(field->name) + 2);
+              c = this->_Measure(field->val);
+              if (this->fit_widths->index_(c) != -1) {
+                fit_width = (width + this->fit_widths->index_(c));
+              }
+              width += this->widths->index_(c);
+            }
+          }
+          width += len(node->right);
+        }
+        else {
+          assert(0);  // AssertionError
+        }
+      }
+    }
+  }
+  this->widths->set(i, width);
+  this->fit_widths->set(i, fit_width);
+  this->sizes->set(i, (len(this->widths) - i));
+  return i;
+}
+
+bool _PrettyPrinter::_Fits(int i, int max_chars) {
+  int fit_width;
+
+  fit_width = this->fit_widths->index_(i);
+  return (fit_width == -1 or fit_width <= max_chars);
+}
+
+void _PrettyPrinter::_PrintSingleLine(hnode_asdl::hnode_t* node, int i, format::ColorOutput* f) {
+  hnode_asdl::hnode_t* UP_node = nullptr;
+  int tag;
+  int c;
+  int j;
+  StackRoots _roots({&node, &f, &UP_node});
+
+  UP_node = node;
+  tag = node->tag();
+  if (tag == hnode_e::Leaf) {
+    hnode::Leaf* node = static_cast<hnode::Leaf*>(UP_node);
+    f->PushColor(node->color);
+    f->write(this->texts->index_(i));
+    f->PopColor();
+  }
+  else {
+    if (tag == hnode_e::External) {
+      f->PushColor(color_e::External);
+      f->write(this->texts->index_(i));
+      f->PopColor();
+    }
+    else {
+      if (tag == hnode_e::Array) {
+        hnode::Array* node = static_cast<hnode::Array*>(UP_node);
+        f->write(str15);
+        c = (i + 1);
+        j = 0;
+        for (ListIter<hnode_asdl::hnode_t*> it(node->children); !it.Done(); it.Next(), ++j) {
+          hnode_asdl::hnode_t* item = it.Value();
+          StackRoots _for({&item        });
+          if (j != 0) {
+            f->write(str16);
+          }
+          this->_PrintSingleLine(item, c, f);
+          c += this->sizes->index_(c);
+        }
+        f->write(str17);
+      }
+      else {
+        if (tag == hnode_e::Record) {
+          hnode::Record* node = static_cast<hnode::Record*>(UP_node);
+          f->write(node->left);
+          c = (i + 1);
+          if (node->abbrev) {
+            if (len(node->node_type)) {
+              f->PushColor(color_e::TypeName);
+              f->write(node->node_type);
+              f->PopColor();
+              f->write(str18);
+            }
+            j = 0;
+            for (ListIter<hnode_asdl::hnode_t*> it(node->unnamed_fields); !it.Done(); it.Next(), ++j) {
+              hnode_asdl::hnode_t* val = it.Value();
+              StackRoots _for({&val            });
+              if (j != 0) {
+                f->write(str19);
+              }
+              this->_PrintSingleLine(val, c, f);
+              c += this->sizes->index_(c);
+            }
+          }
+          else {
+            f->PushColor(color_e::TypeName);
+            f->write(node->node_type);
+            f->PopColor();
+            for (ListIter<hnode_asdl::Field*> it(node->fields); !it.Done(); it.Next()) {
+              hnode_asdl::Field* field = it.Value();
+              StackRoots _for({&field            });
+              f->write(StrFormat(" %s:", field->name));
+              this->_PrintSingleLine(field->val, c, f);
+              c += this->sizes->index_(c);
+            }
+          }
+          f->write(node->right);
+        }
+        else {
+          assert(0);  // AssertionError
+        }
+      }
+    }
+  }
+}
+
+bool _PrettyPrinter::_PrintWrappedArray(List<hnode_asdl::hnode_t*>* array, int first, int prefix_len, format::ColorOutput* f, int indent) {
   bool all_fit;
   int chars_so_far;
+  int c;
   int i;
-  format::ColorOutput* single_f = nullptr;
-  Str* s = nullptr;
-  int num_chars;
-  StackRoots _roots({&array, &f, &single_f, &s});
+  StackRoots _roots({&array, &f});
 
   all_fit = true;
   chars_so_far = prefix_len;
+  c = first;
   i = 0;
   for (ListIter<hnode_asdl::hnode_t*> it(array); !it.Done(); it.Next(), ++i) {
     hnode_asdl::hnode_t* val = it.Value();
     StackRoots _for({&val  });
     if (i != 0) {
-      f->write(str14);
+      f->write(str21);
     }
-    single_f = f->NewTempBuffer();
-    if (_TrySingleLine(val, single_f, (this->max_col - chars_so_far))) {
-      Tuple2<Str*, int> tup1 = single_f->GetRaw();
-      s = tup1.at0();
-      num_chars = tup1.at1();
-      f->WriteRaw((Alloc<Tuple2<Str*, int>>(s, num_chars)));
-      chars_so_far += single_f->NumChars();
+    if (this->_Fits(c, (this->max_col - chars_so_far))) {
+      this->_PrintSingleLine(val, c, f);
+      chars_so_far += this->widths->index_(c);
     }
     else {
-      f->write(str15);
-      this->PrintNode(val, f, (indent + INDENT));
+      f->write(str22);
+      this->PrintNode(val, c, f, (indent + INDENT));
       chars_so_far = 0;
       all_fit = false;
     }
+    c += this->sizes->index_(c);
   }
   return all_fit;
 }
 
-bool _PrettyPrinter::_PrintWholeArray(List<hnode_asdl::hnode_t*>* array, int prefix_len, format::ColorOutput* f, int indent) {
-  bool all_fit;
-  List<Tuple2<Str*, int>*>* pieces = nullptr;
+bool _PrettyPrinter::_PrintWholeArray(List<hnode_asdl::hnode_t*>* array, int first, int prefix_len, format::ColorOutput* f) {
   int chars_so_far;
-  format::ColorOutput* single_f = nullptr;
-  Str* s = nullptr;
-  int num_chars;
+  int c;
   int i;
-  StackRoots _roots({&array, &f, &pieces, &single_f, &s});
+  StackRoots _roots({&array, &f});
 
-  all_fit = true;
-  pieces = Alloc<List<Tuple2<Str*, int>*>>();
   chars_so_far = prefix_len;
+  c = first;
   for (ListIter<hnode_asdl::hnode_t*> it(array); !it.Done(); it.Next()) {
-    hnode_asdl::hnode_t* item = it.Value();
-    StackRoots _for({&item  });
-    single_f = f->NewTempBuffer();
-    if (_TrySingleLine(item, single_f, (this->max_col - chars_so_far))) {
-      Tuple2<Str*, int> tup2 = single_f->GetRaw();
-      s = tup2.at0();
-      num_chars = tup2.at1();
-      pieces->append((Alloc<Tuple2<Str*, int>>(s, num_chars)));
-      chars_so_far += single_f->NumChars();
-    }
-    else {
-      all_fit = false;
-      break;
+    hnode_asdl::hnode_t* _ = it.Value();
+    StackRoots _for({&_  });
+    if (!this->_Fits(c, (this->max_col - chars_so_far))) {
+      return false;
     }
+    chars_so_far += this->widths->index_(c);
+    c += this->sizes->index_(c);
   }
-  if (all_fit) {
-    i = 0;
-    for (ListIter<Tuple2<Str*, int>*> it(pieces); !it.Done(); it.Next(), ++i) {
-      Tuple2<Str*, int>* p = it.Value();
-      StackRoots _for({&p    });
-      if (i != 0) {
-        f->write(str16);
-      }
-      f->WriteRaw(p);
+  c = first;
+  i = 0;
+  for (ListIter<hnode_asdl::hnode_t*> it(array); !it.Done(); it.Next(), ++i) {
+    hnode_asdl::hnode_t* item = it.Value();
+    StackRoots _for({&item  });
+    if (i != 0) {
+      f->write(str23);
     }
-    f->write(str17);
+    this->_PrintSingleLine(item, c, f);
+    c += this->sizes->index_(c);
   }
-  return all_fit;
+  f->write(str24);
+  return true;
 }
 
-void _PrettyPrinter::_PrintRecord(hnode::Record* node, format::ColorOutput* f, int indent) {
+void _PrettyPrinter::_PrintRecord(hnode::Record* node, int i, format::ColorOutput* f, int indent) {
   Str* ind = nullptr;
   Str* prefix = nullptr;
   int prefix_len;
   bool all_fit;
+  int c;
   Str* name = nullptr;
   hnode_asdl::hnode_t* val = nullptr;
   Str* ind1 = nullptr;
   hnode_asdl::hnode_t* UP_val = nullptr;
   int tag;
   Str* name_str = nullptr;
-  format::ColorOutput* single_f = nullptr;
-  Str* s = nullptr;
-  int num_chars;
-  StackRoots _roots({&node, &f, &ind, &prefix, &name, &val, &ind1, &UP_val, &name_str, &single_f, &s});
+  int c2;
+  StackRoots _roots({&node, &f, &ind, &prefix, &name, &val, &ind1, &UP_val, &name_str});
 
-  ind = str_repeat(str18, indent);
+  ind = str_repeat(str25, indent);
   if (node->abbrev) {
     prefix = str_concat(ind, node->left);
     f->write(prefix);
@@ -743,12 +926,12 @@ void _PrettyPrinter::_PrintRecord(hnode::Record* node, format::ColorOutput* f, i
       f->PushColor(color_e::TypeName);
       f->write(node->node_type);
       f->PopColor();
-      f->write(str19);
+      f->write(str26);
     }
     prefix_len = ((len(prefix) + len(node->node_type)) + 1);
-    all_fit = this->_PrintWrappedArray(node->unnamed_fields, prefix_len, f, indent);
+    all_fit = this->_PrintWrappedArray(node->unnamed_fields, (i + 1), prefix_len, f, indent);
     if (!all_fit) {
-      f->write(str20);
+      f->write(str27);
       f->write(ind);
     }
     f->write(node->right);
@@ -758,13 +941,14 @@ void _PrettyPrinter::_PrintRecord(hnode::Record* node, format::ColorOutput* f, i
     f->PushColor(color_e::TypeName);
     f->write(node->node_type);
     f->PopColor();
-    f->write(str21);
+    f->write(str28);
+    c = (i + 1);
     for (ListIter<hnode_asdl::Field*> it(node->fields); !it.Done(); it.Next()) {
       hnode_asdl::Field* field = it.Value();
       StackRoots _for({&field    });
       name = field->name;
       val = field->val;
-      ind1 = str_repeat(str22, (indent + INDENT));
+      ind1 = str_repeat(str29, (indent + INDENT));
       UP_val = val;
       tag = val->tag();
       if (tag == hnode_e::Array) {
@@ -772,13 +956,15 @@ void _PrettyPrinter::_PrintRecord(hnode::Record* node, format::ColorOutput* f, i
         name_str = StrFormat("%s%s: [", ind1, name);
         f->write(name_str);
         prefix_len = len(name_str);
-        if (!this->_PrintWholeArray(val->children, prefix_len, f, indent)) {
-          f->write(str24);
+        if (!this->_PrintWholeArray(val->children, (c + 1), prefix_len, f)) {
+          f->write(str31);
+          c2 = (c + 1);
           for (ListIter<hnode_asdl::hnode_t*> it(val->children); !it.Done(); it.Next()) {
             hnode_asdl::hnode_t* child = it.Value();
             StackRoots _for({&child          });
-            this->PrintNode(child, f, ((indent + INDENT) + INDENT));
-            f->write(str25);
+            this->PrintNode(child, c2, f, ((indent + INDENT) + INDENT));
+            f->write(str32);
+            c2 += this->sizes->index_(c2);
           }
           f->write(StrFormat("%s]", ind1));
         }
@@ -787,41 +973,31 @@ void _PrettyPrinter::_PrintRecord(hnode::Record* node, format::ColorOutput* f, i
         name_str = StrFormat("%s%s: ", ind1, name);
         f->write(name_str);
         prefix_len = len(name_str);
-        single_f = f->NewTempBuffer();
-        if (_TrySingleLine(val, single_f, (this->max_col - prefix_len))) {
-          Tuple2<Str*, int> tup3 = single_f->GetRaw();
-          s = tup3.at0();
-          num_chars = tup3.at1();
-          f->WriteRaw((Alloc<Tuple2<Str*, int>>(s, num_chars)));
+        if (this->_Fits(c, (this->max_col - prefix_len))) {
+          this->_PrintSingleLine(val, c, f);
         }
         else {
-          f->write(str28);
-          this->PrintNode(val, f, ((indent + INDENT) + INDENT));
+          f->write(str35);
+          this->PrintNode(val, c, f, ((indent + INDENT) + INDENT));
         }
       }
-      f->write(str29);
+      f->write(str36);
+      c += this->sizes->index_(c);
     }
     f->write(str_concat(ind, node->right));
   }
 }
 
-void _PrettyPrinter::PrintNode(hnode_asdl::hnode_t* node, format::ColorOutput* f, int indent) {
+void _PrettyPrinter::PrintNode(hnode_asdl::hnode_t* node, int i, format::ColorOutput* f, int indent) {
   Str* ind = nullptr;
-  format::ColorOutput* single_f = nullptr;
-  Str* s = nullptr;
-  int num_chars;
   hnode_asdl::hnode_t* UP_node = nullptr;
   int tag;
-  StackRoots _roots({&node, &f, &ind, &single_f, &s, &UP_node});
-
-  ind = str_repeat(str30, indent);
-  single_f = f->NewTempBuffer();
-  single_f->write(ind);
-  if (_TrySingleLine(node, single_f, (this->max_col - indent))) {
-    Tuple2<Str*, int> tup4 = single_f->GetRaw();
-    s = tup4.at0();
-    num_chars = tup4.at1();
-    f->WriteRaw((Alloc<Tuple2<Str*, int>>(s, num_chars)));
+  StackRoots _roots({&node, &f, &ind, &UP_node});
+
+  ind = str_repeat(str37, indent);
+  if (this->_Fits(i, ((this->max_col - indent) - indent))) {
+    f->write(ind);
+    this->_PrintSingleLine(node, i, f);
     return ;
   }
   UP_node = node;
@@ -829,24 +1005,19 @@ void _PrettyPrinter::PrintNode(hnode_asdl::hnode_t* node, format::ColorOutput* f
   if (tag == hnode_e::Leaf) {
     hnode::Leaf* node = static_cast<hnode::Leaf*>(UP_node);
     f->PushColor(node->color);
-    f->write(qsn::maybe_encode(node->s));
+    f->write(this->texts->index_(i));
     f->PopColor();
   }
   else {
     if (tag == hnode_e::External) {
-      hnode::External* node = static_cast<hnode::External*>(UP_node);
       f->PushColor(color_e::External);
-      // if not PYTHON
-      {
-        f->write(str31);
-      }
-      // endif MYCPP
+      f->write(this->texts->index_(i));
       f->PopColor();
     }
     else {
       if (tag == hnode_e::Record) {
         hnode::Record* node = static_cast<hnode::Record*>(UP_node);
-        this->_PrintRecord(node, f, indent);
+        this->_PrintRecord(node, i, f, indent);
       }
       else {
         assert(0);  // AssertionError
@@ -855,128 +1026,28 @@ void _PrettyPrinter::PrintNode(hnode_asdl::hnode_t* node, format::ColorOutput* f
   }
 }
 
-bool _TrySingleLineObj(hnode::Record* node, format::ColorOutput* f, int max_chars) {
-  int i;
-  StackRoots _roots({&node, &f});
-
-  f->write(node->left);
-  if (node->abbrev) {
-    if (len(node->node_type)) {
-      f->PushColor(color_e::TypeName);
-      f->write(node->node_type);
-      f->PopColor();
-      f->write(str32);
-    }
-    i = 0;
-    for (ListIter<hnode_asdl::hnode_t*> it(node->unnamed_fields); !it.Done(); it.Next(), ++i) {
-      hnode_asdl::hnode_t* val = it.Value();
-      StackRoots _for({&val    });
-      if (i != 0) {
-        f->write(str33);
-      }
-      if (!_TrySingleLine(val, f, max_chars)) {
-        return false;
-      }
-    }
-  }
-  else {
-    f->PushColor(color_e::TypeName);
-    f->write(node->node_type);
-    f->PopColor();
-    for (ListIter<hnode_asdl::Field*> it(node->fields); !it.Done(); it.Next()) {
-      hnode_asdl::Field* field = it.Value();
-      StackRoots _for({&field    });
-      f->write(StrFormat(" %s:", field->name));
-      if (!_TrySingleLine(field->val, f, max_chars)) {
-        return false;
-      }
-    }
-  }
-  f->write(node->right);
-  return true;
-}
-
-bool _TrySingleLine(hnode_asdl::hnode_t* node, format::ColorOutput* f, int max_chars) {
-  hnode_asdl::hnode_t* UP_node = nullptr;
-  int tag;
-  int i;
-  int num_chars_so_far;
-  StackRoots _roots({&node, &f, &UP_node});
-
-  UP_node = node;
-  tag = node->tag();
-  if (tag == hnode_e::Leaf) {
-    hnode::Leaf* node = static_cast<hnode::Leaf*>(UP_node);
-    f->PushColor(node->color);
-    f->write(qsn::maybe_encode(node->s));
-    f->PopColor();
-  }
-  else {
-    if (tag == hnode_e::External) {
-      hnode::External* node = static_cast<hnode::External*>(UP_node);
-      f->PushColor(color_e::External);
-      // if not PYTHON
-      {
-        f->write(str35);
-      }
-      // endif MYCPP
-      f->PopColor();
-    }
-    else {
-      if (tag == hnode_e::Array) {
-        hnode::Array* node = static_cast<hnode::Array*>(UP_node);
-        f->write(str36);
-        i = 0;
-        for (ListIter<hnode_asdl::hnode_t*> it(node->children); !it.Done(); it.Next(), ++i) {
-          hnode_asdl::hnode_t* item = it.Value();
-          StackRoots _for({&item        });
-          if (i != 0) {
-            f->write(str37);
-          }
-          if (!_TrySingleLine(item, f, max_chars)) {
-            return false;
-          }
-        }
-        f->write(str38);
-      }
-      else {
-        if (tag == hnode_e::Record) {
-          hnode::Record* node = static_cast<hnode::Record*>(UP_node);
-          return _TrySingleLineObj(node, f, max_chars);
-        }
-        else {
-          assert(0);  // AssertionError
-        }
-      }
-    }
-  }
-  num_chars_so_far = f->NumChars();
-  if (num_chars_so_far > max_chars) {
-    return false;
-  }
-  return true;
-}
-
 void PrintTree(hnode_asdl::hnode_t* node, format::ColorOutput* f) {
   format::_PrettyPrinter* pp = nullptr;
+  int i;
   StackRoots _roots({&node, &f, &pp});
 
   pp = Alloc<_PrettyPrinter>(100);
-  pp->PrintNode(node, f, 0);
+  i = pp->_Measure(node);
+  pp->PrintNode(node, i, f, 0);
 }
 
 }  // define namespace format
 
 namespace ansi {  // define
 
-Str* RESET = str39;
-Str* BOLD = str40;
-Str* UNDERLINE = str41;
-Str* REVERSE = str42;
-Str* RED = str43;
-Str* GREEN = str44;
-Str* YELLOW = str45;
-Str* BLUE = str46;
+Str* RESET = str38;
+Str* BOLD = str39;
+Str* UNDERLINE = str40;
+Str* REVERSE = str41;
+Str* RED = str42;
+Str* GREEN = str43;
+Str* YELLOW = str44;
+Str* BLUE = str45;
 
 }  // define namespace ansi
 
@@ -986,9 +1057,9 @@ namespace cgi {  // define
 Str* escape(Str* s) {
   StackRoots _roots({&s});
 
-  s = s->replace(str47, str48);
-  s = s->replace(str49, str50);
-  s = s->replace(str51, str52);
+  s = s->replace(str46, str47);
+  s = s->replace(str48, str49);
+  s = s->replace(str50, str51);
   return s;
 }
 
@@ -1036,7 +1107,7 @@ Str* maybe_shell_encode(Str* s, int flags) {
         continue;
       }
       quote = 1;
-      if ((str_contains(str53, ch) or IsUnprintableLow(ch))) {
+      if ((str_contains(str52, ch) or IsUnprintableLow(ch))) {
         quote = 2;
         break;
       }
@@ -1048,13 +1119,13 @@ Str* maybe_shell_encode(Str* s, int flags) {
   parts = Alloc<List<Str*>>();
   valid_utf8 = _encode(s, bit8_display, true, parts);
   if ((!valid_utf8 or quote == 2)) {
-    prefix = str54;
+    prefix = str53;
   }
   else {
-    prefix = str55;
+    prefix = str54;
   }
-  parts->append(str56);
-  return str_concat(prefix, str57->join(parts));
+  parts->append(str55);
+  return str_concat(prefix, str56->join(parts));
 }
 
 Str* maybe_encode(Str* s, int bit8_display) {
@@ -1080,10 +1151,10 @@ Str* maybe_encode(Str* s, int bit8_display) {
     return s;
   }
   parts = Alloc<List<Str*>>();
-  parts->append(str58);
+  parts->append(str57);
   _encode(s, bit8_display, false, parts);
-  parts->append(str59);
-  return str60->join(parts);
+  parts->append(str58);
+  return str59->join(parts);
 }
 
 Str* encode(Str* s, int bit8_display) {
@@ -1091,10 +1162,10 @@ Str* encode(Str* s, int bit8_display) {
   StackRoots _roots({&s, &parts});
 
   parts = Alloc<List<Str*>>();
-  parts->append(str61);
+  parts->append(str60);
   _encode(s, bit8_display, false, parts);
-  parts->append(str62);
-  return str63->join(parts);
+  parts->append(str61);
+  return str62->join(parts);
 }
 
 void _encode_bytes_x(Str* s, bool shell_compat, List<Str*>* parts) {
@@ -1104,28 +1175,28 @@ void _encode_bytes_x(Str* s, bool shell_compat, List<Str*>* parts) {
   for (StrIter it(s); !it.Done(); it.Next()) {
     Str* byte = it.Value();
     StackRoots _for({&byte  });
-    if (str_equals(byte, str64)) {
-      part = str65;
+    if (str_equals(byte, str63)) {
+      part = str64;
     }
     else {
-      if (str_equals(byte, str66)) {
-        part = str67;
+      if (str_equals(byte, str65)) {
+        part = str66;
       }
       else {
-        if (str_equals(byte, str68)) {
-          part = str69;
+        if (str_equals(byte, str67)) {
+          part = str68;
         }
         else {
-          if (str_equals(byte, str70)) {
-            part = str71;
+          if (str_equals(byte, str69)) {
+            part = str70;
           }
           else {
-            if (str_equals(byte, str72)) {
-              part = str73;
+            if (str_equals(byte, str71)) {
+              part = str72;
             }
             else {
-              if (str_equals(byte, str74)) {
-                part = shell_compat ? str75 : str76;
+              if (str_equals(byte, str73)) {
+                part = shell_compat ? str74 : str75;
               }
               else {
                 if (IsUnprintableLow(byte)) {
@@ -1176,9 +1247,9 @@ bool _encode_runes(Str* s, int bit8_display, bool shell_compat, List<Str*>* part
 
   valid_utf8 = true;
   state = Start;
-  r1 = str77;
-  r2 = str78;
-  r3 = str79;
+  r1 = str76;
+  r2 = str77;
+  r3 = str78;
   for (StrIter it(s); !it.Done(); it.Next()) {
     Str* byte = it.Value();
     StackRoots _for({&byte  });
@@ -1223,28 +1294,28 @@ bool _encode_runes(Str* s, int bit8_display, bool shell_compat, List<Str*>* part
     }
     if (typ == Ascii) {
       state = Start;
-      if (str_equals(byte, str80)) {
-        out = str81;
+      if (str_equals(byte, str79)) {
+        out = str80;
       }
       else {
-        if (str_equals(byte, str82)) {
-          out = str83;
+        if (str_equals(byte, str81)) {
+          out = str82;
         }
         else {
-          if (str_equals(byte, str84)) {
-            out = str85;
+          if (str_equals(byte, str83)) {
+            out = str84;
           }
           else {
-            if (str_equals(byte, str86)) {
-              out = str87;
+            if (str_equals(byte, str85)) {
+              out = str86;
             }
             else {
-              if (str_equals(byte, str88)) {
-                out = str89;
+              if (str_equals(byte, str87)) {
+                out = str88;
               }
               else {
-                if (str_equals(byte, str90)) {
-                  out = shell_compat ? str91 : str92;
+                if (str_equals(byte, str89)) {
+                  out = shell_compat ? str90 : str91;
                 }
                 else {
                   if (IsUnprintableLow(byte)) {
@@ -1523,7 +1594,7 @@ void _Attributes::SetTrue(Str* name) {
 void _Attributes::Set(Str* name, runtime_asdl::value_t* val) {
   StackRoots _roots({&name, &val});
 
-  name = name->replace(str94, str95);
+  name = name->replace(str93, str94);
   this->attrs->set(name, val);
 }
 
@@ -1658,7 +1729,7 @@ bool _ArgAction::OnMatch(Str* attached_arg, args::Reader* arg_r, args::_Attribut
     arg_r->Next();
     arg = arg_r->Peek();
     if (arg == nullptr) {
-      e_usage(StrFormat("expected argument to %r", str_concat(str99, this->name)), arg_r->Location());
+      e_usage(StrFormat("expected argument to %r", str_concat(str98, this->name)), arg_r->Location());
     }
   }
   val = this->_Value(arg, arg_r->Location());
@@ -1677,10 +1748,10 @@ runtime_asdl::value_t* SetToInt::_Value(Str* arg, syntax_asdl::loc_t* location)
     i = to_int(arg);
   }
   catch (ValueError*) {
-    e_usage(StrFormat("expected integer after %s, got %r", str_concat(str101, this->name), arg), location);
+    e_usage(StrFormat("expected integer after %s, got %r", str_concat(str100, this->name), arg), location);
   }
   if (i < 0) {
-    e_usage(StrFormat("got invalid integer for %s: %s", str_concat(str103, this->name), arg), location);
+    e_usage(StrFormat("got invalid integer for %s: %s", str_concat(str102, this->name), arg), location);
   }
   return Alloc<value::Int>(i);
 }
@@ -1696,10 +1767,10 @@ runtime_asdl::value_t* SetToFloat::_Value(Str* arg, syntax_asdl::loc_t* location
     f = to_float(arg);
   }
   catch (ValueError*) {
-    e_usage(StrFormat("expected number after %r, got %r", str_concat(str105, this->name), arg), location);
+    e_usage(StrFormat("expected number after %r, got %r", str_concat(str104, this->name), arg), location);
   }
   if (f < 0) {
-    e_usage(StrFormat("got invalid float for %s: %s", str_concat(str107, this->name), arg), location);
+    e_usage(StrFormat("got invalid float for %s: %s", str_concat(str106, this->name), arg), location);
   }
   return Alloc<value::Float>(f);
 }
@@ -1711,7 +1782,7 @@ runtime_asdl::value_t* SetToString::_Value(Str* arg, syntax_asdl::loc_t* locatio
   StackRoots _roots({&arg, &location});
 
   if ((this->valid != nullptr and !list_contains(this->valid, arg))) {
-    e_usage(StrFormat("got invalid argument %r to %r, expected one of: %s", arg, str_concat(str109, this->name), str110->join(this->valid)), location);
+    e_usage(StrFormat("got invalid argument %r to %r, expected one of: %s", arg, str_concat(str108, this->name), str109->join(this->valid)), location);
   }
   return Alloc<value::Str>(arg);
 }
@@ -1725,11 +1796,11 @@ bool SetAttachedBool::OnMatch(Str* attached_arg, args::Reader* arg_r, args::_Att
   StackRoots _roots({&attached_arg, &arg_r, &out});
 
   if (attached_arg != nullptr) {
-    if ((str_equals(attached_arg, str111) || str_equals(attached_arg, str112) || str_equals(attached_arg, str113) || str_equals(attached_arg, str114))) {
+    if ((str_equals(attached_arg, str110) || str_equals(attached_arg, str111) || str_equals(attached_arg, str112) || str_equals(attached_arg, str113))) {
       b = false;
     }
     else {
-      if ((str_equals(attached_arg, str115) || str_equals(attached_arg, str116) || str_equals(attached_arg, str117) || str_equals(attached_arg, str118))) {
+      if ((str_equals(attached_arg, str114) || str_equals(attached_arg, str115) || str_equals(attached_arg, str116) || str_equals(attached_arg, str117))) {
         b = true;
       }
       else {
@@ -1763,7 +1834,7 @@ bool SetOption::OnMatch(Str* attached_arg, args::Reader* arg_r, args::_Attribute
   bool b;
   StackRoots _roots({&attached_arg, &arg_r, &out});
 
-  b = maybe_str_equals(attached_arg, str120);
+  b = maybe_str_equals(attached_arg, str119);
   out->opt_changes->append((Alloc<Tuple2<Str*, bool>>(this->name, b)));
   return false;
 }
@@ -1786,7 +1857,7 @@ bool SetNamedOption::OnMatch(Str* attached_arg, args::Reader* arg_r, args::_Attr
   List<Tuple2<Str*, bool>*>* changes = nullptr;
   StackRoots _roots({&attached_arg, &arg_r, &out, &arg, &attr_name, &changes});
 
-  b = maybe_str_equals(attached_arg, str121);
+  b = maybe_str_equals(attached_arg, str120);
   arg_r->Next();
   arg = arg_r->Peek();
   if (arg == nullptr) {
@@ -1831,7 +1902,7 @@ bool SetNamedAction::OnMatch(Str* attached_arg, args::Reader* arg_r, args::_Attr
   arg_r->Next();
   arg = arg_r->Peek();
   if (arg == nullptr) {
-    e_usage(str123, loc::Missing);
+    e_usage(str122, loc::Missing);
   }
   attr_name = arg;
   if ((len(this->names) and !list_contains(this->names, attr_name))) {
@@ -1856,13 +1927,13 @@ args::_Attributes* Parse(flag_spec::_FlagSpec* spec, args::Reader* arg_r) {
   out = Alloc<_Attributes>(spec->defaults);
   while (!arg_r->AtEnd()) {
     arg = arg_r->Peek();
-    if (maybe_str_equals(arg, str125)) {
+    if (maybe_str_equals(arg, str124)) {
       out->saw_double_dash = true;
       arg_r->Next();
       break;
     }
-    if ((len(spec->actions_long) and arg->startswith(str126))) {
-      pos = arg->find(str127, 2);
+    if ((len(spec->actions_long) and arg->startswith(str125))) {
+      pos = arg->find(str126, 2);
       if (pos == -1) {
         suffix = nullptr;
         flag_name = arg->slice(2);
@@ -1880,15 +1951,15 @@ args::_Attributes* Parse(flag_spec::_FlagSpec* spec, args::Reader* arg_r) {
       continue;
     }
     else {
-      if ((arg->startswith(str129) and len(arg) > 1)) {
+      if ((arg->startswith(str128) and len(arg) > 1)) {
         n = len(arg);
         for (int i = 1; i < n; ++i) {
           ch = arg->index_(i);
-          if (str_equals(ch, str130)) {
-            ch = str131;
+          if (str_equals(ch, str129)) {
+            ch = str130;
           }
           if (list_contains(spec->plus_flags, ch)) {
-            out->Set(ch, Alloc<value::Str>(str132));
+            out->Set(ch, Alloc<value::Str>(str131));
             continue;
           }
           if (list_contains(spec->arity0, ch)) {
@@ -1901,20 +1972,20 @@ args::_Attributes* Parse(flag_spec::_FlagSpec* spec, args::Reader* arg_r) {
             action->OnMatch(attached_arg, arg_r, out);
             break;
           }
-          e_usage(StrFormat("doesn't accept flag %s", str_concat(str134, ch)), arg_r->Location());
+          e_usage(StrFormat("doesn't accept flag %s", str_concat(str133, ch)), arg_r->Location());
         }
         arg_r->Next();
       }
       else {
-        if ((len(spec->plus_flags) and (arg->startswith(str135) and len(arg) > 1))) {
+        if ((len(spec->plus_flags) and (arg->startswith(str134) and len(arg) > 1))) {
           n = len(arg);
           for (int i = 1; i < n; ++i) {
             ch = arg->index_(i);
             if (list_contains(spec->plus_flags, ch)) {
-              out->Set(ch, Alloc<value::Str>(str136));
+              out->Set(ch, Alloc<value::Str>(str135));
               continue;
             }
-            e_usage(StrFormat("doesn't accept option %s", str_concat(str138, ch)), arg_r->Location());
+            e_usage(StrFormat("doesn't accept option %s", str_concat(str137, ch)), arg_r->Location());
           }
           arg_r->Next();
         }
@@ -1938,7 +2009,7 @@ args::_Attributes* ParseLikeEcho(flag_spec::_FlagSpec* spec, args::Reader* arg_r
   while (!arg_r->AtEnd()) {
     arg = arg_r->Peek();
     chars = arg->slice(1);
-    if ((arg->startswith(str139) and len(chars))) {
+    if ((arg->startswith(str138) and len(chars))) {
       done = false;
       for (StrIter it(chars); !it.Done(); it.Next()) {
         Str* c = it.Value();
@@ -1978,12 +2049,12 @@ args::_Attributes* ParseMore(flag_spec::_FlagSpecAndMore* spec, args::Reader* ar
   quit = false;
   while (!arg_r->AtEnd()) {
     arg = arg_r->Peek();
-    if (maybe_str_equals(arg, str140)) {
+    if (maybe_str_equals(arg, str139)) {
       out->saw_double_dash = true;
       arg_r->Next();
       break;
     }
-    if (arg->startswith(str141)) {
+    if (arg->startswith(str140)) {
       action = spec->actions_long->get(arg->slice(2));
       if (action == nullptr) {
         e_usage(StrFormat("got invalid flag %r", arg), arg_r->Location());
@@ -1992,14 +2063,14 @@ args::_Attributes* ParseMore(flag_spec::_FlagSpecAndMore* spec, args::Reader* ar
       arg_r->Next();
       continue;
     }
-    if (((arg->startswith(str143) or arg->startswith(str144)) and len(arg) > 1)) {
+    if (((arg->startswith(str142) or arg->startswith(str143)) and len(arg) > 1)) {
       char0 = arg->index_(0);
       for (StrIter it(arg->slice(1)); !it.Done(); it.Next()) {
         Str* ch = it.Value();
         StackRoots _for({&ch      });
         action = spec->actions_short->get(ch);
         if (action == nullptr) {
-          e_usage(StrFormat("got invalid flag %r", str_concat(str146, ch)), arg_r->Location());
+          e_usage(StrFormat("got invalid flag %r", str_concat(str145, ch)), arg_r->Location());
         }
         attached_arg = list_contains(spec->plus_flags, ch) ? char0 : nullptr;
         quit = action->OnMatch(attached_arg, arg_r, out);
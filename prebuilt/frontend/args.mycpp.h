@@ -143,24 +143,30 @@ class AnsiOutput : public ColorOutput {
 };
 
 extern int INDENT;
+Str* _ExternalStr(hnode::External* node);
 class _PrettyPrinter {
  public:
   _PrettyPrinter(int max_col);
-  bool _PrintWrappedArray(List<hnode_asdl::hnode_t*>* array, int prefix_len, format::ColorOutput* f, int indent);
-  bool _PrintWholeArray(List<hnode_asdl::hnode_t*>* array, int prefix_len, format::ColorOutput* f, int indent);
-  void _PrintRecord(hnode::Record* node, format::ColorOutput* f, int indent);
-  void PrintNode(hnode_asdl::hnode_t* node, format::ColorOutput* f, int indent);
+  int _Measure(hnode_asdl::hnode_t* node);
+  bool _Fits(int i, int max_chars);
+  void _PrintSingleLine(hnode_asdl::hnode_t* node, int i, format::ColorOutput* f);
+  bool _PrintWrappedArray(List<hnode_asdl::hnode_t*>* array, int first, int prefix_len, format::ColorOutput* f, int indent);
+  bool _PrintWholeArray(List<hnode_asdl::hnode_t*>* array, int first, int prefix_len, format::ColorOutput* f);
+  void _PrintRecord(hnode::Record* node, int i, format::ColorOutput* f, int indent);
+  void PrintNode(hnode_asdl::hnode_t* node, int i, format::ColorOutput* f, int indent);
+  List<int>* widths;
+  List<int>* fit_widths;
+  List<int>* sizes;
+  List<Str*>* texts;
   int max_col;
 
   static constexpr ObjHeader obj_header() {
-    return ObjHeader::ClassScanned(0, sizeof(_PrettyPrinter));
+    return ObjHeader::ClassScanned(4, sizeof(_PrettyPrinter));
   }
 
   DISALLOW_COPY_AND_ASSIGN(_PrettyPrinter)
 };
 
-bool _TrySingleLineObj(hnode::Record* node, format::ColorOutput* f, int max_chars);
-bool _TrySingleLine(hnode_asdl::hnode_t* node, format::ColorOutput* f, int max_chars);
 void PrintTree(hnode_asdl::hnode_t* node, format::ColorOutput* f);
 
 
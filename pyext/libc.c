@@ -55,8 +55,9 @@ static PyObject *
 func_fnmatch(PyObject *self, PyObject *args) {
   const char *pattern;
   const char *str;
+  int extglob = 1;
 
-  if (!PyArg_ParseTuple(args, "ss", &pattern, &str)) {
+  if (!PyArg_ParseTuple(args, "ss|i", &pattern, &str, &extglob)) {
     return NULL;
   }
 
@@ -67,7 +68,9 @@ func_fnmatch(PyObject *self, PyObject *args) {
   // musl libc (or OS X).  Instead we should compile extended globs to extended
   // regex syntax.
 #ifdef __GLIBC__
-  flags |= FNM_EXTMATCH;
+  if (extglob) {
+    flags |= FNM_EXTMATCH;
+  }
 #else
   debug("Warning: FNM_EXTMATCH is not defined");
 #endif
@@ -370,7 +373,8 @@ static PyMethodDef methods[] = {
   // an error.
   {"realpath", func_realpath, METH_VARARGS, ""},
 
-  // Return whether a string matches a pattern."
+  // Return whether a string matches a pattern.  The optional third arg
+  // turns off extended glob syntax, for matching file names like glob().
   {"fnmatch", func_fnmatch, METH_VARARGS, ""},
 
   // Return a list of files that match a pattern.
@@ -170,6 +170,12 @@ class LibcTest(unittest.TestCase):
           "Matching %s against %s: got %s but expected %s" %
           (pat, s, actual, expected))
 
+  def testFnmatchNoExtglob(self):
+    # ( and | are literals, like glob()
+    self.assertEqual(0, libc.fnmatch('*(foo|bar).py', 'foo.py', False))
+    self.assertEqual(1, libc.fnmatch('*(foo|bar).py', '(foo|bar).py', False))
+    self.assertEqual(1, libc.fnmatch('*.py', 'foo.py', False))
+
   def testGlob(self):
     print(libc.glob('*.py'))
 
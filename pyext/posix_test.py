@@ -28,6 +28,7 @@ Other notes:
 """
 from __future__ import print_function
 
+import errno
 import signal
 import subprocess
 import unittest
@@ -47,6 +48,7 @@ FUNCS = [
     "readlink",
     "stat",
     "umask",
+    "unlink",
     "uname",
     "_exit",
     "execv",
@@ -56,9 +58,11 @@ FUNCS = [
     "getpid",
     "getuid",
     "wait",
+    "wait4",
     "open",
     "close",
     "dup2",
+    "lseek",
     "read",
     "write",
     "fdopen",
@@ -81,6 +85,8 @@ FUNCS = [
     'O_RDWR',
     'O_TRUNC',
     'O_WRONLY',
+    'SEEK_CUR',
+    'SEEK_SET',
 ]
 
 class PosixTest(unittest.TestCase):
@@ -101,6 +107,26 @@ class PosixTest(unittest.TestCase):
     posix_.read(0, 0)
     posix_.write(1, '')
 
+  def testLseek(self):
+    fd = posix_.open('pyext/posix_test.py', posix_.O_RDONLY, 0)
+    try:
+      self.assertEqual(0, posix_.lseek(fd, 0, posix_.SEEK_CUR))
+      posix_.read(fd, 10)
+      self.assertEqual(6, posix_.lseek(fd, -4, posix_.SEEK_CUR))
+      self.assertEqual(2, posix_.lseek(fd, 2, posix_.SEEK_SET))
+    finally:
+      posix_.close(fd)
+
+    r, w = posix_.pipe()
+    try:
+      posix_.lseek(r, 0, posix_.SEEK_CUR)
+    except OSError as e:
+      self.assertEqual(errno.ESPIPE, e.errno)
+    else:
+      self.fail('Expected ESPIPE')
+    posix_.close(r)
+    posix_.close(w)
+
   def testRead(self):
     if posix_.environ.get('EINTR_TEST'):
       # Now we can do kill -TERM PID can get EINTR.
@@ -132,6 +158,17 @@ class PosixTest(unittest.TestCase):
       log('Hanging on waitpid in pid %d', posix_.getpid())
       posix_.waitpid(-1, 0)
 
+  def testWait4(self):
+    pid = posix_.fork()
+    if pid == 0:
+      posix_._exit(42)
+
+    wait_pid, status, ru = posix_.wait4(-1, 0)
+    self.assertEqual(pid, wait_pid)
+    self.assertEqual(42, posix_.WEXITSTATUS(status))
+    self.assert_(ru.ru_utime >= 0.0, ru)
+    self.assert_(ru.ru_maxrss > 0, ru)
+
   def testWrite(self):
     if posix_.environ.get('EINTR_TEST'):
 
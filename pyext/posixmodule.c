@@ -2034,6 +2034,30 @@ posix_dup2(PyObject *self, PyObject *args)
 }
 
 
+PyDoc_STRVAR_remove(posix_lseek__doc__,
+"lseek(fd, pos, how) -> newpos\n\n\
+Set the current position of a file descriptor.");
+
+static PyObject *
+posix_lseek(PyObject *self, PyObject *args)
+{
+    int fd, how;
+    long pos;
+    off_t res;
+    // Simplified from CPython: long offsets only, no SEEK_* translation
+    if (!PyArg_ParseTuple(args, "ili:lseek", &fd, &pos, &how))
+        return NULL;
+    if (!_PyVerify_fd(fd))
+        return posix_error();
+    Py_BEGIN_ALLOW_THREADS
+    res = lseek(fd, (off_t)pos, how);
+    Py_END_ALLOW_THREADS
+    if (res < 0)
+        return posix_error();
+    return PyInt_FromLong((long)res);
+}
+
+
 PyDoc_STRVAR_remove(posix_read__doc__,
 "read(fd, buffersize) -> string\n\n\
 Read a file descriptor.");
@@ -2589,6 +2613,12 @@ all_ins(PyObject *d)
 #ifdef WUNTRACED
     if (ins(d, "WUNTRACED", (long)WUNTRACED)) return -1;
 #endif
+#ifdef SEEK_SET
+    if (ins(d, "SEEK_SET", (long)SEEK_SET)) return -1;
+#endif
+#ifdef SEEK_CUR
+    if (ins(d, "SEEK_CUR", (long)SEEK_CUR)) return -1;
+#endif
 #ifdef O_RDONLY
     if (ins(d, "O_RDONLY", (long)O_RDONLY)) return -1;
 #endif
@@ -17,6 +17,16 @@ def exists(path):
     return True
 
 
+def lexists(path):
+    # type: (str) -> bool
+    """Test whether a path exists.  Returns True for broken symbolic links"""
+    try:
+        posix.lstat(path)
+    except posix.error:
+        return False
+    return True
+
+
 def isdir(s):
     # type: (str) -> bool
     """Return true if the pathname refers to an existing directory."""
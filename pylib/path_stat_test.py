@@ -15,6 +15,10 @@ class PathStatTest(unittest.TestCase):
     self.assertEqual(True, path_stat.exists('/'))
     self.assertEqual(False, path_stat.exists('/nonexistent__ZZZZ'))
 
+  def testLexists(self):
+    self.assertEqual(True, path_stat.lexists('/'))
+    self.assertEqual(False, path_stat.lexists('/nonexistent__ZZZZ'))
+
   def testIsDir(self):
     self.assertEqual(True, path_stat.exists('/'))
     self.assertEqual(False, path_stat.exists('/nonexistent__ZZZZ'))
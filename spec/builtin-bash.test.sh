@@ -333,6 +333,122 @@ n=3
 ## END
 ## N-I dash/mksh/zsh/ash stdout-json: ""
 
+#### mapfile -n leaves the rest of a file for the next reader
+type mapfile >/dev/null 2>&1 || exit 0
+seq 5 > $TMP/mapfile.txt
+arr=(x y z)
+{ mapfile -t -n 2 arr; cat; } < $TMP/mapfile.txt
+echo "n=${#arr[@]}" "${arr[@]}"
+## STDOUT:
+3
+4
+5
+n=2 1 2
+## END
+## N-I dash/mksh/zsh/ash STDOUT:
+## END
+
+#### mapfile -n leaves the rest of a pipe for the next reader
+type mapfile >/dev/null 2>&1 || exit 0
+seq 5 | {
+  mapfile -t -n 2 arr
+  cat
+  echo "${arr[@]}"
+}
+## STDOUT:
+3
+4
+5
+1 2
+## END
+## N-I dash/mksh/zsh/ash STDOUT:
+## END
+
+#### mapfile -C callback -c quantum
+type mapfile >/dev/null 2>&1 || exit 0
+cb() {
+  echo "cb $1 [$2] n=${#arr[@]}"
+}
+seq 5 | {
+  mapfile -t -C cb -c 2 arr
+  echo "${arr[@]}"
+}
+## STDOUT:
+cb 1 [2] n=1
+cb 3 [4] n=3
+1 2 3 4 5
+## END
+## N-I dash/mksh/zsh/ash STDOUT:
+## END
+
+#### mapfile -C quotes the line, and -O sets the index
+type mapfile >/dev/null 2>&1 || exit 0
+printf '%s\n' "it's" 'a  b' '$x' | {
+  mapfile -t -C 'echo cb' -c 1 -O 5 arr
+  echo "${!arr[@]}"
+}
+## STDOUT:
+cb 5 it's
+cb 6 a  b
+cb 7 $x
+5 6 7
+## END
+## N-I dash/mksh/zsh/ash STDOUT:
+## END
+
+#### mapfile -C with a file, and -s
+type mapfile >/dev/null 2>&1 || exit 0
+seq 10 > $TMP/mapfile.txt
+cb() {
+  read -r next
+  echo "cb $1 [$2] next=$next"
+}
+mapfile -t -s 2 -C cb -c 3 arr < $TMP/mapfile.txt
+echo "${arr[@]}"
+## STDOUT:
+cb 2 [5] next=6
+cb 5 [9] next=10
+3 4 5 7 8 9
+## END
+## N-I dash/mksh/zsh/ash STDOUT:
+## END
+
+#### mapfile -C callback that clears the array
+type mapfile >/dev/null 2>&1 || exit 0
+cb() {
+  echo "cb $1 batch=${arr[*]}"
+  arr=()
+}
+seq 7 | {
+  mapfile -t -C cb -c 3 arr
+  echo "rest=${arr[*]} indices=${!arr[*]}"
+}
+## STDOUT:
+cb 2 batch=1 2
+cb 5 batch=3 4 5
+rest=6 7 indices=0 1
+## END
+## OK bash STDOUT:
+cb 2 batch=1 2
+cb 5 batch=3 4 5
+rest=6 7 indices=5 6
+## END
+## N-I dash/mksh/zsh/ash STDOUT:
+## END
+
+#### mapfile -c 0 is an error
+type mapfile >/dev/null 2>&1 || exit 0
+mapfile -c 0 arr < /dev/null
+echo status=$?
+## STDOUT:
+status=2
+## END
+## OK bash STDOUT:
+status=1
+## END
+## N-I dash/mksh/zsh/ash STDOUT:
+## END
+
 #### mapfile / readarray stdin  TODO: Fix me.
 shopt -s lastpipe  # for bash
 
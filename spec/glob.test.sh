@@ -395,3 +395,102 @@ other
 other
 other
 ## END
+
+#### shopt -s globstar
+mkdir -p $TMP/globstar/d/a/b $TMP/globstar/d/.hidden
+cd $TMP/globstar
+touch d/f.c d/a/g.c d/a/b/h.c d/.hidden/i.c top.c
+
+echo **/*.c
+echo d/**/*.c
+shopt -s globstar
+echo **/*.c
+echo d/**/*.c
+echo **/
+echo **/b
+## STDOUT:
+d/f.c
+d/a/g.c
+d/a/b/h.c d/a/g.c d/f.c top.c
+d/a/b/h.c d/a/g.c d/f.c
+d/ d/a/ d/a/b/
+d/a/b
+## END
+## N-I dash/mksh/ash STDOUT:
+d/f.c
+d/a/g.c
+d/f.c
+d/a/g.c
+d/
+**/b
+## END
+
+#### globstar with trailing ** lists files and dirs
+mkdir -p $TMP/globstar2/d/a
+cd $TMP/globstar2
+touch d/f d/a/g
+
+shopt -s globstar
+echo d/**
+## STDOUT:
+d/ d/a d/a/g d/f
+## END
+## N-I dash/mksh/ash STDOUT:
+d/a d/f
+## END
+
+#### Glob in a loop sees files created in the loop
+rm -rf $TMP/glob-loop
+mkdir -p $TMP/glob-loop
+cd $TMP/glob-loop
+for i in 1 2 3; do
+  touch f$i
+  echo f*
+done
+## STDOUT:
+f1
+f1 f2
+f1 f2 f3
+## END
+
+#### Glob keeps a run of slashes before the first glob operator
+mkdir -p $TMP/slashes/d/a
+cd $TMP/slashes
+touch d/x.c d/a/y.c
+echo d//*.c
+echo d///a/*.c
+echo d*//x.c
+echo d//[a]//y.c
+## STDOUT:
+d//x.c
+d///a/y.c
+d/x.c
+d//a/y.c
+## END
+## OK dash STDOUT:
+d//x.c
+d///a/y.c
+d//x.c
+d//a//y.c
+## END
+
+#### Glob with a trailing slash
+mkdir -p $TMP/trailing/d/a/b
+cd $TMP/trailing
+touch d/x.c
+echo d*/
+echo d*//
+echo d//*/
+echo d/a//*//
+## STDOUT:
+d/
+d/
+d//a/
+d/a//b/
+## END
+## OK dash STDOUT:
+d/
+d//
+d//a/
+d/a//b//
+## END
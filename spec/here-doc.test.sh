@@ -368,3 +368,24 @@ EOF5
 5: fd5
 ## END
 
+
+#### Here doc and here string bigger than a pipe buffer
+big=$(printf '%010000d' 0)
+cat <<EOF | wc -c
+$big
+EOF
+wc -c <<< "$big$big"
+{ read -r x; read -r y; } <<EOF
+$big
+second
+EOF
+echo ${#x} $y
+## STDOUT:
+10001
+20001
+10000 second
+## END
+## N-I dash status: 2
+## N-I dash STDOUT:
+10001
+## END
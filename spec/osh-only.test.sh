@@ -68,6 +68,80 @@ crash status=1
 found crash dump
 ## END
 
+#### OILS_PROFILE writes collapsed stacks
+
+cat >$TMP/profiled.sh <<'EOF'
+f() {
+  true
+  sleep 0
+}
+f
+EOF
+
+OILS_PROFILE=$TMP/profile.txt $SH $TMP/profiled.sh
+echo status=$?
+
+# Strip the counts and the directory
+sed -e 's/ [0-9]*$//' -e "s|$TMP/||g" $TMP/profile.txt
+
+## STDOUT:
+status=0
+osh
+osh;profiled.sh:5
+osh;profiled.sh:5;f
+osh;profiled.sh:5;f;profiled.sh:2
+osh;profiled.sh:5;f;profiled.sh:3
+osh;profiled.sh:5;f;profiled.sh:3;sleep
+osh;profiled.sh:5;f;profiled.sh:3;sleep;exec
+osh;profiled.sh:5;f;profiled.sh:3;sleep;fork
+osh;profiled.sh:5;f;profiled.sh:3;sleep;wait
+## END
+
+#### OILS_PROCESS_LOG writes a row per process
+
+cat >$TMP/logged.sh <<'EOF'
+sleep 0
+( exit 3 )
+echo hi | cat >/dev/null
+EOF
+
+OILS_PROCESS_LOG=$TMP/processes.tsv $SH $TMP/logged.sh
+echo status=$?
+
+# Keep the status and command columns.  echo runs in the shell process, so it
+# has no row.
+cut -f 2,7 $TMP/processes.tsv
+
+## STDOUT:
+status=0
+status	command
+0	[process] sleep 0
+3	[subprog] command.ControlFlow
+0	[process] cat
+## END
+
+#### $_process_stats has a row for each process of the last command
+
+sleep 0
+argv.py "${#_process_stats[@]}"
+
+set -- $_process_stats
+argv.py "$#" "$2"
+
+( exit 3 ) | sleep 0 | cat
+rows=( "${_process_stats[@]}" )
+argv.py "${#rows[@]}"
+
+read pid status rest <<< "${rows[0]}"
+argv.py "$status"
+
+## STDOUT:
+['1']
+['6', '0']
+['3']
+['3']
+## END
+
 # NOTE: strict_arith has one case in arith.test.sh), strict_word-eval has a case in var-op-other.
 
 
@@ -195,3 +195,61 @@ ls /dev/null | eval 'cat | cat' | wc -l
 ## STDOUT:
 1
 ## END
+
+#### Builtin first part: PIPESTATUS and $?
+false
+echo "status=$?" | cat
+true | false | cat
+echo ${PIPESTATUS[@]}
+false | true
+echo ${PIPESTATUS[@]}
+## STDOUT:
+status=1
+0 1 0
+1 0
+## END
+## N-I dash/zsh STDOUT:
+status=1
+## END
+## N-I dash/zsh status: 2
+
+#### Builtin first part with big output
+printf '%s\n' {1..3000} | wc -l
+echo "$(printf '%0100d' 0)" | wc -c
+## STDOUT:
+3000
+101
+## END
+## N-I dash STDOUT:
+1
+101
+## END
+
+#### Function that shadows a builtin in first part
+echo() { printf 'func %s\n' "$@"; }
+echo a | cat
+## STDOUT:
+func a
+## END
+
+#### Undefined variable in first part
+set -u
+echo "$undef" | cat
+echo status=$?
+## STDOUT:
+status=0
+## END
+
+#### ERR trap doesn't change the shell in first part
+trap 'echo ERR; x=set' ERR
+false | wc -l
+echo "x=$x"
+n=0
+trap 'n=$((n+1))' ERR
+false | cat
+echo n=$n
+## STDOUT:
+0
+x=
+n=0
+## END
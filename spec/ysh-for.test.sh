@@ -26,10 +26,10 @@ key age
 ## END
 
 
-#### For loop over expression: range (low priority)
+#### For loop over expression: range
 var myrange = 0:3
 for i in (myrange) {
-  echo "i $key"
+  echo "i $i"
 }
 
 ## STDOUT:
@@ -171,3 +171,51 @@ for i, file in *.py {README,foo}.md {
 2 README.md
 3 foo.md
 ## END
+
+#### Iterate over a range
+for i in (1:4) {
+  echo $i
+}
+echo ---
+var r = 0:2
+for i, x in (r) {
+  echo "$i $x"
+}
+## STDOUT:
+1
+2
+3
+---
+0 0
+1 1
+## END
+
+#### Range loop with break and continue
+for x in (0:1000000) {
+  if (x === 1) {
+    continue
+  }
+  if (x > 3) {
+    break
+  }
+  echo $x
+}
+## STDOUT:
+0
+2
+3
+## END
+
+#### Loop variables keep their types
+for i, x in ([1, 'two', true]) {
+  = i
+  = x
+}
+## STDOUT:
+(Int)   0
+(Int)   1
+(Int)   1
+(Str)   'two'
+(Int)   2
+(Bool)   True
+## END
@@ -405,17 +405,12 @@ sed --regexp-extended 's/[[:digit:]]{2,}/12345/g' err.txt >&2
 ## END
 ## STDERR:
 . builtin ':' begin
-| here doc 12345
 | command 12345: tac
 ; process 12345: status 0
-; process 12345: status 0
 . builtin set '+x'
 ## END
 
 #### Two here docs
-
-# BUG: This trace shows an extra process?
-
 shopt --set oil:upgrade
 shopt --unset errexit
 set -x
@@ -439,12 +434,8 @@ yy
 zz
 ## END
 ## STDERR:
-| here doc 12345
-| here doc 12345
 | command 12345: cat - '/dev/fd/3'
 ; process 12345: status 0
-; process 12345: status 0
-; process 12345: status 0
 . builtin set '+x'
 ## END
 
@@ -53,11 +53,13 @@ import cgi
 import cStringIO
 import errno
 import json
+import multiprocessing
 import optparse
 import os
 import pprint
 import re
 import shutil
+import signal
 import subprocess
 import sys
 import time
@@ -567,9 +569,61 @@ class Stats(object):
 
 PIPE = subprocess.PIPE
 
+def _RunShell(job):
+  """Run one (case, shell) pair.  Called in a worker process with --jobs."""
+  argv, case_env, case_tmp_dir, code = job
+
+  try:
+    p = subprocess.Popen(argv, env=case_env, cwd=case_tmp_dir,
+                         stdin=PIPE, stdout=PIPE, stderr=PIPE)
+  except OSError as e:
+    # Return the error rather than raising it, so it's reported the same way
+    # with and without --jobs
+    return {'error': 'Error running %r: %s' % (argv, e)}
+
+  # communicate() avoids deadlock when a shell fills the stderr pipe while
+  # we're blocked reading stdout
+  stdout, stderr = p.communicate(code)
+
+  actual = {}
+  actual['stdout'] = stdout
+  actual['stderr'] = stderr
+  actual['status'] = p.returncode
+  return actual
+
+
+def _InitWorker():
+  # Let the parent handle Ctrl-C and terminate the pool
+  signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _RunJobs(jobs, num_jobs):
+  """Yield the result of each job, in the same order as 'jobs'."""
+  if num_jobs <= 1:
+    for job in jobs:
+      yield _RunShell(job)
+    return
+
+  pool = multiprocessing.Pool(num_jobs, _InitWorker)
+  try:
+    # imap() returns results in order, as soon as the earlier ones are done.
+    # Cases vary a lot in running time, so hand them out one at a time.
+    it = pool.imap(_RunShell, jobs, 1)
+    for _ in jobs:
+      # A timeout makes next() interruptible with Ctrl-C in Python 2
+      yield it.next(0x7fffffff)
+    pool.close()
+  finally:
+    pool.terminate()
+    pool.join()
+
+
 def RunCases(cases, case_predicate, shells, env, out, opts):
   """
   Run a list of test 'cases' for all 'shells' and write output to 'out'.
+
+  With --jobs N, the (case, shell) pairs are run concurrently by a pool of N
+  processes.  Results are still checked and written in the original order.
   """
   if opts.trace:
     for _, sh in shells:
@@ -607,9 +661,11 @@ def RunCases(cases, case_predicate, shells, env, out, opts):
   except OSError:
     pass
 
-  # Now run each case, and print a table.
+  # First decide which cases to run, and make the argv and environment for
+  # each (case, shell) pair.
+  to_run = []  # list of (i, case)
+  jobs = []
   for i, case in enumerate(cases):
-    line_num = case['line_num']
     desc = case['desc']
     code = case['code']
 
@@ -627,11 +683,9 @@ def RunCases(cases, case_predicate, shells, env, out, opts):
       continue
 
     stats.Inc('num_cases_run')
-
-    result_row = []
+    to_run.append((i, case))
 
     for shell_index, (sh_label, sh_path) in enumerate(shells):
-      timeout_file = os.path.join(timeout_dir, '%02d-%s' % (i, sh_label))
       if opts.timeout:
         if opts.timeout_bin:
           # This is what smoosh itself uses.  See smoosh/tests/shell_tests.sh
@@ -664,7 +718,8 @@ def RunCases(cases, case_predicate, shells, env, out, opts):
       if opts.trace:
         log('\t%s', ' '.join(argv))
 
-      case_env = sh_env[shell_index]
+      # Copy, because jobs may run concurrently
+      case_env = dict(sh_env[shell_index])
 
       # Unique dir for every test case and shell
       tmp_base = os.path.normpath(opts.tmp_env)  # no . or ..
@@ -686,27 +741,25 @@ def RunCases(cases, case_predicate, shells, env, out, opts):
       case_env['TMP'] = case_tmp_dir
 
       if opts.pyann_out_dir:
-        case_env = dict(case_env)
         case_env['PYANN_OUT'] = os.path.join(opts.pyann_out_dir, '%d.json' % i)
 
-      try:
-        p = subprocess.Popen(argv, env=case_env, cwd=case_tmp_dir,
-                             stdin=PIPE, stdout=PIPE, stderr=PIPE)
-      except OSError as e:
-        print('Error running %r: %s' % (sh_path, e), file=sys.stderr)
-        sys.exit(1)
+      jobs.append((argv, case_env, case_tmp_dir, code))
 
-      p.stdin.write(code)
-      p.stdin.close()
+  # Now check each result, and print a table.
+  results = _RunJobs(jobs, opts.jobs)
+  for i, case in to_run:
+    line_num = case['line_num']
+    desc = case['desc']
 
-      actual = {}
-      actual['stdout'] = p.stdout.read()
-      actual['stderr'] = p.stderr.read()
-      p.stdout.close()
-      p.stderr.close()
+    result_row = []
 
-      actual['status'] = p.wait()
+    for shell_index, (sh_label, sh_path) in enumerate(shells):
+      actual = next(results)
+      if 'error' in actual:
+        print(actual['error'], file=sys.stderr)
+        sys.exit(1)
 
+      timeout_file = os.path.join(timeout_dir, '%02d-%s' % (i, sh_label))
       if opts.timeout_bin and os.path.exists(timeout_file):
         cell_result = Result.TIMEOUT
       elif not opts.timeout_bin and actual['status'] == 124:
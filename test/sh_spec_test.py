@@ -136,6 +136,30 @@ class ShSpecTest(unittest.TestCase):
     RunCases([self.CASE1], lambda i, case: True, shells, env, out, opts)
     print(repr(out.f.getvalue()))
 
+  def testRunCasesJobs(self):
+    this_dir = os.path.dirname(os.path.abspath(sys.argv[0]))
+    repo_root = os.path.dirname(this_dir)
+
+    shells = [('bash', '/bin/bash'), ('dash', '/bin/sh')]
+    cases = [self.CASE1, self.CASE2, self.CASE1]
+
+    # The same table and stats, whether or not cases run concurrently
+    tables = []
+    for jobs in ['1', '3']:
+      o = optparse.OptionParser()
+      spec_lib.DefineCommon(o)
+      spec_lib.DefineShSpec(o)
+      opts, _ = o.parse_args(
+          ['--tmp-env', os.path.join(repo_root, '_tmp'), '--jobs', jobs])
+
+      out = AnsiOutput(cStringIO.StringIO(), False)
+      stats = RunCases(cases, lambda i, case: True, shells, {}, out, opts)
+      tables.append((out.f.getvalue(), stats.tsv_rows))
+
+    print(repr(tables[1][0]))
+    self.assertEqual(tables[0], tables[1])
+    self.assertEqual(6, len(tables[1][1]))
+
   def testMakeShellPairs(self):
     pairs = spec_lib.MakeShellPairs(['bin/osh', '_bin/osh'])
     print(pairs)
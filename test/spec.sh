@@ -307,7 +307,7 @@ builtin-trap-bash() {
 # Bash implements type -t, but no other shell does.  For Nix.
 # zsh/mksh/dash don't have the 'help' builtin.
 builtin-bash() {
-  sh-spec spec/builtin-bash.test.sh --oils-failures-allowed 4 \
+  sh-spec spec/builtin-bash.test.sh \
     $BASH $OSH_LIST "$@"
 }
 
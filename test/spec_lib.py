@@ -193,6 +193,10 @@ def DefineShSpec(p):
       '--timeout-bin', dest='timeout_bin', default=None,
       help="Use the smoosh timeout binary at this location.")
 
+  p.add_option(
+      '-j', '--jobs', dest='jobs', type='int', default=1,
+      help='Run this many (case, shell) pairs at once')
+
   p.add_option(
       '--posix', dest='posix', default=False, action='store_true',
       help='Pass -o posix to the shell (when applicable)')
@@ -23,8 +23,8 @@ def _basename(v):
 	return os.path.basename(v.path)
 
 pathAccMap = {
-	asdl.pathAccessor_e.FullPath.enum_id : _path,
-	asdl.pathAccessor_e.Filename.enum_id : _basename,
+	asdl.pathAccessor_e.FullPath : _path,
+	asdl.pathAccessor_e.Filename : _basename,
 }
 
 def _accessTime(v):
@@ -59,19 +59,19 @@ def _size(v):
 	return stat.ST_SIZE(v.stat.st_mode)
 
 statAccMap = {
-	asdl.statAccessor_e.AccessTime.enum_id		: _accessTime,
-	asdl.statAccessor_e.CreationTime.enum_id	: _creationTime,
-	asdl.statAccessor_e.ModificationTime.enum_id	: _modificationTime,
-	asdl.statAccessor_e.Filesystem.enum_id	: _filesystem,
-	asdl.statAccessor_e.Inode.enum_id		: _inode,
-#	asdl.statAccessor_e.LinkCount.enum_id	: _linkCount,
-	asdl.statAccessor_e.Mode.enum_id		: _mode,
-	asdl.statAccessor_e.Filetype.enum_id	: _filetype,
-	asdl.statAccessor_e.Uid.enum_id		: _uid,
-	asdl.statAccessor_e.Gid.enum_id		: _gid,
-	asdl.statAccessor_e.Username.enum_id	: _username,
-	asdl.statAccessor_e.Groupname.enum_id	: _groupname,
-	asdl.statAccessor_e.Size.enum_id		: _size,
+	asdl.statAccessor_e.AccessTime		: _accessTime,
+	asdl.statAccessor_e.CreationTime	: _creationTime,
+	asdl.statAccessor_e.ModificationTime	: _modificationTime,
+	asdl.statAccessor_e.Filesystem	: _filesystem,
+	asdl.statAccessor_e.Inode		: _inode,
+#	asdl.statAccessor_e.LinkCount	: _linkCount,
+	asdl.statAccessor_e.Mode		: _mode,
+	asdl.statAccessor_e.Filetype	: _filetype,
+	asdl.statAccessor_e.Uid		: _uid,
+	asdl.statAccessor_e.Gid		: _gid,
+	asdl.statAccessor_e.Username	: _username,
+	asdl.statAccessor_e.Groupname	: _groupname,
+	asdl.statAccessor_e.Size		: _size,
 }
 
 def _stringMatch(acc, test):
@@ -124,11 +124,11 @@ def _negation(test):
 	return lambda x: not EvalExpr(test.expr)(x)
 def _pathTest(test):
 	pred = predicateMap[test.p.tag]
-	acc = pathAccMap[test.a.enum_id]
+	acc = pathAccMap[test.a]
 	return pred(acc, test)
 def _statTest(test):
 	pred = predicateMap[test.p.tag]
-	acc = statAccMap[test.a.enum_id]
+	acc = statAccMap[test.a]
 	return pred(acc, test)
 def _delete(_):
 	def __delete(v):
@@ -149,7 +149,7 @@ def _print(action):
 	# TODO handle output-file
 	# TODO handle format
 	def __print(v):
-		print(v.path)
+		v.output(v.path)
 		return True
 	return __print
 def _ls(action):
@@ -179,11 +179,18 @@ def EvalExpr(ast):
 	return exprMap[ast.tag](ast)
 
 class Thing:
-	def __init__(self, path, stat=None):
+	def __init__(self, path, stat=None, out=None):
 		self.path = path
 		self._stat = stat
 		self.prune = False
 		self.quit = False
+		# If not None, a list that buffers output lines, e.g. for ParallelWalk
+		self.out = out
+	def output(self, line):
+		if self.out is None:
+			print(line)
+		else:
+			self.out.append(line)
 	@property
 	def stat(self):
 		if self._stat is None:
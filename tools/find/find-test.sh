@@ -45,6 +45,9 @@ setup_testdir() (
 	done
 )
 
+# e.g. FIND_PY_OPTS='-parallel 4' to test the parallel walker
+FIND_PY_OPTS=${FIND_PY_OPTS:-}
+
 testdir="_tmp/find-testdir"
 test -d "$testdir" || setup_testdir "$testdir"
 
@@ -61,7 +64,7 @@ do
 	stdout="_tmp/$(basename "$test")_stdout"
 	stderr="_tmp/$(basename "$test")_stderr"
 	eval find "$(realpath "$testdir")" $(cat "$test") 2>/dev/null | sort >"${stdout}_expected" &
-	eval find_py "$(realpath "$testdir")" $(cat "$test") 2>"$stderr"| sort >"${stdout}_actual"
+	eval find_py "$(realpath "$testdir")" $FIND_PY_OPTS $(cat "$test") 2>"$stderr"| sort >"${stdout}_actual"
 	rc_actual=$?
 	wait %1
 	rc_expected=$?
@@ -11,7 +11,6 @@ find.py: Clone of GNU find.
 
 from __future__ import print_function
 
-import os
 import sys
 
 #from typing import TYPE_CHECKING, Dict, IO
@@ -22,8 +21,9 @@ import tokenizer
 import parser
 from _devbuild.gen import find_nt
 from ast import AST
-from eval import EvalExpr, Thing
+from eval import EvalExpr
 import eval
+import walk
 
 def printTree(pnode, nametable, f=sys.stderr, indentChars="\t"):
 	def _printTree(pnode, nametable, f, i, depth, indentChars):
@@ -63,6 +63,19 @@ def main(argv):
 	if not paths:
 		paths.append('.')
 
+	# -parallel N is a global option, so it has to come before the expression.
+	num_workers = 0
+	if i < len(argv) and argv[i] == '-parallel':
+		if i + 1 >= len(argv):
+			raise RuntimeError('-parallel requires an argument')
+		try:
+			num_workers = int(argv[i+1])
+		except ValueError:
+			raise RuntimeError('-parallel: invalid number %r' % argv[i+1])
+		if num_workers < 1:
+			raise RuntimeError('-parallel: expected a positive number, got %d' % num_workers)
+		i += 2
+
 	tokens = tokenizer.tokenize(argv[i:])
 
 	parse_root = parser.ParseTree(tokens)
@@ -88,23 +101,10 @@ def main(argv):
 			ast_root = asdl.expr.Conjunction([ast_root, asdl.expr.PrintAction()])
 
 	expr = EvalExpr(ast_root)
-	for path in paths:
-		for root, dirs, files in os.walk(path):
-			t = Thing(root)
-			b = expr(t)
-			if t.quit:
-				break
-			if t.prune:
-				del dirs[:]
-				continue
-			for fname in files:
-				t = Thing(os.path.join(root,fname))
-				expr(t)
-				# -prune should be ignored for files
-		else:
-			continue
-		# TODO run -exec ... {} +
-		break
+	if num_workers:
+		walk.ParallelWalk(expr, num_workers).Run(paths)
+	else:
+		walk.SerialWalk(paths, expr)
 
 if __name__ == '__main__':
 	try:
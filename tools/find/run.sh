@@ -19,7 +19,12 @@ find-demo() {
     $REPO_ROOT/tools/find/find.py tools "$@"
 }
 
+walk-test() {
+  PYTHONPATH="$REPO_ROOT:$REPO_ROOT/vendor" $REPO_ROOT/tools/find/walk_test.py
+}
+
 unit-tests() {
+  walk-test
 
   find-demo -true
   find-demo -false -o -true
@@ -49,6 +54,11 @@ unit-tests() {
   find-demo -type f -a -name '*.py'
 
   find-demo '!' -name '*.py'
+
+  # walk subtrees with a pool of threads
+  find-demo -parallel 4 -name '*.py'
+  find-demo -parallel 4 -name 'find' -a -prune -o -print
+  find-demo -parallel 4 -name '*.py' -a -quit
 }
 
 "$@"
@@ -0,0 +1,174 @@
+# Copyright 2019 Wilke Schwiedop. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+"""
+walk.py: directory traversal for find.
+
+SerialWalk is the original os.walk() loop.  ParallelWalk hands each directory
+to a bounded pool of threads, which list it and evaluate the expression on its
+entries.  Traversal on large trees and network filesystems is bound by
+metadata latency, and the GIL is released during those syscalls.
+
+Output of the workers is buffered per directory, and the main thread writes it
+in the same depth-first order as SerialWalk.  So -quit stops output at the
+same place, and work done speculatively past that point is discarded.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import threading
+
+import Queue
+
+from eval import Thing
+
+
+def SerialWalk(paths, expr):
+	for path in paths:
+		for root, dirs, files in os.walk(path):
+			t = Thing(root)
+			expr(t)
+			if t.quit:
+				break
+			if t.prune:
+				del dirs[:]
+				continue
+			for fname in files:
+				t = Thing(os.path.join(root,fname))
+				expr(t)
+				# -prune should be ignored for files
+				if t.quit:
+					break
+			else:
+				continue
+			break
+		else:
+			continue
+		# TODO run -exec ... {} +
+		break
+
+
+class _DirTask(object):
+	"""One directory to be listed and evaluated by a worker."""
+
+	def __init__(self, path):
+		self.path = path
+		self.out = []		# lines written by actions, in order
+		self.children = []	# _DirTask for each subdirectory to descend into
+		self.quit = False
+		self.done = threading.Event()
+
+
+class ParallelWalk(object):
+	"""Walk directories with a pool of worker threads.
+
+	Args:
+		expr: a function returned by EvalExpr().  It must not share mutable
+			state between calls; all per-file state lives on the Thing.
+		num_workers: size of the thread pool.
+	"""
+
+	def __init__(self, expr, num_workers, f=sys.stdout):
+		self.expr = expr
+		self.num_workers = num_workers
+		self.f = f
+		self.queue = Queue.Queue()
+		self.stop = threading.Event()
+		self.exc_info = None	# the first error raised by a worker
+
+	def _Visit(self, task):
+		# Mirror os.walk(): a directory that can't be listed is not visited at
+		# all, and symlinks to directories are neither evaluated nor followed.
+		try:
+			names = os.listdir(task.path)
+		except os.error:
+			return
+
+		t = Thing(task.path, out=task.out)
+		self.expr(t)
+		if t.quit:
+			task.quit = True
+			return
+		if t.prune:
+			return
+
+		subdirs = []
+		for name in names:
+			if self.stop.is_set():
+				return
+			path = os.path.join(task.path, name)
+			if os.path.isdir(path):
+				if not os.path.islink(path):
+					subdirs.append(path)
+				continue
+			t = Thing(path, out=task.out)
+			self.expr(t)
+			# -prune should be ignored for files
+			if t.quit:
+				task.quit = True
+				return
+
+		for path in subdirs:
+			child = _DirTask(path)
+			task.children.append(child)
+			self.queue.put(child)
+
+	def _Worker(self):
+		while True:
+			task = self.queue.get()
+			if task is None:
+				return
+			try:
+				if not self.stop.is_set():
+					self._Visit(task)
+			except Exception:
+				# Stop the walk, and let Run() raise it in the main thread
+				if self.exc_info is None:
+					self.exc_info = sys.exc_info()
+				self.stop.set()
+			finally:
+				task.done.set()
+
+	def Run(self, paths):
+		threads = []
+		for _ in xrange(self.num_workers):
+			th = threading.Thread(target=self._Worker)
+			th.daemon = True
+			th.start()
+			threads.append(th)
+
+		roots = [_DirTask(path) for path in paths]
+		for task in roots:
+			self.queue.put(task)
+
+		# Consume results in pre-order, which is the order os.walk() yields them.
+		stack = list(reversed(roots))
+		try:
+			while stack:
+				task = stack.pop()
+				# Event.wait() without a timeout can't be interrupted in Python 2
+				while not task.done.wait(1.0):
+					pass
+				if self.exc_info:
+					break
+				for line in task.out:
+					print(line, file=self.f)
+				if task.quit:
+					break
+				stack.extend(reversed(task.children))
+		finally:
+			self.stop.set()
+			for _ in threads:
+				self.queue.put(None)
+
+		for th in threads:
+			th.join()
+
+		if self.exc_info:
+			exc_type, value, tb = self.exc_info
+			raise exc_type, value, tb
@@ -0,0 +1,85 @@
+#!/usr/bin/env python2
+"""
+walk_test.py: Tests for walk.py
+"""
+from __future__ import print_function
+
+import cStringIO
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import walk  # module under test
+
+
+def _PrintPath(t):
+	t.output(t.path)
+
+
+class WalkTest(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp_dir = tempfile.mkdtemp()
+		for d in ['a/b/c', 'a/d', 'e', 'f/g/h/i']:
+			os.makedirs(os.path.join(self.tmp_dir, d))
+		for name in ['x', 'a/y', 'a/b/c/z', 'a/d/w', 'f/g/h/i/v', 'f/u']:
+			open(os.path.join(self.tmp_dir, name), 'w').close()
+
+	def tearDown(self):
+		shutil.rmtree(self.tmp_dir)
+
+	def _SerialLines(self, expr):
+		saved = sys.stdout
+		sys.stdout = cStringIO.StringIO()
+		try:
+			walk.SerialWalk([self.tmp_dir], expr)
+			return sys.stdout.getvalue().splitlines()
+		finally:
+			sys.stdout = saved
+
+	def _ParallelLines(self, expr, num_workers):
+		f = cStringIO.StringIO()
+		walk.ParallelWalk(expr, num_workers, f=f).Run([self.tmp_dir])
+		return f.getvalue().splitlines()
+
+	def testSameOutputAsSerial(self):
+		expected = self._SerialLines(_PrintPath)
+		self.assertEqual(16, len(expected))
+		for num_workers in [1, 2, 4, 8]:
+			self.assertEqual(expected, self._ParallelLines(_PrintPath, num_workers))
+
+	def testPrune(self):
+		def expr(t):
+			if os.path.basename(t.path) == 'b':
+				t.prune = True
+			else:
+				t.output(t.path)
+
+		expected = self._SerialLines(expr)
+		self.assertEqual(13, len(expected))
+		self.assertEqual(expected, self._ParallelLines(expr, 4))
+
+	def testQuit(self):
+		def expr(t):
+			t.output(t.path)
+			if os.path.basename(t.path) == 'd':
+				t.quit = True
+
+		expected = self._SerialLines(expr)
+		self.assertEqual(expected, self._ParallelLines(expr, 4))
+
+	def testWorkerError(self):
+		def expr(t):
+			if os.path.basename(t.path) == 'h':
+				raise ValueError(t.path)
+			t.output(t.path)
+
+		w = walk.ParallelWalk(expr, 4, f=cStringIO.StringIO())
+		# Raised from Run(), instead of hanging or dropping the subtree
+		self.assertRaises(ValueError, w.Run, [self.tmp_dir])
+
+
+if __name__ == '__main__':
+	unittest.main()
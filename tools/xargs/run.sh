@@ -0,0 +1,37 @@
+#!/usr/bin/env bash
+#
+# Usage:
+#   tools/xargs/run.sh <function name>
+
+set -o nounset
+set -o pipefail
+set -o errexit
+
+readonly REPO_ROOT=$(cd $(dirname $0)/../.. && pwd)
+
+readonly XARGS_PY=$REPO_ROOT/tools/xargs/xargs.py
+
+# Throughput of -P with many short commands, compared with GNU xargs.  This
+# measures the overhead of the slot scheduler, not of the commands.
+throughput() {
+  local n=${1:-5000}
+  local procs=${2:-4}
+
+  for xargs in xargs $XARGS_PY; do
+    echo
+    echo "--- $xargs: $n commands, -P $procs ---"
+    time seq $n | $xargs -n 1 -P $procs true
+  done
+
+  echo
+  echo "--- $XARGS_PY: $n commands, -P $procs --group-output ---"
+  time seq $n | $XARGS_PY -n 1 -P $procs --group-output echo > /dev/null
+}
+
+# Check that output of parallel commands isn't interleaved.
+group-output-demo() {
+  seq 8 | $XARGS_PY -n 1 -P 4 --group-output \
+    sh -c 'for i in 1 2 3; do echo "$1.$i"; sleep 0.01; done' ARGV0
+}
+
+"$@"
@@ -10,13 +10,16 @@ from __future__ import print_function
 
 import argparse
 import collections
+import errno
 import itertools
 import os
 # TODO docs.python.org suggests https://pypi.org/project/subprocess32/
 #      for POSIX users
 import shlex
+import shutil
 import subprocess
 import sys
+import tempfile
 
 class GNUXargsQuirks(argparse.Action):
 	def __init__(self, option_strings, dest, **kwargs):
@@ -52,7 +55,8 @@ xargs.add_argument('-L', metavar='max-lines', dest='max_lines', type=int, action
 xargs.add_argument('-l', '--max-lines', metavar='max-lines', nargs='?', const=1, dest='max_lines', type=int, action=GNUXargsQuirks, help='similar to -L but defaults to at most one non-blank input line if MAX-LINES is not specified')
 xargs.add_argument('-n', '--max-args', metavar='max-args', dest='max_args', type=int, action=GNUXargsQuirks, help='use at most MAX-ARGS arguments per command line')
 xargs.add_argument('-s', '--max-chars', metavar='max-chars', dest='max_chars', type=int, action=GNUXargsQuirks, help='limit length of command line to MAX-CHARS')
-xargs.add_argument('-P', '--max-procs', metavar='max-procs', default=1, dest='max_procs', type=int, help='run at most MAX-PROCS processes at a time')
+xargs.add_argument('-P', '--max-procs', metavar='max-procs', default=1, dest='max_procs', type=int, help='run at most MAX-PROCS processes at a time; 0 means one per CPU')
+xargs.add_argument('--group-output', action='store_true', help='with -P, buffer the output of each command and write it when the command exits, so that output of parallel commands is not interleaved')
 xargs.add_argument('--process-slot-var', metavar='name', help='set environment variable VAR in child processes')
 xargs.add_argument('-p', '--interactive', action='store_true', help='prompt before running commands')
 xargs.add_argument('-t', '--verbose', action='store_true', help='print commands before executing them')
@@ -226,14 +230,109 @@ def prompt_user(cmdline_iter):
 				continue
 			yield cmdline
 
-def wait_open_slot(processes):
-	# type: (List[Optional[Any]])-> int
-	while processes:
-		for i, p in enumerate(processes):
-			# process doesn't yet exist or has finished
-			if p is None or p.poll() is not None:
-				return i
-		_pid, _err = os.wait()
+def exit_status(status):
+	# type: (int) -> int
+	"""Convert a status from os.waitpid() to a Popen-style returncode."""
+	if os.WIFSIGNALED(status):
+		return -os.WTERMSIG(status)
+	return os.WEXITSTATUS(status)
+
+class JobSlots(object):
+	"""
+	Run up to len(slots) commands at once.
+
+	Children are reaped with os.waitpid(-1) and mapped back to their slot by
+	pid, so we block until *some* child exits instead of polling every slot.
+	"""
+	def __init__(self, num_slots, stdin, slot_var=None, group_output=False):
+		# type: (int, IO[str], Optional[str], bool) -> None
+		self.slots = [None] * num_slots # type: List[Optional[subprocess.Popen]]
+		self.pid_to_slot = {} # type: Dict[int, int]
+		self.free = list(reversed(range(num_slots))) # lowest slot first
+		self.stdin = stdin
+		self.group_output = group_output
+		self.outputs = [None] * num_slots # type: List[Optional[Tuple[IO[str], IO[str]]]]
+		self.max_rc = 0
+		self.failed = False
+
+		# One environment per slot, so we don't copy os.environ per command.
+		if slot_var:
+			self.envs = []
+			for i in range(num_slots):
+				env = os.environ.copy()
+				env[slot_var] = str(i)
+				self.envs.append(env)
+		else:
+			self.envs = [None] * num_slots
+
+	def wait_for_slot(self):
+		# type: () -> None
+		"""Block until a slot is free."""
+		while not self.free:
+			self.reap_one()
+
+	def start(self, cmdline):
+		# type: (List[str]) -> None
+		"""Start cmdline in a free slot.  Call wait_for_slot() first."""
+		i = self.free.pop()
+		stdout = stderr = None
+		if self.group_output:
+			stdout = tempfile.TemporaryFile()
+			stderr = tempfile.TemporaryFile()
+			self.outputs[i] = (stdout, stderr)
+		p = subprocess.Popen(cmdline, stdin=self.stdin, stdout=stdout,
+		                     stderr=stderr, env=self.envs[i])
+		self.slots[i] = p
+		self.pid_to_slot[p.pid] = i
+
+	def reap_one(self):
+		# type: () -> None
+		"""Block until a child exits, and free its slot."""
+		while True:
+			try:
+				pid, status = os.waitpid(-1, 0)
+			except OSError as e:
+				if e.errno == errno.EINTR:
+					continue
+				raise
+			i = self.pid_to_slot.pop(pid, None)
+			if i is not None:
+				break
+			# not one of ours
+
+		p = self.slots[i]
+		# So that subprocess doesn't try to reap it again
+		p.returncode = exit_status(status)
+		if p.returncode:
+			self.failed = True
+		self.max_rc = max(self.max_rc, map_errcode(p.returncode))
+
+		if self.group_output:
+			# Copy the whole output at once, so it isn't interleaved with
+			# output of other commands
+			for f, dest in zip(self.outputs[i], (sys.stdout, sys.stderr)):
+				f.seek(0)
+				shutil.copyfileobj(f, dest)
+				f.close()
+				dest.flush()
+			self.outputs[i] = None
+
+		self.slots[i] = None
+		self.free.append(i)
+
+	def wait_all(self):
+		# type: () -> int
+		"""Wait for all running commands, and return the exit code for xargs."""
+		while self.pid_to_slot:
+			self.reap_one()
+		return self.max_rc
+
+def num_cpus():
+	# type: () -> int
+	try:
+		return max(1, os.sysconf('SC_NPROCESSORS_ONLN'))
+	except (ValueError, OSError):
+		return 1
 
 def map_errcode(rc):
 	# type: int -> int
@@ -328,17 +427,27 @@ def main(xargs_args):
 		cmdline_iter = tee_cmdline(cmdline_iter)
 
 	# phase 4: execute command-lines
-	if xargs_args.max_procs > 1:
-		ps = [None] * xargs_args.max_procs
-		environ = os.environ.copy()
+	max_procs = xargs_args.max_procs
+	if max_procs == 0:
+		max_procs = num_cpus()
+	if max_procs > 1:
+		# flush before children write to the same stdout
+		sys.stdout.flush()
+		sys.stderr.flush()
+		jobs = JobSlots(
+			max_procs,
+			cmd_input,
+			slot_var=xargs_args.process_slot_var,
+			group_output=xargs_args.group_output
+		)
 		for cmdline in cmdline_iter:
-			i = wait_open_slot(ps)
-			if ps[i] is not None and ps[i].returncode:
+			jobs.wait_for_slot()
+			# stop launching as soon as any command fails, including one we
+			# just reaped
+			if jobs.failed:
 				break
-			if xargs_args.process_slot_var:
-				environ[xargs_args.process_slot_var] = str(i)
-			ps[i] = subprocess.Popen(cmdline, stdin=cmd_input, env=environ)
-		return max(map_errcode(p.wait()) for p in ps if p is not None)
+			jobs.start(cmdline)
+		return jobs.wait_all()
 	else:
 		for cmdline in cmdline_iter:
 			p = subprocess.Popen(cmdline, stdin=cmd_input)
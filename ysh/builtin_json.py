@@ -8,7 +8,6 @@ from core.error import e_usage
 from core import pyos
 from core import state
 from core import vm
-from frontend import flag_spec
 from frontend import args
 from frontend import location
 from frontend import match
@@ -51,8 +50,7 @@ class Json(vm._Builtin):
         arg_r.Next()
 
         if action == 'write':
-            attrs = flag_spec.Parse('json_write', arg_r)
-            arg_jw = arg_types.json_write(attrs.attrs)
+            arg_jw = arg_types.Parse_json_write(arg_r)
 
             if not arg_r.AtEnd():
                 e_usage('write got too many args', arg_r.Location())
@@ -74,8 +72,7 @@ class Json(vm._Builtin):
                 sys.stdout.write('\n')
 
         elif action == 'read':
-            attrs = flag_spec.Parse('json_read', arg_r)
-            arg_jr = arg_types.json_read(attrs.attrs)
+            arg_jr = arg_types.Parse_json_read(arg_r)
             # TODO:
             # Respect -validate=F
 
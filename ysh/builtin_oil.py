@@ -227,8 +227,8 @@ class Write(_Builtin):
 
     def Run(self, cmd_val):
         # type: (cmd_value.Argv) -> int
-        attrs, arg_r = flag_spec.ParseCmdVal('write', cmd_val)
-        arg = arg_types.write(attrs.attrs)
+        arg_r = flag_spec.CmdValReader(cmd_val)
+        arg = arg_types.Parse_write(arg_r)
         #print(arg)
 
         if arg.unicode == 'raw':
@@ -103,6 +103,13 @@ def LookupVar(mem, var_name, which_scopes, var_loc):
             val = cast(value.Obj, UP_val)
             return val.obj
 
+        elif case(value_e.Int):  # e.g. bound by a YSH for loop
+            val = cast(value.Int, UP_val)
+            return val.i
+
+        elif case(value_e.Bool, value_e.Float, value_e.List, value_e.Dict):
+            return _ValueToPyObj(val)
+
         else:
             raise NotImplementedError()
 
@@ -691,6 +698,65 @@ class OilEvaluator(object):
 
         return items
 
+    def EvalForIterable(self, node, blame_loc):
+        # type: (expr_t, loc_t) -> value_t
+        """Evaluate the (expr) in 'for x in (expr)' to a typed value.
+
+        Ranges stay lazy, and variables aren't copied.  Other expressions are
+        evaluated to Python objects, which are wrapped in value.Obj.
+        """
+        try:
+            with state.ctx_OilExpr(self.mutable_opts):
+                return self._EvalForIterable(node)
+        except TypeError as e:
+            raise error.Expr('Type error in expression: %s' % str(e), blame_loc)
+        except (AttributeError, ValueError) as e:
+            raise error.Expr('Expression eval error: %s' % str(e), blame_loc)
+
+    def _EvalForIterable(self, node):
+        # type: (expr_t) -> value_t
+        UP_node = node
+        with tagswitch(node) as case:
+            if case(expr_e.Range):
+                node = cast(expr.Range, UP_node)
+                return self._EvalRange(node)
+
+            elif case(expr_e.List):
+                node = cast(expr.List, UP_node)
+                return self._EvalList(node)
+
+            elif case(expr_e.Dict):
+                node = cast(expr.Dict, UP_node)
+                return self._EvalDict(node)
+
+            elif case(expr_e.Var):
+                node = cast(expr.Var, UP_node)
+                val = self.mem.GetValue(node.name.tval,
+                                        which_scopes=scope_e.LocalOrGlobal)
+                UP_val = val
+                with tagswitch(val) as case2:
+                    if case2(value_e.Undef):
+                        e_die('Undefined variable %r' % node.name.tval,
+                              node.name)
+
+                    elif case2(value_e.AssocArray):
+                        val = cast(value.AssocArray, UP_val)
+                        # YSH dicts are stored as AssocArray with values of
+                        # any type
+                        for v in val.d.values():
+                            if not isinstance(v, str):
+                                return value.Obj(val.d)
+                        return val
+
+                    elif case2(value_e.MaybeStrArray, value_e.Obj,
+                               value_e.List, value_e.Dict, value_e.Range):
+                        return val
+
+                    else:
+                        return value.Obj(_ValueToPyObj(val))
+
+        return value.Obj(self._EvalExpr(node))
+
     def EvalExpr(self, node, blame_loc):
         # type: (expr_t, loc_t) -> Any
         """Public API for _EvalExpr that ensures that command_sub_errexit is
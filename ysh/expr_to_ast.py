@@ -793,7 +793,7 @@ class Transformer(object):
                 exprs = []  # type: List[expr_t]
                 for i in xrange(pattern.NumChildren()):
                     child = pattern.GetChild(i)
-                    if child.typ == grammar_nt.expr:
+                    if ISNONTERMINAL(child.typ):  # expr may be elided
                         expr = self.Expr(child)
                         exprs.append(expr)
                 return pat.YshExprs(exprs)
@@ -19,6 +19,21 @@ from frontend import reader
 from pgen2 import parse, pgen
 
 
+# expr_to_ast.Transformer handles each of these nonterminals the same way when
+# it has one child, so the parser elides them.  Precedence levels make the
+# chains long, e.g. 42 is test -> or_test -> and_test -> ... -> power -> atom.
+UNARY_NONTERMINALS = [
+    'test', 'or_test', 'and_test', 'not_test', 'comparison', 'range_expr',
+    'expr', 'xor_expr', 'and_expr', 'shift_expr', 'arith_expr', 'term',
+    'factor', 'power', 'atom'
+]
+
+
+def _Unary(basename):
+    """Only elide nodes in Oil's grammar, not find or calc."""
+    return UNARY_NONTERMINALS if basename == 'grammar' else None
+
+
 class OilTokenDef(object):
     def __init__(self, ops, more_ops, keyword_ops):
         self.ops = ops
@@ -135,7 +150,7 @@ def main(argv):
             tok_def = find_tokenizer.TokenDef()
 
         with open(grammar_path) as f:
-            gr = pgen.MakeGrammar(f, tok_def=tok_def)
+            gr = pgen.MakeGrammar(f, tok_def=tok_def, unary=_Unary(basename))
 
         marshal_path = os.path.join(out_dir, basename + '.marshal')
         with open(marshal_path, 'wb') as out_f:
@@ -157,7 +172,7 @@ def main(argv):
         basename, _ = os.path.splitext(os.path.basename(grammar_path))
 
         with open(grammar_path) as f:
-            gr = pgen.MakeGrammar(f, tok_def=tok_def)
+            gr = pgen.MakeGrammar(f, tok_def=tok_def, unary=_Unary(basename))
 
         nonterm_h = os.path.join(out_dir, basename + '_nt.h')
         with open(nonterm_h, 'w') as out_f:
@@ -185,7 +200,9 @@ def main(argv):
         grammar_name, _ = os.path.splitext(os.path.basename(grammar_path))
 
         with open(grammar_path) as f:
-            gr = pgen.MakeGrammar(f, tok_def=tok_def)
+            gr = pgen.MakeGrammar(f,
+                                  tok_def=tok_def,
+                                  unary=_Unary(grammar_name))
 
         arena = alloc.Arena()
         lex_ = MakeOilLexer(code_str, arena)